@@ -0,0 +1,734 @@
+#!/usr/bin/env python3
+"""
+Async Network Monitoring Service - The continuous monitor on one event loop.
+
+The threaded service spends a thread per sweep host, blocks a stage thread
+on every ping3 call and sleeps between samples, so probing hundreds of
+devices per interval costs hundreds of threads. This edition runs the same
+pipeline as tasks on a single asyncio event loop:
+
+1. Discovery, probing, snapshot ticks and checkpoints are tasks scheduled
+   on the same drift-free deadline grids as the threaded stages
+2. ICMP echo requests for every host share one non-blocking socket; replies
+   are matched to waiting probes by address and sequence number, so
+   thousands of pings can be in flight at once
+3. Probes cover the whole device list every probe_coverage seconds instead
+   of one device per tick, with concurrency bounded by the pinger
+4. stop() cancels every task and awaits it before the writers are flushed
+
+Snapshots are the same MonitoringSnapshot objects as in the threaded
+service and go through the same persistence pipeline, output sinks,
+renderer and metrics. Those writers keep their own threads, since SQLite
+and file writes block; the loop only hands them snapshots, which never
+waits. Reverse DNS runs on a small resolver pool for the same reason.
+
+Usage:
+    python async_monitor_service.py              # Live terminal display
+    python async_monitor_service.py --headless   # No terminal output (daemons)
+    python async_monitor_service.py --metrics    # Prometheus metrics on localhost:9108
+    python async_monitor_service.py --jsonl=snapshots.jsonl   # Output sinks as in the threaded service
+    python async_monitor_service.py --simulate=10000          # Simulated LAN, as in the threaded service
+
+    service = AsyncContinuousMonitorService(render_mode='headless')
+    asyncio.run(service.run())                   # Until SIGINT/SIGTERM or request_stop()
+"""
+
+import asyncio
+import contextlib
+import ipaddress
+import math
+import os
+import socket
+import struct
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Add backend directory to path for imports
+from pathlib import Path
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+from network_monitor import NetworkMonitorConfig
+from network_backends import NetworkBackend, LiveBackend
+from stage_workers import PeriodicStage, StageResult
+from terminal_renderer import RenderConfig
+from service_metrics import MetricsConfig
+from overload_controller import OverloadConfig
+from output_sinks import OutputSink
+from continuous_monitor_service import (
+    ContinuousNetworkMonitorService, DISCOVERY_INTERVAL, output_sinks_from_args, network_backend_from_args,
+    checkpoint_path_from_args, database_from_args
+)
+
+
+class AsyncMonitorConfig:
+    """Configuration constants for the asyncio monitoring service."""
+
+    # Echo requests awaiting a reply at any one time (more mostly makes
+    # each loop iteration longer, not the sweep faster)
+    MAX_PINGS_IN_FLIGHT = 256
+
+    # Socket receive buffer: a sweep's replies arrive in one burst
+    RECEIVE_BUFFER_BYTES = 4 * 1024 * 1024
+
+    # Threads used for blocking pings when no ICMP socket can be opened
+    EXECUTOR_PING_WORKERS = 64
+
+    # Concurrent reverse DNS lookups and the time allowed for each
+    MAX_LOOKUPS_IN_FLIGHT = 32
+    LOOKUP_TIMEOUT = 2.0
+
+    # Every device is probed at least once per this many seconds
+    PROBE_COVERAGE = DISCOVERY_INTERVAL
+
+    # Echo request payload (identifies our packets in captures)
+    ECHO_PAYLOAD = b'network-tracker-ai'
+
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+
+def _icmp_checksum(data: bytes) -> int:
+    """Internet checksum (RFC 1071) of an ICMP message."""
+    if len(data) % 2:
+        data += b'\0'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+class AsyncPinger:
+    """
+    ICMP echo for many hosts at once over a single non-blocking socket.
+
+    Opens an unprivileged ICMP datagram socket where the kernel allows it
+    (net.ipv4.ping_group_range), a raw ICMP socket otherwise, and falls
+    back to the backend's blocking ping on a thread pool when neither is
+    permitted. Simulated and replayed backends are asked directly and the
+    reply is delivered after the modelled round trip. Must be used from
+    one event loop.
+    """
+
+    DGRAM = 'dgram'
+    RAW = 'raw'
+    EXECUTOR = 'executor'
+    BACKEND = 'backend'
+
+    def __init__(self, timeout: float = NetworkMonitorConfig.PING_TIMEOUT,
+                 max_in_flight: int = AsyncMonitorConfig.MAX_PINGS_IN_FLIGHT,
+                 backend: Optional[NetworkBackend] = None):
+        """
+        Initialize the pinger.
+
+        Args:
+            timeout: Seconds to wait for each echo reply
+            max_in_flight: Echo requests outstanding at most
+            backend: Network to ping (defaults to the live network)
+        """
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self.backend = backend or LiveBackend()
+        self.mode: Optional[str] = None
+
+        # Statistics
+        self.sent = 0
+        self.received = 0
+        self.timeouts = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._socket: Optional[socket.socket] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._limit = asyncio.Semaphore(max_in_flight)
+        self._pending: Dict[Tuple[str, int], asyncio.Future] = {}
+        self._identifier = os.getpid() & 0xFFFF
+        self._sequence = 0
+
+    def open(self) -> str:
+        """Open the ICMP socket on the running loop; returns the mode used."""
+        if self.mode:
+            return self.mode
+        self._loop = asyncio.get_running_loop()
+
+        if not self.backend.live:
+            if self.backend.blocking:
+                self._open_executor()
+            else:
+                self.mode = self.BACKEND
+            return self.mode
+
+        for kind, mode in ((socket.SOCK_DGRAM, self.DGRAM), (socket.SOCK_RAW, self.RAW)):
+            try:
+                sock = socket.socket(socket.AF_INET, kind, socket.IPPROTO_ICMP)
+            except OSError:
+                continue  # Not permitted for this user
+            sock.setblocking(False)
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, AsyncMonitorConfig.RECEIVE_BUFFER_BYTES)
+            except OSError:
+                pass  # Keep the default size
+            self._socket = sock
+            self._loop.add_reader(sock.fileno(), self._on_readable)
+            self.mode = mode
+            return mode
+
+        self._open_executor()
+        return self.mode
+
+    def _open_executor(self):
+        self._executor = ThreadPoolExecutor(max_workers=AsyncMonitorConfig.EXECUTOR_PING_WORKERS,
+                                            thread_name_prefix="ping")
+        self.mode = self.EXECUTOR
+
+    def close(self):
+        """Close the socket and cancel pings still waiting for a reply."""
+        if self._socket:
+            if self._loop and not self._loop.is_closed():
+                self._loop.remove_reader(self._socket.fileno())
+            self._socket.close()
+            self._socket = None
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        for future in self._pending.values():
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
+        self.mode = None
+
+    async def ping(self, ip: str, timeout: Optional[float] = None) -> Optional[float]:
+        """
+        Send one echo request.
+
+        Returns:
+            Round-trip time in seconds, or None on timeout or send failure
+        """
+        if self.mode is None:
+            self.open()
+        timeout = timeout or self.timeout
+
+        async with self._limit:
+            self.sent += 1
+            if self.mode == self.EXECUTOR:
+                delay = await self._ping_in_executor(ip, timeout)
+            elif self.mode == self.BACKEND:
+                delay = await self._ping_backend(ip, timeout)
+            else:
+                delay = await self._ping_on_socket(ip, timeout)
+
+        if delay is None:
+            self.timeouts += 1
+        else:
+            self.received += 1
+        return delay
+
+    async def ping_many(self, hosts: List[str], timeout: Optional[float] = None) -> List[Optional[float]]:
+        """
+        Ping every host, max_in_flight at a time.
+
+        A fixed set of workers walks the host list, so a sweep of thousands
+        of hosts never creates thousands of tasks in one loop iteration.
+
+        Returns:
+            Round-trip times in seconds (None for no reply), in host order
+        """
+        delays: List[Optional[float]] = [None] * len(hosts)
+        pending = iter(enumerate(hosts))
+
+        async def worker():
+            for index, ip in pending:
+                delays[index] = await self.ping(ip, timeout)
+
+        await asyncio.gather(*(worker() for _ in range(min(self.max_in_flight, len(hosts)))))
+        return delays
+
+    async def _ping_on_socket(self, ip: str, timeout: float) -> Optional[float]:
+        loop = self._loop
+        sequence = self._next_sequence(ip)
+        key = (ip, sequence)
+        future = loop.create_future()
+        self._pending[key] = future
+        try:
+            sent_at = loop.time()
+            try:
+                await loop.sock_sendto(self._socket, self._echo_request(sequence), (ip, 0))
+            except OSError:
+                return None  # Unreachable network, no route, ...
+            try:
+                received_at = await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                return None
+            return max(0.0, received_at - sent_at)
+        finally:
+            self._pending.pop(key, None)
+
+    async def _ping_in_executor(self, ip: str, timeout: float) -> Optional[float]:
+        try:
+            return await self._loop.run_in_executor(self._executor, self.backend.ping, ip, timeout)
+        except Exception:
+            return None
+
+    async def _ping_backend(self, ip: str, timeout: float) -> Optional[float]:
+        # The answer is known at once; hold it for the round trip (or the
+        # timeout) on the backend's clock so probes overlap as they would
+        delay = self.backend.ping(ip, timeout)
+        await asyncio.sleep(self.backend.real_seconds(timeout if delay is None else delay))
+        return delay
+
+    def _next_sequence(self, ip: str) -> int:
+        while True:
+            self._sequence = (self._sequence + 1) & 0xFFFF
+            if (ip, self._sequence) not in self._pending:
+                return self._sequence
+
+    def _echo_request(self, sequence: int) -> bytes:
+        # The kernel replaces the identifier of datagram ICMP sockets
+        payload = AsyncMonitorConfig.ECHO_PAYLOAD
+        header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, self._identifier, sequence)
+        checksum = _icmp_checksum(header + payload)
+        return struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, checksum, self._identifier, sequence) + payload
+
+    def _on_readable(self):
+        """Resolve the probes waiting for every reply that has arrived."""
+        received_at = self._loop.time()
+        while self._socket:
+            try:
+                data, address = self._socket.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return  # Queued ICMP error; the affected probe times out
+
+            if self.mode == self.RAW:
+                data = data[(data[0] & 0x0F) * 4:]  # Strip the IP header
+            if len(data) < 8:
+                continue
+            icmp_type, _code, _checksum, identifier, sequence = struct.unpack('!BBHHH', data[:8])
+            if icmp_type != ICMP_ECHO_REPLY:
+                continue
+            if self.mode == self.RAW and identifier != self._identifier:
+                continue  # A raw socket sees every reply on the host
+
+            future = self._pending.get((address[0], sequence))
+            if future is not None and not future.done():
+                future.set_result(received_at)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'mode': self.mode,
+            'sent': self.sent,
+            'received': self.received,
+            'timeouts': self.timeouts,
+            'in_flight': self.in_flight,
+            'max_in_flight': self.max_in_flight
+        }
+
+
+class AsyncContinuousMonitorService(ContinuousNetworkMonitorService):
+    """
+    The continuous monitoring service with every stage on one event loop.
+
+    Snapshot assembly, processing, shedding and reporting are inherited
+    unchanged; only how the stages are scheduled and how devices are
+    pinged differ. start(), stop() and run() are coroutines.
+    """
+
+    def __init__(self, *args, probe_coverage: float = AsyncMonitorConfig.PROBE_COVERAGE,
+                 max_pings_in_flight: int = AsyncMonitorConfig.MAX_PINGS_IN_FLIGHT,
+                 resolve_hostnames: bool = True, **kwargs):
+        """
+        Initialize the service.
+
+        Args:
+            *args, **kwargs: As for ContinuousNetworkMonitorService
+            probe_coverage: Probe every device at least once per this many
+                            seconds (each round probes a share of the devices)
+            max_pings_in_flight: Echo requests outstanding at most
+            resolve_hostnames: Look up hostnames of newly discovered devices
+        """
+        super().__init__(*args, **kwargs)
+        self.probe_coverage = probe_coverage
+        self.resolve_hostnames = resolve_hostnames
+        self.pinger = AsyncPinger(max_in_flight=max_pings_in_flight, backend=self.network_monitor.backend)
+
+        # Latest quality result per device and the last sweep's summary
+        self.probe_results: Dict[str, Dict[str, Any]] = {}
+        self.last_sweep: Dict[str, Any] = {}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self._stop_requested: Optional[asyncio.Event] = None
+        self._resolver: Optional[ThreadPoolExecutor] = None
+        self._lookup_limit = asyncio.Semaphore(AsyncMonitorConfig.MAX_LOOKUPS_IN_FLIGHT)
+
+    def _signal_handler(self, signum, frame):
+        """Handle interrupt signals by letting run() shut down on the loop."""
+        print("\n🛑 Received shutdown signal...")
+        self.request_stop()
+
+    def request_stop(self):
+        """Ask run() to stop the service (safe from any thread)."""
+        loop, stop_requested = self._loop, self._stop_requested
+        if loop is not None and stop_requested is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(stop_requested.set)
+
+    async def run(self) -> bool:
+        """
+        Start the service and run it until request_stop() or a signal.
+
+        Returns:
+            False if the service could not start
+        """
+        if not await self.start():
+            return False
+        try:
+            await self._stop_requested.wait()
+        finally:
+            await self.stop()
+        return True
+
+    async def start(self) -> bool:
+        """
+        Start the service on the running event loop.
+
+        Returns:
+            True if service started successfully, False otherwise
+        """
+        if self.is_running:
+            print("⚠️ Service is already running")
+            return False
+
+        self._loop = asyncio.get_running_loop()
+        self._stop_requested = asyncio.Event()
+        self._print_startup_banner()
+        mode = self.pinger.open()
+        print(f"⚡ Event loop probing: {mode} pings, up to {self.pinger.max_in_flight} pings in flight")
+
+        # Warm restart from a checkpoint, or a full initial sweep
+        checkpoint = self._load_checkpoint()
+        if checkpoint:
+            self._restore_checkpoint(checkpoint)
+            print(f"♻️  Restored {len(self.device_cache)} devices from checkpoint "
+                  f"({checkpoint['age_seconds']:.0f}s old); reconciling in the background")
+        else:
+            print("🔍 Performing initial device discovery...")
+            initial_devices = await self.discover_devices()
+            if not self._adopt_initial_devices(initial_devices):
+                self._close_network()
+                return False
+
+        self._establish_baseline()
+        await asyncio.to_thread(self._open_outputs)
+
+        self.is_running = True
+        self.start_time = datetime.now()
+        self.renderer.start()
+        self._start_metrics_server()
+
+        self.tick_scheduler.reset()
+        for stage in (self.discovery_stage, self.probe_stage, self.checkpoint_stage, self.retention_stage):
+            stage.scheduler.reset()
+        self._tasks = [
+            asyncio.create_task(self._tick_loop(), name="tick"),
+            asyncio.create_task(self._stage_loop(self.probe_stage, self._run_probe_round), name="probe"),
+            asyncio.create_task(self._stage_loop(self.discovery_stage, self._run_discovery_round),
+                                name="discovery")
+        ]
+        if self.checkpoint_path:
+            self._tasks.append(asyncio.create_task(
+                self._stage_loop(self.checkpoint_stage, partial(asyncio.to_thread, self._run_checkpoint_stage)),
+                name="checkpoint"
+            ))
+        if self.db_manager and self.retention_days:
+            self._tasks.append(asyncio.create_task(
+                self._stage_loop(self.retention_stage, partial(asyncio.to_thread, self._run_retention_stage)),
+                name="retention"
+            ))
+        if self.restored_from_checkpoint:
+            self.discovery_stage.trigger()  # Reconcile the restored device list now
+
+        print("\n📊 Real-time Monitoring Started:")
+
+        return True
+
+    async def stop(self):
+        """Cancel every task, flush the writers and close the session."""
+        if not self.is_running:
+            return
+
+        self.is_running = False
+        self.tick_scheduler.stop()
+        for stage in (self.discovery_stage, self.probe_stage, self.checkpoint_stage, self.retention_stage):
+            stage.scheduler.stop()
+
+        # In-flight probes and sweeps are cancelled, not waited for
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.to_thread(self.renderer.stop)
+
+        print("\n🛑 Stopping monitoring service...")
+        print(f"✅ {len(tasks)} event loop tasks cancelled")
+
+        self._close_network()
+        await asyncio.to_thread(self._close_outputs)
+
+        # Print final statistics
+        self._print_final_stats()
+
+    def _close_network(self):
+        self.pinger.close()
+        if self._resolver:
+            self._resolver.shutdown(wait=False, cancel_futures=True)
+            self._resolver = None
+
+    async def _tick_loop(self):
+        """Snapshot ticks: bandwidth sampling and assembly, as in the monitor thread."""
+        self._consecutive_errors = 0
+        async for tick in self.tick_scheduler.aticks():
+            if not self.is_running:
+                break
+            self._handle_tick(tick)
+
+    async def _stage_loop(self, stage: PeriodicStage, run: Callable[[], Awaitable[Any]]):
+        """
+        Run a stage on its schedule as a task.
+
+        Publishes results and keeps the counters exactly like the stage's
+        own worker thread would, so status and metrics read the same.
+        """
+        async for _tick in stage.scheduler.aticks(initial_delay=stage.initial_delay):
+            run_start = time.monotonic()
+            try:
+                value = await run()
+                if value is not None:
+                    finished = time.monotonic()
+                    sequence = stage.latest.sequence + 1 if stage.latest else 1
+                    stage.latest = StageResult(value, sequence, finished, finished - run_start)
+            except Exception as e:
+                stage.error_count += 1
+                stage.last_error = str(e)
+            stage.run_count += 1
+
+    async def _run_discovery_round(self) -> Optional[List[Dict[str, Any]]]:
+        """Discovery stage: sweep the network and refresh the device cache."""
+        if self.overload and self.overload.is_shedding(OverloadConfig.REDISCOVERY):
+            self._rediscovery_postponed += 1
+            return None  # Postponed; run again once headroom returns
+        self._rediscovery_postponed = 0
+
+        fresh_devices = await self.discover_devices()
+        if not fresh_devices:
+            return None  # Keep using cached devices
+
+        self._update_device_cache(fresh_devices)
+        return fresh_devices
+
+    async def discover_devices(self) -> List[Dict[str, Any]]:
+        """
+        Ping sweep of the whole network range with every host in flight at once.
+
+        Returns:
+            Devices in the same form as NetworkMonitor.discover_devices()
+        """
+        sweep_start = time.perf_counter()
+        network = ipaddress.IPv4Network(self.network_monitor.network_range)
+        hosts = [str(ip) for ip in network.hosts()]
+
+        delays = await self.pinger.ping_many(hosts)
+        seen_at = datetime.fromtimestamp(self.network_monitor.backend.time()).isoformat()
+        devices = [
+            {
+                'ip': ip,
+                'latency_ms': round(delay * 1000, 2),
+                'status': 'online',
+                'last_seen': seen_at,
+                'hostname': None,
+                'mac_address': None
+            }
+            for ip, delay in zip(hosts, delays) if delay is not None
+        ]
+
+        await self._resolve_hostnames(devices)
+        arp_devices = await asyncio.to_thread(self.network_monitor._parse_arp_table)
+        devices = self.network_monitor._merge_device_data(devices, arp_devices)
+        self.network_monitor.devices = {dev['ip']: dev for dev in devices}
+
+        self.last_sweep = {
+            'hosts': len(hosts),
+            'devices': len(devices),
+            'seconds': round(time.perf_counter() - sweep_start, 3)
+        }
+        return devices
+
+    async def _resolve_hostnames(self, devices: List[Dict[str, Any]]):
+        """Fill in hostnames, looking up only devices without a known name."""
+        unnamed = []
+        for device in devices:
+            known = self.device_cache.get(device['ip'])
+            if known and known.get('hostname'):
+                device['hostname'] = known['hostname']
+            elif self.resolve_hostnames:
+                unnamed.append(device)
+
+        if unnamed and not self.network_monitor.backend.blocking:
+            for device in unnamed:  # Answered from memory, no need for threads
+                device['hostname'] = self.network_monitor._get_hostname(device['ip'])
+        elif unnamed:
+            if self._resolver is None:
+                self._resolver = ThreadPoolExecutor(max_workers=AsyncMonitorConfig.MAX_LOOKUPS_IN_FLIGHT,
+                                                    thread_name_prefix="resolver")
+            await asyncio.gather(*(self._lookup_hostname(device) for device in unnamed))
+
+    async def _lookup_hostname(self, device: Dict[str, Any]):
+        async with self._lookup_limit:
+            lookup = self._loop.run_in_executor(
+                self._resolver, socket.getnameinfo, (device['ip'], 0), socket.NI_NAMEREQD
+            )
+            try:
+                hostname, _port = await asyncio.wait_for(lookup, AsyncMonitorConfig.LOOKUP_TIMEOUT)
+            except (OSError, asyncio.TimeoutError):
+                return
+            device['hostname'] = hostname
+
+    def probe_batch_size(self, device_count: int) -> int:
+        """Devices per probe round needed to cover all of them within probe_coverage."""
+        rounds = max(1, int(self.probe_coverage / self.monitoring_interval))
+        return max(1, min(device_count, math.ceil(device_count / rounds)))
+
+    async def _run_probe_round(self) -> Optional[Dict[str, Any]]:
+        """
+        Probe stage: test the next batch of devices (round-robin) concurrently.
+
+        Returns:
+            The batch result: the first tested ip with the batch's average
+            latency and packet loss, or None if there is nothing to test
+        """
+        # Shedding probe work: single-sample probes, every other run
+        samples = self.quality_test_samples
+        if self.overload and self.overload.is_shedding(OverloadConfig.PROBE_SAMPLES):
+            self._shed_probe_skip = not self._shed_probe_skip
+            if self._shed_probe_skip:
+                return None
+            samples = 1
+
+        device_ips = list(self.device_cache.keys())
+        if not device_ips:
+            return None
+        batch_size = self.probe_batch_size(len(device_ips))
+        first = self.device_test_index
+        batch = [device_ips[(first + offset) % len(device_ips)] for offset in range(batch_size)]
+        self.device_test_index += batch_size
+
+        if batch_size == 1:
+            self._print_quality_message("🔍 Testing connection quality to {} ({} samples)...", batch[0], samples)
+        else:
+            self._print_quality_message("🔍 Testing connection quality to {} devices from {} ({} samples)...",
+                                        batch_size, batch[0], samples)
+
+        results = await self._probe_devices(batch, samples)
+
+        lost = sum(1 for result in results if result['packet_loss_percent'] >= 100)
+        self.metrics.inc('probes_total', len(results))
+        if lost:
+            self.metrics.inc('probe_timeouts_total', lost)
+        self.tested_devices.update(batch)
+        self.probe_results.update(zip(batch, results))
+
+        latencies = [result['avg_latency_ms'] for result in results if result['packet_loss_percent'] < 100]
+        return {
+            'ip': batch[0],
+            'avg_latency_ms': sum(latencies) / len(latencies) if latencies else 0.0,
+            'packet_loss_percent': sum(result['packet_loss_percent'] for result in results) / len(results),
+            'devices_probed': len(results)
+        }
+
+    async def _probe_devices(self, ips: List[str], samples: int) -> List[Dict[str, Any]]:
+        """Connection quality of each device (same metrics as monitor_device_connectivity)."""
+        latencies: List[List[float]] = [[] for _ in ips]
+        for sample in range(samples):
+            if sample:
+                await asyncio.sleep(self.network_monitor.backend.real_seconds(NetworkMonitorConfig.PING_INTERVAL))
+            for device_latencies, delay in zip(latencies, await self.pinger.ping_many(ips)):
+                if delay is not None:
+                    device_latencies.append(delay * 1000)
+        return [
+            self.network_monitor._calculate_connectivity_metrics(ip, device_latencies, len(device_latencies), samples)
+            for ip, device_latencies in zip(ips, latencies)
+        ]
+
+    def get_service_status(self) -> Dict[str, Any]:
+        """Get current service state, including the event loop's probing."""
+        status = super().get_service_status()
+        status['quality_testing_enabled'] = self.is_running
+        status['event_loop'] = {
+            'tasks': [task.get_name() for task in self._tasks if not task.done()],
+            'pinger': self.pinger.get_stats(),
+            'probe_batch_size': self.probe_batch_size(len(self.device_cache)) if self.device_cache else 0,
+            'last_sweep': self.last_sweep
+        }
+        return status
+
+    def _print_final_stats(self):
+        """Print final statistics, plus the pinger's totals."""
+        super()._print_final_stats()
+        pinger = self.pinger
+        if pinger.sent:
+            print(f"⚡ Event loop pings: {pinger.sent} sent, {pinger.received} replies, "
+                  f"{pinger.timeouts} timeouts")
+
+
+def main():
+    """Main entry point for the asyncio monitoring service (--stdout: JSON lines only on stdout)."""
+    sinks = output_sinks_from_args(sys.argv[1:])
+    to_stdout = '--stdout' in sys.argv
+    with contextlib.redirect_stdout(sys.stderr) if to_stdout else contextlib.nullcontext():
+        return run_service(sinks, to_stdout)
+
+
+def run_service(sinks: List[OutputSink], to_stdout: bool) -> int:
+    """Configure, run and stop the service from the command line arguments."""
+    print("🌐 Network Monitoring Service (asyncio)")
+    print("=======================================")
+
+    backend = network_backend_from_args(sys.argv[1:])
+    db_manager = database_from_args(sys.argv[1:])
+
+    service = AsyncContinuousMonitorService(
+        monitoring_interval=1.0,
+        quality_test_samples=1,
+        render_mode=RenderConfig.HEADLESS if '--headless' in sys.argv or to_stdout else RenderConfig.LIVE,
+        metrics_port=MetricsConfig.DEFAULT_PORT if '--metrics' in sys.argv else None,
+        checkpoint_path=checkpoint_path_from_args(sys.argv[1:]),
+        output_sinks=sinks,
+        network_backend=backend,
+        db_manager=db_manager
+    )
+
+    try:
+        if not asyncio.run(service.run()):
+            print("❌ Failed to start monitoring service")
+            return 1
+    except Exception as e:
+        print(f"\n❌ Service error: {e}")
+        return 1
+    finally:
+        if db_manager:
+            db_manager.close()
+
+    print("👋 Service stopped. Thank you for using Network Monitor!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,20 +8,36 @@ This service runs in the background and continuously monitors:
 3. Overall connection quality
 
 The service collects data every 1 second and displays real-time statistics
-in the terminal. This data will later be saved to a SQLite database.
+in the terminal. When a database is configured, snapshots are persisted to
+SQLite by a write-behind pipeline that never blocks collection; optional
+output sinks (JSONL files, UNIX datagram sockets, stdout, a live subscriber
+feed) each receive the snapshots through their own queue.
 
 Usage:
-    python continuous_monitor_service.py
+    python continuous_monitor_service.py              # Live terminal display
+    python continuous_monitor_service.py --headless   # No terminal output (daemons)
+    python continuous_monitor_service.py --metrics    # Prometheus metrics on localhost:9108
+    python continuous_monitor_service.py --db=network_monitoring.db    # Persist snapshots to SQLite
+    python continuous_monitor_service.py --checkpoint=/var/lib/netmon/checkpoint.json  # Warm restarts
+    python continuous_monitor_service.py --jsonl=snapshots.jsonl       # Also write JSON lines
+    python continuous_monitor_service.py --datagram=/run/netmon.sock   # Also send UNIX datagrams
+    python continuous_monitor_service.py --stdout     # JSON lines on stdout, messages on stderr (implies --headless)
+    python continuous_monitor_service.py --feed=/run/netmon-feed.sock  # Live feed for subscribers
+    python continuous_monitor_service.py --feed-port=9109             # Server-Sent Events on localhost
+    python continuous_monitor_service.py --simulate=10000             # Simulated LAN of 10k devices
+    python continuous_monitor_service.py --replay=lan.trace.jsonl --speed=10  # Replay a trace at 10x
 """
 
 import threading
 import time
 import signal
+import contextlib
 import sys
 import os
+from collections import deque
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
-from dataclasses import dataclass
+from typing import List, Dict, Optional, Any, Tuple
+from dataclasses import dataclass, asdict
 
 # Add backend directory to path for imports
 import sys
@@ -30,27 +46,81 @@ backend_path = Path(__file__).parent
 sys.path.insert(0, str(backend_path))
 
 from network_monitor import NetworkMonitor
+from network_backends import NetworkBackend, SimulatedBackend, SimulationProfile, TraceReplayBackend
+from monitoring_snapshot import MonitoringSnapshot, DeviceSet, EMPTY_DEVICE_SET, QUALITY_CODES
+from stage_workers import PeriodicStage
+from tick_scheduler import DeadlineScheduler, ScheduledTick, SchedulerConfig
+from terminal_renderer import TerminalRenderer, RenderConfig
+from service_metrics import MetricsRegistry, MetricsServer, MetricsConfig
+from overload_controller import OverloadController, OverloadConfig
+from service_checkpoint import CheckpointConfig, save_checkpoint, load_checkpoint, restore_interface_counters
+from conntrack_accounting import ConntrackTrafficAccountant
+from quantile_sketch import BandwidthQuantileTracker
+from database_manager import NetworkDatabaseManager, RetentionProgress
+from persistence_pipeline import SnapshotPersistencePipeline
+from deadband_filter import DeadbandFilter, DeadbandConfig
+from output_sinks import OutputSink, SinkFanOut, JsonlFileSink, UnixDatagramSink, StdoutSink
+from snapshot_feed import SnapshotFeed
+
+# Interfaces excluded from the network-wide bandwidth totals
+LOOPBACK_INTERFACES = ('lo', 'lo0')
+
+# Seconds between background device rediscovery sweeps
+DISCOVERY_INTERVAL = 30.0
+
+# Recent snapshots kept in memory (one hour at the default 1 s interval)
+DEFAULT_SNAPSHOT_HISTORY = 3600
+
+# Seconds between background retention runs (when retention_days is set)
+RETENTION_INTERVAL = 3600.0
+
+# Failed ticks in a row before all optional work is shed
+MAX_CONSECUTIVE_ERRORS = 5
 
 
 @dataclass
-class MonitoringSnapshot:
+class SessionStatistics:
     """
-    Data class representing a single monitoring snapshot.
+    Running aggregates for a monitoring session.
     
-    This structure contains all the monitoring metrics we collect
-    and will be perfect for storing in our database later.
+    Updated in O(1) on every tick, so session totals and averages are
+    available instantly no matter how long the service has been running
+    or how much snapshot history is retained.
     """
-    timestamp: str
-    device_count: int
-    devices: List[Dict[str, Any]]
-    total_upload_mbps: float
-    total_download_mbps: float
-    total_usage_mb: float
-    avg_latency_ms: float
-    avg_packet_loss: float
-    overall_quality: str
-    active_interfaces: List[str]
-    tested_device_ip: Optional[str] = None
+    snapshot_count: int = 0
+    device_count_sum: int = 0
+    max_device_count: int = 0
+    upload_mbps_sum: float = 0.0
+    download_mbps_sum: float = 0.0
+    peak_download_mbps: float = 0.0
+    latency_ms_sum: float = 0.0
+    packet_loss_sum: float = 0.0
+    
+    def update(self, snapshot: MonitoringSnapshot):
+        """Fold one snapshot into the running aggregates."""
+        self.snapshot_count += 1
+        self.device_count_sum += snapshot.device_count
+        self.max_device_count = max(self.max_device_count, snapshot.device_count)
+        self.upload_mbps_sum += snapshot.total_upload_mbps
+        self.download_mbps_sum += snapshot.total_download_mbps
+        self.peak_download_mbps = max(self.peak_download_mbps, snapshot.total_download_mbps)
+        self.latency_ms_sum += snapshot.avg_latency_ms
+        self.packet_loss_sum += snapshot.avg_packet_loss
+    
+    def _average(self, total: float) -> float:
+        return total / self.snapshot_count if self.snapshot_count else 0.0
+    
+    @property
+    def avg_device_count(self) -> float:
+        return self._average(self.device_count_sum)
+    
+    @property
+    def avg_latency_ms(self) -> float:
+        return self._average(self.latency_ms_sum)
+    
+    @property
+    def avg_packet_loss(self) -> float:
+        return self._average(self.packet_loss_sum)
 
 
 class ContinuousNetworkMonitorService:
@@ -64,41 +134,164 @@ class ContinuousNetworkMonitorService:
     4. Service-oriented architecture
     5. Data pipeline design
     6. Round-robin device testing for comprehensive coverage
+    
+    Discovery and quality probing run as independent stages on their own
+    threads; the monitor thread samples bandwidth on every tick and
+    assembles each snapshot from the latest result of the other stages.
     """
     
-    def __init__(self, monitoring_interval: float = 1.0, quality_test_samples: int = 1):
+    def __init__(self, monitoring_interval: float = 1.0, quality_test_samples: int = 1,
+                 enable_traffic_accounting: bool = True,
+                 db_manager: Optional[NetworkDatabaseManager] = None,
+                 snapshot_history_size: int = DEFAULT_SNAPSHOT_HISTORY,
+                 missed_tick_policy: str = SchedulerConfig.COALESCE,
+                 render_mode: str = RenderConfig.LIVE,
+                 max_refresh_hz: float = RenderConfig.MAX_REFRESH_HZ,
+                 metrics_port: Optional[int] = None,
+                 checkpoint_path: Optional[str] = None,
+                 checkpoint_interval: float = CheckpointConfig.SAVE_INTERVAL,
+                 enable_load_shedding: bool = True,
+                 deadband_heartbeat: Optional[float] = DeadbandConfig.HEARTBEAT,
+                 output_sinks: Optional[List[OutputSink]] = None,
+                 network_backend: Optional[NetworkBackend] = None,
+                 network_range: Optional[str] = None,
+                 retention_days: Optional[int] = None):
         """
         Initialize the continuous monitoring service.
         
         Args:
             monitoring_interval: Time between monitoring cycles (seconds)
             quality_test_samples: Number of ping samples per device test
+            enable_traffic_accounting: Attribute traffic to individual hosts
+                                       using the conntrack table (Linux gateways)
+            db_manager: Optional database for persisting collected data
+            snapshot_history_size: Number of recent snapshots kept in memory
+                                   (older ones only live on in the session
+                                   statistics and the database)
+            missed_tick_policy: What to do with ticks missed after an overrun
+                                ('skip', 'catch_up' or 'coalesce')
+            render_mode: Terminal output: 'live' (throttled redraw), 'changes'
+                         (redraw only when values change) or 'headless'
+            max_refresh_hz: Maximum status line redraws per second
+            metrics_port: Serve Prometheus metrics on localhost at this port
+                          (None disables the endpoint; 0 picks a free port)
+            checkpoint_path: File for warm-restart checkpoints (None disables)
+            checkpoint_interval: Seconds between periodic checkpoints
+            enable_load_shedding: Shed optional work (extra probe samples,
+                                  rediscovery, per-host accounting) when
+                                  ticks exceed their time budget
+            deadband_heartbeat: Store one row per run of near-identical
+                                snapshots, at least every this many seconds
+                                (None stores every snapshot)
+            output_sinks: Additional destinations for snapshots (JSONL
+                          files, UNIX datagram sockets, stdout, ...), each
+                          with its own queue and writer thread
+            network_backend: Where measurements come from (defaults to the
+                             live network; a SimulatedBackend or
+                             TraceReplayBackend load-tests without one)
+            network_range: Network CIDR to monitor (auto-detected from the
+                           backend when None)
+            retention_days: Delete persisted data older than this many days
+                            in the background, in small batches (None
+                            keeps everything)
         """
         self.monitoring_interval = monitoring_interval
         self.quality_test_samples = quality_test_samples
-        
-        # Core monitoring components
-        self.network_monitor = NetworkMonitor()
+        self.db_manager = db_manager
+        self.render_mode = render_mode
         
         # Service state management
         self.is_running = False
         self.monitor_thread = None
         self.start_time = None
+        self._consecutive_errors = 0
+        
+        # Core monitoring components (progress messages follow the render mode)
+        self.network_monitor = NetworkMonitor(network_range=network_range, backend=network_backend,
+                                              log=self._network_message)
+        
+        # Per-host traffic accounting (only where the kernel exposes conntrack,
+        # and only when monitoring the live network)
+        self.traffic_accountant: Optional[ConntrackTrafficAccountant] = None
+        if (enable_traffic_accounting and self.network_monitor.backend.live
+                and ConntrackTrafficAccountant.is_available()):
+            self.traffic_accountant = ConntrackTrafficAccountant(
+                network_range=self.network_monitor.network_range
+            )
+        
+        # Snapshot ticks on a drift-free grid aligned to the interval
+        self.tick_scheduler = DeadlineScheduler(monitoring_interval, policy=missed_tick_policy)
         
         # Data collection and statistics
-        self.snapshots: List[MonitoringSnapshot] = []
+        self.snapshots: deque = deque(maxlen=snapshot_history_size)  # Ring buffer
+        self.session_stats = SessionStatistics()
         self.device_cache: Dict[str, Dict[str, Any]] = {}
+        self.device_set: DeviceSet = EMPTY_DEVICE_SET  # Shared by snapshots until membership changes
         self.measurement_count = 0
         self.successful_measurements = 0
         
+        # Write-behind persistence (created per session when db_manager is set)
+        self.session_id: Optional[int] = None
+        self.persistence: Optional[SnapshotPersistencePipeline] = None
+        self.deadband_heartbeat = deadband_heartbeat
+        
+        # Fan-out to additional output sinks (never blocks collection)
+        self.outputs = SinkFanOut(output_sinks or ())
+        
+        # Bandwidth rate calculation and percentile sketches
+        self._previous_interface_stats: Dict[str, Dict] = {}
+        self._active_interfaces: Tuple[str, ...] = ()  # Shared by snapshots until interfaces change
+        self.bandwidth_quantiles = BandwidthQuantileTracker()
+        
         # Round-robin device testing
         self.device_test_index = 0
         self.tested_devices = set()
         
-        # Thread safety for display
-        self.display_lock = threading.Lock()
-        self.last_display_length = 0
-        self.suppress_quality_output = False
+        # Pipeline stages running on their own cadence
+        # (device_cache is replaced wholesale by discovery; state_lock guards
+        # the replacement together with the round-robin position)
+        self.state_lock = threading.Lock()
+        self.discovery_stage = PeriodicStage(
+            "discovery", self._run_discovery_stage, DISCOVERY_INTERVAL,
+            initial_delay=DISCOVERY_INTERVAL
+        )
+        self.probe_stage = PeriodicStage("probe", self._run_probe_stage, monitoring_interval)
+        self._last_probe_sequence = 0
+        
+        # Warm-restart checkpoints, written off the monitoring thread
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_stage = PeriodicStage(
+            "checkpoint", self._run_checkpoint_stage, checkpoint_interval,
+            initial_delay=checkpoint_interval
+        )
+        self.restored_from_checkpoint = False
+        
+        # Database retention, in short batches off the monitoring thread
+        self.retention_days = retention_days
+        self.retention_stage = PeriodicStage(
+            "retention", self._run_retention_stage, RETENTION_INTERVAL,
+            initial_delay=DISCOVERY_INTERVAL
+        )
+        self.retention_rows_removed = 0
+        
+        # Graceful degradation under load
+        self.overload: Optional[OverloadController] = (
+            OverloadController(monitoring_interval) if enable_load_shedding else None
+        )
+        self._shed_probe_skip = False
+        self._rediscovery_postponed = 0
+        
+        # Status display on its own thread, fed with the latest snapshot
+        self.renderer = TerminalRenderer(
+            self._format_status_line, mode=render_mode,
+            max_refresh_hz=max_refresh_hz, change_key=self._status_change_key
+        )
+        
+        # Instrumentation (always recorded; served only when a port is given)
+        self.metrics_port = metrics_port
+        self.metrics_server: Optional[MetricsServer] = None
+        self.metrics = MetricsRegistry()
+        self._register_metrics()
         
         # Setup graceful shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -110,23 +303,83 @@ class ContinuousNetworkMonitorService:
         self.stop()
         sys.exit(0)
     
-    def _clear_line(self):
-        """Clear the current terminal line completely."""
-        # Get terminal width or use default
-        try:
-            terminal_width = os.get_terminal_size().columns
-        except:
-            terminal_width = 80
+    def _print_quality_message(self, message: str, *args: Any):
+        """
+        Print a message above the real-time display.
         
-        # Clear the line by overwriting with spaces, then return to start
-        print('\r' + ' ' * terminal_width + '\r', end='', flush=True)
+        The message is handed to the renderer unformatted (str.format
+        placeholders), so the calling stage never waits on the terminal.
+        """
+        self.renderer.message(message, *args)
     
-    def _print_quality_message(self, message: str):
-        """Print quality testing message without interfering with real-time display."""
-        if not self.suppress_quality_output:
-            with self.display_lock:
-                self._clear_line()
-                print(f"\n{message}")
+    def _network_message(self, template: str, *args: Any):
+        """
+        Progress messages of the network monitor (sweeps, probes).
+        
+        Printed as they come during the initial sweep, then queued above
+        the status line; headless mode drops them unformatted.
+        """
+        if self.render_mode == RenderConfig.HEADLESS:
+            return
+        if self.is_running:
+            self.renderer.message(template, *args)
+        else:
+            print(template.format(*args) if args else template)
+    
+    def _register_metrics(self):
+        """Attach stage timings and scrape-time values to the metrics registry."""
+        metrics = self.metrics
+        
+        # Stage timings already kept by the thread that runs each stage
+        metrics.attach_histogram('tick', self.tick_scheduler.durations)
+        metrics.attach_histogram('discovery', self.discovery_stage.scheduler.durations)
+        metrics.attach_histogram('probing', self.probe_stage.scheduler.durations)
+        metrics.attach_histogram('render', self.renderer.render_durations)
+        metrics.attach_histogram('monitor', self.tick_scheduler.lateness, family='tick_lateness_seconds')
+        
+        metrics.describe_counter('probes_total', "Connection quality probes run.")
+        metrics.describe_counter('probe_timeouts_total', "Probes that received no reply.")
+        
+        metrics.register_counter('snapshots_total', "Monitoring snapshots collected.",
+                                 lambda: self.measurement_count)
+        metrics.register_gauge('snapshots_in_memory', "Snapshots held in the history ring buffer.",
+                               lambda: len(self.snapshots))
+        metrics.register_gauge('devices', "Devices in the current device cache.",
+                               lambda: len(self.device_cache))
+        metrics.register_counter('tick_overruns_total', "Ticks that took longer than the interval.",
+                                 lambda: self.tick_scheduler.overruns)
+        metrics.register_counter('missed_ticks_total', "Tick slots skipped or coalesced after overruns.",
+                                 lambda: self.tick_scheduler.missed_ticks)
+        metrics.register_gauge('persistence_queue_depth', "Records waiting for the database writer.",
+                               lambda: self.persistence.queue_depth if self.persistence else 0)
+        metrics.register_counter('persistence_written_total', "Records written to the database.",
+                                 lambda: self.persistence.stats.written if self.persistence else 0)
+        metrics.register_counter('persistence_dropped_total', "Records dropped because the queue was full.",
+                                 lambda: self.persistence.stats.dropped if self.persistence else 0)
+        metrics.register_counter('retention_rows_removed_total', "Snapshot and quality test rows deleted by retention.",
+                                 lambda: self.retention_rows_removed)
+        metrics.register_gauge('render_pending_messages', "Messages waiting to be printed.",
+                               lambda: self.renderer.pending_messages)
+        if self.overload:
+            metrics.register_gauge('shed_level', "Current load shedding level (0 = nothing shed).",
+                                   lambda: self.overload.level)
+            metrics.register_counter('shed_ticks_total', "Ticks run with optional work shed.",
+                                     lambda: self.overload.stats.shed_ticks)
+        metrics.register_process_metrics()
+    
+    def _start_metrics_server(self):
+        """Serve /metrics on localhost if a port was configured."""
+        if self.metrics_port is None or self.metrics_server:
+            return
+        
+        server = MetricsServer(self.metrics, port=self.metrics_port)
+        try:
+            server.start()
+        except OSError as e:
+            print(f"⚠️ Metrics endpoint disabled: cannot bind port {self.metrics_port} ({e})")
+            return
+        self.metrics_server = server
+        print(f"📈 Metrics available at {server.url}")
     
     def start(self) -> bool:
         """
@@ -139,61 +392,161 @@ class ContinuousNetworkMonitorService:
             print("⚠️ Service is already running")
             return False
         
+        self._print_startup_banner()
+        
+        # Warm restart from a checkpoint, or a full initial sweep
+        checkpoint = self._load_checkpoint()
+        if checkpoint:
+            self._restore_checkpoint(checkpoint)
+            print(f"♻️  Restored {len(self.device_cache)} devices from checkpoint "
+                  f"({checkpoint['age_seconds']:.0f}s old); reconciling in the background")
+        else:
+            print("🔍 Performing initial device discovery...")
+            initial_devices = self.network_monitor.discover_devices()
+            if not self._adopt_initial_devices(initial_devices):
+                return False
+        
+        self._establish_baseline()
+        self._open_outputs()
+        
+        # Start independent stages, then the bandwidth/assembly thread
+        self.is_running = True
+        self.start_time = datetime.now()
+        self.tick_scheduler.reset()
+        self.renderer.start()
+        self._start_metrics_server()
+        self.discovery_stage.start()
+        self.probe_stage.start()
+        if self.restored_from_checkpoint:
+            self.discovery_stage.trigger()  # Reconcile the restored device list now
+        if self.checkpoint_path:
+            self.checkpoint_stage.start()
+        if self.db_manager and self.retention_days:
+            self.retention_stage.start()
+        self.monitor_thread = threading.Thread(target=self._monitoring_loop, daemon=True)
+        self.monitor_thread.start()
+        
+        print("\n📊 Real-time Monitoring Started:")
+        
+        return True
+    
+    def _print_startup_banner(self):
+        """Print the service configuration."""
         print("🚀 Starting Continuous Network Monitoring Service")
         print("=" * 60)
         print(f"📡 Network range: {self.network_monitor.network_range}")
         print(f"⏱️  Monitoring interval: {self.monitoring_interval} seconds")
-        print("💾 Data will be displayed in real-time terminal output")
+        if self.render_mode == RenderConfig.HEADLESS:
+            print("🖥️  Terminal display: off (headless)")
+        else:
+            print(f"🖥️  Terminal display: {self.render_mode} status line")
+        if self.db_manager:
+            print(f"💾 Persisting to database: {self.db_manager.db_path}")
+        else:
+            print("💾 Persistence: off (no database)")
+        for sink in self.outputs.sinks:
+            print(f"📤 Output sink: {sink.name}")
         print("🔍 Connection quality testing: Enabled (Round-Robin)")
+        if self.traffic_accountant:
+            print(f"👥 Per-host accounting: Enabled ({self.traffic_accountant.conntrack_path})")
         print("🛑 Press Ctrl+C to stop monitoring")
         print("=" * 60)
+    
+    def _adopt_initial_devices(self, initial_devices: List[Dict[str, Any]]) -> bool:
+        """
+        Initialize the device cache and round-robin from the initial sweep.
         
-        # Perform initial device discovery
-        print("🔍 Performing initial device discovery...")
-        initial_devices = self.network_monitor.discover_devices()
-        
+        Returns:
+            False if the sweep found no devices (the service cannot start)
+        """
         if not initial_devices:
             print("❌ No devices found during initial discovery")
             print("💡 Check your network connection and try again")
             return False
         
-        # Initialize device cache and round-robin
         self.device_cache = {dev['ip']: dev for dev in initial_devices}
+        self.device_set = DeviceSet.from_devices(initial_devices, previous=self.device_set)
         self.device_test_index = 0
         self.tested_devices.clear()
         
         print(f"✅ Initial discovery complete: {len(initial_devices)} devices found")
-        
-        # Get initial bandwidth baseline
-        initial_bandwidth = self.network_monitor.get_bandwidth_stats()
-        print("✅ Initial bandwidth baseline established")
-        
-        # Start monitoring thread
-        self.is_running = True
-        self.start_time = datetime.now()
-        self.monitor_thread = threading.Thread(target=self._monitoring_loop, daemon=True)
-        self.monitor_thread.start()
-        
-        print("\n📊 Real-time Monitoring Started:")
-        
         return True
     
+    def _establish_baseline(self):
+        """Get the initial bandwidth baseline (unless counters were handed over)."""
+        if not self._previous_interface_stats:
+            self._previous_interface_stats = self.network_monitor.get_interface_bandwidth_stats()
+        if self.traffic_accountant:
+            self.traffic_accountant.reset()
+            self.traffic_accountant.sample()
+        print("✅ Initial bandwidth baseline established")
+    
+    def _open_outputs(self):
+        """Open a session and start the writers before the first snapshot."""
+        if self.db_manager:
+            self.session_id = self.db_manager.start_monitoring_session(
+                notes=f"Continuous monitoring ({self.monitoring_interval}s interval)"
+            )
+            deadband = DeadbandFilter(self.deadband_heartbeat) if self.deadband_heartbeat else None
+            self.persistence = SnapshotPersistencePipeline(self.db_manager, self.session_id, deadband=deadband)
+            self.metrics.attach_histogram('persistence', self.persistence.batch_durations)
+            self.persistence.start()
+        for sink in self.outputs.sinks:
+            self.metrics.attach_histogram(f"sink_{sink.name}", sink.batch_durations)
+        self.outputs.start()
+    
     def stop(self):
         """Stop the continuous monitoring service."""
         if not self.is_running:
             return
         
-        print("\n🛑 Stopping monitoring service...")
         self.is_running = False
+        self.tick_scheduler.stop()
         
-        # Wait for monitoring thread to finish
-        if self.monitor_thread and self.monitor_thread.is_alive():
+        # Wait for monitoring thread to finish, then let the renderer
+        # draw its last frame before printing directly again
+        monitor_was_running = self.monitor_thread and self.monitor_thread.is_alive()
+        if monitor_was_running:
             self.monitor_thread.join(timeout=5)
+        self.renderer.stop()
+        
+        print("\n🛑 Stopping monitoring service...")
+        if monitor_was_running:
             print("✅ Monitor thread stopped cleanly")
         
+        # Stop stage workers (an in-flight probe or sweep may take a moment)
+        self.probe_stage.stop()
+        self.discovery_stage.stop()
+        self.checkpoint_stage.stop()
+        self.retention_stage.stop()  # Stops between batches
+        
+        self._close_outputs()
+        
         # Print final statistics
         self._print_final_stats()
     
+    def _close_outputs(self):
+        """Write the final checkpoint, flush every writer and close the session."""
+        # Final checkpoint: exact counters for the next warm restart
+        if self.checkpoint_path:
+            self._run_checkpoint_stage(clean_shutdown=True)
+        
+        # Persist the partially filled percentile bucket
+        self._persist_bandwidth_sketches(self.bandwidth_quantiles.drain())
+        
+        # Flush everything still queued, then close the session
+        if self.persistence:
+            self.persistence.stop()
+            self.db_manager.end_monitoring_session(self.session_id)
+            print("✅ Persistence queue flushed")
+        if self.outputs.sinks:
+            self.outputs.stop()
+            print(f"✅ {len(self.outputs)} output sink(s) flushed")
+        
+        if self.metrics_server:
+            self.metrics_server.stop()
+            self.metrics_server = None
+    
     def _monitoring_loop(self):
         """
         Main monitoring loop that runs in a separate thread.
@@ -204,47 +557,240 @@ class ContinuousNetworkMonitorService:
         3. Performance optimization
         4. Data aggregation and processing
         """
-        consecutive_errors = 0
-        max_consecutive_errors = 5
+        self._consecutive_errors = 0
         
-        while self.is_running:
-            loop_start_time = time.time()
+        # Ticks arrive on absolute monotonic deadlines; missed ticks are
+        # handled by the scheduler's policy instead of sliding the schedule
+        for tick in self.tick_scheduler.ticks():
+            if not self.is_running:
+                break
+            self._handle_tick(tick)
+    
+    def _handle_tick(self, tick: ScheduledTick):
+        """Collect, process and account for one tick's snapshot."""
+        work_start = time.perf_counter()
+        try:
+            # Collect monitoring snapshot
+            snapshot = self._collect_monitoring_snapshot(tick)
             
-            try:
-                # Collect monitoring snapshot
-                snapshot = self._collect_monitoring_snapshot()
-                
-                if snapshot:
-                    # Process and display the data
-                    self._process_monitoring_data(snapshot)
-                    consecutive_errors = 0  # Reset error counter on success
-                else:
-                    consecutive_errors += 1
-                    if consecutive_errors >= max_consecutive_errors:
-                        print(f"\n❌ Too many consecutive errors ({consecutive_errors}), stopping...")
-                        self.is_running = False
-                        break
-                
-            except Exception as e:
-                consecutive_errors += 1
-                print(f"\n⚠️ Monitoring error: {e}")
-                
-                if consecutive_errors >= max_consecutive_errors:
-                    print(f"\n❌ Too many consecutive errors ({consecutive_errors}), stopping...")
-                    self.is_running = False
-                    break
+            if snapshot:
+                # Process and display the data
+                self._process_monitoring_data(snapshot)
+                self._consecutive_errors = 0  # Reset error counter on success
+            else:
+                self._consecutive_errors += 1
+            
+        except Exception as e:
+            self._consecutive_errors += 1
+            self._print_quality_message("⚠️ Monitoring error: {}", e)
+        
+        # Repeated failures: shed all optional work and keep going
+        # rather than stopping the collector
+        if self._consecutive_errors == MAX_CONSECUTIVE_ERRORS:
+            self._print_quality_message(
+                "❌ {} consecutive errors, shedding optional work and continuing", self._consecutive_errors
+            )
+            if self.overload:
+                self.overload.force_level(self.overload.max_level)
+                self._on_shed_level_change(0)
+        
+        if self.overload:
+            previous_level = self.overload.level
+            self.overload.record(time.perf_counter() - work_start, tick.lateness)
+            if self.overload.level != previous_level:
+                self._on_shed_level_change(previous_level)
+    
+    def _on_shed_level_change(self, previous_level: int):
+        """Report a shed level change and resume postponed work."""
+        level = self.overload.level
+        if level > previous_level:
+            self._print_quality_message("🐢 Overloaded (load {:.0%} of budget): shedding {}",
+                                        self.overload.load_ratio, ", ".join(self.overload.shed_actions))
+        else:
+            restored = OverloadConfig.SHED_ORDER[level]
+            self._print_quality_message("🐇 Headroom back: restored {}", restored)
+            if restored == OverloadConfig.REDISCOVERY and self._rediscovery_postponed:
+                self.discovery_stage.trigger()  # Catch up on the postponed sweep
+    
+    def _run_discovery_stage(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        Discovery stage: rediscover devices and refresh the device cache.
+        
+        Runs on its own worker every DISCOVERY_INTERVAL seconds, so a slow
+        sweep never delays bandwidth ticks.
+        
+        Returns:
+            Fresh device list, or None if discovery found nothing
+        """
+        if self.overload and self.overload.is_shedding(OverloadConfig.REDISCOVERY):
+            self._rediscovery_postponed += 1
+            return None  # Postponed; run again once headroom returns
+        self._rediscovery_postponed = 0
+        
+        fresh_devices = self.network_monitor.discover_devices()
+        if not fresh_devices:
+            return None  # Keep using cached devices
+        
+        self._update_device_cache(fresh_devices)
+        return fresh_devices
+    
+    def _update_device_cache(self, fresh_devices: List[Dict[str, Any]]):
+        """Replace the device cache with a sweep's results."""
+        new_cache = {dev['ip']: dev for dev in fresh_devices}
+        
+        with self.state_lock:
+            # Check if device list changed
+            if set(new_cache.keys()) != set(self.device_cache.keys()):
+                self._print_quality_message("🔄 Device list changed, resetting round-robin to first device")
+                self.device_test_index = 0
+                self.tested_devices.clear()
             
-            # Maintain precise timing
-            loop_duration = time.time() - loop_start_time
-            sleep_time = max(0, self.monitoring_interval - loop_duration)
+            self.device_cache = new_cache
+            self.device_set = DeviceSet.from_devices(fresh_devices, previous=self.device_set)
+    
+    def _run_probe_stage(self) -> Optional[Dict[str, Any]]:
+        """
+        Probe stage: test connection quality of the next device (round-robin).
+        
+        Returns:
+            Probe result with ip, avg_latency_ms and packet_loss_percent, or
+            None if there is no device to test
+        """
+        # Shedding probe work: single-sample probes, every other run
+        samples = self.quality_test_samples
+        if self.overload and self.overload.is_shedding(OverloadConfig.PROBE_SAMPLES):
+            self._shed_probe_skip = not self._shed_probe_skip
+            if self._shed_probe_skip:
+                return None
+            samples = 1
+        
+        with self.state_lock:
+            device_ips = list(self.device_cache.keys())
+            if not device_ips:
+                return None
             
-            if sleep_time > 0:
-                time.sleep(sleep_time)
+            # Get current device for testing and move on for the next round
+            current_device_ip = device_ips[self.device_test_index % len(device_ips)]
+            self.device_test_index += 1
+        
+        # The network monitor reports the probe itself (through _network_message)
+        try:
+            quality_result = self.network_monitor.monitor_device_connectivity(
+                current_device_ip, samples=samples
+            )
+        except Exception as e:
+            self._print_quality_message("  Probe failed ({})", e)
+            quality_result = {'avg_latency_ms': 0.0, 'packet_loss_percent': 100.0}
+        
+        self.metrics.inc('probes_total')
+        if quality_result.get('packet_loss_percent', 0.0) >= 100:
+            self.metrics.inc('probe_timeouts_total')
+        
+        with self.state_lock:
+            self.tested_devices.add(current_device_ip)
+        
+        return {
+            'ip': current_device_ip,
+            'avg_latency_ms': quality_result.get('avg_latency_ms', 0.0),
+            'packet_loss_percent': quality_result.get('packet_loss_percent', 0.0)
+        }
+    
+    def _checkpoint_state(self, clean_shutdown: bool) -> Dict[str, Any]:
+        """Gather the state needed for a warm restart."""
+        with self.state_lock:
+            device_cache = self.device_cache
+            device_test_index = self.device_test_index
+            tested_devices = sorted(self.tested_devices)
+        
+        return {
+            'network_range': self.network_monitor.network_range,
+            'clean_shutdown': clean_shutdown,
+            'devices': list(device_cache.values()),
+            'device_test_index': device_test_index,
+            'tested_devices': tested_devices,
+            'interface_counters': self._previous_interface_stats,
+            'session_stats': asdict(self.session_stats),
+            'measurement_count': self.measurement_count,
+            'successful_measurements': self.successful_measurements
+        }
     
-    def _collect_monitoring_snapshot(self) -> Optional[MonitoringSnapshot]:
+    def _run_checkpoint_stage(self, clean_shutdown: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Checkpoint stage: atomically save service state for warm restarts.
+        
+        Returns:
+            Summary of the saved checkpoint, or None if saving failed
+        """
+        try:
+            save_checkpoint(self.checkpoint_path, self._checkpoint_state(clean_shutdown))
+        except (OSError, TypeError, ValueError) as e:
+            self._print_quality_message("⚠️ Could not save checkpoint: {}", e)
+            return None
+        return {'path': self.checkpoint_path, 'devices': len(self.device_cache)}
+    
+    def _run_retention_stage(self) -> Optional[RetentionProgress]:
+        """
+        Retention stage: delete data older than retention_days.
+        
+        The database deletes in short batches with pauses between them, so
+        the persistence writer is never held up for long; a service stop
+        ends the run between batches.
+        
+        Returns:
+            Progress of the run, or None if it failed
+        """
+        removed_before = self.retention_rows_removed
+        
+        def on_progress(progress: RetentionProgress):
+            self.retention_rows_removed = removed_before + progress.rows_removed
+        
+        try:
+            progress = self.db_manager.cleanup_old_data(self.retention_days, on_progress=on_progress,
+                                                        should_stop=lambda: not self.is_running)
+        except Exception as e:
+            self._print_quality_message("⚠️ Retention run failed: {}", e)
+            return None
+        return progress
+    
+    def _load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """Load a usable checkpoint for this network, if one exists."""
+        if not self.checkpoint_path:
+            return None
+        checkpoint = load_checkpoint(self.checkpoint_path, network_range=self.network_monitor.network_range)
+        if not checkpoint or not checkpoint.get('devices'):
+            return None
+        return checkpoint
+    
+    def _restore_checkpoint(self, checkpoint: Dict[str, Any]):
+        """Restore device cache, probe rotation, rate counters and aggregates."""
+        with self.state_lock:
+            self.device_cache = {dev['ip']: dev for dev in checkpoint['devices']}
+            self.device_set = DeviceSet.from_devices(self.device_cache.values(), previous=self.device_set)
+            self.device_test_index = checkpoint.get('device_test_index', 0)
+            self.tested_devices = set(checkpoint.get('tested_devices', []))
+        
+        self._previous_interface_stats = restore_interface_counters(checkpoint)
+        
+        try:
+            self.session_stats = SessionStatistics(**checkpoint.get('session_stats', {}))
+        except TypeError:
+            self.session_stats = SessionStatistics()  # Saved by a different version
+        self.measurement_count = checkpoint.get('measurement_count', 0)
+        self.successful_measurements = checkpoint.get('successful_measurements', 0)
+        self.restored_from_checkpoint = True
+    
+    def _collect_monitoring_snapshot(self, tick: Optional[ScheduledTick] = None) -> Optional[MonitoringSnapshot]:
         """
         Collect a complete monitoring snapshot.
         
+        Bandwidth is sampled here on every tick; devices and connection
+        quality come from the latest published result of the discovery and
+        probe stages, so assembling a snapshot never waits on them.
+        
+        Args:
+            tick: Scheduler tick; the snapshot is stamped with its nominal
+                  grid time (current time when called outside the loop)
+        
         This method demonstrates:
         1. Multi-source data collection
         2. Data validation and error handling
@@ -252,78 +798,48 @@ class ContinuousNetworkMonitorService:
         4. Round-robin device testing strategy
         """
         try:
-            snapshot_timestamp = datetime.now().isoformat()
+            sample_time = tick.scheduled_time if tick else time.time()
             
-            # 1. Device discovery (with caching for performance)
-            devices = list(self.device_cache.values())  # Use cached devices primarily
+            # 1. Devices: the shared set maintained by the discovery stage
+            device_set = self.device_set
             
-            # Periodically refresh device list (every 30 seconds)
-            if not hasattr(self, '_last_discovery') or \
-               (datetime.now() - self._last_discovery).total_seconds() > 30:
-                try:
-                    fresh_devices = self.network_monitor.discover_devices()
-                    if fresh_devices:
-                        new_cache = {dev['ip']: dev for dev in fresh_devices}
-                        
-                        # Check if device list changed
-                        if set(new_cache.keys()) != set(self.device_cache.keys()):
-                            self._print_quality_message("🔄 Device list changed, resetting round-robin to first device")
-                            self.device_test_index = 0
-                            self.tested_devices.clear()
-                        
-                        self.device_cache = new_cache
-                        devices = fresh_devices
-                    self._last_discovery = datetime.now()
-                except:
-                    pass  # Use cached devices if discovery fails
+            # 2. Bandwidth monitoring (rates since the previous tick)
+            stage_start = time.perf_counter()
+            interface_rates, usage_mb = self._sample_interface_rates()
+            self.metrics.observe('bandwidth', time.perf_counter() - stage_start)
+            upload_mbps, download_mbps = interface_rates.get('all', (0.0, 0.0))
             
-            # 2. Bandwidth monitoring
-            current_bandwidth_stats = self.network_monitor.get_bandwidth_stats()
-            upload_mbps = current_bandwidth_stats.get('upload_mbps', 0.0)
-            download_mbps = current_bandwidth_stats.get('download_mbps', 0.0)
-            usage_mb = current_bandwidth_stats.get('total_usage_mb', 0.0)
+            # Feed the p95/p99 sketches; persist buckets as hours roll over
+            closed_buckets = self.bandwidth_quantiles.record(sample_time, interface_rates)
+            if closed_buckets:
+                self._persist_bandwidth_sketches(closed_buckets)
             
-            # 3. Round-robin connection quality testing
+            # 2b. Per-host accounting (who is using the bandwidth; shed first
+            # under heavy load since it is enrichment, not core data)
+            top_talkers = ()
+            shedding_enrichment = self.overload and self.overload.is_shedding(OverloadConfig.ENRICHMENT)
+            if self.traffic_accountant and not shedding_enrichment:
+                stage_start = time.perf_counter()
+                try:
+                    top_talkers = self.traffic_accountant.sample()
+                except OSError:
+                    pass  # Table temporarily unreadable, try again next tick
+                self.metrics.observe('traffic_accounting', time.perf_counter() - stage_start)
+            
+            # 3. Connection quality from the latest round-robin probe
             tested_device_ip = None
             avg_latency = 0.0
             avg_packet_loss = 0.0
             
-            if devices:
-                # Select device for round-robin testing
-                device_ips = list(self.device_cache.keys())
-                if device_ips:
-                    # Get current device for testing
-                    current_device_ip = device_ips[self.device_test_index % len(device_ips)]
-                    tested_device_ip = current_device_ip
-                    
-                    # Test connection quality for this device
-                    latency_results = []
-                    
-                    self._print_quality_message(f"🔍 Testing connection quality to {current_device_ip} ({self.quality_test_samples} samples)...")
-                    
-                    for i in range(self.quality_test_samples):
-                        try:
-                            quality_result = self.network_monitor.monitor_device_connectivity(current_device_ip)
-                            if quality_result and 'latency_ms' in quality_result:
-                                latency_ms = quality_result['latency_ms']
-                                latency_results.append(latency_ms)
-                                self._print_quality_message(f"  Ping {i+1}: {latency_ms:.2f}ms")
-                        except Exception as e:
-                            self._print_quality_message(f"  Ping {i+1}: Failed ({e})")
-                    
-                    # Calculate averages
-                    if latency_results:
-                        avg_latency = sum(latency_results) / len(latency_results)
-                        # Simple packet loss simulation (0% for successful pings)
-                        successful_pings = len(latency_results)
-                        total_pings = self.quality_test_samples
-                        avg_packet_loss = ((total_pings - successful_pings) / total_pings) * 100
-                    
-                    # Add to tested devices set
-                    self.tested_devices.add(current_device_ip)
-                    
-                    # Move to next device for next round
-                    self.device_test_index += 1
+            probe = self.probe_stage.latest
+            if probe:
+                avg_latency = probe.value['avg_latency_ms']
+                avg_packet_loss = probe.value['packet_loss_percent']
+                
+                # Only report the tested device on the tick after its probe
+                if probe.sequence != self._last_probe_sequence:
+                    self._last_probe_sequence = probe.sequence
+                    tested_device_ip = probe.value['ip']
             
             # 4. Overall quality assessment
             overall_quality = "Good"  # Default
@@ -338,22 +854,22 @@ class ContinuousNetworkMonitorService:
                     overall_quality = "Poor"
             else:
                 # No active testing, base on device count
-                if devices:
-                    overall_quality = "Good" if len(devices) <= 10 else "Fair"
+                if device_set.devices:
+                    overall_quality = "Good" if len(device_set.devices) <= 10 else "Fair"
             
-            # 5. Create snapshot with enhanced information
+            # 5. Create the compact snapshot (devices and interfaces are shared)
             snapshot = MonitoringSnapshot(
-                timestamp=snapshot_timestamp,
-                device_count=len(devices),
-                devices=devices,
+                timestamp_ms=int(round(sample_time * 1000)),
+                device_set=device_set,
                 total_upload_mbps=upload_mbps,
                 total_download_mbps=download_mbps,
                 total_usage_mb=usage_mb,
                 avg_latency_ms=round(avg_latency, 2),
                 avg_packet_loss=round(avg_packet_loss, 2),
-                overall_quality=overall_quality,
-                active_interfaces=current_bandwidth_stats.get('interfaces', []),
-                tested_device_ip=tested_device_ip
+                quality_code=QUALITY_CODES[overall_quality],
+                interfaces=self._active_interfaces,
+                tested_device_ip=tested_device_ip,
+                top_talkers=top_talkers
             )
             
             return snapshot
@@ -361,6 +877,67 @@ class ContinuousNetworkMonitorService:
         except Exception as e:
             return None
     
+    def _sample_interface_rates(self) -> Tuple[Dict[str, Tuple[float, float]], float]:
+        """
+        Sample interface counters and calculate rates since the previous tick.
+        
+        Returns:
+            Tuple of (interface -> (upload_mbps, download_mbps), usage_mb).
+            The rates include an 'all' entry summing non-loopback interfaces;
+            usage_mb is the data transferred by those interfaces this tick.
+        """
+        current_stats = self.network_monitor.get_interface_bandwidth_stats()
+        previous_stats = self._previous_interface_stats
+        self._previous_interface_stats = current_stats
+        if current_stats.keys() != previous_stats.keys() or (current_stats and not self._active_interfaces):
+            self._active_interfaces = tuple(current_stats)
+        
+        rates: Dict[str, Tuple[float, float]] = {}
+        total_upload = total_download = total_usage = 0.0
+        
+        for interface, stats in current_stats.items():
+            previous = previous_stats.get(interface)
+            if previous is None:
+                continue  # New interface, rate available from next tick
+            
+            usage = self.network_monitor.calculate_bandwidth_usage(previous, stats)
+            if 'error' in usage:
+                continue
+            
+            # Counters can wrap or reset (e.g. interface re-created)
+            upload = max(0.0, usage['upload_rate_mbps'])
+            download = max(0.0, usage['download_rate_mbps'])
+            rates[interface] = (upload, download)
+            
+            if interface not in LOOPBACK_INTERFACES:
+                total_upload += upload
+                total_download += download
+                total_usage += max(0.0, usage['total_usage_mb'])
+        
+        if rates:
+            rates['all'] = (round(total_upload, 2), round(total_download, 2))
+        
+        return rates, round(total_usage, 2)
+    
+    def _persist_bandwidth_sketches(self, closed_buckets: List[Dict[str, Any]]):
+        """Save closed percentile sketch buckets to the database."""
+        if not self.db_manager or not closed_buckets:
+            return
+        
+        # Hand off to the writer thread when it is running
+        if self.persistence and self.persistence.is_running:
+            self.persistence.submit_sketches(closed_buckets)
+            return
+        
+        try:
+            for bucket in closed_buckets:
+                self.db_manager.save_bandwidth_sketch(
+                    bucket['interface'], bucket['direction'],
+                    bucket['bucket_start'], bucket['sketch']
+                )
+        except Exception as e:
+            self._print_quality_message("⚠️ Could not persist bandwidth sketches: {}", e)
+    
     def _calculate_overall_quality(self, avg_latency: float, avg_packet_loss: float, device_count: int) -> str:
         """
         Calculate overall network quality based on multiple factors.
@@ -400,60 +977,121 @@ class ContinuousNetworkMonitorService:
         3. Statistics calculation
         4. Performance tracking
         """
-        # Add to snapshots history
+        # Add to recent history (oldest snapshot drops out) and running totals
         self.snapshots.append(snapshot)
+        self.session_stats.update(snapshot)
         self.measurement_count += 1
         
+        # Queue for the writer threads (never blocks; drops are counted per sink)
+        if self.persistence:
+            self.persistence.submit_snapshot(snapshot)
+        self.outputs.submit_snapshot(snapshot)
+        
         # Determine if this was a successful measurement
         if snapshot.device_count > 0:
             self.successful_measurements += 1
         
-        # Display real-time data
-        self._display_realtime_data(snapshot)
+        # Hand the snapshot to the renderer (drawn at its own pace)
+        self.renderer.publish(snapshot)
     
-    def _display_realtime_data(self, snapshot: MonitoringSnapshot):
-        """Display real-time monitoring data in terminal."""
-        with self.display_lock:
-            # Calculate runtime and success rate
-            runtime = datetime.now() - self.start_time
-            success_rate = (self.successful_measurements / self.measurement_count * 100) if self.measurement_count > 0 else 0
-            
-            # Format runtime as HH:MM:SS
-            total_seconds = int(runtime.total_seconds())
-            hours = total_seconds // 3600
-            minutes = (total_seconds % 3600) // 60
-            seconds = total_seconds % 60
-            uptime_str = f"{hours}:{minutes:02d}:{seconds:02d}"
-            
-            # Format tested device info
-            tested_info = ""
-            if snapshot.tested_device_ip:
-                tested_info = f" [Testing: {snapshot.tested_device_ip}]"
-            
-            # Create status line
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            status_line = (
-                f"📊 {timestamp} | "
-                f"Devices: {snapshot.device_count:2d} | "
-                f"↑{snapshot.total_upload_mbps:6.2f} Mbps | "
-                f"↓{snapshot.total_download_mbps:6.2f} Mbps | "
-                f"Quality: {snapshot.overall_quality:9s} | "
-                f"Latency: {snapshot.avg_latency_ms:5.1f}ms | "
-                f"Loss: {snapshot.avg_packet_loss:4.1f}% | "
-                f"Uptime: {uptime_str} | "
-                f"Success: {success_rate:5.1f}%{tested_info}"
-            )
-            
-            # Clear the line completely and display new status
-            self._clear_line()
-            print(f"\r{status_line}", end='', flush=True)
+    def _format_status_line(self, snapshot: MonitoringSnapshot) -> str:
+        """Build the real-time status line (runs on the render thread)."""
+        # Calculate runtime and success rate
+        runtime = datetime.now() - self.start_time
+        success_rate = (self.successful_measurements / self.measurement_count * 100) if self.measurement_count > 0 else 0
+        
+        # Format runtime as HH:MM:SS
+        total_seconds = int(runtime.total_seconds())
+        hours = total_seconds // 3600
+        minutes = (total_seconds % 3600) // 60
+        seconds = total_seconds % 60
+        uptime_str = f"{hours}:{minutes:02d}:{seconds:02d}"
+        
+        # Format tested device info
+        tested_info = ""
+        if snapshot.tested_device_ip:
+            tested_info = f" [Testing: {snapshot.tested_device_ip}]"
+        
+        # Format busiest host info
+        if snapshot.top_talkers:
+            top = snapshot.top_talkers[0]
+            tested_info += f" [Top: {top['ip']} ↓{top['download_mbps']:.1f}/↑{top['upload_mbps']:.1f}]"
+        
+        # Create status line
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        return (
+            f"📊 {timestamp} | "
+            f"Devices: {snapshot.device_count:2d} | "
+            f"↑{snapshot.total_upload_mbps:6.2f} Mbps | "
+            f"↓{snapshot.total_download_mbps:6.2f} Mbps | "
+            f"Quality: {snapshot.overall_quality:9s} | "
+            f"Latency: {snapshot.avg_latency_ms:5.1f}ms | "
+            f"Loss: {snapshot.avg_packet_loss:4.1f}% | "
+            f"Uptime: {uptime_str} | "
+            f"Success: {success_rate:5.1f}%{tested_info}"
+        )
+    
+    @staticmethod
+    def _status_change_key(snapshot: MonitoringSnapshot) -> Tuple:
+        """Displayed values that count as a change in 'changes' render mode."""
+        top_ip = snapshot.top_talkers[0]['ip'] if snapshot.top_talkers else None
+        return (
+            snapshot.device_count,
+            round(snapshot.total_upload_mbps, 1),
+            round(snapshot.total_download_mbps, 1),
+            snapshot.overall_quality,
+            round(snapshot.avg_latency_ms),
+            round(snapshot.avg_packet_loss),
+            top_ip
+        )
+    
+    def get_recent_snapshots(self, count: int = 10) -> List[MonitoringSnapshot]:
+        """
+        Get the most recent snapshots from the in-memory ring buffer.
+        
+        Args:
+            count: Maximum number of snapshots to return
             
-            # Store the length for future clearing
-            self.last_display_length = len(status_line)
+        Returns:
+            Snapshots in chronological order (oldest first)
+        """
+        history = list(self.snapshots)  # Copy first: the monitor thread keeps appending
+        return history[-count:] if count > 0 else []
+    
+    def get_service_status(self) -> Dict[str, Any]:
+        """Get current service state and session statistics."""
+        stats = self.session_stats
+        runtime = (datetime.now() - self.start_time).total_seconds() if self.start_time else 0.0
+        
+        return {
+            'is_running': self.is_running,
+            'runtime_seconds': round(runtime, 1),
+            'measurement_count': self.measurement_count,
+            'successful_measurements': self.successful_measurements,
+            'success_rate': (self.successful_measurements / self.measurement_count * 100) if self.measurement_count else 0.0,
+            'snapshots_in_memory': len(self.snapshots),
+            'snapshot_history_size': self.snapshots.maxlen,
+            'avg_device_count': round(stats.avg_device_count, 2),
+            'avg_latency_ms': round(stats.avg_latency_ms, 2),
+            'peak_download_mbps': stats.peak_download_mbps,
+            'devices_in_rotation': len(self.device_cache),
+            'current_device_index': self.device_test_index,
+            'quality_testing_enabled': self.probe_stage.is_running,
+            'unique_devices_tested': len(self.tested_devices),
+            'scheduler': self.tick_scheduler.get_stats(),
+            'renderer': self.renderer.get_stats(),
+            'metrics_url': self.metrics_server.url if self.metrics_server else None,
+            'restored_from_checkpoint': self.restored_from_checkpoint,
+            'overload': self.overload.get_stats() if self.overload else None,
+            'rediscovery_postponed': self._rediscovery_postponed,
+            'persistence': self.persistence.get_stats() if self.persistence else None,
+            'outputs': self.outputs.get_stats()
+        }
     
     def _print_final_stats(self):
         """Print final statistics when service stops."""
-        if not self.snapshots:
+        stats = self.session_stats
+        if not stats.snapshot_count:
             print("\n📊 No data collected during this session")
             return
         
@@ -461,11 +1099,11 @@ class ContinuousNetworkMonitorService:
         total_runtime = datetime.now() - self.start_time
         success_rate = (self.successful_measurements / self.measurement_count * 100) if self.measurement_count > 0 else 0
         
-        # Data analysis
-        avg_devices = sum(s.device_count for s in self.snapshots) / len(self.snapshots)
-        total_upload = sum(s.total_upload_mbps for s in self.snapshots)
-        total_download = sum(s.total_download_mbps for s in self.snapshots)
-        avg_latency = sum(s.avg_latency_ms for s in self.snapshots) / len(self.snapshots)
+        # Data analysis (running aggregates, no pass over the history)
+        avg_devices = stats.avg_device_count
+        total_upload = stats.upload_mbps_sum
+        total_download = stats.download_mbps_sum
+        avg_latency = stats.avg_latency_ms
         
         print("\n\n📈 Final Session Statistics:")
         print("=" * 50)
@@ -478,8 +1116,35 @@ class ContinuousNetworkMonitorService:
         print(f"⬇️  Total download activity: {total_download:.2f} Mbps-seconds")
         print(f"🔍 Average network latency: {avg_latency:.1f}ms")
         print(f"🎯 Unique devices tested: {len(self.tested_devices)} devices")
-        print(f"💾 Data snapshots collected: {len(self.snapshots)}")
-        print("🗄️  Ready for database persistence!")
+        print(f"💾 Data snapshots collected: {stats.snapshot_count} ({len(self.snapshots)} kept in memory)")
+        
+        scheduler = self.tick_scheduler
+        lateness_p99 = scheduler.lateness.percentile(0.99) or 0.0
+        print(f"⏲️  Tick timing: {scheduler.overruns} overruns, {scheduler.missed_ticks} missed ticks "
+              f"({scheduler.policy}), p99 lateness ≤{lateness_p99 * 1000:.1f}ms, "
+              f"max tick {scheduler.durations.max_value * 1000:.1f}ms")
+        if self.overload and self.overload.stats.shed_ticks:
+            overload = self.overload.stats
+            print(f"🐢 Load shedding: {overload.shed_ticks} of {overload.ticks} ticks degraded "
+                  f"({overload.escalations} escalations, {overload.restorations} restorations)")
+        
+        if self.persistence:
+            persisted = self.persistence.stats
+            print(f"🗄️  Persisted records: {persisted.written} in {persisted.batches} batches "
+                  f"(session {self.session_id})")
+            if persisted.dropped or persisted.failed:
+                print(f"⚠️  Not persisted: {persisted.dropped} dropped (queue full), "
+                      f"{persisted.failed} failed ({persisted.last_error})")
+            print(f"📦 Peak persistence queue depth: {persisted.max_queue_depth}")
+            deadband = self.persistence.deadband
+            if deadband and deadband.rows:
+                print(f"🗜️  Deadband: {deadband.ticks} snapshots stored as {deadband.rows} rows "
+                      f"({deadband.compression_ratio:.1f}x)")
+        else:
+            print("🗄️  No database configured; snapshots were not persisted")
+        for sink in self.outputs.sinks:
+            print(f"📤 Sink {sink.name}: {sink.stats.written} written, {sink.stats.dropped} dropped, "
+                  f"{sink.stats.failed} failed")
         
         if self.tested_devices:
             print("\n🔄 Round-robin tested devices:")
@@ -487,6 +1152,59 @@ class ContinuousNetworkMonitorService:
                 print(f"   • {device_ip}")
 
 
+def output_sinks_from_args(args: List[str]) -> List[OutputSink]:
+    """Build the output sinks requested by --jsonl=, --datagram=, --feed=, --feed-port= and --stdout."""
+    sinks: List[OutputSink] = []
+    feed_path, feed_port = None, None
+    for arg in args:
+        if arg.startswith('--jsonl='):
+            sinks.append(JsonlFileSink(arg.split('=', 1)[1]))
+        elif arg.startswith('--datagram='):
+            sinks.append(UnixDatagramSink(arg.split('=', 1)[1]))
+        elif arg.startswith('--feed='):
+            feed_path = arg.split('=', 1)[1]
+        elif arg.startswith('--feed-port='):
+            feed_port = int(arg.split('=', 1)[1])
+    if feed_path or feed_port is not None:
+        sinks.append(SnapshotFeed(feed_path, http_port=feed_port))
+    if '--stdout' in args:
+        sinks.append(StdoutSink(sys.stdout))  # Bound now: main() sends everything else to stderr
+    return sinks
+
+
+def checkpoint_path_from_args(args: List[str]) -> Optional[str]:
+    """Checkpoint file requested by --checkpoint=PATH (--checkpoint alone uses the default name)."""
+    for arg in args:
+        if arg.startswith('--checkpoint='):
+            return arg.split('=', 1)[1]
+        if arg == '--checkpoint':
+            return CheckpointConfig.DEFAULT_PATH
+    return None
+
+
+def database_from_args(args: List[str]) -> Optional[NetworkDatabaseManager]:
+    """Open the database requested by --db=PATH (snapshots are only persisted with one)."""
+    for arg in args:
+        if arg.startswith('--db='):
+            return NetworkDatabaseManager(arg.split('=', 1)[1])
+    return None
+
+
+def network_backend_from_args(args: List[str]) -> Optional[NetworkBackend]:
+    """Build the backend requested by --simulate=N or --replay=PATH (with --speed=X)."""
+    speed = 1.0
+    for arg in args:
+        if arg.startswith('--speed='):
+            speed = float(arg.split('=', 1)[1])
+    for arg in args:
+        if arg.startswith('--simulate='):
+            profile = SimulationProfile(device_count=int(arg.split('=', 1)[1]))
+            return SimulatedBackend(profile, speed=speed)
+        if arg.startswith('--replay='):
+            return TraceReplayBackend(arg.split('=', 1)[1], speed=speed, loop=True)
+    return None
+
+
 def main():
     """
     Main entry point for the continuous monitoring service.
@@ -495,14 +1213,39 @@ def main():
     1. Service initialization and configuration
     2. Error handling and graceful shutdown
     3. User interaction and control
+    
+    With --stdout, stdout carries nothing but JSON lines: the stdout sink
+    keeps the real stream and every other message goes to stderr.
     """
+    # Optional output sinks
+    sinks = output_sinks_from_args(sys.argv[1:])
+    to_stdout = '--stdout' in sys.argv
+    
+    with contextlib.redirect_stdout(sys.stderr) if to_stdout else contextlib.nullcontext():
+        return run_service(sinks, to_stdout)
+
+
+def run_service(sinks: List[OutputSink], to_stdout: bool) -> int:
+    """Configure, run and stop the service from the command line arguments."""
     print("🌐 Network Monitoring Service")
     print("============================")
     
+    # Simulated or replayed network instead of the live one
+    backend = network_backend_from_args(sys.argv[1:])
+    
+    # Write-behind persistence to SQLite
+    db_manager = database_from_args(sys.argv[1:])
+    
     # Create and configure the service
     service = ContinuousNetworkMonitorService(
         monitoring_interval=1.0,  # 1 second intervals
-        quality_test_samples=1    # 1 ping per device test (faster)
+        quality_test_samples=1,   # 1 ping per device test (faster)
+        render_mode=RenderConfig.HEADLESS if '--headless' in sys.argv or to_stdout else RenderConfig.LIVE,
+        metrics_port=MetricsConfig.DEFAULT_PORT if '--metrics' in sys.argv else None,
+        checkpoint_path=checkpoint_path_from_args(sys.argv[1:]),  # Warm restarts skip the initial sweep
+        output_sinks=sinks,
+        network_backend=backend,
+        db_manager=db_manager
     )
     
     try:
@@ -525,6 +1268,8 @@ def main():
     finally:
         # Ensure service is stopped
         service.stop()
+        if db_manager:
+            db_manager.close()
     
     print("👋 Service stopped. Thank you for using Network Monitor!")
     return 0
@@ -12,14 +12,250 @@ It demonstrates:
 
 import sqlite3
 import threading
+import queue
 import json
-from datetime import datetime
-from typing import List, Dict, Optional, Any
+import time
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Any, Sequence, Tuple, Callable, Iterator
 from pathlib import Path
 import contextlib
 
 from dataclasses import dataclass
 
+from quantile_sketch import KLLSketch, KLLConfig
+from snapshot_partitions import SnapshotPartitions, PartitionConfig
+from device_registry import DeviceRegistry, DeviceRegistryConfig
+
+
+class DatabaseConfig:
+    """Connection settings for the monitoring database."""
+    
+    # Seconds a connection waits for another process's write lock
+    BUSY_TIMEOUT = 30.0
+    
+    # WAL lets readers work while the writer commits; NORMAL only syncs
+    # at checkpoints (a power loss can lose the last commits, never corrupt)
+    JOURNAL_MODE = "WAL"
+    SYNCHRONOUS = "NORMAL"
+    
+    # Page cache per connection (KiB) and memory-mapped I/O (bytes)
+    CACHE_SIZE_KB = 16 * 1024
+    MMAP_SIZE = 256 * 1024 * 1024
+    
+    # Prepared statements kept per connection
+    CACHED_STATEMENTS = 256
+    
+    # Read-only connections lent to analytics (reports, model training);
+    # callers beyond this many wait for one to be returned
+    ANALYTICS_POOL_SIZE = 4
+    
+    # Bound parameters allowed per statement (999 before SQLite 3.32);
+    # bulk inserts are split into chunks that fit
+    MAX_SQL_VARIABLES = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+    
+    # Rows converted per transaction when migrating text timestamps, and
+    # the pause between chunks so other writers get the database
+    MIGRATION_CHUNK_ROWS = 2000
+    MIGRATION_PAUSE = 0.02
+    
+    # Rollup bucket sizes (epoch milliseconds, UTC aligned), and snapshot
+    # rows rolled up per transaction when catching up a backlog (with
+    # MIGRATION_PAUSE between chunks)
+    ROLLUP_BUCKETS = {'minute': 60 * 1000, 'hour': 3600 * 1000, 'day': 86400 * 1000}
+    ROLLUP_CHUNK_ROWS = 2000
+    
+    # Retention deletes the oldest snapshots this many at a time, one
+    # short transaction each, pausing between batches so writers get in
+    RETENTION_BATCH_ROWS = 200
+    RETENTION_PAUSE = 0.01
+    
+    # Free pages returned to the file system per incremental vacuum step
+    VACUUM_STEP_PAGES = 64
+
+
+# Schema version 2 stores every time column as integer epoch milliseconds
+SCHEMA_VERSION = 2
+
+# Current time in epoch milliseconds, as an SQL default
+NOW_MS_SQL = "(CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER))"
+
+# Snapshot metrics kept in the rollups, with the weight of a row: a
+# deadband row stands for sample_count ticks, but its usage is already
+# summed over them (so usage min, max and spread are per row piece, the
+# part of a row falling in one bucket)
+ROLLUP_METRICS = (
+    ('device_count', 'sample_count'),
+    ('total_upload_mbps', 'sample_count'),
+    ('total_download_mbps', 'sample_count'),
+    ('total_usage_mb', '1'),
+    ('avg_latency_ms', 'sample_count'),
+    ('avg_packet_loss', 'sample_count'),
+)
+
+# Per-metric rollup columns: <metric>_<stat>
+ROLLUP_STATS = ('sum', 'min', 'max', 'sumsq')
+
+
+def _ceil_sql(expression: str) -> str:
+    """SQL for the ceiling of a real expression (CAST truncates toward zero)."""
+    return f"(CAST({expression} AS INTEGER) + ({expression} > CAST({expression} AS INTEGER)))"
+
+
+def _rollup_upsert_sql() -> str:
+    """
+    The statement adding the snapshots of an ID range to every rollup.
+    
+    New snapshots are aggregated once into the finest buckets, and the
+    coarser buckets are merged from those, so the raw rows are read and
+    grouped once whatever the number of granularities. {source} is the
+    snapshot table to read (a partition's, when partitioned).
+    
+    A deadband row covering several finest buckets is first split into
+    one piece per bucket, each with the ticks expand_snapshot_rows would
+    place in it (evenly spread over timestamp..valid_until) and the same
+    share of the row's usage.
+    """
+    sizes = sorted(DatabaseConfig.ROLLUP_BUCKETS.values())
+    metrics = ', '.join(metric for metric, _weight in ROLLUP_METRICS)
+    columns = [f"{metric}_{stat}" for metric, _weight in ROLLUP_METRICS for stat in ROLLUP_STATS]
+    crossing = (f"sample_count > 1 AND valid_until - valid_until % {sizes[0]} "
+                f"> timestamp - timestamp % {sizes[0]}")
+    # Piece values: per-tick metrics as they are, summed ones by tick share
+    shares = [f"{metric} * (end_tick - first_tick) / ticks AS {metric}" if weight == '1' else metric
+              for metric, weight in ROLLUP_METRICS]
+    aggregates = []
+    for metric, weight in ROLLUP_METRICS:
+        aggregates += [f"SUM({metric} * {weight})", f"MIN({metric})", f"MAX({metric})",
+                       f"SUM({metric} * {metric} * {weight})"]
+    merged = [f"{'SUM' if stat in ('sum', 'sumsq') else stat.upper()}({column})"
+              for column, stat in zip(columns, ROLLUP_STATS * len(ROLLUP_METRICS))]
+    coarser = "\n        UNION ALL".join(f"""
+        SELECT {size}, bucket_start - bucket_start % {size}, SUM(sample_count), SUM(row_count),
+               MIN(first_timestamp), MAX(last_timestamp), {', '.join(merged)}
+        FROM fine GROUP BY 2""" for size in sizes[1:])
+    merges = [f"{column} = {'MIN' if stat == 'min' else 'MAX'}({column}, excluded.{column})"
+              if stat in ('min', 'max') else f"{column} = {column} + excluded.{column}"
+              for column, stat in zip(columns, ROLLUP_STATS * len(ROLLUP_METRICS))]
+    return f"""
+        WITH RECURSIVE spans AS (
+            -- Rows whose ticks reach past their first bucket: one span per bucket
+            SELECT timestamp - timestamp % {sizes[0]} AS bucket_start, timestamp, valid_until AS run_end,
+                   sample_count AS ticks, (valid_until - timestamp) * 1.0 / (sample_count - 1) AS step, {metrics}
+            FROM {{source}}
+            WHERE id > ?1 AND id <= ?2 AND {crossing}
+            UNION ALL
+            SELECT bucket_start + {sizes[0]}, timestamp, run_end, ticks, step, {metrics}
+            FROM spans WHERE bucket_start + {sizes[0]} <= run_end
+        ),
+        ranged AS (
+            -- Ticks timestamp + step * i with first_tick <= i < end_tick fall in the bucket
+            SELECT *,
+                   MAX(0, {_ceil_sql('(bucket_start - timestamp) / step')}) AS first_tick,
+                   MIN(ticks, {_ceil_sql(f'(bucket_start + {sizes[0]} - timestamp) / step')}) AS end_tick
+            FROM spans
+        ),
+        pieces AS (
+            -- Rows with all their ticks in one bucket stay whole
+            SELECT timestamp - timestamp % {sizes[0]} AS bucket_start, sample_count,
+                   timestamp AS first_timestamp, COALESCE(valid_until, timestamp) AS last_timestamp, {metrics}
+            FROM {{source}}
+            WHERE id > ?1 AND id <= ?2 AND NOT COALESCE({crossing}, false)
+            UNION ALL
+            SELECT bucket_start, end_tick - first_tick,
+                   timestamp + CAST(ROUND(step * first_tick) AS INTEGER),
+                   timestamp + CAST(ROUND(step * (end_tick - 1)) AS INTEGER), {', '.join(shares)}
+            FROM ranged WHERE end_tick > first_tick
+        ),
+        fine AS (
+            SELECT bucket_start, SUM(sample_count) AS sample_count,
+                   COUNT(*) AS row_count, MIN(first_timestamp) AS first_timestamp,
+                   MAX(last_timestamp) AS last_timestamp,
+                   {', '.join(f'{aggregate} AS {column}' for aggregate, column in zip(aggregates, columns))}
+            FROM pieces
+            GROUP BY 1
+        )
+        INSERT INTO snapshot_rollups (
+            bucket_ms, bucket_start, sample_count, row_count, first_timestamp, last_timestamp,
+            {', '.join(columns)}
+        )
+        SELECT {sizes[0]}, * FROM fine WHERE true
+        UNION ALL{coarser}
+        ON CONFLICT(bucket_ms, bucket_start) DO UPDATE SET
+            sample_count = sample_count + excluded.sample_count,
+            row_count = row_count + excluded.row_count,
+            first_timestamp = MIN(first_timestamp, excluded.first_timestamp),
+            last_timestamp = MAX(last_timestamp, excluded.last_timestamp),
+            {', '.join(merges)}
+    """
+
+
+ROLLUP_UPSERT_SQL = _rollup_upsert_sql()
+
+
+def now_ms() -> int:
+    """Current time in epoch milliseconds."""
+    return int(time.time() * 1000)
+
+
+def to_epoch_ms(value: Any) -> Optional[int]:
+    """
+    Epoch milliseconds from a stored or caller-supplied time.
+    
+    Accepts epoch milliseconds, datetimes and ISO 8601 strings; naive
+    datetimes and strings are local time, as datetime.timestamp() assumes.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return int(round(value.timestamp() * 1000))
+
+
+def from_epoch_ms(value: Optional[int]) -> Optional[datetime]:
+    """Local naive datetime of an epoch-milliseconds column value."""
+    return datetime.fromtimestamp(value / 1000) if value is not None else None
+
+
+def _legacy_text_to_ms(text: str) -> Optional[int]:
+    """
+    Convert a timestamp stored as text by schema version 1.
+    
+    'YYYY-MM-DD HH:MM:SS' is what SQLite's CURRENT_TIMESTAMP wrote (UTC);
+    anything else came from isoformat() on local naive datetimes.
+    """
+    try:
+        if len(text) == 19 and text[10] == ' ':
+            return int(datetime.fromisoformat(text).replace(tzinfo=timezone.utc).timestamp() * 1000)
+        return to_epoch_ms(text)
+    except ValueError:
+        return None
+
+@dataclass
+class RetentionProgress:
+    """Progress of a cleanup_old_data run, reported after every batch."""
+    cutoff_ms: int
+    snapshots_pending: int = 0      # Snapshots older than the cutoff when the run started
+    snapshots_removed: int = 0
+    quality_tests_removed: int = 0
+    partitions_dropped: int = 0
+    pages_freed: int = 0            # Returned to the file system by incremental vacuum
+    batches: int = 0
+    longest_batch_ms: float = 0.0   # Longest transaction, i.e. the longest a writer waited
+    finished: bool = False          # False if stopped early (the next run resumes)
+    
+    @property
+    def rows_removed(self) -> int:
+        return self.snapshots_removed + self.quality_tests_removed
+    
+    @property
+    def fraction_done(self) -> float:
+        if not self.snapshots_pending:
+            return 1.0
+        return min(self.snapshots_removed / self.snapshots_pending, 1.0)
+
+
 @dataclass
 class MonitoringSession:
     """Represents a monitoring session in the database"""
@@ -36,23 +272,49 @@ class NetworkDatabaseManager:
     Manages SQLite database for network monitoring data.
     
     This class demonstrates professional database management practices:
-    1. Connection pooling and thread safety
+    1. Long-lived connections, one per thread (readers never wait for the
+       writer; writes are serialized in-process)
     2. Proper schema versioning
     3. Transaction management
     4. Efficient query patterns
     5. Data integrity constraints
     """
     
-    def __init__(self, db_path: str = "network_monitoring.db"):
+    def __init__(self, db_path: str = "network_monitoring.db", partition_by: Optional[str] = None,
+                 last_seen_granularity_ms: int = DeviceRegistryConfig.LAST_SEEN_GRANULARITY_MS):
         """
         Initialize database manager.
         
         Args:
             db_path: Path to SQLite database file
+            partition_by: 'day' or 'week' to keep the raw snapshot and
+                          quality test tables in one file per period (see
+                          snapshot_partitions); fixed once chosen, and
+                          existing rows are moved into their partitions
+            last_seen_granularity_ms: Move a device's last_seen on at most
+                                      this often; unchanged devices are not
+                                      rewritten in between (see device_registry)
         """
         self.db_path = Path(db_path)
-        self.connection_lock = threading.Lock()
+        
+        # One connection per thread, opened on first use
+        self.write_lock = threading.Lock()
+        self._local = threading.local()
+        self._connections: List[Tuple[threading.Thread, sqlite3.Connection]] = []
+        self._connections_lock = threading.Lock()
+        
+        # Read-only analytics connections, lent out by analytics_connection()
+        self._analytics_pool: queue.LifoQueue = queue.LifoQueue()
+        self._analytics_connections: List[sqlite3.Connection] = []
+        
+        # Raw tables in time partitions (None: in the main file)
+        self.partitions: Optional[SnapshotPartitions] = None
+        
+        # Devices as last written, to skip rewriting unchanged ones
+        self.device_registry = DeviceRegistry(last_seen_granularity_ms)
+        
         self._init_database()
+        self._init_partitions(partition_by)
         
         print(f"📊 Database initialized: {self.db_path.absolute()}")
     
@@ -69,8 +331,8 @@ class NetworkDatabaseManager:
             hostname TEXT,                          -- Resolved hostname
             device_type TEXT DEFAULT 'unknown',    -- Router, laptop, phone, etc.
             manufacturer TEXT,                      -- Based on MAC OUI lookup
-            first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            first_seen INTEGER DEFAULT {now},         -- Epoch milliseconds (all time columns)
+            last_seen INTEGER DEFAULT {now},
             is_active BOOLEAN DEFAULT 1,           -- Whether device is currently active
             
             UNIQUE(ip_address)                      -- Prevent duplicate IPs
@@ -79,8 +341,8 @@ class NetworkDatabaseManager:
         -- Monitoring sessions table: Track when monitoring started/stopped
         CREATE TABLE IF NOT EXISTS monitoring_sessions (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            end_time TIMESTAMP NULL,                -- NULL while session is active
+            start_time INTEGER DEFAULT {now},
+            end_time INTEGER NULL,                -- NULL while session is active
             total_snapshots INTEGER DEFAULT 0,
             avg_device_count REAL DEFAULT 0.0,
             avg_quality_score REAL DEFAULT 0.0,
@@ -91,7 +353,7 @@ class NetworkDatabaseManager:
         CREATE TABLE IF NOT EXISTS network_snapshots (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             session_id INTEGER NOT NULL,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            timestamp INTEGER DEFAULT {now},
             
             -- Device metrics
             device_count INTEGER NOT NULL,
@@ -110,6 +372,11 @@ class NetworkDatabaseManager:
             active_interfaces TEXT,                 -- JSON array of interface names
             tested_device_ip TEXT,                  -- Which device was tested this round
             
+            -- Deadband compression: the row stands for sample_count ticks
+            -- from timestamp until valid_until (NULL for a single tick)
+            valid_until INTEGER NULL,
+            sample_count INTEGER NOT NULL DEFAULT 1,
+            
             FOREIGN KEY (session_id) REFERENCES monitoring_sessions(id)
         );
         
@@ -118,7 +385,7 @@ class NetworkDatabaseManager:
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             snapshot_id INTEGER NOT NULL,
             device_ip TEXT NOT NULL,
-            test_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            test_timestamp INTEGER DEFAULT {now},
             
             -- Test results
             latency_ms REAL,                        -- NULL if ping failed
@@ -130,40 +397,483 @@ class NetworkDatabaseManager:
             FOREIGN KEY (device_ip) REFERENCES devices(ip_address)
         );
         
+        -- Bandwidth quantile sketches: mergeable p95/p99 summaries per bucket
+        CREATE TABLE IF NOT EXISTS bandwidth_sketches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            interface TEXT NOT NULL,                -- Interface name or 'all'
+            direction TEXT NOT NULL,                -- 'upload' or 'download'
+            bucket_seconds INTEGER NOT NULL,        -- 3600 (hour) or 86400 (day)
+            bucket_start INTEGER NOT NULL,          -- Epoch seconds (UTC aligned)
+            sample_count INTEGER NOT NULL,
+            sketch TEXT NOT NULL,                   -- Serialized KLL sketch (JSON)
+            
+            UNIQUE(interface, direction, bucket_seconds, bucket_start)
+        );
+        
         -- Performance indexes for fast queries (crucial for AI later!)
         CREATE INDEX IF NOT EXISTS idx_snapshots_timestamp ON network_snapshots(timestamp);
         CREATE INDEX IF NOT EXISTS idx_snapshots_session ON network_snapshots(session_id);
         CREATE INDEX IF NOT EXISTS idx_devices_active ON devices(is_active, last_seen);
         CREATE INDEX IF NOT EXISTS idx_quality_tests_device ON device_quality_tests(device_ip, test_timestamp);
+        CREATE INDEX IF NOT EXISTS idx_quality_tests_snapshot ON device_quality_tests(snapshot_id);
         CREATE INDEX IF NOT EXISTS idx_sessions_time ON monitoring_sessions(start_time, end_time);
         
+        -- Snapshot rollups: per minute, hour and day bucket, the tick count
+        -- and each metric's sum, min, max and sum of squares
+        CREATE TABLE IF NOT EXISTS snapshot_rollups (
+            bucket_ms INTEGER NOT NULL,             -- 60000, 3600000 or 86400000
+            bucket_start INTEGER NOT NULL,          -- Epoch milliseconds (UTC aligned)
+            sample_count INTEGER NOT NULL,          -- Ticks (SUM of snapshot sample_count)
+            row_count INTEGER NOT NULL,             -- Snapshot rows, or their pieces in this bucket
+            first_timestamp INTEGER NOT NULL,
+            last_timestamp INTEGER NOT NULL,        -- Latest tick
+            {metric_columns},
+            
+            PRIMARY KEY (bucket_ms, bucket_start)
+        ) WITHOUT ROWID;
+        
+        -- Last snapshot ID included in the rollups
+        CREATE TABLE IF NOT EXISTS rollup_watermark (
+            source TEXT PRIMARY KEY,
+            last_id INTEGER NOT NULL
+        );
+        
+        -- Storage options fixed when first chosen (e.g. partition_by)
+        CREATE TABLE IF NOT EXISTS storage_settings (
+            name TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        
         -- Database metadata
         CREATE TABLE IF NOT EXISTS schema_version (
             version INTEGER PRIMARY KEY,
-            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            applied_at INTEGER DEFAULT {now}
         );
-        """
+        """.replace('{now}', NOW_MS_SQL).replace('{metric_columns}', ',\n            '.join(
+            f"{metric}_{stat} REAL" for metric, _weight in ROLLUP_METRICS for stat in ROLLUP_STATS
+        ))
         
-        with self._get_connection() as conn:
+        with self._get_connection(write=True) as conn:
             cursor = conn.cursor()
             cursor.executescript(schema_sql)
+            self._add_missing_columns(cursor)
+            version = cursor.execute("SELECT MAX(version) FROM schema_version").fetchone()[0]
+        
+        # Databases written before version 2 hold text timestamps
+        if version is None or version < SCHEMA_VERSION:
+            self._migrate_timestamps()
+            with self._get_connection(write=True) as conn:
+                conn.execute("INSERT OR IGNORE INTO schema_version (version, applied_at) VALUES (?, ?)",
+                             (SCHEMA_VERSION, now_ms()))
+        
+        # Snapshots written before the rollups existed, or by other writers
+        self.refresh_rollups()
+        
+        print("✅ Database schema initialized successfully")
+    
+    # Columns added after the first release: (table, column, definition)
+    ADDED_COLUMNS = (
+        ('network_snapshots', 'valid_until', 'INTEGER NULL'),
+        ('network_snapshots', 'sample_count', 'INTEGER NOT NULL DEFAULT 1'),
+    )
+    
+    def _init_partitions(self, partition_by: Optional[str]):
+        """Open the partition directory, moving raw rows out of the main file when first enabled."""
+        with self._get_connection() as conn:
+            row = conn.execute("SELECT value FROM storage_settings WHERE name = 'partition_by'").fetchone()
+            schema_sql = [sql for (sql,) in conn.execute(
+                f"SELECT sql FROM sqlite_master WHERE tbl_name IN ({', '.join('?' * len(PartitionConfig.TABLES))}) "
+                "AND sql IS NOT NULL ORDER BY type DESC", PartitionConfig.TABLES
+            )]  # Tables before their indexes
+        stored = row[0] if row else None
+        if partition_by and stored and partition_by != stored:
+            raise ValueError(f"{self.db_path} is partitioned by {stored}, not {partition_by}")
+        if not (partition_by or stored):
+            return
+        
+        self.partitions = SnapshotPartitions(self.db_path.with_name(f"{self.db_path.stem}-partitions"),
+                                             partition_by or stored, schema_sql)
+        if not stored:
+            with self._get_connection(write=True) as conn:
+                conn.execute("INSERT INTO storage_settings (name, value) VALUES ('partition_by', ?)", (partition_by,))
+        self._move_into_partitions()
+    
+    def _move_into_partitions(self):
+        """
+        Move raw rows left in the main file into their partitions.
+        
+        One partition per transaction; rows keep their IDs, so a move cut
+        short is finished on the next open without duplicates.
+        """
+        moved = 0
+        for table, time_column in zip(PartitionConfig.TABLES, ('timestamp', 'test_timestamp')):
+            offset = f"({time_column} - {PartitionConfig.ORIGIN_MS})"
+            with self._get_connection() as conn:
+                keys = [row[0] for row in conn.execute(
+                    f"SELECT DISTINCT {offset} - {offset} % {self.partitions.period_ms} + {PartitionConfig.ORIGIN_MS} "
+                    f"FROM main.{table} ORDER BY 1"
+                )]
+            for key in keys:
+                with self._get_connection(write=True, partitions=[key]) as conn:
+                    name = self.partitions.name_for(key)
+                    bounds = (key, key + self.partitions.period_ms)
+                    conn.execute(f"INSERT OR IGNORE INTO {name}.{table} SELECT * FROM main.{table} "
+                                 f"WHERE {time_column} >= ? AND {time_column} < ?", bounds)
+                    moved += conn.execute(f"DELETE FROM main.{table} WHERE {time_column} >= ? AND {time_column} < ?",
+                                          bounds).rowcount
+        if moved:
+            print(f"📦 Moved {moved:,} rows into {self.partitions.period} partitions")
+    
+    def _add_missing_columns(self, cursor):
+        """Bring tables created by older versions up to date (ALTER TABLE is cheap here)."""
+        for table, column, definition in self.ADDED_COLUMNS:
+            existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    
+    # Time columns per table, converted by the version 2 migration
+    TIME_COLUMNS = (
+        ('monitoring_sessions', ('start_time', 'end_time')),
+        ('devices', ('first_seen', 'last_seen')),
+        ('network_snapshots', ('timestamp', 'valid_until')),
+        ('device_quality_tests', ('test_timestamp',)),
+        ('schema_version', ('applied_at',)),
+    )
+    
+    def _migrate_timestamps(self) -> Dict[str, int]:
+        """
+        Convert text timestamps to epoch milliseconds, in chunks.
+        
+        Each chunk is its own short transaction, so other connections keep
+        writing while a large database converts, and an interrupted
+        migration resumes where it stopped (only text values are touched).
+        The old columns have NUMERIC affinity, so they keep the integers
+        without rebuilding the tables.
+        
+        Returns:
+            Rows converted per table
+        """
+        converted = {}
+        for table, columns in self.TIME_COLUMNS:
+            has_text = " OR ".join(f"typeof({column}) = 'text'" for column in columns)
+            with self._get_connection() as conn:
+                remaining = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {has_text}").fetchone()[0]
+            if not remaining:
+                continue
             
-            # Set schema version
-            cursor.execute("INSERT OR IGNORE INTO schema_version (version) VALUES (1)")
-            conn.commit()
-            
-            print("✅ Database schema initialized successfully")
+            print(f"🔄 Converting {remaining:,} {table} rows to epoch-millisecond timestamps...")
+            last_rowid, done = 0, 0
+            while True:
+                with self._get_connection(write=True) as conn:
+                    rows = conn.execute(f"""
+                        SELECT rowid, {', '.join(columns)} FROM {table}
+                        WHERE rowid > ? AND ({has_text})
+                        ORDER BY rowid LIMIT ?
+                    """, (last_rowid, DatabaseConfig.MIGRATION_CHUNK_ROWS)).fetchall()
+                    if not rows:
+                        break
+                    conn.executemany(
+                        f"UPDATE {table} SET {', '.join(f'{column} = ?' for column in columns)} WHERE rowid = ?",
+                        [tuple(_legacy_text_to_ms(value) if isinstance(value, str) else value
+                               for value in row[1:]) + (row[0],) for row in rows]
+                    )
+                last_rowid = rows[-1][0]
+                done += len(rows)
+                time.sleep(DatabaseConfig.MIGRATION_PAUSE)
+            converted[table] = done
+        
+        if converted:
+            with self._get_connection() as conn:
+                conn.execute("PRAGMA optimize")  # Refresh planner statistics for the new values
+            print(f"✅ Timestamps converted: {', '.join(f'{table} {count:,}' for table, count in converted.items())}")
+        return converted
+    
+    def _roll_up(self, cursor, up_to: Optional[int] = None,
+                 sources: Sequence[str] = ('network_snapshots',)) -> int:
+        """
+        Add snapshots past the watermark to the rollups and move it on.
+        
+        Runs inside the caller's write transaction, so the rollups always
+        match the committed snapshots. Snapshot IDs only grow and there is
+        one writer at a time, so every ID the sequence has handed out is
+        committed and nothing is counted twice, whichever process wrote it.
+        
+        Args:
+            cursor: Cursor of an open write transaction
+            up_to: Roll up to this snapshot ID at most
+            sources: Snapshot tables holding the new IDs (the main table
+                     and the partitions holding them, when partitioned)
+        
+        Returns:
+            Snapshot IDs rolled up (gaps from deleted rows included)
+        """
+        last_id = self._rollup_watermark(cursor)
+        max_id = self._last_id(cursor, 'network_snapshots')
+        if up_to is not None:
+            max_id = min(max_id, up_to)
+        if max_id <= last_id:
+            return 0
+        
+        for source in sources:
+            cursor.execute(ROLLUP_UPSERT_SQL.replace('{source}', source), (last_id, max_id))
+        cursor.execute("""
+            INSERT INTO rollup_watermark (source, last_id) VALUES ('network_snapshots', ?)
+            ON CONFLICT(source) DO UPDATE SET last_id = excluded.last_id
+        """, (max_id,))
+        return max_id - last_id
+    
+    def refresh_rollups(self) -> int:
+        """
+        Catch the rollups up with snapshots not yet included.
+        
+        Snapshots saved through this manager are rolled up as they are
+        written; this covers existing databases and rows from other
+        writers. A large backlog is handled in chunks, one transaction
+        each, so other writers keep going. When partitioned, each chunk
+        reads the main table and the partitions holding its IDs.
+        
+        Returns:
+            Snapshot IDs rolled up
+        """
+        with self._get_connection() as conn:
+            target = self._last_id(conn, 'network_snapshots')
+            backlog = target - self._rollup_watermark(conn)
+        if backlog > DatabaseConfig.ROLLUP_CHUNK_ROWS:
+            print(f"🔄 Rolling up {backlog:,} snapshot IDs...")
+        
+        # Stop at the backlog seen now: rows written meanwhile are rolled
+        # up by their own save (or the next refresh)
+        total = 0
+        while True:
+            with self._get_connection() as conn:
+                last_id = self._rollup_watermark(conn)
+            up_to = min(target, last_id + DatabaseConfig.ROLLUP_CHUNK_ROWS)
+            if up_to <= last_id:
+                break
+            keys = []
+            if self.partitions:
+                keys, up_to = self._partitions_holding(last_id, up_to)
+            with self._get_connection(write=True, partitions=keys) as conn:
+                sources = ['network_snapshots'] + [f"{self.partitions.name_for(key)}.network_snapshots"
+                                                   for key in keys]
+                done = self._roll_up(conn.cursor(), up_to=up_to, sources=sources)
+            if not done:
+                break
+            total += done
+            time.sleep(DatabaseConfig.MIGRATION_PAUSE)
+        return total
+    
+    def _partitions_holding(self, last_id: int, up_to: int) -> Tuple[List[int], int]:
+        """
+        Partitions holding snapshot IDs in (last_id, up_to].
+        
+        At most MAX_ATTACHED of them, as one transaction has to read them
+        all: when more hold IDs in the range, it is cut short before the
+        first ID of the next one.
+        
+        Returns:
+            (partition keys, end of the range they cover)
+        """
+        keys = self.partitions.keys()
+        found = []  # (first ID in the range, key)
+        for offset in range(0, len(keys), PartitionConfig.MAX_ATTACHED):
+            group = {self.partitions.name_for(key): key for key in keys[offset:offset + PartitionConfig.MAX_ATTACHED]}
+            with self._get_connection() as conn:
+                for name in self.partitions.attach(conn, list(group.values())):
+                    first = conn.execute(f"SELECT MIN(id) FROM {name}.network_snapshots WHERE id > ? AND id <= ?",
+                                         (last_id, up_to)).fetchone()[0]
+                    if first is not None:
+                        found.append((first, group[name]))
+        found.sort()
+        if len(found) > PartitionConfig.MAX_ATTACHED:
+            up_to = found[PartitionConfig.MAX_ATTACHED][0] - 1
+            found = found[:PartitionConfig.MAX_ATTACHED]
+        return [key for _first, key in found], up_to
+    
+    @staticmethod
+    def _rollup_watermark(cursor) -> int:
+        """Highest snapshot ID included in the rollups."""
+        row = cursor.execute("SELECT last_id FROM rollup_watermark WHERE source = 'network_snapshots'").fetchone()
+        return row[0] if row else 0
+    
+    def _holds_pending_ids(self, cursor, sources: Sequence[str], before: int) -> bool:
+        """Whether every ID between the rollup watermark and before is in sources."""
+        last_id = self._rollup_watermark(cursor)
+        if before - 1 <= last_id:
+            return True
+        found = sum(cursor.execute(f"SELECT COUNT(*) FROM {source} WHERE id > ? AND id < ?",
+                                   (last_id, before)).fetchone()[0] for source in sources)
+        return found == before - 1 - last_id
+    
+    @staticmethod
+    def _last_id(cursor, table: str) -> int:
+        """Highest ID the table's AUTOINCREMENT sequence has handed out."""
+        row = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+        return row[0] if row else 0
+    
+    def _allocate_ids(self, cursor, table: str, count: int) -> List[int]:
+        """
+        Take IDs from a table's sequence for rows stored in partitions.
+        
+        Partitioned rows keep the IDs the main table would have given
+        them, so IDs stay unique and ordered across partitions.
+        """
+        first = self._last_id(cursor, table) + 1
+        cursor.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = ?", (first + count - 1, table))
+        if cursor.rowcount == 0:
+            cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, first + count - 1))
+        return list(range(first, first + count))
+    
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open and tune a connection for the calling thread."""
+        conn = sqlite3.connect(self.db_path, timeout=DatabaseConfig.BUSY_TIMEOUT,
+                               cached_statements=DatabaseConfig.CACHED_STATEMENTS,
+                               check_same_thread=False)  # close() may run on another thread
+        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        # Takes effect only while the file has no tables (before WAL is
+        # set): new databases can give space freed by retention back
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute(f"PRAGMA journal_mode = {DatabaseConfig.JOURNAL_MODE}")
+        conn.execute(f"PRAGMA synchronous = {DatabaseConfig.SYNCHRONOUS}")
+        conn.execute(f"PRAGMA cache_size = -{DatabaseConfig.CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size = {DatabaseConfig.MMAP_SIZE}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        
+        with self._connections_lock:
+            # Threads come and go (executors, tests): close what they left
+            for thread, stale in [pair for pair in self._connections if not pair[0].is_alive()]:
+                stale.close()
+                self._connections.remove((thread, stale))
+            self._connections.append((threading.current_thread(), conn))
+        return conn
     
     @contextlib.contextmanager
-    def _get_connection(self):
-        """Thread-safe database connection context manager"""
-        with self.connection_lock:
-            conn = sqlite3.connect(self.db_path, timeout=30.0)
-            conn.row_factory = sqlite3.Row  # Enable dict-like access
+    def _get_connection(self, write: bool = False, partitions: Sequence[int] = ()):
+        """
+        The calling thread's connection.
+        
+        Reads take no lock: in WAL mode they see the last committed state
+        while a write is in progress. With write=True the block is one
+        transaction, serialized with the other writers of this process and
+        committed on exit (rolled back on error).
+        
+        partitions are attached first (created for writes), as SQL can
+        only attach outside of a transaction. Callbacks registered with
+        _after_commit run once the write block has committed; a partitioned
+        save that found snapshots of other writers it could not read
+        catches the rollups up after that.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._open_connection()
+        
+        if not write:
+            if partitions:
+                self.partitions.attach(conn, partitions)
             try:
                 yield conn
             finally:
-                conn.close()
+                if conn.in_transaction:
+                    conn.rollback()  # Never hold a snapshot (or a lock) between calls
+            return
+        
+        with self.write_lock:
+            if partitions:
+                self.partitions.attach(conn, partitions, create=True)
+            # Take the write lock now rather than when the first row changes
+            conn.execute("BEGIN IMMEDIATE")
+            self._local.after_commit = []
+            self._local.rollups_behind = False
+            try:
+                yield conn
+                if conn.in_transaction:
+                    conn.commit()
+            except BaseException:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            finally:
+                callbacks, self._local.after_commit = self._local.after_commit, None
+            for callback in callbacks:
+                callback()
+        if self._local.rollups_behind:
+            self.refresh_rollups()  # Attaches partitions, so only outside a transaction
+    
+    def _after_commit(self, callback: Callable[[], None]):
+        """Run a callback when the calling thread's write block commits (never on rollback)."""
+        self._local.after_commit.append(callback)
+    
+    def _open_analytics_connection(self) -> sqlite3.Connection:
+        """Open a read-only connection for the analytics pool."""
+        conn = sqlite3.connect(f"{self.db_path.absolute().as_uri()}?mode=ro", uri=True,
+                               timeout=DatabaseConfig.BUSY_TIMEOUT,
+                               cached_statements=DatabaseConfig.CACHED_STATEMENTS,
+                               check_same_thread=False)  # Lent to any thread
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only = ON")  # mode=ro does not cover attached partitions
+        conn.execute(f"PRAGMA cache_size = -{DatabaseConfig.CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size = {DatabaseConfig.MMAP_SIZE}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+    
+    def _acquire_analytics_connection(self) -> sqlite3.Connection:
+        """An idle pool connection, a new one while the pool has room, or the next one returned."""
+        try:
+            return self._analytics_pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._connections_lock:
+            if len(self._analytics_connections) < DatabaseConfig.ANALYTICS_POOL_SIZE:
+                conn = self._open_analytics_connection()
+                self._analytics_connections.append(conn)
+                return conn
+        return self._analytics_pool.get()
+    
+    @contextlib.contextmanager
+    def analytics_connection(self, snapshot: bool = False, partitions: Sequence[int] = ()):
+        """
+        A read-only connection from the analytics pool.
+        
+        Analytics connections are opened with mode=ro and never take the
+        write lock or share a connection with the collector, so a long
+        report runs in parallel with ingestion: in WAL mode readers and
+        the writer do not wait for each other.
+        
+        Args:
+            snapshot: Run the block as one read transaction, so all its
+                      queries see the database as of the block's start
+                      (the WAL cannot be checkpointed past an open
+                      snapshot, so keep such blocks report-sized)
+            partitions: Partition keys to attach, when partitioned; each
+                        joins the snapshot on its first read
+        """
+        conn = self._acquire_analytics_connection()
+        try:
+            if partitions:
+                self.partitions.attach(conn, partitions)
+            if snapshot:
+                conn.execute("BEGIN")
+                conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()  # Start reading now
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            with self._connections_lock:
+                returned = conn in self._analytics_connections  # Not closed meanwhile
+            if returned:
+                self._analytics_pool.put(conn)
+    
+    def close(self):
+        """Close every thread's connection and the analytics pool (the manager reopens on next use)."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            analytics, self._analytics_connections = self._analytics_connections, []
+            self._analytics_pool = queue.LifoQueue()
+        for _thread, conn in connections:
+            conn.close()
+        for conn in analytics:
+            conn.close()
+        self._local = threading.local()
     
     def start_monitoring_session(self, notes: str = None) -> int:
         """
@@ -175,12 +885,12 @@ class NetworkDatabaseManager:
         Returns:
             Session ID for use in subsequent operations
         """
-        with self._get_connection() as conn:
+        with self._get_connection(write=True) as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                INSERT INTO monitoring_sessions (notes) 
-                VALUES (?)
-            """, (notes,))
+                INSERT INTO monitoring_sessions (start_time, notes) 
+                VALUES (?, ?)
+            """, (now_ms(), notes))
             
             session_id = cursor.lastrowid
             conn.commit()
@@ -190,235 +900,747 @@ class NetworkDatabaseManager:
     
     def end_monitoring_session(self, session_id: int):
         """End a monitoring session and calculate summary statistics"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Calculate session statistics
-            cursor.execute("""
+        # Calculate session statistics (rows weighted by the ticks they stand
+        # for), summed over every table the session's snapshots may be in
+        ticks, device_ticks, quality_ticks = 0, 0, 0
+        for conn, table in self._raw_tables('network_snapshots'):
+            row = conn.execute(f"""
+                SELECT 
+                    COALESCE(SUM(sample_count), 0),
+                    COALESCE(SUM(device_count * sample_count), 0),
+                    COALESCE(SUM(
+                        CASE overall_quality
+                            WHEN 'Excellent' THEN 4
+                            WHEN 'Good' THEN 3
+                            WHEN 'Fair' THEN 2
+                            WHEN 'Poor' THEN 1
+                            ELSE 0
+                        END * sample_count
+                    ), 0)
+                FROM {table} 
+                WHERE session_id = ?
+            """, (session_id,)).fetchone()
+            ticks, device_ticks, quality_ticks = ticks + row[0], device_ticks + row[1], quality_ticks + row[2]
+        
+        with self._get_connection(write=True) as conn:
+            conn.execute("""
                 UPDATE monitoring_sessions 
-                SET 
-                    end_time = CURRENT_TIMESTAMP,
-                    total_snapshots = (
-                        SELECT COUNT(*) FROM network_snapshots 
-                        WHERE session_id = ?
-                    ),
-                    avg_device_count = (
-                        SELECT AVG(device_count) FROM network_snapshots 
-                        WHERE session_id = ?
-                    ),
-                    avg_quality_score = (
-                        SELECT AVG(
-                            CASE overall_quality
-                                WHEN 'Excellent' THEN 4
-                                WHEN 'Good' THEN 3
-                                WHEN 'Fair' THEN 2
-                                WHEN 'Poor' THEN 1
-                                ELSE 0
-                            END
-                        ) FROM network_snapshots 
-                        WHERE session_id = ?
-                    )
+                SET end_time = ?, total_snapshots = ?, avg_device_count = ?, avg_quality_score = ?
                 WHERE id = ?
-            """, (session_id, session_id, session_id, session_id))
+            """, (now_ms(), ticks, device_ticks / ticks if ticks else None,
+                  quality_ticks / ticks if ticks else None, session_id))
             
-            conn.commit()
             print(f"🏁 Ended monitoring session #{session_id}")
     
+    # Column lists and row placeholders of the bulk inserts
+    SNAPSHOT_COLUMNS = (
+        "session_id, timestamp, device_count, total_upload_mbps, total_download_mbps, "
+        "total_usage_mb, avg_latency_ms, avg_packet_loss, overall_quality, "
+        "active_interfaces, tested_device_ip, valid_until, sample_count"
+    )
+    SNAPSHOT_ROW = "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    QUALITY_TEST_COLUMNS = (
+        "snapshot_id, device_ip, test_timestamp, latency_ms, packet_loss_percent, response_time_ms, test_status"
+    )
+    QUALITY_TEST_ROW = "(?, ?, ?, ?, ?, ?, ?)"
+    
+    @staticmethod
+    def _insert_rows(cursor, insert_sql: str, row_sql: str, rows: Sequence[tuple],
+                     suffix: str = "RETURNING id") -> List[tuple]:
+        """
+        Multi-row INSERT, chunked to SQLite's bound-variable limit.
+        
+        One statement per chunk instead of one per row; the rows of the
+        RETURNING suffix are collected from every chunk.
+        """
+        if not rows:
+            return []
+        per_chunk = max(1, DatabaseConfig.MAX_SQL_VARIABLES // len(rows[0]))
+        returned = []
+        for start in range(0, len(rows), per_chunk):
+            chunk = rows[start:start + per_chunk]
+            cursor.execute(
+                f"{insert_sql} VALUES {', '.join([row_sql] * len(chunk))} {suffix}",
+                [value for row in chunk for value in row]
+            )
+            returned.extend(cursor.fetchall())
+        return returned
+    
+    def _insert_snapshots(self, cursor, session_id: int, snapshots: Sequence[Dict[str, Any]]) -> List[int]:
+        current_ms = now_ms()
+        rows = [(
+            session_id,
+            to_epoch_ms(snapshot_data.get('timestamp')) or current_ms,
+            snapshot_data['device_count'],
+            snapshot_data['total_upload_mbps'],
+            snapshot_data['total_download_mbps'],
+            snapshot_data['total_usage_mb'],
+            snapshot_data['avg_latency_ms'],
+            snapshot_data['avg_packet_loss'],
+            snapshot_data['overall_quality'],
+            json.dumps(snapshot_data['active_interfaces']),
+            snapshot_data.get('tested_device_ip'),
+            to_epoch_ms(snapshot_data.get('valid_until')),
+            snapshot_data.get('sample_count', 1)
+        ) for snapshot_data in snapshots]
+        if self.partitions:
+            return self._insert_partitioned(cursor, 'network_snapshots', self.SNAPSHOT_COLUMNS,
+                                            self.SNAPSHOT_ROW, rows, time_index=1)
+        returned = self._insert_rows(
+            cursor, f"INSERT INTO network_snapshots ({self.SNAPSHOT_COLUMNS})", self.SNAPSHOT_ROW, rows
+        )
+        self._roll_up(cursor)
+        # RETURNING order is unspecified; AUTOINCREMENT IDs follow insertion order
+        return sorted(row[0] for row in returned)
+    
+    def _upsert_devices(self, cursor, devices: Sequence[Dict[str, Any]]) -> Dict[str, int]:
+        # One row per IP (the latest data wins): a statement may not update a row twice
+        latest = {device['ip']: device for device in devices}
+        current_ms = now_ms()
+        # Unchanged devices seen within the last_seen granularity are not rewritten
+        rows = [(device['ip'], device.get('mac_address'), device.get('hostname'), current_ms, current_ms)
+                for device in self.device_registry.changed(latest.values(), current_ms)]
+        returned = self._insert_rows(
+            cursor, "INSERT INTO devices (ip_address, mac_address, hostname, first_seen, last_seen, is_active)",
+            "(?, ?, ?, ?, ?, 1)", rows, suffix="""
+                ON CONFLICT(ip_address) DO UPDATE SET
+                    mac_address = COALESCE(excluded.mac_address, mac_address),
+                    hostname = COALESCE(excluded.hostname, hostname),
+                    last_seen = excluded.last_seen,
+                    is_active = 1
+                RETURNING ip_address, id, mac_address, hostname, last_seen
+            """
+        )
+        self._after_commit(lambda: self.device_registry.remember(returned))
+        
+        device_ids = {row[0]: row[1] for row in returned}
+        return {ip: device_ids.get(ip) or self.device_registry.device_id(ip) for ip in latest}
+    
+    def _insert_quality_tests(self, cursor, tests: Sequence[Dict[str, Any]]) -> List[int]:
+        current_ms = now_ms()
+        rows = [(
+            test_result['snapshot_id'],
+            test_result['device_ip'],
+            to_epoch_ms(test_result.get('test_timestamp')) or current_ms,
+            test_result.get('latency_ms'),
+            test_result.get('packet_loss_percent', 0.0),
+            test_result.get('response_time_ms'),
+            test_result.get('test_status', 'success')
+        ) for test_result in tests]
+        if self.partitions:
+            return self._insert_partitioned(cursor, 'device_quality_tests', self.QUALITY_TEST_COLUMNS,
+                                            self.QUALITY_TEST_ROW, rows, time_index=2)
+        returned = self._insert_rows(
+            cursor, f"INSERT INTO device_quality_tests ({self.QUALITY_TEST_COLUMNS})", self.QUALITY_TEST_ROW, rows
+        )
+        return sorted(row[0] for row in returned)
+    
+    def _insert_partitioned(self, cursor, table: str, columns: str, row_sql: str,
+                            rows: Sequence[tuple], time_index: int) -> List[int]:
+        """Insert rows into the (attached) partitions of their times, with IDs from the main sequence."""
+        ids = self._allocate_ids(cursor, table, len(rows))
+        groups: Dict[str, List[tuple]] = {}
+        for row_id, row in zip(ids, rows):
+            name = self.partitions.name_for(self.partitions.key_for(row[time_index]))
+            groups.setdefault(name, []).append((row_id,) + row)
+        for name, group in groups.items():
+            self._insert_rows(cursor, f"INSERT INTO {name}.{table} (id, {columns})", "(?, " + row_sql[1:],
+                              group, suffix="")
+        if table == 'network_snapshots':
+            # The main table too, for rows other writers put there before the next move
+            sources = [table] + [f"{name}.{table}" for name in groups]
+            if self._holds_pending_ids(cursor, sources, ids[0]):
+                self._roll_up(cursor, sources=sources)
+            else:
+                # Other writers' rows in partitions not attached here: never
+                # move the watermark past them, catch up once this commits
+                self._local.rollups_behind = True
+        return ids
+    
+    def _partition_batches(self, records: Sequence[Any],
+                           time_of: Callable[[Any], int]) -> Iterator[Tuple[List[int], Sequence[Any]]]:
+        """
+        Split records into write transactions by partition.
+        
+        Unpartitioned, the whole batch is one transaction. Partitioned, a
+        transaction attaches at most MAX_ATTACHED partitions, so a batch
+        spanning more (e.g. a historical backfill) is written in runs of
+        consecutive records.
+        
+        Yields:
+            (partition keys to attach, records) per transaction
+        """
+        if not self.partitions:
+            yield [], records
+            return
+        keys: set = set()
+        start = 0
+        for index, record in enumerate(records):
+            key = self.partitions.key_for(time_of(record))
+            if key not in keys and len(keys) == PartitionConfig.MAX_ATTACHED:
+                yield sorted(keys), records[start:index]
+                keys, start = set(), index
+            keys.add(key)
+        yield sorted(keys), records[start:]
+    
+    def _stamped(self, records: Sequence[Dict[str, Any]], field: str) -> Sequence[Dict[str, Any]]:
+        """Records with their time resolved to epoch ms up front when partitioned (writes attach by it)."""
+        if not self.partitions:
+            return records
+        current_ms = now_ms()
+        return [dict(record, **{field: to_epoch_ms(record.get(field)) or current_ms}) for record in records]
+    
+    def save_devices(self, devices: Sequence[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Save or update many devices in one transaction.
+        
+        Args:
+            devices: Device information from network discovery; when an IP
+                     appears more than once its last entry wins
+        
+        Returns:
+            Device ID per IP address
+        """
+        with self._get_connection(write=True) as conn:
+            return self._upsert_devices(conn.cursor(), devices)
+    
     def save_device(self, device_data: Dict[str, Any]) -> int:
         """
         Save or update device information.
         
         Args:
             device_data: Device information from network discovery
-            
+        
         Returns:
             Device ID
         """
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
+        return self.save_devices([device_data])[device_data['ip']]
+    
+    def save_network_snapshots(self, session_id: int, snapshots: Sequence[Dict[str, Any]]) -> List[int]:
+        """
+        Save many network monitoring snapshots in one transaction.
+        
+        Args:
+            session_id: ID of the current monitoring session
+            snapshots: Snapshot data as for save_network_snapshot; each may
+                       also carry 'valid_until' and 'sample_count'
+        
+        Returns:
+            Snapshot IDs in the same order as the snapshots
+        """
+        snapshot_ids = []
+        for keys, batch in self._partition_batches(self._stamped(snapshots, 'timestamp'),
+                                                   lambda snapshot: snapshot['timestamp']):
+            with self._get_connection(write=True, partitions=keys) as conn:
+                snapshot_ids.extend(self._insert_snapshots(conn.cursor(), session_id, batch))
+        return snapshot_ids
+    
+    def save_network_snapshot(self, session_id: int, snapshot_data: Dict[str, Any]) -> int:
+        """
+        Save a network monitoring snapshot.
+        
+        Args:
+            session_id: ID of the current monitoring session
+            snapshot_data: Monitoring data from MonitoringSnapshot (the
+                           current time is used without a 'timestamp')
+        
+        Returns:
+            Snapshot ID
+        """
+        return self.save_network_snapshots(session_id, [snapshot_data])[0]
+    
+    def save_device_quality_tests(self, tests: Sequence[Dict[str, Any]]) -> List[int]:
+        """
+        Save many device quality test results in one transaction.
+        
+        Args:
+            tests: Test results, each with 'snapshot_id' and 'device_ip'
+                   ('test_timestamp' defaults to the current time)
+        
+        Returns:
+            Test IDs in the same order as the tests
+        """
+        test_ids = []
+        for keys, batch in self._partition_batches(self._stamped(tests, 'test_timestamp'),
+                                                   lambda test_result: test_result['test_timestamp']):
+            with self._get_connection(write=True, partitions=keys) as conn:
+                test_ids.extend(self._insert_quality_tests(conn.cursor(), batch))
+        return test_ids
+    
+    def save_device_quality_test(self, snapshot_id: int, device_ip: str, 
+                                test_result: Dict[str, Any]):
+        """Save individual device quality test results"""
+        self.save_device_quality_tests([dict(test_result, snapshot_id=snapshot_id, device_ip=device_ip)])
+    
+    def save_monitoring_batch(self, session_id: int, records: Sequence[Dict[str, Any]],
+                              sketches: Sequence[Dict[str, Any]] = ()) -> List[int]:
+        """
+        Save a batch of monitoring records in a single transaction.
+        
+        Each record bundles what one monitoring tick produces:
+        - 'snapshot': snapshot data (same format as save_network_snapshot)
+        - 'devices': devices seen in that tick
+        - 'quality_test': optional test result for the snapshot's tested device
+        - 'quality_tests': optional list of test results, each with a
+          'device_ip' (a deadband row covering several probes)
+        
+        Snapshot data may carry 'valid_until' and 'sample_count' when one
+        row stands for a run of ticks.
+        
+        The batch costs three statements however many records it holds:
+        snapshots, device upserts (latest data per IP wins) and quality
+        tests are each written as one multi-row insert.
+        
+        Closed bandwidth sketch buckets ('interface', 'direction',
+        'bucket_start', 'sketch', as for save_bandwidth_sketch) are merged
+        in the same transaction, so a failed batch leaves no sketch behind
+        to be merged twice when it is written again.
+        
+        Args:
+            session_id: ID of the current monitoring session
+            records: Monitoring records in chronological order
+            sketches: Closed bandwidth sketch buckets to merge
+        
+        Returns:
+            Snapshot IDs in the same order as the records
+        """
+        if self.partitions:
+            # Stamp each tick up front: its snapshot and tests go to the same partition
+            current_ms = now_ms()
+            records = [dict(record, snapshot=dict(record['snapshot'],
+                                                  timestamp=to_epoch_ms(record['snapshot'].get('timestamp')) or current_ms))
+                       for record in records]
+        
+        snapshot_ids = []
+        for keys, batch in self._partition_batches(records, lambda record: record['snapshot']['timestamp']):
+            with self._get_connection(write=True, partitions=keys) as conn:
+                cursor = conn.cursor()
+                for bucket in sketches:
+                    self._merge_bandwidth_sketch(cursor, bucket['interface'], bucket['direction'],
+                                                 bucket['bucket_start'], bucket['sketch'])
+                sketches = ()  # With the first transaction (there is always one)
+                if batch:
+                    snapshot_ids.extend(self._insert_monitoring_batch(cursor, session_id, batch))
+        return snapshot_ids
+    
+    def _insert_monitoring_batch(self, cursor, session_id: int, records: Sequence[Dict[str, Any]]) -> List[int]:
+        """Write monitoring records within the caller's transaction."""
+        snapshot_ids = self._insert_snapshots(cursor, session_id, [record['snapshot'] for record in records])
+        
+        devices = []
+        quality_tests = []
+        for record, snapshot_id in zip(records, snapshot_ids):
+            devices.extend(record.get('devices', ()))
+            
+            # Tests are stamped with their tick, not with the write
+            tested_at = record['snapshot'].get('timestamp')
+            tested_ip = record['snapshot'].get('tested_device_ip')
+            if record.get('quality_test') and tested_ip:
+                quality_tests.append(dict(record['quality_test'], snapshot_id=snapshot_id, device_ip=tested_ip,
+                                          test_timestamp=tested_at))
+            for test_result in record.get('quality_tests') or ():
+                quality_tests.append(dict(test_result, snapshot_id=snapshot_id, test_timestamp=tested_at))
+        
+        if devices:
+            self._upsert_devices(cursor, devices)
+        if quality_tests:
+            self._insert_quality_tests(cursor, quality_tests)
+        
+        return snapshot_ids
+    
+    def save_bandwidth_sketch(self, interface: str, direction: str, bucket_start: int,
+                              sketch: KLLSketch):
+        """
+        Persist a closed bandwidth sketch bucket.
+        
+        The sketch is merged into both its hourly and its daily bucket, so
+        partial buckets (e.g. after a restart) accumulate instead of
+        overwriting each other, and long ranges can use daily sketches.
+        
+        Args:
+            interface: Interface name, or 'all' for the aggregate
+            direction: 'upload' or 'download'
+            bucket_start: Epoch seconds of the collector's bucket start
+            sketch: Sketch holding the bucket's Mbps samples
+        """
+        with self._get_connection(write=True) as conn:
+            self._merge_bandwidth_sketch(conn.cursor(), interface, direction, bucket_start, sketch)
+    
+    def _merge_bandwidth_sketch(self, cursor, interface: str, direction: str, bucket_start: int,
+                                sketch: KLLSketch):
+        """Merge a sketch into its hourly and daily buckets within the caller's transaction."""
+        for bucket_seconds in (KLLConfig.HOUR_BUCKET, KLLConfig.DAY_BUCKET):
+            aligned_start = bucket_start - bucket_start % bucket_seconds
             
-            # Insert or update device
             cursor.execute("""
-                INSERT INTO devices (
-                    ip_address, mac_address, hostname, last_seen, is_active
-                ) VALUES (?, ?, ?, CURRENT_TIMESTAMP, 1)
-                ON CONFLICT(ip_address) DO UPDATE SET
-                    mac_address = COALESCE(excluded.mac_address, mac_address),
-                    hostname = COALESCE(excluded.hostname, hostname),
-                    last_seen = CURRENT_TIMESTAMP,
-                    is_active = 1
-            """, (
-                device_data['ip'],
-                device_data.get('mac_address'),
-                device_data.get('hostname')
-            ))
+                SELECT sketch FROM bandwidth_sketches
+                WHERE interface = ? AND direction = ? 
+                    AND bucket_seconds = ? AND bucket_start = ?
+            """, (interface, direction, bucket_seconds, aligned_start))
+            row = cursor.fetchone()
             
-            # Get the device ID
-            cursor.execute("SELECT id FROM devices WHERE ip_address = ?", (device_data['ip'],))
-            device_id = cursor.fetchone()[0]
+            merged = KLLSketch.from_json(row[0]) if row else KLLSketch(k=sketch.k)
+            merged.merge(sketch)
             
-            conn.commit()
-            return device_id
+            cursor.execute("""
+                INSERT INTO bandwidth_sketches (
+                    interface, direction, bucket_seconds, bucket_start, sample_count, sketch
+                ) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(interface, direction, bucket_seconds, bucket_start) DO UPDATE SET
+                    sample_count = excluded.sample_count,
+                    sketch = excluded.sketch
+            """, (interface, direction, bucket_seconds, aligned_start,
+                  merged.count, merged.to_json()))
     
-    def save_network_snapshot(self, session_id: int, snapshot_data: Dict[str, Any]) -> int:
+    def get_bandwidth_percentiles(self, start_time: datetime, end_time: datetime,
+                                  percentiles: Sequence[float] = (95.0, 99.0),
+                                  interface: str = 'all', direction: str = 'download') -> Dict[str, Any]:
         """
-        Save a network monitoring snapshot.
+        Billing-style bandwidth percentiles over an arbitrary time range.
+        
+        Whole UTC days inside the range are read from daily sketches and the
+        partial days at either edge from hourly sketches, so a month costs
+        about 30 sketch merges regardless of how many snapshots it holds.
+        Ranges are resolved at hour granularity.
         
         Args:
-            session_id: ID of the current monitoring session
-            snapshot_data: Monitoring data from MonitoringSnapshot
+            start_time: Range start
+            end_time: Range end (exclusive)
+            percentiles: Percentiles to compute (e.g. 95.0 for p95)
+            interface: Interface name, or 'all' for the aggregate
+            direction: 'upload' or 'download'
             
         Returns:
-            Snapshot ID
+            Dictionary with one 'p<N>' entry per percentile (Mbps, or None
+            without data), plus sample and bucket counts
         """
+        hour, day = KLLConfig.HOUR_BUCKET, KLLConfig.DAY_BUCKET
+        range_start = int(start_time.timestamp())
+        range_end = int(end_time.timestamp())
+        range_start -= range_start % hour
+        
+        first_full_day = range_start + (-range_start % day)
+        last_full_day_end = range_end - range_end % day
+        
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            rows = []
             
-            # FIXED: Include timestamp in INSERT if provided, otherwise use CURRENT_TIMESTAMP
-            if 'timestamp' in snapshot_data:
+            if first_full_day < last_full_day_end:
                 cursor.execute("""
-                    INSERT INTO network_snapshots (
-                        session_id, timestamp, device_count, total_upload_mbps, total_download_mbps,
-                        total_usage_mb, avg_latency_ms, avg_packet_loss, overall_quality,
-                        active_interfaces, tested_device_ip
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    session_id,
-                    snapshot_data['timestamp'],  # FIXED: Use provided timestamp
-                    snapshot_data['device_count'],
-                    snapshot_data['total_upload_mbps'],
-                    snapshot_data['total_download_mbps'],
-                    snapshot_data['total_usage_mb'],
-                    snapshot_data['avg_latency_ms'],
-                    snapshot_data['avg_packet_loss'],
-                    snapshot_data['overall_quality'],
-                    json.dumps(snapshot_data['active_interfaces']),
-                    snapshot_data.get('tested_device_ip')
-                ))
+                    SELECT sketch FROM bandwidth_sketches
+                    WHERE interface = ? AND direction = ? AND bucket_seconds = ?
+                        AND bucket_start >= ? AND bucket_start < ?
+                """, (interface, direction, day, first_full_day, last_full_day_end))
+                rows.extend(cursor.fetchall())
+                hour_ranges = [(range_start, first_full_day), (last_full_day_end, range_end)]
             else:
-                # Original behavior for real-time monitoring
+                hour_ranges = [(range_start, range_end)]
+            
+            for hours_start, hours_end in hour_ranges:
+                if hours_start >= hours_end:
+                    continue
                 cursor.execute("""
-                    INSERT INTO network_snapshots (
-                        session_id, device_count, total_upload_mbps, total_download_mbps,
-                        total_usage_mb, avg_latency_ms, avg_packet_loss, overall_quality,
-                        active_interfaces, tested_device_ip
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    session_id,
-                    snapshot_data['device_count'],
-                    snapshot_data['total_upload_mbps'],
-                    snapshot_data['total_download_mbps'],
-                    snapshot_data['total_usage_mb'],
-                    snapshot_data['avg_latency_ms'],
-                    snapshot_data['avg_packet_loss'],
-                    snapshot_data['overall_quality'],
-                    json.dumps(snapshot_data['active_interfaces']),
-                    snapshot_data.get('tested_device_ip')
-                ))
+                    SELECT sketch FROM bandwidth_sketches
+                    WHERE interface = ? AND direction = ? AND bucket_seconds = ?
+                        AND bucket_start >= ? AND bucket_start < ?
+                """, (interface, direction, hour, hours_start, hours_end))
+                rows.extend(cursor.fetchall())
+        
+        merged = KLLSketch()
+        for row in rows:
+            merged.merge(KLLSketch.from_json(row[0]))
+        
+        values = merged.quantiles([p / 100.0 for p in percentiles])
+        result = {
+            f"p{p:g}": (round(value, 2) if value is not None else None)
+            for p, value in zip(percentiles, values)
+        }
+        result.update({
+            'interface': interface,
+            'direction': direction,
+            'sample_count': merged.count,
+            'buckets_merged': len(rows)
+        })
+        return result
+    
+    def get_rollups(self, granularity: str, start_time: Any, end_time: Any) -> List[Dict[str, Any]]:
+        """
+        Snapshot statistics per minute, hour or day bucket.
+        
+        Reads the rollup tables, so a month of hourly statistics is 720
+        rows whatever the snapshot rate. Averages and standard deviations
+        are per tick (deadband rows count sample_count times).
+        
+        Args:
+            granularity: 'minute', 'hour' or 'day' (UTC aligned)
+            start_time: Range start (datetime, ISO string or epoch ms);
+                        the bucket holding it is included
+            end_time: Range end (exclusive)
             
-            snapshot_id = cursor.lastrowid
-            conn.commit()
-            return snapshot_id
+        Returns:
+            One dictionary per bucket in time order: bucket_start,
+            sample_count, row_count, first/last timestamp, and
+            <metric>_avg, _min, _max and _stddev for each rolled-up metric
+        """
+        bucket_ms = DatabaseConfig.ROLLUP_BUCKETS[granularity]
+        range_start = to_epoch_ms(start_time)
+        
+        with self._get_connection() as conn:
+            rows = conn.execute("""
+                SELECT * FROM snapshot_rollups
+                WHERE bucket_ms = ? AND bucket_start >= ? AND bucket_start < ?
+                ORDER BY bucket_start
+            """, (bucket_ms, range_start - range_start % bucket_ms, to_epoch_ms(end_time))).fetchall()
+        
+        buckets = []
+        for row in rows:
+            bucket = {key: row[key] for key in ('bucket_start', 'sample_count', 'row_count',
+                                                'first_timestamp', 'last_timestamp')}
+            for metric, weight in ROLLUP_METRICS:
+                count = row['sample_count'] if weight == 'sample_count' else row['row_count']
+                mean = row[f"{metric}_sum"] / count
+                variance = row[f"{metric}_sumsq"] / count - mean * mean
+                bucket[f"{metric}_avg"] = row[f"{metric}_sum"] / row['sample_count']
+                bucket[f"{metric}_min"] = row[f"{metric}_min"]
+                bucket[f"{metric}_max"] = row[f"{metric}_max"]
+                bucket[f"{metric}_stddev"] = max(variance, 0.0) ** 0.5  # Rounding can dip below 0
+            buckets.append(bucket)
+        return buckets
     
-    def save_device_quality_test(self, snapshot_id: int, device_ip: str, 
-                                test_result: Dict[str, Any]):
-        """Save individual device quality test results"""
+    def _raw_tables(self, table: str, start_ms: Optional[int] = None, end_ms: Optional[int] = None,
+                    newest_first: bool = False) -> Iterator[Tuple[sqlite3.Connection, str]]:
+        """
+        Query router: the tables holding a raw table's rows in a time range.
+        
+        Unpartitioned, that is the table itself. Partitioned, the main
+        table (rows written there by other versions, until the next open
+        moves them) and then each partition overlapping [start_ms, end_ms),
+        attached in groups of MAX_ATTACHED; partitions outside the range
+        are never opened. A partition's rows are read before moving on.
+        
+        Yields:
+            (connection, qualified table name) to run one query against
+        """
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO device_quality_tests (
-                    snapshot_id, device_ip, latency_ms, packet_loss_percent,
-                    response_time_ms, test_status
-                ) VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                snapshot_id,
-                device_ip,
-                test_result.get('latency_ms'),
-                test_result.get('packet_loss_percent', 0.0),
-                test_result.get('response_time_ms'),
-                test_result.get('test_status', 'success')
-            ))
-            
-            conn.commit()
+            if not self.partitions:
+                yield conn, table
+                return
+            yield conn, f"main.{table}"
+        
+        keys = self.partitions.overlapping(start_ms, end_ms)
+        if newest_first:
+            keys.reverse()
+        for offset in range(0, len(keys), PartitionConfig.MAX_ATTACHED):
+            with self._get_connection() as conn:
+                # Skips partitions retention dropped since they were listed
+                for name in self.partitions.attach(conn, keys[offset:offset + PartitionConfig.MAX_ATTACHED]):
+                    yield conn, f"{name}.{table}"
+    
+    def get_snapshots(self, start_time: Any, end_time: Any) -> List[Dict]:
+        """
+        Get the network snapshots of a time range, oldest first.
+        
+        Args:
+            start_time: Range start (datetime, ISO string or epoch ms)
+            end_time: Range end (exclusive)
+        """
+        start_ms, end_ms = to_epoch_ms(start_time), to_epoch_ms(end_time)
+        snapshots = []
+        for conn, table in self._raw_tables('network_snapshots', start_ms, end_ms):
+            snapshots.extend(dict(row) for row in conn.execute(f"""
+                SELECT * FROM {table} 
+                WHERE timestamp >= ? AND timestamp < ?
+                ORDER BY timestamp
+            """, (start_ms, end_ms)))
+        snapshots.sort(key=lambda snapshot: snapshot['timestamp'])  # The main table's rows may be any age
+        return snapshots
     
     def get_recent_snapshots(self, limit: int = 100) -> List[Dict]:
         """Get recent network snapshots for analysis"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT * FROM network_snapshots 
+        snapshots = []
+        for conn, table in self._raw_tables('network_snapshots', newest_first=True):
+            # Partitions come newest first: stop once older ones cannot make the cut
+            if len(snapshots) >= limit and not table.startswith('main.'):
+                break
+            snapshots.extend(dict(row) for row in conn.execute(f"""
+                SELECT * FROM {table} 
                 ORDER BY timestamp DESC 
                 LIMIT ?
-            """, (limit,))
-            
-            return [dict(row) for row in cursor.fetchall()]
+            """, (limit,)))
+        snapshots.sort(key=lambda snapshot: snapshot['timestamp'], reverse=True)
+        return snapshots[:limit]
     
     def get_device_history(self, device_ip: str, hours: int = 24) -> List[Dict]:
         """Get quality test history for a specific device"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT * FROM device_quality_tests 
+        since_ms = now_ms() - hours * 3600 * 1000
+        history = []
+        for conn, table in self._raw_tables('device_quality_tests', since_ms + 1):
+            history.extend(dict(row) for row in conn.execute(f"""
+                SELECT * FROM {table} 
                 WHERE device_ip = ? 
-                    AND test_timestamp > datetime('now', '-{} hours')
+                    AND test_timestamp > ?
                 ORDER BY test_timestamp DESC
-            """.format(hours), (device_ip,))
-            
-            return [dict(row) for row in cursor.fetchall()]
+            """, (device_ip, since_ms)))
+        history.sort(key=lambda test_result: test_result['test_timestamp'], reverse=True)
+        return history
     
     def get_session_summary(self, session_id: int) -> Optional[Dict]:
         """Get summary statistics for a monitoring session"""
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT 
-                    s.*,
-                    COUNT(ns.id) as actual_snapshots,
-                    MIN(ns.timestamp) as first_snapshot,
-                    MAX(ns.timestamp) as last_snapshot
-                FROM monitoring_sessions s
-                LEFT JOIN network_snapshots ns ON s.id = ns.session_id
-                WHERE s.id = ?
-                GROUP BY s.id
-            """, (session_id,))
-            
-            row = cursor.fetchone()
-            return dict(row) if row else None
+            row = conn.execute("SELECT * FROM monitoring_sessions WHERE id = ?", (session_id,)).fetchone()
+        if not row:
+            return None
+        
+        summary = dict(row, actual_snapshots=0, first_snapshot=None, last_snapshot=None)
+        # Snapshots carry their tick's time, which need not lie within the session's
+        for conn, table in self._raw_tables('network_snapshots'):
+            count, first, last = conn.execute(f"""
+                SELECT COUNT(id), MIN(timestamp), MAX(timestamp)
+                FROM {table}
+                WHERE session_id = ?
+            """, (session_id,)).fetchone()
+            if count:
+                summary['actual_snapshots'] += count
+                summary['first_snapshot'] = min(first, summary['first_snapshot'] or first)
+                summary['last_snapshot'] = max(last, summary['last_snapshot'] or last)
+        return summary
     
-    def cleanup_old_data(self, days_to_keep: int = 30):
-        """Clean up old monitoring data to keep database size manageable"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Delete old snapshots and related data
-            cursor.execute("""
-                DELETE FROM device_quality_tests 
-                WHERE snapshot_id IN (
-                    SELECT id FROM network_snapshots 
-                    WHERE timestamp < datetime('now', '-{} days')
-                )
-            """.format(days_to_keep))
-            
-            cursor.execute("""
-                DELETE FROM network_snapshots 
-                WHERE timestamp < datetime('now', '-{} days')
-            """.format(days_to_keep))
-            
-            deleted_snapshots = cursor.rowcount
-            
-            # Mark inactive devices
-            cursor.execute("""
+    def cleanup_old_data(self, days_to_keep: int = 30,
+                         on_progress: Optional[Callable[[RetentionProgress], None]] = None,
+                         should_stop: Optional[Callable[[], bool]] = None) -> RetentionProgress:
+        """
+        Clean up old monitoring data to keep database size manageable.
+        
+        Meant to run in the background (see the service's retention
+        stage): snapshots older than the cutoff are deleted oldest first,
+        RETENTION_BATCH_ROWS at a time, each batch with its quality tests
+        in one short transaction and a pause before the next, so writers
+        wait milliseconds, not for the whole cleanup. Freed pages are then
+        returned to the file system in VACUUM_STEP_PAGES steps (databases
+        created with incremental auto-vacuum; in older files they stay
+        free for reuse).
+        
+        Partitioned, whole partitions older than the cutoff are unlinked;
+        the partition holding the cutoff is kept until all of it is old.
+        
+        Args:
+            days_to_keep: Keep data newer than this many days
+            on_progress: Called with the progress after every batch
+            should_stop: Checked between batches; returning True ends the
+                         run early (the next run picks up where it stopped)
+        
+        Returns:
+            Progress of the run
+        """
+        progress = RetentionProgress(cutoff_ms=now_ms() - days_to_keep * 86400 * 1000)
+        stopped = should_stop or (lambda: False)
+        
+        if self.partitions:
+            progress.partitions_dropped = len(self.partitions.drop_before(progress.cutoff_ms))
+            with self._get_connection() as conn:
+                self.partitions.attach(conn, [])  # Let go of dropped files held open here
+        else:
+            self._delete_old_snapshots(progress, on_progress, stopped)
+            self._release_free_pages(progress, on_progress, stopped)
+        
+        # Mark inactive devices
+        with self._get_connection(write=True) as conn:
+            conn.execute("""
                 UPDATE devices 
                 SET is_active = 0 
-                WHERE last_seen < datetime('now', '-{} days')
-            """.format(days_to_keep))
+                WHERE last_seen < ?
+            """, (progress.cutoff_ms,))
+        
+        progress.finished = not stopped()
+        if on_progress:
+            on_progress(progress)
+        if self.partitions:
+            print(f"🧹 Dropped {progress.partitions_dropped} old {self.partitions.period} partitions")
+        else:
+            print(f"🧹 Cleaned up {progress.snapshots_removed} old snapshots "
+                  f"({progress.quality_tests_removed} quality tests, {progress.pages_freed} pages freed)")
+        return progress
+    
+    def _delete_old_snapshots(self, progress: RetentionProgress,
+                              on_progress: Optional[Callable[[RetentionProgress], None]],
+                              stopped: Callable[[], bool]):
+        """Delete snapshots before the cutoff, and their quality tests, in key-range batches."""
+        with self._get_connection() as conn:
+            progress.snapshots_pending = conn.execute(
+                "SELECT COUNT(*) FROM network_snapshots WHERE timestamp < ?", (progress.cutoff_ms,)
+            ).fetchone()[0]
+        
+        while progress.snapshots_removed < progress.snapshots_pending and not stopped():
+            batch_start = time.perf_counter()
+            with self._get_connection(write=True) as conn:
+                # The batch is a timestamp range ending after its last snapshot
+                # (idx_snapshots_timestamp), so each delete is a range scan
+                row = conn.execute("""
+                    SELECT timestamp FROM network_snapshots 
+                    WHERE timestamp < ? 
+                    ORDER BY timestamp 
+                    LIMIT 1 OFFSET ?
+                """, (progress.cutoff_ms, DatabaseConfig.RETENTION_BATCH_ROWS - 1)).fetchone()
+                batch_end = min(row[0] + 1, progress.cutoff_ms) if row else progress.cutoff_ms
+                
+                progress.quality_tests_removed += conn.execute("""
+                    DELETE FROM device_quality_tests 
+                    WHERE snapshot_id IN (
+                        SELECT id FROM network_snapshots 
+                        WHERE timestamp < ?
+                    )
+                """, (batch_end,)).rowcount
+                deleted = conn.execute("DELETE FROM network_snapshots WHERE timestamp < ?", (batch_end,)).rowcount
             
-            conn.commit()
-            print(f"🧹 Cleaned up {deleted_snapshots} old snapshots")
+            progress.snapshots_removed += deleted
+            progress.batches += 1
+            progress.longest_batch_ms = max(progress.longest_batch_ms, (time.perf_counter() - batch_start) * 1000)
+            self._checkpoint_between_batches()
+            if on_progress:
+                on_progress(progress)
+            if not deleted or batch_end == progress.cutoff_ms:
+                break
+            time.sleep(DatabaseConfig.RETENTION_PAUSE)
+    
+    def _release_free_pages(self, progress: RetentionProgress,
+                            on_progress: Optional[Callable[[RetentionProgress], None]],
+                            stopped: Callable[[], bool]):
+        """Shrink the file by the pages retention freed, a step at a time."""
+        with self._get_connection() as conn:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:  # Not INCREMENTAL
+                return
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        
+        while free_pages and not stopped():
+            step_start = time.perf_counter()
+            # executescript steps the pragma to completion (execute frees a
+            # single page); it runs as its own transaction
+            with self._get_connection() as conn, self.write_lock:
+                conn.executescript(f"PRAGMA incremental_vacuum({DatabaseConfig.VACUUM_STEP_PAGES})")
+                remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            
+            progress.pages_freed += free_pages - remaining
+            progress.longest_batch_ms = max(progress.longest_batch_ms, (time.perf_counter() - step_start) * 1000)
+            self._checkpoint_between_batches()
+            if on_progress:
+                on_progress(progress)
+            if remaining >= free_pages:
+                break
+            free_pages = remaining
+            time.sleep(DatabaseConfig.RETENTION_PAUSE)
+    
+    def _checkpoint_between_batches(self):
+        """
+        Copy the WAL back into the database outside of any write.
+        
+        Retention fills the WAL quickly; left to the automatic checkpoint,
+        the copy runs inside whichever commit crosses the threshold, with
+        the write lock held. A passive checkpoint runs alongside writers
+        (and is what shrinks the file after an incremental vacuum).
+        """
+        with self._get_connection() as conn:
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
 
 
 # Utility functions for data analysis
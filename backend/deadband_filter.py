@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Deadband Filter - Change-driven snapshot persistence.
+
+On a quiet network most 1 Hz snapshots are near-identical, and writing
+every one of them to SQLite mostly stores repetition. The filter keeps a
+snapshot (the anchor) for as long as the following ticks stay within a
+tolerance of it, and emits one row for the whole run:
+
+1. A new anchor starts when any metric moves beyond its deadband, when
+   devices, interfaces or the quality level change, or when the heartbeat
+   interval has passed (so a row is written at least that often)
+2. The emitted row covers [anchor time, last tick time] and carries the
+   number of ticks it stands for; data usage is summed over those ticks
+3. Probe results seen while a row is open are kept, so every quality
+   test is still stored
+
+Every tick covered by a row differs from the stored values by at most the
+tolerance, which bounds the error of a reconstructed series.
+
+Usage:
+    deadband = DeadbandFilter(heartbeat=60.0)
+    interval = deadband.offer(snapshot)     # None while the run continues
+    ...
+    interval = deadband.flush()             # The open run, on shutdown
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class DeadbandConfig:
+    """Configuration constants for deadband compression."""
+
+    # Absolute deadband per metric (a tick within all of them is absorbed)
+    TOLERANCES = {
+        'total_upload_mbps': 0.5,
+        'total_download_mbps': 0.5,
+        'avg_latency_ms': 5.0,
+        'avg_packet_loss': 1.0
+    }
+
+    # Additional deadband relative to the anchor value (10%)
+    RELATIVE_TOLERANCE = 0.1
+
+    # Seconds after which a row is emitted even without changes
+    HEARTBEAT = 60.0
+
+
+class DeadbandInterval:
+    """A run of ticks represented by its anchor snapshot."""
+
+    __slots__ = ('anchor', 'valid_until_ms', 'sample_count', 'usage_mb', 'quality_tests')
+
+    def __init__(self, anchor):
+        self.anchor = anchor
+        self.valid_until_ms = anchor.timestamp_ms
+        self.sample_count = 1
+        self.usage_mb = anchor.total_usage_mb
+        self.quality_tests: List[Tuple[str, float, float]] = []
+        self._add_probe(anchor)
+
+    def extend(self, snapshot):
+        """Absorb a tick that stayed within the deadband."""
+        self.valid_until_ms = snapshot.timestamp_ms
+        self.sample_count += 1
+        self.usage_mb += snapshot.total_usage_mb
+        self._add_probe(snapshot)
+
+    def _add_probe(self, snapshot):
+        if snapshot.tested_device_ip:
+            self.quality_tests.append(
+                (snapshot.tested_device_ip, snapshot.avg_latency_ms, snapshot.avg_packet_loss)
+            )
+
+    @property
+    def valid_from_ms(self) -> int:
+        return self.anchor.timestamp_ms
+
+
+class DeadbandFilter:
+    """
+    Absorbs ticks that stay close to the current anchor snapshot.
+
+    offer() is called from the monitoring thread for every snapshot and
+    only compares a handful of numbers; formatting happens on the writer.
+    """
+
+    def __init__(self, heartbeat: float = DeadbandConfig.HEARTBEAT,
+                 tolerances: Optional[Dict[str, float]] = None,
+                 relative_tolerance: float = DeadbandConfig.RELATIVE_TOLERANCE):
+        """
+        Initialize the filter.
+
+        Args:
+            heartbeat: Longest span of one row, in seconds
+            tolerances: Absolute deadband per metric (defaults to DeadbandConfig.TOLERANCES)
+            relative_tolerance: Extra deadband as a fraction of the anchor value
+        """
+        self.heartbeat_ms = int(heartbeat * 1000)
+        self.tolerances = tuple((tolerances or DeadbandConfig.TOLERANCES).items())
+        self.relative_tolerance = relative_tolerance
+
+        # Statistics
+        self.ticks = 0
+        self.rows = 0
+
+        self._open: Optional[DeadbandInterval] = None
+
+    def offer(self, snapshot) -> Optional[DeadbandInterval]:
+        """
+        Feed one snapshot.
+
+        Returns:
+            The interval closed by this snapshot, or None if the snapshot
+            was absorbed into the open interval
+        """
+        self.ticks += 1
+        current = self._open
+        if current is not None and self._within_deadband(current, snapshot):
+            current.extend(snapshot)
+            return None
+
+        self._open = DeadbandInterval(snapshot)
+        if current is not None:
+            self.rows += 1
+        return current
+
+    def flush(self) -> Optional[DeadbandInterval]:
+        """Close and return the open interval (e.g. on shutdown)."""
+        current, self._open = self._open, None
+        if current is not None:
+            self.rows += 1
+        return current
+
+    def _within_deadband(self, interval: DeadbandInterval, snapshot) -> bool:
+        anchor = interval.anchor
+        if snapshot.timestamp_ms - anchor.timestamp_ms >= self.heartbeat_ms:
+            return False
+        if (snapshot.device_set is not anchor.device_set
+                or snapshot.quality_code != anchor.quality_code
+                or snapshot.interfaces != anchor.interfaces):
+            return False
+
+        relative = self.relative_tolerance
+        for metric, tolerance in self.tolerances:
+            reference = getattr(anchor, metric)
+            if abs(getattr(snapshot, metric) - reference) > max(tolerance, relative * abs(reference)):
+                return False
+        return True
+
+    @property
+    def compression_ratio(self) -> float:
+        """Ticks per emitted row so far."""
+        return self.ticks / self.rows if self.rows else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'ticks': self.ticks,
+            'rows': self.rows,
+            'compression_ratio': round(self.compression_ratio, 2),
+            'heartbeat_seconds': self.heartbeat_ms / 1000
+        }
+
+
+def expand_snapshot_rows(rows: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Reconstruct the per-tick series from stored snapshot rows.
+
+    Each row is repeated sample_count times, spread evenly over
+    [timestamp, valid_until] (epoch milliseconds), with its data usage
+    divided between the ticks. Rows written without deadband compression
+    pass through as-is.
+
+    Args:
+        rows: network_snapshots rows as dicts, in time order
+    """
+    for row in rows:
+        count = row.get('sample_count') or 1
+        if count == 1 or not row.get('valid_until'):
+            yield row
+            continue
+
+        start = row['timestamp']
+        step = (row['valid_until'] - start) / (count - 1)
+        usage = row['total_usage_mb'] / count
+        for index in range(count):
+            tick = dict(row)
+            tick['timestamp'] = start + round(step * index)
+            tick['total_usage_mb'] = usage
+            tick['sample_count'] = 1
+            yield tick
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+In-Process Device Registry for Skipping Redundant Device Upserts
+
+Every monitoring tick reports the devices it saw, and the same devices
+are seen tick after tick. Upserting all of them every time rewrites
+identical rows just to move last_seen on by a second. The registry
+remembers what was last written for each device:
+
+1. IP address (and MAC address) to device ID, so IDs are known without
+   a round trip
+2. The MAC address and hostname stored, so only real changes are written
+3. When last_seen was last written, so it is only moved on once per
+   LAST_SEEN_GRANULARITY_MS (last_seen is accurate to that granularity)
+
+The registry only knows what this process wrote. It is filled from the
+RETURNING rows of the upserts after their transaction commits, so a
+rolled-back write is written again next time; it never blocks a write it
+cannot vouch for (an IP it has not seen is always upserted).
+
+Usage:
+    registry = DeviceRegistry()
+    pending = registry.changed(devices, now_ms())   # Devices to upsert
+    registry.remember(returned_rows)                # After commit
+    registry.device_id('192.168.1.20')
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+
+class DeviceRegistryConfig:
+    """Configuration constants for the device registry."""
+
+    # last_seen is moved on at most this often per device (epoch ms)
+    LAST_SEEN_GRANULARITY_MS = 60 * 1000
+
+
+@dataclass
+class RegisteredDevice:
+    """What was last written for a device."""
+    device_id: int
+    mac_address: Optional[str]
+    hostname: Optional[str]
+    last_seen: int              # Epoch milliseconds, as stored
+
+
+class DeviceRegistry:
+    """
+    Maps devices to their IDs and last-written attributes.
+
+    Not locked: the database manager consults and updates it while holding
+    its write lock, and lookups are single dictionary reads.
+    """
+
+    def __init__(self, granularity_ms: int = DeviceRegistryConfig.LAST_SEEN_GRANULARITY_MS):
+        """
+        Args:
+            granularity_ms: Write last_seen at most this often per device
+                            (0 writes it on every sighting)
+        """
+        self.granularity_ms = granularity_ms
+        self._by_ip: Dict[str, RegisteredDevice] = {}
+        self._by_mac: Dict[str, int] = {}
+
+        # Devices offered for writing, and those that needed it
+        self.sightings = 0
+        self.writes = 0
+
+    def __len__(self) -> int:
+        return len(self._by_ip)
+
+    def device_id(self, ip: Optional[str] = None, mac_address: Optional[str] = None) -> Optional[int]:
+        """ID of a device by IP or MAC address, if this process has written it."""
+        if ip is not None:
+            device = self._by_ip.get(ip)
+            return device.device_id if device else None
+        if mac_address is not None:
+            return self._by_mac.get(mac_address.lower())
+        return None
+
+    def changed(self, devices: Iterable[Dict[str, Any]], current_ms: int) -> List[Dict[str, Any]]:
+        """
+        The devices that need writing: unknown to the registry, with a new
+        MAC address or hostname (None keeps the stored value, as in the
+        upsert), or whose last_seen is a granularity old.
+        """
+        pending = []
+        for device in devices:
+            self.sightings += 1
+            known = self._by_ip.get(device['ip'])
+            if (known is None
+                    or device.get('mac_address') not in (None, known.mac_address)
+                    or device.get('hostname') not in (None, known.hostname)
+                    or current_ms - known.last_seen >= self.granularity_ms):
+                pending.append(device)
+        self.writes += len(pending)
+        return pending
+
+    def remember(self, rows: Sequence[Sequence[Any]]):
+        """
+        Record written devices from committed upserts.
+
+        Args:
+            rows: (ip_address, id, mac_address, hostname, last_seen) as
+                  returned by the upsert
+        """
+        for ip_address, device_id, mac_address, hostname, last_seen in rows:
+            self._by_ip[ip_address] = RegisteredDevice(device_id, mac_address, hostname, last_seen)
+            if mac_address:
+                self._by_mac[mac_address.lower()] = device_id
+
+    def clear(self):
+        """Forget everything (after devices were changed behind the registry's back)."""
+        self._by_ip.clear()
+        self._by_mac.clear()
+
+    @property
+    def skipped_ratio(self) -> float:
+        """Fraction of sightings that needed no write."""
+        return 1.0 - self.writes / self.sightings if self.sightings else 0.0
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Monitoring Snapshot - Compact per-tick records for the monitoring service.
+
+The service keeps an hour of snapshots in memory and produces one every
+second, so the per-snapshot footprint and allocation count matter. A
+snapshot is therefore built from as few new objects as possible:
+
+1. A slotted class (no per-instance __dict__) with numeric fields only
+2. An integer epoch timestamp in milliseconds instead of an ISO string
+3. A numeric quality code instead of a quality string
+4. A reference to an immutable, versioned DeviceSet shared by every
+   snapshot until device membership changes (no per-tick device list)
+5. A shared interface-name tuple, replaced only when interfaces change
+
+The old attribute names (timestamp, devices, device_count,
+overall_quality, active_interfaces) are still available as properties,
+computed on access, for display and persistence code.
+
+Usage:
+    device_set = DeviceSet.from_devices(discovered, previous=device_set)
+    snapshot = MonitoringSnapshot(timestamp_ms, device_set, upload, download, ...)
+    snapshot.timestamp          # ISO string, built on demand
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+
+# Quality levels, indexed by MonitoringSnapshot.quality_code
+QUALITY_LEVELS = ("Excellent", "Good", "Fair", "Poor")
+QUALITY_CODES = {name: code for code, name in enumerate(QUALITY_LEVELS)}
+
+# Device attributes that define a device set; other fields (e.g. last_seen,
+# response_time_ms) change on every sweep and do not start a new version
+DEVICE_IDENTITY_FIELDS = ('ip', 'mac_address', 'hostname')
+
+
+class DeviceSet:
+    """
+    Immutable, versioned set of discovered devices.
+
+    Snapshots reference the current set instead of copying the device
+    list; a new set (with a higher version) is only built when discovery
+    reports a different set of devices.
+    """
+
+    __slots__ = ('version', 'devices', 'ips', '_identity')
+
+    def __init__(self, devices: Iterable[Dict[str, Any]] = (), version: int = 0):
+        devices = tuple(devices)
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, 'devices', devices)
+        object.__setattr__(self, 'ips', frozenset(device['ip'] for device in devices))
+        object.__setattr__(self, '_identity', self._identity_of(devices))
+
+    @staticmethod
+    def _identity_of(devices: Sequence[Dict[str, Any]]) -> frozenset:
+        return frozenset(tuple(device.get(name) for name in DEVICE_IDENTITY_FIELDS) for device in devices)
+
+    @classmethod
+    def from_devices(cls, devices: Iterable[Dict[str, Any]],
+                     previous: Optional['DeviceSet'] = None) -> 'DeviceSet':
+        """
+        Device set for a discovery result, reusing previous if nothing changed.
+
+        Args:
+            devices: Discovered devices (dicts with at least an 'ip')
+            previous: The set currently in use
+
+        Returns:
+            previous when membership and identity fields are unchanged,
+            otherwise a new set with the next version number
+        """
+        devices = tuple(devices)
+        if previous is not None and cls._identity_of(devices) == previous._identity:
+            return previous
+        return cls(devices, previous.version + 1 if previous is not None else 1)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DeviceSet is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("DeviceSet is immutable")
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.devices)
+
+    def __contains__(self, ip: str) -> bool:
+        return ip in self.ips
+
+    def __repr__(self) -> str:
+        return f"DeviceSet(version={self.version}, devices={len(self.devices)})"
+
+
+EMPTY_DEVICE_SET = DeviceSet()
+
+
+class MonitoringSnapshot:
+    """
+    One monitoring tick: totals, quality and references to shared state.
+
+    Everything a tick measures is stored as a number; devices and
+    interfaces are shared, immutable objects.
+    """
+
+    __slots__ = (
+        'timestamp_ms', 'device_set', 'total_upload_mbps', 'total_download_mbps',
+        'total_usage_mb', 'avg_latency_ms', 'avg_packet_loss', 'quality_code',
+        'interfaces', 'tested_device_ip', 'top_talkers'
+    )
+
+    def __init__(self, timestamp_ms: int, device_set: DeviceSet,
+                 total_upload_mbps: float, total_download_mbps: float, total_usage_mb: float,
+                 avg_latency_ms: float, avg_packet_loss: float, quality_code: int,
+                 interfaces: Tuple[str, ...] = (), tested_device_ip: Optional[str] = None,
+                 top_talkers: Sequence[Dict[str, Any]] = ()):
+        """
+        Initialize the snapshot.
+
+        Args:
+            timestamp_ms: Epoch time of the tick in milliseconds
+            device_set: Devices known at the time of the tick (shared)
+            total_upload_mbps: Network-wide upload rate
+            total_download_mbps: Network-wide download rate
+            total_usage_mb: Data transferred during the tick
+            avg_latency_ms: Latency of the latest probe
+            avg_packet_loss: Packet loss of the latest probe (percent)
+            quality_code: Index into QUALITY_LEVELS
+            interfaces: Active interface names (shared tuple)
+            tested_device_ip: Device probed since the previous tick, if any
+            top_talkers: Busiest hosts, when per-host accounting is enabled
+        """
+        self.timestamp_ms = timestamp_ms
+        self.device_set = device_set
+        self.total_upload_mbps = total_upload_mbps
+        self.total_download_mbps = total_download_mbps
+        self.total_usage_mb = total_usage_mb
+        self.avg_latency_ms = avg_latency_ms
+        self.avg_packet_loss = avg_packet_loss
+        self.quality_code = quality_code
+        self.interfaces = interfaces
+        self.tested_device_ip = tested_device_ip
+        self.top_talkers = top_talkers
+
+    # Derived views (computed on access, nothing stored per snapshot)
+
+    @property
+    def timestamp(self) -> str:
+        """Local time of the tick as an ISO 8601 string."""
+        return datetime.fromtimestamp(self.timestamp_ms / 1000).isoformat()
+
+    @property
+    def device_count(self) -> int:
+        return len(self.device_set.devices)
+
+    @property
+    def devices(self) -> Tuple[Dict[str, Any], ...]:
+        return self.device_set.devices
+
+    @property
+    def overall_quality(self) -> str:
+        return QUALITY_LEVELS[self.quality_code]
+
+    @property
+    def active_interfaces(self) -> Tuple[str, ...]:
+        return self.interfaces
+
+    def __repr__(self) -> str:
+        return (f"MonitoringSnapshot(timestamp_ms={self.timestamp_ms}, devices={self.device_count}, "
+                f"upload={self.total_upload_mbps}, download={self.total_download_mbps}, "
+                f"quality={self.overall_quality!r})")
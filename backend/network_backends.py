@@ -0,0 +1,660 @@
+#!/usr/bin/env python3
+"""
+Network Backends - Where NetworkMonitor gets its measurements.
+
+Load-testing the monitoring service used to require a real LAN with
+thousands of hosts. NetworkMonitor now takes its raw measurements (echo
+replies, names, the ARP table, interface counters and the clock) from a
+pluggable backend:
+
+1. LiveBackend queries the real network (ping3, reverse DNS, arp, psutil);
+   it is the default and behaves exactly as before
+2. SimulatedBackend models N devices with configurable round-trip time
+   distributions, packet loss, churn (devices coming and going) and a
+   daily traffic curve. Every result is derived from the seed, the device
+   and the simulated time, so runs are reproducible
+3. TraceRecorder wraps any backend and records what it returned;
+   TraceReplayBackend plays such a trace back, optionally faster than
+   real time, so a recorded LAN can be replayed into the service
+
+Simulated and replayed backends run on their own clock. With speed=None
+time only moves when the monitor sleeps (fully deterministic); with a
+speed factor it runs that many times faster than real time, and rates
+are computed on the simulated clock.
+
+Usage:
+    monitor = NetworkMonitor(backend=SimulatedBackend(SimulationProfile(device_count=10000)))
+    service = ContinuousNetworkMonitorService(network_backend=SimulatedBackend(profile, speed=1.0))
+
+    recorder = TraceRecorder(LiveBackend(), "lan.trace.jsonl")   # Record a real LAN
+    replay = TraceReplayBackend("lan.trace.jsonl", speed=10.0)    # Replay it at 10x
+"""
+
+import bisect
+import ipaddress
+import json
+import math
+import socket
+import subprocess
+import threading
+import time
+from collections import namedtuple
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import psutil
+import ping3
+
+
+# Interface counters in the shape of psutil.net_io_counters(pernic=True)
+InterfaceCounters = namedtuple(
+    'InterfaceCounters',
+    ['bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv', 'errin', 'errout', 'dropin', 'dropout']
+)
+
+
+class BackendConfig:
+    """Configuration constants for network backends."""
+
+    # MAC address validation for arp output
+    MAC_ADDRESS_LENGTH = 17
+    MAC_ADDRESS_SEPARATOR = ':'
+
+    # Simulated networks are numbered from here
+    SIMULATED_NETWORK_BASE = "10.0.0.0"
+
+    # Average packet size used to derive simulated packet counters
+    SIMULATED_PACKET_BYTES = 800
+
+    # Bytes per Mbps-second (the monitor converts rates with 1024 * 1024)
+    BYTES_PER_MBIT = 1024 * 1024 / 8
+
+
+class NetworkBackend:
+    """
+    Source of raw network measurements for NetworkMonitor.
+
+    Subclasses implement ping() and interface_counters(); the other
+    lookups default to "unknown".
+    """
+
+    name = "base"
+    live = False        # Measures the real network
+    blocking = True     # ping() takes real time, so sweeps run pings on threads
+
+    def local_network(self) -> Optional[str]:
+        """Network range to monitor (None lets NetworkMonitor detect it)."""
+        return None
+
+    def ping(self, ip: str, timeout: float) -> Optional[float]:
+        """Round-trip time in seconds, or None if no reply arrived in time."""
+        raise NotImplementedError
+
+    def resolve_hostname(self, ip: str) -> Optional[str]:
+        return None
+
+    def lookup_mac(self, ip: str) -> Optional[str]:
+        return None
+
+    def arp_table(self) -> List[Dict[str, Any]]:
+        """Known neighbours: dicts with ip, mac_address, hostname and source."""
+        return []
+
+    def interface_counters(self) -> Dict[str, InterfaceCounters]:
+        """Cumulative counters per interface."""
+        raise NotImplementedError
+
+    def time(self) -> float:
+        """Wall-clock time of the measured network (epoch seconds)."""
+        return time.time()
+
+    def monotonic(self) -> float:
+        """Monotonic clock used for rate calculations."""
+        return time.monotonic()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+    def real_seconds(self, seconds: float) -> float:
+        """Real time that passes while this backend's clock advances by seconds."""
+        return seconds
+
+    def close(self):
+        """Release resources (trace files, ...)."""
+
+
+class LiveBackend(NetworkBackend):
+    """The real network, through ping3, the resolver, arp and psutil."""
+
+    name = "live"
+    live = True
+
+    def __init__(self, interfaces: Optional[Tuple[str, ...]] = None):
+        """
+        Args:
+            interfaces: Only report counters of these interfaces (None: all),
+                        e.g. the VLAN interfaces of one segment
+        """
+        self.interfaces = tuple(interfaces) if interfaces else None
+
+    def ping(self, ip: str, timeout: float) -> Optional[float]:
+        # ping3 returns the delay in seconds, None on timeout and False on errors
+        delay = ping3.ping(ip, timeout=timeout)
+        return delay if isinstance(delay, float) else None
+
+    def resolve_hostname(self, ip: str) -> Optional[str]:
+        try:
+            return socket.gethostbyaddr(ip)[0]
+        except (socket.herror, socket.gaierror):
+            return None
+
+    def lookup_mac(self, ip: str) -> Optional[str]:
+        try:
+            result = subprocess.run(['arp', '-n', ip], capture_output=True, text=True)
+            if result.returncode == 0:
+                for line in result.stdout.strip().split('\n'):
+                    if ip in line and 'incomplete' not in line:
+                        # MAC address is typically in format xx:xx:xx:xx:xx:xx
+                        for part in line.split():
+                            if (BackendConfig.MAC_ADDRESS_SEPARATOR in part and
+                                    len(part) == BackendConfig.MAC_ADDRESS_LENGTH):
+                                return part.upper()
+        except Exception:
+            pass
+        return None
+
+    def arp_table(self) -> List[Dict[str, Any]]:
+        devices = []
+        try:
+            result = subprocess.run(['arp', '-a'], capture_output=True, text=True)
+            for line in result.stdout.split('\n'):
+                if '(' in line and ')' in line and 'incomplete' not in line:
+                    # Parse format: hostname (ip) at mac_address [ether] on interface
+                    parts = line.split()
+                    if len(parts) >= 4:
+                        mac = parts[3]
+                        devices.append({
+                            'ip': parts[1].strip('()'),
+                            'mac_address': mac.upper() if mac else None,
+                            'hostname': parts[0] if parts[0] != '?' else None,
+                            'source': 'arp_table'
+                        })
+        except Exception as e:
+            print(f"⚠️ Could not parse ARP table: {e}")
+        return devices
+
+    def interface_counters(self) -> Dict[str, InterfaceCounters]:
+        counters = psutil.net_io_counters(pernic=True)
+        if self.interfaces is None:
+            return counters
+        return {name: stat for name, stat in counters.items() if name in self.interfaces}
+
+
+class SimulationClock:
+    """
+    Simulated time: manual (advances only on sleep) or scaled real time.
+    """
+
+    def __init__(self, start_time: float, speed: Optional[float] = None):
+        """
+        Args:
+            start_time: Simulated epoch time at creation
+            speed: Simulated seconds per real second (None: manual clock)
+        """
+        self.start_time = start_time
+        self.speed = speed
+        self._elapsed = 0.0
+        self._real_origin = time.monotonic()
+
+    def elapsed(self) -> float:
+        """Simulated seconds since the clock started."""
+        if self.speed is None:
+            return self._elapsed
+        return (time.monotonic() - self._real_origin) * self.speed
+
+    def now(self) -> float:
+        return self.start_time + self.elapsed()
+
+    def real_seconds(self, seconds: float) -> float:
+        return 0.0 if self.speed is None else max(0.0, seconds) / self.speed
+
+    def sleep(self, seconds: float):
+        if self.speed is None:
+            self._elapsed += max(0.0, seconds)
+        elif seconds > 0:
+            time.sleep(seconds / self.speed)
+
+    def advance(self, seconds: float):
+        """Move a manual clock forward (scaled clocks follow real time)."""
+        if self.speed is not None:
+            raise ValueError("Only a manual clock can be advanced")
+        self._elapsed += max(0.0, seconds)
+
+
+def _mix64(value: int) -> int:
+    """SplitMix64 finalizer: a well-distributed 64-bit hash of value."""
+    value = (value + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return value ^ (value >> 31)
+
+
+def _uniform(*keys: int) -> float:
+    """Deterministic uniform number in (0, 1) for the given keys."""
+    value = 0
+    for key in keys:
+        value = _mix64(value ^ (key & 0xFFFFFFFFFFFFFFFF))
+    return ((value >> 11) + 0.5) / float(1 << 53)
+
+
+@dataclass
+class SimulationProfile:
+    """What the simulated network looks like."""
+    device_count: int = 250
+    network_range: Optional[str] = None     # Smallest range holding the devices if None
+    seed: int = 1
+
+    # Round-trip times: log-normal around the median; a share of devices
+    # sits behind a slow link
+    rtt_median_ms: float = 4.0
+    rtt_sigma: float = 0.4
+    slow_device_fraction: float = 0.05
+    slow_rtt_median_ms: float = 60.0
+    loss_rate: float = 0.01                 # Per echo request
+
+    # Churn: this share of devices comes and goes, online for about
+    # session_seconds at a time and offline for about as long
+    churn_fraction: float = 0.2
+    session_seconds: float = 1800.0
+
+    # Traffic: mean rates with a sinusoidal daily swing
+    upload_mbps: float = 5.0
+    download_mbps: float = 40.0
+    traffic_swing: float = 0.5              # 0 = flat, 1 = drops to zero at night
+    traffic_period: float = 86400.0
+    interfaces: Tuple[str, ...] = ('sim0',)
+
+    # Share of online devices that are named and answer reverse DNS
+    named_fraction: float = 0.6
+
+    # Simulated epoch time at start (None: the real time at creation)
+    start_time: Optional[float] = None
+
+
+class SimulatedDevice:
+    """One simulated host; parameters are fixed at creation from the seed."""
+
+    __slots__ = ('index', 'ip', 'mac_address', 'hostname', 'rtt_median_ms', 'churn_period', 'online_span', 'phase')
+
+    def __init__(self, index: int, ip: str, profile: SimulationProfile):
+        seed = profile.seed
+        self.index = index
+        self.ip = ip
+        self.mac_address = ':'.join(f"{(_mix64(seed ^ index) >> shift) & 0xFF:02X}" for shift in range(0, 48, 8))
+        self.hostname = f"sim-{index:05d}.lan" if _uniform(seed, index, 1) < profile.named_fraction else None
+
+        slow = _uniform(seed, index, 2) < profile.slow_device_fraction
+        self.rtt_median_ms = profile.slow_rtt_median_ms if slow else profile.rtt_median_ms
+
+        # Churning devices cycle between an online and an offline span
+        self.churn_period = 0.0
+        self.online_span = 0.0
+        self.phase = 0.0
+        if _uniform(seed, index, 3) < profile.churn_fraction:
+            self.online_span = profile.session_seconds * (0.5 + _uniform(seed, index, 4))
+            self.churn_period = self.online_span + profile.session_seconds * (0.5 + _uniform(seed, index, 5))
+            self.phase = self.churn_period * _uniform(seed, index, 6)
+
+    def is_online(self, elapsed: float) -> bool:
+        if not self.churn_period:
+            return True
+        return (elapsed + self.phase) % self.churn_period < self.online_span
+
+
+class SimulatedBackend(NetworkBackend):
+    """
+    A deterministic model of a LAN with any number of devices.
+
+    Pings return immediately with the modelled round-trip time, so a
+    sweep of ten thousand hosts costs no waiting; counters follow the
+    traffic curve on the simulated clock.
+    """
+
+    name = "simulated"
+    blocking = False
+
+    def __init__(self, profile: Optional[SimulationProfile] = None, speed: Optional[float] = None):
+        """
+        Initialize the simulation.
+
+        Args:
+            profile: Network model (defaults to SimulationProfile())
+            speed: Simulated seconds per real second (None: manual clock
+                   that only advances on sleep() and advance())
+        """
+        self.profile = profile or SimulationProfile()
+        self.network_range = self.profile.network_range or self._range_for(self.profile.device_count)
+        start_time = self.profile.start_time if self.profile.start_time is not None else time.time()
+        self.clock = SimulationClock(start_time, speed)
+
+        hosts = ipaddress.IPv4Network(self.network_range).hosts()
+        self.devices: Dict[str, SimulatedDevice] = {}
+        for index in range(self.profile.device_count):
+            ip = str(next(hosts))
+            self.devices[ip] = SimulatedDevice(index, ip, self.profile)
+
+        self._probe_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _range_for(device_count: int) -> str:
+        prefix = 32 - max(2, math.ceil(math.log2(device_count + 2)))
+        return f"{BackendConfig.SIMULATED_NETWORK_BASE}/{prefix}"
+
+    def local_network(self) -> Optional[str]:
+        return self.network_range
+
+    def time(self) -> float:
+        return self.clock.now()
+
+    def monotonic(self) -> float:
+        return self.clock.elapsed()
+
+    def sleep(self, seconds: float):
+        self.clock.sleep(seconds)
+
+    def real_seconds(self, seconds: float) -> float:
+        return self.clock.real_seconds(seconds)
+
+    def advance(self, seconds: float):
+        self.clock.advance(seconds)
+
+    def online_devices(self) -> List[SimulatedDevice]:
+        elapsed = self.clock.elapsed()
+        return [device for device in self.devices.values() if device.is_online(elapsed)]
+
+    def ping(self, ip: str, timeout: float) -> Optional[float]:
+        device = self.devices.get(ip)
+        if device is None or not device.is_online(self.clock.elapsed()):
+            return None
+
+        # The n-th probe of a device always gets the same outcome
+        with self._lock:
+            count = self._probe_counts.get(ip, 0)
+            self._probe_counts[ip] = count + 1
+        seed = self.profile.seed
+        if _uniform(seed, device.index, 7, count) < self.profile.loss_rate:
+            return None
+
+        # Log-normal RTT via Box-Muller
+        u1 = _uniform(seed, device.index, 8, count)
+        u2 = _uniform(seed, device.index, 9, count)
+        normal = math.sqrt(-2.0 * math.log(u1)) * math.cos(2.0 * math.pi * u2)
+        rtt = device.rtt_median_ms * math.exp(self.profile.rtt_sigma * normal) / 1000.0
+        return rtt if rtt <= timeout else None
+
+    def resolve_hostname(self, ip: str) -> Optional[str]:
+        device = self.devices.get(ip)
+        return device.hostname if device else None
+
+    def lookup_mac(self, ip: str) -> Optional[str]:
+        device = self.devices.get(ip)
+        if device is None or not device.is_online(self.clock.elapsed()):
+            return None
+        return device.mac_address
+
+    def arp_table(self) -> List[Dict[str, Any]]:
+        return [
+            {'ip': device.ip, 'mac_address': device.mac_address, 'hostname': device.hostname, 'source': 'arp_table'}
+            for device in self.online_devices()
+        ]
+
+    def traffic_mbps(self, elapsed: Optional[float] = None) -> Tuple[float, float]:
+        """Modelled (upload, download) rates at a simulated time."""
+        elapsed = self.clock.elapsed() if elapsed is None else elapsed
+        factor = 1.0 + self.profile.traffic_swing * math.sin(2.0 * math.pi * self._day_position(elapsed))
+        return self.profile.upload_mbps * factor, self.profile.download_mbps * factor
+
+    def _day_position(self, elapsed: float) -> float:
+        return ((self.clock.start_time + elapsed) % self.profile.traffic_period) / self.profile.traffic_period
+
+    def _transferred_mbit(self, mean_mbps: float, elapsed: float) -> float:
+        """Integral of the traffic curve from the start to elapsed (Mbit)."""
+        profile = self.profile
+        omega = 2.0 * math.pi / profile.traffic_period
+        start = self.clock.start_time
+        swing = profile.traffic_swing / omega
+        return mean_mbps * (elapsed - swing * (math.cos(omega * (start + elapsed)) - math.cos(omega * start)))
+
+    def interface_counters(self) -> Dict[str, InterfaceCounters]:
+        elapsed = self.clock.elapsed()
+        interfaces = self.profile.interfaces
+        share = 1.0 / len(interfaces)
+        sent = self._transferred_mbit(self.profile.upload_mbps, elapsed) * share * BackendConfig.BYTES_PER_MBIT
+        recv = self._transferred_mbit(self.profile.download_mbps, elapsed) * share * BackendConfig.BYTES_PER_MBIT
+        packet = BackendConfig.SIMULATED_PACKET_BYTES
+        counters = InterfaceCounters(int(sent), int(recv), int(sent // packet), int(recv // packet), 0, 0, 0, 0)
+        return {name: counters for name in interfaces}
+
+
+class TraceRecorder(NetworkBackend):
+    """
+    Passes every call through to a backend and records the result.
+
+    The trace is JSON lines: a header with the network range and start
+    time, then one event per call stamped with the backend's time.
+    """
+
+    name = "recording"
+
+    def __init__(self, backend: NetworkBackend, path: str):
+        self.backend = backend
+        self.live = backend.live
+        self.blocking = backend.blocking
+        self.path = path
+        self.events_recorded = 0
+        self._lock = threading.Lock()
+        self._file = open(path, 'w', encoding='utf-8')
+        self._write({'op': 'meta', 'network_range': backend.local_network(), 'backend': backend.name})
+
+    def _write(self, event: Dict[str, Any]):
+        event['t'] = self.backend.time()
+        line = json.dumps(event, separators=(',', ':')) + "\n"
+        with self._lock:
+            if self._file:
+                self._file.write(line)
+                self.events_recorded += 1
+
+    def local_network(self) -> Optional[str]:
+        return self.backend.local_network()
+
+    def ping(self, ip: str, timeout: float) -> Optional[float]:
+        delay = self.backend.ping(ip, timeout)
+        self._write({'op': 'ping', 'ip': ip, 'rtt': delay})
+        return delay
+
+    def resolve_hostname(self, ip: str) -> Optional[str]:
+        hostname = self.backend.resolve_hostname(ip)
+        self._write({'op': 'hostname', 'ip': ip, 'hostname': hostname})
+        return hostname
+
+    def lookup_mac(self, ip: str) -> Optional[str]:
+        mac = self.backend.lookup_mac(ip)
+        self._write({'op': 'mac', 'ip': ip, 'mac': mac})
+        return mac
+
+    def arp_table(self) -> List[Dict[str, Any]]:
+        entries = self.backend.arp_table()
+        self._write({'op': 'arp', 'entries': entries})
+        return entries
+
+    def interface_counters(self) -> Dict[str, InterfaceCounters]:
+        counters = self.backend.interface_counters()
+        self._write({'op': 'counters', 'interfaces': {name: list(stat) for name, stat in counters.items()}})
+        return counters
+
+    def time(self) -> float:
+        return self.backend.time()
+
+    def monotonic(self) -> float:
+        return self.backend.monotonic()
+
+    def sleep(self, seconds: float):
+        self.backend.sleep(seconds)
+
+    def real_seconds(self, seconds: float) -> float:
+        return self.backend.real_seconds(seconds)
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+        self.backend.close()
+
+
+class TraceReplayBackend(NetworkBackend):
+    """
+    Plays back a recorded trace on its own clock.
+
+    A ping returns the latest result recorded for that host at the current
+    trace time (the first one before it was first probed); counters are
+    interpolated between recorded samples, so rates come out as recorded.
+    With loop=True the trace repeats, counters continuing to grow.
+    """
+
+    name = "replay"
+    blocking = False
+
+    def __init__(self, path: str, speed: Optional[float] = 1.0, loop: bool = False):
+        """
+        Load a trace.
+
+        Args:
+            path: Trace written by TraceRecorder
+            speed: Trace seconds per real second (None: manual clock)
+            loop: Start over at the end instead of freezing on the last state
+        """
+        self.path = path
+        self.loop = loop
+        self.network_range: Optional[str] = None
+        self._pings: Dict[str, Tuple[List[float], List[Optional[float]]]] = {}
+        self._hostnames: Dict[str, Optional[str]] = {}
+        self._macs: Dict[str, Optional[str]] = {}
+        self._arp: Tuple[List[float], List[List[Dict[str, Any]]]] = ([], [])
+        self._counters: Tuple[List[float], List[Dict[str, List[int]]]] = ([], [])
+        self.events = 0
+        self._load(path)
+
+        times = [t for t in (self.trace_start, self.trace_end) if t is not None]
+        self.duration = times[1] - times[0] if len(times) == 2 else 0.0
+        self.clock = SimulationClock(self.trace_start or time.time(), speed)
+
+    def _load(self, path: str):
+        first = last = None
+        with open(path, encoding='utf-8') as trace:
+            for line in trace:
+                event = json.loads(line)
+                op, t = event['op'], event['t']
+                if op == 'meta':
+                    self.network_range = event.get('network_range')
+                    continue
+                first = t if first is None else min(first, t)
+                last = t if last is None else max(last, t)
+                self.events += 1
+                if op == 'ping':
+                    times, results = self._pings.setdefault(event['ip'], ([], []))
+                    times.append(t)
+                    results.append(event['rtt'])
+                elif op == 'hostname':
+                    self._hostnames[event['ip']] = event['hostname']
+                elif op == 'mac':
+                    self._macs[event['ip']] = event['mac']
+                elif op == 'arp':
+                    self._arp[0].append(t)
+                    self._arp[1].append(event['entries'])
+                elif op == 'counters':
+                    self._counters[0].append(t)
+                    self._counters[1].append(event['interfaces'])
+        self.trace_start = first
+        self.trace_end = last
+
+    def _trace_position(self) -> Tuple[int, float]:
+        """(completed laps, seconds into the trace) at the current replay time."""
+        elapsed = self.clock.elapsed()
+        if self.duration <= 0:
+            return 0, 0.0
+        if self.loop:
+            laps = int(elapsed // self.duration)
+            return laps, elapsed - laps * self.duration
+        return 0, min(elapsed, self.duration)
+
+    @property
+    def exhausted(self) -> bool:
+        """The replay has reached the end of a non-looping trace."""
+        return not self.loop and self.clock.elapsed() >= self.duration
+
+    def local_network(self) -> Optional[str]:
+        return self.network_range
+
+    def time(self) -> float:
+        return self.clock.now()
+
+    def monotonic(self) -> float:
+        return self.clock.elapsed()
+
+    def sleep(self, seconds: float):
+        self.clock.sleep(seconds)
+
+    def real_seconds(self, seconds: float) -> float:
+        return self.clock.real_seconds(seconds)
+
+    def advance(self, seconds: float):
+        self.clock.advance(seconds)
+
+    @staticmethod
+    def _latest(times: List[float], at: float) -> int:
+        return max(0, bisect.bisect_right(times, at) - 1)
+
+    def ping(self, ip: str, timeout: float) -> Optional[float]:
+        recorded = self._pings.get(ip)
+        if not recorded:
+            return None
+        _laps, offset = self._trace_position()
+        times, results = recorded
+        delay = results[self._latest(times, self.trace_start + offset)]
+        return delay if delay is not None and delay <= timeout else None
+
+    def resolve_hostname(self, ip: str) -> Optional[str]:
+        return self._hostnames.get(ip)
+
+    def lookup_mac(self, ip: str) -> Optional[str]:
+        return self._macs.get(ip)
+
+    def arp_table(self) -> List[Dict[str, Any]]:
+        times, tables = self._arp
+        if not times:
+            return []
+        _laps, offset = self._trace_position()
+        return [dict(entry) for entry in tables[self._latest(times, self.trace_start + offset)]]
+
+    def interface_counters(self) -> Dict[str, InterfaceCounters]:
+        times, samples = self._counters
+        if not times:
+            return {}
+        laps, offset = self._trace_position()
+        at = self.trace_start + offset
+        index = self._latest(times, at)
+        following = min(index + 1, len(times) - 1)
+        span = times[following] - times[index]
+        weight = (at - times[index]) / span if span > 0 else 0.0
+
+        counters = {}
+        for name, values in samples[index].items():
+            after = samples[following].get(name, values)
+            lap_growth = [end - start for start, end in zip(samples[0].get(name, values), samples[-1].get(name, values))]
+            counters[name] = InterfaceCounters(*(
+                int(value + (later - value) * weight + laps * growth)
+                for value, later, growth in zip(values, after, lap_growth)
+            ))
+        return counters
@@ -7,6 +7,9 @@ This module provides comprehensive network monitoring capabilities including:
 - Bandwidth monitoring and rate calculation
 - Connection quality testing and metrics
 - Thread-safe operations for concurrent monitoring
+
+Raw measurements come from a pluggable backend (see network_backends.py):
+the live network by default, or a simulated or replayed one for testing.
 """
 
 # Standard library imports
@@ -15,12 +18,11 @@ import socket
 import threading
 import time
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import Any, Callable, List, Dict, Optional, Tuple
 import ipaddress
 
-# Third-party imports
-import psutil
-import ping3
+# Local imports
+from network_backends import NetworkBackend, LiveBackend, InterfaceCounters
 
 # Constants for configuration
 class NetworkMonitorConfig:
@@ -49,10 +51,10 @@ class NetworkMonitorConfig:
     
     # Default network range
     DEFAULT_NETWORK = "192.168.1.0/24"
-    
-    # MAC address validation
-    MAC_ADDRESS_LENGTH = 17
-    MAC_ADDRESS_SEPARATOR = ':'
+
+def _print_message(template: str, *args: Any):
+    """Default NetworkMonitor log: print the formatted message."""
+    print(template.format(*args) if args else template)
 
 class NetworkMonitor:
     """
@@ -65,15 +67,21 @@ class NetworkMonitor:
     4. Thread-safe operations for concurrent monitoring
     """
     
-    def __init__(self, network_range: str = None):
+    def __init__(self, network_range: str = None, backend: Optional[NetworkBackend] = None,
+                 log: Optional[Callable[..., None]] = None):
         """
         Initialize the network monitor.
         
         Args:
             network_range: Network CIDR (e.g., '192.168.1.0/24'). 
                           If None, will auto-detect local network.
+            backend: Source of measurements (defaults to the live network)
+            log: Receives progress messages as (template, *args) in
+                 str.format style; defaults to printing them
         """
-        self.network_range = network_range or self._get_local_network()
+        self.log = log or _print_message
+        self.backend = backend or LiveBackend()
+        self.network_range = network_range or self.backend.local_network() or self._get_local_network()
         self.devices: Dict[str, Dict] = {}  # Store discovered devices
         self.monitoring = False
         self.monitoring_thread: Optional[threading.Thread] = None
@@ -112,7 +120,7 @@ class NetworkMonitor:
             
         except Exception as e:
             # Fallback to common home network range
-            print(f"Could not auto-detect network, using default: {e}")
+            self.log("Could not auto-detect network, using default: {}", e)
             return NetworkMonitorConfig.DEFAULT_NETWORK
     
     def discover_devices(self) -> List[Dict]:
@@ -127,7 +135,7 @@ class NetworkMonitor:
         Returns:
             List of device dictionaries with IP, MAC, hostname, etc.
         """
-        print(f"🔍 Scanning network range: {self.network_range}")
+        self.log("🔍 Scanning network range: {}", self.network_range)
         
         # Reset thread-safe results collection
         with self._results_lock:
@@ -143,7 +151,7 @@ class NetworkMonitor:
         discovered_devices = self._merge_device_data(discovered_devices, arp_devices)
         
         self.devices = {dev['ip']: dev for dev in discovered_devices}
-        print(f"🎯 Discovery complete: Found {len(discovered_devices)} devices")
+        self.log("🎯 Discovery complete: Found {} devices", len(discovered_devices))
         
         return discovered_devices
     
@@ -151,10 +159,19 @@ class NetworkMonitor:
         """
         Perform ping sweep using threaded operations.
         
+        Backends that answer without waiting (simulation, replay) are swept
+        sequentially: threads would only add overhead and nondeterminism.
+        
         Returns:
             List of discovered devices from ping sweep.
         """
         network = ipaddress.IPv4Network(self.network_range)
+        if not self.backend.blocking:
+            for ip in network.hosts():
+                self._ping_host(ip)
+            with self._results_lock:
+                return self._discovery_results.copy()
+        
         threads = []
         
         # Create threads for parallel scanning (much faster than sequential)
@@ -181,14 +198,14 @@ class NetworkMonitor:
             ip: IP address to ping
         """
         try:
-            # ping3 returns response time in seconds, None if unreachable
-            response_time = ping3.ping(str(ip), timeout=NetworkMonitorConfig.PING_TIMEOUT)
+            # Response time in seconds, None if unreachable
+            response_time = self.backend.ping(str(ip), NetworkMonitorConfig.PING_TIMEOUT)
             if response_time is not None:
                 device_info = {
                     'ip': str(ip),
                     'latency_ms': round(response_time * 1000, 2),
                     'status': 'online',
-                    'last_seen': datetime.now().isoformat(),
+                    'last_seen': datetime.fromtimestamp(self.backend.time()).isoformat(),
                     'hostname': self._get_hostname(str(ip)),
                     'mac_address': self._get_mac_address(str(ip))
                 }
@@ -197,7 +214,7 @@ class NetworkMonitor:
                 with self._results_lock:
                     self._discovery_results.append(device_info)
                 
-                print(f"✅ Found device: {ip} (latency: {device_info['latency_ms']}ms)")
+                self.log("✅ Found device: {} (latency: {}ms)", ip, device_info['latency_ms'])
         except Exception:
             pass  # Device not reachable
     
@@ -231,11 +248,7 @@ class NetworkMonitor:
         2. PTR records map IP addresses back to hostnames
         3. Many devices register hostnames like "iPhone-John" or "LAPTOP-ABC123"
         """
-        try:
-            hostname = socket.gethostbyaddr(ip)[0]
-            return hostname
-        except (socket.herror, socket.gaierror):
-            return None
+        return self.backend.resolve_hostname(ip)
     
     def _get_mac_address(self, ip: str) -> Optional[str]:
         """
@@ -247,23 +260,7 @@ class NetworkMonitor:
         - MAC addresses are unique hardware identifiers
         - Useful for device identification and tracking
         """
-        try:
-            # Use system ARP command
-            result = subprocess.run(['arp', '-n', ip], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                lines = result.stdout.strip().split('\n')
-                for line in lines:
-                    if ip in line and 'incomplete' not in line:
-                        parts = line.split()
-                        # MAC address is typically in format xx:xx:xx:xx:xx:xx
-                        for part in parts:
-                            if (NetworkMonitorConfig.MAC_ADDRESS_SEPARATOR in part and 
-                                len(part) == NetworkMonitorConfig.MAC_ADDRESS_LENGTH):
-                                return part.upper()
-        except Exception:
-            pass
-        return None
+        return self.backend.lookup_mac(ip)
     
     def _parse_arp_table(self) -> List[Dict]:
         """
@@ -275,28 +272,7 @@ class NetworkMonitor:
         - Interface information
         - Whether entries are complete or incomplete
         """
-        devices = []
-        try:
-            result = subprocess.run(['arp', '-a'], capture_output=True, text=True)
-            for line in result.stdout.split('\n'):
-                if '(' in line and ')' in line and 'incomplete' not in line:
-                    # Parse format: hostname (ip) at mac_address [ether] on interface
-                    parts = line.split()
-                    if len(parts) >= 4:
-                        ip = parts[1].strip('()')
-                        mac = parts[3] if len(parts) > 3 else None
-                        hostname = parts[0] if parts[0] != '?' else None
-                        
-                        devices.append({
-                            'ip': ip,
-                            'mac_address': mac.upper() if mac else None,
-                            'hostname': hostname,
-                            'source': 'arp_table'
-                        })
-        except Exception as e:
-            print(f"⚠️ Could not parse ARP table: {e}")
-        
-        return devices
+        return self.backend.arp_table()
     
     def get_bandwidth_stats(self, interface: str = None) -> Dict:
         """
@@ -315,7 +291,7 @@ class NetworkMonitor:
         Returns:
             Dictionary with bandwidth statistics
         """
-        stats = psutil.net_io_counters(pernic=True)
+        stats = self.backend.interface_counters()
         
         if interface and interface in stats:
             stat = stats[interface]
@@ -323,12 +299,25 @@ class NetworkMonitor:
         else:
             return self._format_aggregated_stats(stats)
     
-    def _format_interface_stats(self, stat: psutil._pslinux.snetio, interface: str) -> Dict:
+    def get_interface_bandwidth_stats(self) -> Dict[str, Dict]:
+        """
+        Get current bandwidth statistics for every interface in one call.
+        
+        Unlike get_bandwidth_stats(), this keeps interfaces separate so rates
+        (and percentiles) can be tracked per uplink.
+        
+        Returns:
+            Dictionary mapping interface name to formatted statistics
+        """
+        stats = self.backend.interface_counters()
+        return {name: self._format_interface_stats(stat, name) for name, stat in stats.items()}
+    
+    def _format_interface_stats(self, stat: InterfaceCounters, interface: str) -> Dict:
         """
         Format statistics for a specific interface.
         
         Args:
-            stat: psutil network statistics object
+            stat: Interface counters (psutil snetio or the backend's equivalent)
             interface: Interface name
             
         Returns:
@@ -344,7 +333,8 @@ class NetworkMonitor:
             'errors_out': stat.errout,
             'drops_in': stat.dropin,
             'drops_out': stat.dropout,
-            'timestamp': time.time()
+            'timestamp': self.backend.time(),
+            'sampled_at': self.backend.monotonic()
         }
     
     def _format_aggregated_stats(self, stats: Dict) -> Dict:
@@ -368,7 +358,8 @@ class NetworkMonitor:
             'bytes_recv': total_recv,
             'packets_sent': total_packets_sent,
             'packets_recv': total_packets_recv,
-            'timestamp': time.time(),
+            'timestamp': self.backend.time(),
+            'sampled_at': self.backend.monotonic(),
             'interfaces': list(stats.keys())
         }
     
@@ -384,7 +375,12 @@ class NetworkMonitor:
         
         This is how most network monitoring tools work!
         """
-        time_diff = current_stats['timestamp'] - previous_stats['timestamp']
+        # Prefer the monotonic sample time: wall-clock steps (NTP) would
+        # otherwise produce negative or wildly inflated rates
+        if 'sampled_at' in current_stats and 'sampled_at' in previous_stats:
+            time_diff = current_stats['sampled_at'] - previous_stats['sampled_at']
+        else:
+            time_diff = current_stats['timestamp'] - previous_stats['timestamp']
         
         if time_diff <= 0:
             return {'error': 'Invalid time difference'}
@@ -430,21 +426,21 @@ class NetworkMonitor:
         latencies = []
         successful_pings = 0
         
-        print(f"🔍 Testing connection quality to {ip} ({samples} samples)...")
+        self.log("🔍 Testing connection quality to {} ({} samples)...", ip, samples)
         
         for i in range(samples):
             try:
-                response_time = ping3.ping(ip, timeout=NetworkMonitorConfig.PING_TIMEOUT)
+                response_time = self.backend.ping(ip, NetworkMonitorConfig.PING_TIMEOUT)
                 if response_time is not None:
                     latency_ms = response_time * 1000
                     latencies.append(latency_ms)
                     successful_pings += 1
-                    print(f"  Ping {i+1}: {latency_ms:.2f}ms")
+                    self.log("  Ping {}: {:.2f}ms", i + 1, latency_ms)
                 else:
-                    print(f"  Ping {i+1}: Timeout")
-                time.sleep(NetworkMonitorConfig.PING_INTERVAL)  # Brief pause between pings
+                    self.log("  Ping {}: Timeout", i + 1)
+                self.backend.sleep(NetworkMonitorConfig.PING_INTERVAL)  # Brief pause between pings
             except Exception as e:
-                print(f"  Ping {i+1}: Error - {e}")
+                self.log("  Ping {}: Error - {}", i + 1, e)
         
         return self._calculate_connectivity_metrics(ip, latencies, successful_pings, samples)
     
@@ -485,7 +481,7 @@ class NetworkMonitor:
             'max_latency_ms': round(max_latency, 2),
             'jitter_ms': round(jitter, 2),
             'quality_rating': quality_rating,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.fromtimestamp(self.backend.time()).isoformat()
         }
     
     def _calculate_quality_rating(self, latency: float, packet_loss: float, jitter: float) -> str:
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Output Sinks - Fan-out of monitoring snapshots to pluggable destinations.
+
+Sending snapshots anywhere other than the terminal used to mean
+subclassing the service. Sinks make destinations pluggable instead:
+
+1. Every sink is an OutputSink with its own bounded queue, writer thread
+   and batching (size- or age-bounded, as in the persistence pipeline)
+2. Failures are isolated: a sink that raises, blocks or falls behind only
+   drops or fails its own records; collection and the other sinks go on
+3. SinkFanOut hands each snapshot to every sink without ever blocking
+
+Built-in sinks:
+    SQLiteSink          - the write-behind database pipeline
+    JsonlFileSink       - JSON lines, rotated by size
+    UnixDatagramSink    - one JSON datagram per snapshot to a UNIX socket
+    StdoutSink          - JSON lines on stdout (for piping into other tools)
+
+Usage:
+    outputs = SinkFanOut([JsonlFileSink("snapshots.jsonl"), UnixDatagramSink("/run/netmon.sock")])
+    outputs.start()
+    outputs.submit_snapshot(snapshot)       # From the monitoring thread
+    outputs.stop()                          # Flushes every sink
+"""
+
+import errno
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, TextIO
+
+from persistence_pipeline import OutputSink, SnapshotPersistencePipeline, PersistenceConfig
+
+
+class SinkConfig:
+    """Configuration constants for output sinks."""
+
+    # Per-sink queue and batching (sinks outside the database see far
+    # smaller volumes, so they hold less in memory)
+    MAX_QUEUE_SIZE = 2000
+    BATCH_SIZE = 100
+    MAX_BATCH_AGE = 1.0
+
+    # JSONL rotation: rotate at this size, keep this many old files
+    JSONL_MAX_BYTES = 10 * 1024 * 1024
+    JSONL_BACKUP_COUNT = 5
+
+    # Largest datagram sent (bigger snapshots are dropped and counted)
+    DATAGRAM_MAX_BYTES = 60000
+
+
+# The database pipeline is the SQLite sink
+SQLiteSink = SnapshotPersistencePipeline
+
+
+def _sink_queue_options(queue_options: Dict[str, Any]) -> Dict[str, Any]:
+    options = {
+        'max_queue_size': SinkConfig.MAX_QUEUE_SIZE,
+        'batch_size': SinkConfig.BATCH_SIZE,
+        'max_batch_age': SinkConfig.MAX_BATCH_AGE
+    }
+    options.update(queue_options)
+    return options
+
+
+def snapshot_to_dict(snapshot) -> Dict[str, Any]:
+    """Plain, JSON-serializable form of a snapshot for external consumers."""
+    return {
+        'timestamp_ms': snapshot.timestamp_ms,
+        'timestamp': snapshot.timestamp,
+        'device_count': snapshot.device_count,
+        'device_set_version': snapshot.device_set.version,
+        'total_upload_mbps': snapshot.total_upload_mbps,
+        'total_download_mbps': snapshot.total_download_mbps,
+        'total_usage_mb': snapshot.total_usage_mb,
+        'avg_latency_ms': snapshot.avg_latency_ms,
+        'avg_packet_loss': snapshot.avg_packet_loss,
+        'overall_quality': snapshot.overall_quality,
+        'active_interfaces': list(snapshot.interfaces),
+        'tested_device_ip': snapshot.tested_device_ip,
+        'top_talkers': list(snapshot.top_talkers)
+    }
+
+
+def snapshot_to_json(snapshot) -> str:
+    return json.dumps(snapshot_to_dict(snapshot), separators=(',', ':'), default=str)
+
+
+class JsonlFileSink(OutputSink):
+    """Appends snapshots as JSON lines, rotating the file by size."""
+
+    def __init__(self, path: str, max_bytes: int = SinkConfig.JSONL_MAX_BYTES,
+                 backup_count: int = SinkConfig.JSONL_BACKUP_COUNT, name: str = "jsonl",
+                 **queue_options):
+        """
+        Initialize the sink.
+
+        Args:
+            path: Output file (rotated files get .1, .2, ... suffixes)
+            max_bytes: Rotate before the file would grow beyond this size
+            backup_count: Rotated files kept (0 truncates instead)
+            name: Sink name
+            **queue_options: Overrides for the sink's queue sizing
+        """
+        super().__init__(name, **_sink_queue_options(queue_options))
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.rotations = 0
+        self._file: Optional[BinaryIO] = None
+        self._size = 0  # Bytes, as max_bytes and the file on disk count them
+
+    def write_records(self, batch: List[Any]):
+        data = "".join(snapshot_to_json(snapshot) + "\n" for snapshot in batch).encode('utf-8')
+        if self._file is None:
+            self._open()
+        if self._size and self._size + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'ab')
+        self._size = self._file.tell()
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                older = self.path.with_name(f"{self.path.name}.{index}")
+                if older.exists():
+                    os.replace(older, self.path.with_name(f"{self.path.name}.{index + 1}"))
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+        self.rotations += 1
+        self._open()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats.update({'path': str(self.path), 'rotations': self.rotations})
+        return stats
+
+
+class UnixDatagramSink(OutputSink):
+    """
+    Sends each snapshot as one JSON datagram to a UNIX socket.
+
+    The socket is non-blocking and nothing is retried: with no listener, or
+    a listener that does not keep up, datagrams are dropped and counted.
+    """
+
+    def __init__(self, socket_path: str, max_datagram_bytes: int = SinkConfig.DATAGRAM_MAX_BYTES,
+                 name: str = "datagram", **queue_options):
+        """
+        Initialize the sink.
+
+        Args:
+            socket_path: Path of the listener's datagram socket
+            max_datagram_bytes: Larger snapshots are dropped
+            name: Sink name
+            **queue_options: Overrides for the sink's queue sizing
+        """
+        super().__init__(name, **_sink_queue_options(queue_options))
+        self.socket_path = socket_path
+        self.max_datagram_bytes = max_datagram_bytes
+        self.datagrams_sent = 0
+        self.datagrams_dropped = 0
+        self._socket: Optional[socket.socket] = None
+
+    def write_records(self, batch: List[Any]):
+        if self._socket is None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._socket.setblocking(False)
+
+        for snapshot in batch:
+            data = snapshot_to_json(snapshot).encode('utf-8')
+            if len(data) > self.max_datagram_bytes:
+                self.datagrams_dropped += 1
+                continue
+            try:
+                self._socket.sendto(data, self.socket_path)
+                self.datagrams_sent += 1
+            except OSError as e:
+                # No listener, or its receive buffer is full
+                if e.errno in (errno.ENOENT, errno.ECONNREFUSED, errno.EAGAIN, errno.ENOBUFS):
+                    self.datagrams_dropped += 1
+                else:
+                    raise
+
+    def close(self):
+        if self._socket:
+            self._socket.close()
+            self._socket = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats.update({
+            'socket_path': self.socket_path,
+            'datagrams_sent': self.datagrams_sent,
+            'datagrams_dropped': self.datagrams_dropped
+        })
+        return stats
+
+
+class StdoutSink(OutputSink):
+    """Writes snapshots as JSON lines to stdout (use with headless rendering)."""
+
+    def __init__(self, stream: Optional[TextIO] = None, name: str = "stdout", **queue_options):
+        super().__init__(name, **_sink_queue_options(queue_options))
+        self.stream = stream
+
+    def write_records(self, batch: List[Any]):
+        stream = self.stream or sys.stdout
+        stream.write("".join(snapshot_to_json(snapshot) + "\n" for snapshot in batch))
+        stream.flush()
+
+
+class SinkFanOut:
+    """Hands every snapshot to each sink; never blocks on any of them."""
+
+    def __init__(self, sinks: Iterable[OutputSink] = ()):
+        self.sinks: List[OutputSink] = list(sinks)
+
+    def add(self, sink: OutputSink):
+        self.sinks.append(sink)
+
+    def start(self):
+        for sink in self.sinks:
+            sink.start()
+
+    def stop(self, timeout: float = PersistenceConfig.STOP_TIMEOUT):
+        """Flush and stop every sink (each bounded by the timeout)."""
+        for sink in self.sinks:
+            sink.stop(timeout)
+
+    def submit_snapshot(self, snapshot) -> int:
+        """
+        Queue a snapshot for every sink.
+
+        Returns:
+            Number of sinks that accepted it (the others dropped it)
+        """
+        accepted = 0
+        for sink in self.sinks:
+            if sink.submit_snapshot(snapshot):
+                accepted += 1
+        return accepted
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {sink.name: sink.get_stats() for sink in self.sinks}
+
+    def __len__(self) -> int:
+        return len(self.sinks)
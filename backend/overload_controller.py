@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Overload Controller - Graceful degradation when ticks overrun.
+
+On a loaded host every stage still running every tick makes the collector
+fall further and further behind. The controller watches how long ticks
+take against a budget and sheds optional work in a fixed priority order:
+
+1. Measure tick load (duration plus scheduling lateness) as an EWMA
+2. Above budget, step up one shed level at a time:
+      level 1 - reduce probe samples
+      level 2 - postpone device rediscovery
+      level 3 - skip enrichment (per-host traffic accounting)
+3. Below a lower restore threshold, step back down one level at a time
+   (hysteresis plus a minimum dwell time prevent flapping)
+
+Bandwidth sampling and snapshot assembly are never shed: they are the
+core of the time series.
+
+Usage:
+    controller = OverloadController(interval=1.0)
+    controller.record(tick_duration, tick_lateness)     # After every tick
+    if controller.is_shedding(OverloadConfig.ENRICHMENT):
+        ...                                             # Skip optional work
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+
+class OverloadConfig:
+    """Configuration constants for overload control."""
+
+    # Shed actions, in the order they are applied
+    PROBE_SAMPLES = 'probe_samples'
+    REDISCOVERY = 'rediscovery'
+    ENRICHMENT = 'enrichment'
+    SHED_ORDER = (PROBE_SAMPLES, REDISCOVERY, ENRICHMENT)
+
+    # Share of the interval a tick may use before it counts as overloaded
+    BUDGET_FRACTION = 0.5
+
+    # Smoothing of the tick load (higher reacts faster)
+    EWMA_ALPHA = 0.3
+
+    # Shed above this load/budget ratio, restore below RESTORE_RATIO
+    SHED_RATIO = 1.0
+    RESTORE_RATIO = 0.5
+
+    # Minimum ticks between level changes
+    DWELL_TICKS = 5
+
+
+@dataclass
+class LevelChange:
+    """One transition of the shed level."""
+    tick: int
+    old_level: int
+    new_level: int
+    load_ratio: float
+
+
+@dataclass
+class OverloadStats:
+    """Counters describing controller activity."""
+    ticks: int = 0
+    shed_ticks: int = 0                     # Ticks spent at level > 0
+    escalations: int = 0
+    restorations: int = 0
+    history: List[LevelChange] = field(default_factory=list)
+
+
+class OverloadController:
+    """
+    EWMA-based shed level controller with hysteresis.
+
+    The controller only decides; the service asks is_shedding() at the
+    points where optional work happens.
+    """
+
+    MAX_HISTORY = 100
+
+    def __init__(self, interval: float, budget_fraction: float = OverloadConfig.BUDGET_FRACTION,
+                 alpha: float = OverloadConfig.EWMA_ALPHA,
+                 dwell_ticks: int = OverloadConfig.DWELL_TICKS):
+        """
+        Initialize the controller.
+
+        Args:
+            interval: Tick interval in seconds
+            budget_fraction: Share of the interval a tick may use
+            alpha: EWMA smoothing factor
+            dwell_ticks: Minimum ticks between level changes
+        """
+        self.budget = interval * budget_fraction
+        self.alpha = alpha
+        self.dwell_ticks = dwell_ticks
+        self.max_level = len(OverloadConfig.SHED_ORDER)
+
+        self.level = 0
+        self.load_ewma = 0.0
+        self.stats = OverloadStats()
+        self._last_change_tick = 0     # First decision after dwell_ticks of warm-up
+
+    @property
+    def load_ratio(self) -> float:
+        """Smoothed tick load relative to the budget."""
+        return self.load_ewma / self.budget if self.budget > 0 else 0.0
+
+    def is_shedding(self, action: str) -> bool:
+        """True if the given optional work should currently be skipped/reduced."""
+        return self.level > OverloadConfig.SHED_ORDER.index(action)
+
+    @property
+    def shed_actions(self) -> List[str]:
+        return list(OverloadConfig.SHED_ORDER[:self.level])
+
+    def record(self, duration: float, lateness: float = 0.0) -> int:
+        """
+        Feed one tick's timing and update the shed level.
+
+        Args:
+            duration: Seconds the tick's work took
+            lateness: Seconds the tick started after its deadline
+
+        Returns:
+            The shed level after this tick
+        """
+        load = duration + lateness
+        if self.stats.ticks == 0:
+            self.load_ewma = load
+        else:
+            self.load_ewma += self.alpha * (load - self.load_ewma)
+        self.stats.ticks += 1
+
+        if self.stats.ticks - self._last_change_tick >= self.dwell_ticks:
+            ratio = self.load_ratio
+            if ratio >= OverloadConfig.SHED_RATIO and self.level < self.max_level:
+                self._change_level(self.level + 1)
+                self.stats.escalations += 1
+            elif ratio <= OverloadConfig.RESTORE_RATIO and self.level > 0:
+                self._change_level(self.level - 1)
+                self.stats.restorations += 1
+
+        if self.level:
+            self.stats.shed_ticks += 1
+        return self.level
+
+    def force_level(self, level: int):
+        """Jump straight to a shed level (e.g. after repeated tick failures)."""
+        level = max(0, min(self.max_level, level))
+        if level != self.level:
+            self._change_level(level)
+
+    def _change_level(self, new_level: int):
+        self.stats.history.append(LevelChange(self.stats.ticks, self.level, new_level, round(self.load_ratio, 3)))
+        del self.stats.history[:-self.MAX_HISTORY]
+        self.level = new_level
+        self._last_change_tick = self.stats.ticks
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Controller state for status reporting."""
+        return {
+            'level': self.level,
+            'shed_actions': self.shed_actions,
+            'load_ratio': round(self.load_ratio, 3),
+            'budget_ms': round(self.budget * 1000, 3),
+            'ticks': self.stats.ticks,
+            'shed_ticks': self.stats.shed_ticks,
+            'escalations': self.stats.escalations,
+            'restorations': self.stats.restorations
+        }
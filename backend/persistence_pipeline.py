@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Write-Behind Persistence Pipeline for the Continuous Monitoring Service
+
+The monitoring thread must never wait for the disk. This module decouples
+collection from storage:
+
+1. A bounded in-memory queue accepts records without blocking
+2. A dedicated writer thread drains the queue
+3. Records are written in batches - one transaction per batch - flushed
+   when the batch is full or its oldest record reaches a maximum age
+4. Backpressure is reported (queue depth, high-water mark) and records are
+   dropped and counted, never blocked on, when the queue is full
+
+Usage:
+    pipeline = SnapshotPersistencePipeline(db_manager, session_id)
+    pipeline.start()
+    pipeline.submit_snapshot(snapshot)    # Called from the monitoring thread
+    pipeline.stop()                       # Flushes everything still queued
+
+With a DeadbandFilter, a run of similar snapshots is queued once, when it
+closes, and written as one row with its validity interval.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional
+
+from deadband_filter import DeadbandFilter, DeadbandInterval
+from tick_scheduler import TimingHistogram
+
+
+class PersistenceConfig:
+    """Configuration constants for write-behind persistence."""
+
+    # Records held in memory before new ones are dropped
+    MAX_QUEUE_SIZE = 10000
+
+    # Flush when a batch reaches this many records...
+    BATCH_SIZE = 500
+
+    # ...or when its oldest record has waited this long (seconds)
+    MAX_BATCH_AGE = 1.0
+
+    # Queue fill ratio reported as backpressure
+    BACKPRESSURE_THRESHOLD = 0.8
+
+    # Seconds to wait for the writer to drain on shutdown
+    STOP_TIMEOUT = 10.0
+
+
+@dataclass
+class PersistenceStats:
+    """Counters describing pipeline health."""
+    submitted: int = 0
+    written: int = 0
+    dropped: int = 0              # Rejected because the queue was full
+    failed: int = 0               # Lost because their batch failed to write
+    batches: int = 0
+    failed_batches: int = 0
+    max_queue_depth: int = 0
+    last_batch_size: int = 0
+    last_batch_seconds: float = 0.0
+    last_error: Optional[str] = None
+
+
+# Sentinel telling the writer thread to flush and exit
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """
+    Bounded queue drained by a writer thread in size- or age-bounded batches.
+
+    submit() never blocks: when the queue is full the record is dropped and
+    counted, so a slow or stalled disk degrades persistence instead of
+    collection. The write function receives each batch as a list and is
+    expected to write it in one transaction.
+    """
+
+    def __init__(self, name: str, write_batch: Callable[[List[Any]], None],
+                 max_queue_size: int = PersistenceConfig.MAX_QUEUE_SIZE,
+                 batch_size: int = PersistenceConfig.BATCH_SIZE,
+                 max_batch_age: float = PersistenceConfig.MAX_BATCH_AGE):
+        """
+        Initialize the queue.
+
+        Args:
+            name: Name used for the writer thread and reporting
+            write_batch: Function writing a list of records
+            max_queue_size: Maximum records waiting to be written
+            batch_size: Flush once this many records are collected
+            max_batch_age: Flush once the oldest collected record is this old
+        """
+        self.name = name
+        self.write_batch = write_batch
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.max_batch_age = max_batch_age
+
+        self.stats = PersistenceStats()
+        self.batch_durations = TimingHistogram()     # Written by the writer thread only
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._writer_thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the writer thread."""
+        if self._writer_thread and self._writer_thread.is_alive():
+            return
+        self._writer_thread = threading.Thread(target=self._writer_loop, name=f"writer-{self.name}",
+                                               daemon=True)
+        self._writer_thread.start()
+
+    def stop(self, timeout: float = PersistenceConfig.STOP_TIMEOUT):
+        """Flush all queued records and stop the writer thread."""
+        if not self._writer_thread or not self._writer_thread.is_alive():
+            return
+        # Blocking put is fine here: the writer is draining the queue
+        self._queue.put(_STOP)
+        self._writer_thread.join(timeout=timeout)
+
+    def submit(self, record: Any) -> bool:
+        """
+        Queue a record for writing without ever blocking.
+
+        Returns:
+            True if queued, False if dropped because the queue is full
+        """
+        self.stats.submitted += 1
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.stats.dropped += 1
+            return False
+
+        depth = self._queue.qsize()
+        if depth > self.stats.max_queue_depth:
+            self.stats.max_queue_depth = depth
+        return True
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._writer_thread and self._writer_thread.is_alive())
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def under_backpressure(self) -> bool:
+        """True when the queue is close to full (writes are falling behind)."""
+        return self._queue.qsize() >= self.max_queue_size * PersistenceConfig.BACKPRESSURE_THRESHOLD
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Snapshot of the pipeline counters plus current queue state."""
+        stats = asdict(self.stats)
+        stats.update({
+            'queue_depth': self.queue_depth,
+            'queue_capacity': self.max_queue_size,
+            'under_backpressure': self.under_backpressure
+        })
+        return stats
+
+    def _flush(self, batch: List[Any]):
+        """Write one batch; failures are counted and never kill the writer."""
+        write_start = time.perf_counter()
+        try:
+            self.write_batch(batch)
+            self.stats.written += len(batch)
+            self.stats.batches += 1
+        except Exception as e:
+            self.stats.failed += len(batch)
+            self.stats.failed_batches += 1
+            self.stats.last_error = str(e)
+        self.stats.last_batch_size = len(batch)
+        self.stats.last_batch_seconds = time.perf_counter() - write_start
+        self.batch_durations.observe(self.stats.last_batch_seconds)
+
+    def _writer_loop(self):
+        batch: List[Any] = []
+        batch_deadline = 0.0
+
+        while True:
+            timeout = max(0.0, batch_deadline - time.monotonic()) if batch else None
+            try:
+                record = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                record = None
+
+            stopping = record is _STOP
+            if record is not None and not stopping:
+                if not batch:
+                    batch_deadline = time.monotonic() + self.max_batch_age
+                batch.append(record)
+
+                # Grab whatever else is already waiting, up to a full batch
+                while len(batch) < self.batch_size:
+                    try:
+                        record = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if record is _STOP:
+                        stopping = True
+                        break
+                    batch.append(record)
+
+            if batch and (stopping or len(batch) >= self.batch_size
+                          or time.monotonic() >= batch_deadline):
+                self._flush(batch)
+                batch = []
+
+            if stopping:
+                break
+
+
+class OutputSink(WriteBehindQueue):
+    """
+    A destination for monitoring snapshots with its own queue and writer.
+
+    Subclasses implement write_records() for one batch and, if they hold
+    resources, close(). Every sink batches, fails and drops on its own, so
+    a slow or broken sink only ever loses its own records.
+    """
+
+    def __init__(self, name: str, **queue_options):
+        """
+        Initialize the sink.
+
+        Args:
+            name: Sink name (writer thread name and reporting)
+            **queue_options: Overrides for WriteBehindQueue sizing
+        """
+        super().__init__(name, self.write_records, **queue_options)
+
+    def submit_snapshot(self, snapshot) -> bool:
+        """Queue a snapshot for this sink (never blocks)."""
+        return self.submit(snapshot)
+
+    def write_records(self, batch: List[Any]):
+        """Write one batch (runs on the sink's writer thread)."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release resources once the writer thread has finished."""
+
+    def stop(self, timeout: float = PersistenceConfig.STOP_TIMEOUT):
+        """Flush all queued records, stop the writer and close the sink."""
+        super().stop(timeout)
+        if not self.is_running:
+            self.close()
+
+
+def snapshot_to_record(snapshot) -> Dict[str, Any]:
+    """
+    Convert a MonitoringSnapshot into a database record.
+
+    Runs on the writer thread, so formatting costs stay off the
+    monitoring thread.
+    """
+    snapshot_data = {
+        'timestamp': snapshot.timestamp_ms,
+        'device_count': snapshot.device_count,
+        'total_upload_mbps': snapshot.total_upload_mbps,
+        'total_download_mbps': snapshot.total_download_mbps,
+        'total_usage_mb': snapshot.total_usage_mb,
+        'avg_latency_ms': snapshot.avg_latency_ms,
+        'avg_packet_loss': snapshot.avg_packet_loss,
+        'overall_quality': snapshot.overall_quality,
+        'active_interfaces': snapshot.active_interfaces,
+        'tested_device_ip': snapshot.tested_device_ip
+    }
+
+    # A quality test row only exists for ticks that carry a fresh probe
+    quality_test = None
+    if snapshot.tested_device_ip:
+        quality_test = _quality_test(snapshot.avg_latency_ms, snapshot.avg_packet_loss)
+
+    return {
+        'snapshot': snapshot_data,
+        'devices': snapshot.devices,
+        'quality_test': quality_test
+    }
+
+
+def interval_to_record(interval: DeadbandInterval) -> Dict[str, Any]:
+    """
+    Convert a closed deadband interval into a database record.
+
+    The row holds the anchor's values, valid from the anchor's timestamp
+    until the last tick of the run; usage is summed over the run and every
+    probe made during it becomes its own quality test row.
+    """
+    record = snapshot_to_record(interval.anchor)
+    snapshot_data = record['snapshot']
+    snapshot_data['valid_until'] = interval.valid_until_ms
+    snapshot_data['sample_count'] = interval.sample_count
+    snapshot_data['total_usage_mb'] = round(interval.usage_mb, 2)
+
+    record['quality_test'] = None
+    record['quality_tests'] = [
+        dict(_quality_test(latency, loss), device_ip=ip)
+        for ip, latency, loss in interval.quality_tests
+    ]
+    return record
+
+
+def _quality_test(latency_ms: float, packet_loss: float) -> Dict[str, Any]:
+    """Quality test row values for one probe result."""
+    probe_failed = latency_ms <= 0 and packet_loss >= 100
+    return {
+        'latency_ms': None if probe_failed else latency_ms,
+        'packet_loss_percent': packet_loss,
+        'response_time_ms': None if probe_failed else latency_ms,
+        'test_status': 'timeout' if probe_failed else 'success'
+    }
+
+
+class SnapshotPersistencePipeline(OutputSink):
+    """
+    Write-behind persistence of monitoring snapshots and bandwidth sketches.
+
+    Snapshots are written with NetworkDatabaseManager.save_monitoring_batch
+    (snapshots, device upserts and quality tests of a whole batch in one
+    transaction); closed percentile sketch buckets ride the same queue so
+    the monitoring thread never touches the database, and are merged in
+    the same transaction as the batch they arrived with.
+    """
+
+    def __init__(self, db_manager, session_id: int, deadband: Optional[DeadbandFilter] = None,
+                 **queue_options):
+        """
+        Initialize the pipeline.
+
+        Args:
+            db_manager: NetworkDatabaseManager to write to
+            session_id: Monitoring session the snapshots belong to
+            deadband: Optional filter storing one row per run of similar
+                      snapshots instead of one row per snapshot
+            **queue_options: Overrides for WriteBehindQueue sizing
+        """
+        super().__init__("persistence", **queue_options)
+        self.db_manager = db_manager
+        self.session_id = session_id
+        self.deadband = deadband
+
+    def stop(self, timeout: float = PersistenceConfig.STOP_TIMEOUT):
+        """Queue the open deadband run, then flush and stop."""
+        if self.deadband and self.is_running:
+            interval = self.deadband.flush()
+            if interval is not None:
+                self.submit(('interval', interval))
+        super().stop(timeout)
+
+    def submit_snapshot(self, snapshot) -> bool:
+        """Queue a snapshot for persistence (never blocks)."""
+        if self.deadband is None:
+            return self.submit(('snapshot', snapshot))
+
+        # Only a snapshot that ends a run produces a row to write
+        interval = self.deadband.offer(snapshot)
+        if interval is None:
+            return True
+        return self.submit(('interval', interval))
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats['deadband'] = self.deadband.get_stats() if self.deadband else None
+        return stats
+
+    def submit_sketches(self, closed_buckets: List[Dict[str, Any]]) -> bool:
+        """Queue closed bandwidth sketch buckets for persistence."""
+        return self.submit(('sketches', closed_buckets))
+
+    def write_records(self, batch: List[Any]):
+        snapshot_records = []
+        sketches = []
+        for kind, payload in batch:
+            if kind == 'snapshot':
+                snapshot_records.append(snapshot_to_record(payload))
+            elif kind == 'interval':
+                snapshot_records.append(interval_to_record(payload))
+            elif kind == 'sketches':
+                sketches.extend(payload)
+
+        # One transaction: a failed batch leaves no sketch merged
+        if snapshot_records or sketches:
+            self.db_manager.save_monitoring_batch(self.session_id, snapshot_records, sketches=sketches)
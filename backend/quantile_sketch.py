@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Streaming Quantile Sketches for Billing-Style Bandwidth Percentiles
+
+Uplink contracts are usually billed at the 95th percentile of throughput.
+Computing that exactly needs every sample of the billing period; instead we
+keep a KLL sketch per interface, direction and time bucket:
+
+1. KLLSketch: a compact, mergeable quantile summary (Karnin, Lang, Liberty)
+   with a bounded rank error that does not grow with the number of samples
+2. BandwidthQuantileTracker: maintains the sketches of the current hour
+   while the collector runs and hands over closed buckets for persistence
+
+Sketches of adjacent buckets merge into a sketch of the whole range, so the
+p95 of a month is answered by merging ~30 daily sketches instead of reading
+millions of raw snapshot rows.
+"""
+
+import json
+import math
+import random
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class KLLConfig:
+    """Configuration constants for quantile sketches."""
+
+    # Top-level compactor capacity: rank error is roughly 1.7 / K
+    DEFAULT_K = 256
+
+    # Capacity shrink factor for each lower level
+    CAPACITY_DECAY = 2.0 / 3.0
+
+    # Decimal places kept when serializing sketch items (Mbps values)
+    SERIALIZED_PRECISION = 4
+
+    # Bucket granularities persisted by the collector (seconds)
+    HOUR_BUCKET = 3600
+    DAY_BUCKET = 86400
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch.
+
+    Items are kept in a hierarchy of compactors; an item on level h stands
+    for 2**h original samples. When a level fills up it is sorted and every
+    other item (random offset) is promoted to the next level, halving its
+    size while keeping ranks unbiased.
+    """
+
+    def __init__(self, k: int = KLLConfig.DEFAULT_K, seed: Optional[int] = None):
+        """
+        Initialize an empty sketch.
+
+        Args:
+            k: Accuracy parameter (larger = more accurate and larger sketch)
+            seed: Optional seed for reproducible compaction
+        """
+        self.k = k
+        self.compactors: List[List[float]] = [[]]
+        self.count = 0
+        self.min_value = math.inf
+        self.max_value = -math.inf
+        self._rng = random.Random(seed)
+        self._size = 0
+        self._max_size = 0
+        self._update_max_size()
+
+    def _capacity(self, level: int) -> int:
+        """Capacity of a compactor level (top level has capacity ~k)."""
+        depth = len(self.compactors) - level - 1
+        return int(math.ceil(self.k * (KLLConfig.CAPACITY_DECAY ** depth))) + 1
+
+    def _update_max_size(self):
+        self._max_size = sum(self._capacity(level) for level in range(len(self.compactors)))
+
+    def update(self, value: float):
+        """Add one sample to the sketch."""
+        value = float(value)
+        self.compactors[0].append(value)
+        self.count += 1
+        self._size += 1
+        if value < self.min_value:
+            self.min_value = value
+        if value > self.max_value:
+            self.max_value = value
+
+        if self._size >= self._max_size:
+            self._compress()
+
+    def _compress(self):
+        """Compact full levels until the sketch fits its size budget."""
+        for level in range(len(self.compactors)):
+            if len(self.compactors[level]) < self._capacity(level):
+                continue
+
+            if level + 1 >= len(self.compactors):
+                self.compactors.append([])
+                self._update_max_size()
+
+            items = self.compactors[level]
+            items.sort()
+            leftover = [items.pop()] if len(items) % 2 else []
+            offset = 1 if self._rng.random() < 0.5 else 0
+            self.compactors[level + 1].extend(items[offset::2])
+            self.compactors[level] = leftover
+
+            self._size = sum(len(compactor) for compactor in self.compactors)
+            if self._size < self._max_size:
+                break
+
+    def merge(self, other: 'KLLSketch'):
+        """Merge another sketch into this one (in place)."""
+        if other.count == 0:
+            return
+
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append([])
+        self._update_max_size()
+
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+
+        self.count += other.count
+        self.min_value = min(self.min_value, other.min_value)
+        self.max_value = max(self.max_value, other.max_value)
+
+        self._size = sum(len(compactor) for compactor in self.compactors)
+        while self._size >= self._max_size:
+            self._compress()
+
+    def quantiles(self, fractions: Iterable[float]) -> List[Optional[float]]:
+        """
+        Estimate several quantiles in one pass.
+
+        Args:
+            fractions: Quantiles in [0, 1] (e.g. 0.95 for p95)
+
+        Returns:
+            Estimated values, or None for each fraction if the sketch is empty
+        """
+        fractions = list(fractions)
+        if self.count == 0:
+            return [None for _ in fractions]
+
+        weighted = sorted(
+            (value, 1 << level)
+            for level, items in enumerate(self.compactors)
+            for value in items
+        )
+        total_weight = sum(weight for _, weight in weighted)
+
+        results = []
+        for fraction in fractions:
+            if fraction <= 0:
+                results.append(self.min_value)
+                continue
+            if fraction >= 1:
+                results.append(self.max_value)
+                continue
+
+            target = fraction * total_weight
+            cumulative = 0
+            estimate = self.max_value
+            for value, weight in weighted:
+                cumulative += weight
+                if cumulative >= target:
+                    estimate = value
+                    break
+            results.append(estimate)
+
+        return results
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Estimate a single quantile (see quantiles())."""
+        return self.quantiles([fraction])[0]
+
+    def to_json(self) -> str:
+        """Serialize the sketch to compact JSON for database storage."""
+        precision = KLLConfig.SERIALIZED_PRECISION
+        return json.dumps({
+            'k': self.k,
+            'n': self.count,
+            'min': self.min_value if self.count else None,
+            'max': self.max_value if self.count else None,
+            'levels': [[round(value, precision) for value in items] for items in self.compactors]
+        }, separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, data: str) -> 'KLLSketch':
+        """Restore a sketch serialized with to_json()."""
+        state = json.loads(data)
+        sketch = cls(k=state['k'])
+        sketch.compactors = [list(items) for items in state['levels']] or [[]]
+        sketch.count = state['n']
+        if sketch.count:
+            sketch.min_value = state['min']
+            sketch.max_value = state['max']
+        sketch._size = sum(len(items) for items in sketch.compactors)
+        sketch._update_max_size()
+        return sketch
+
+
+# (interface, direction) -> sketch
+SketchKey = Tuple[str, str]
+
+
+class BandwidthQuantileTracker:
+    """
+    Maintains per-interface bandwidth sketches for the current hour bucket.
+
+    The collector calls record() on every tick. When a tick falls into a new
+    hour, the sketches of the previous hour are returned as closed buckets
+    so the caller can persist them; the tracker then starts fresh.
+    """
+
+    DIRECTIONS = ('upload', 'download')
+
+    def __init__(self, bucket_seconds: int = KLLConfig.HOUR_BUCKET, k: int = KLLConfig.DEFAULT_K):
+        self.bucket_seconds = bucket_seconds
+        self.k = k
+        self.bucket_start: Optional[int] = None
+        self.sketches: Dict[SketchKey, KLLSketch] = {}
+
+    def record(self, timestamp: float,
+               interface_rates: Dict[str, Tuple[float, float]]) -> List[Dict[str, Any]]:
+        """
+        Record one tick of bandwidth rates.
+
+        Args:
+            timestamp: Epoch seconds of the sample
+            interface_rates: interface -> (upload_mbps, download_mbps); use
+                             'all' for the aggregate across interfaces
+
+        Returns:
+            Closed buckets (see drain()) if this tick started a new bucket
+        """
+        bucket_start = int(timestamp) - int(timestamp) % self.bucket_seconds
+        closed = []
+        if self.bucket_start is not None and bucket_start != self.bucket_start:
+            closed = self.drain()
+        self.bucket_start = bucket_start
+
+        for interface, rates in interface_rates.items():
+            for direction, rate in zip(self.DIRECTIONS, rates):
+                key = (interface, direction)
+                sketch = self.sketches.get(key)
+                if sketch is None:
+                    sketch = self.sketches[key] = KLLSketch(k=self.k)
+                sketch.update(rate)
+
+        return closed
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """
+        Hand over all sketches of the current bucket and reset.
+
+        Returns:
+            List of dicts with interface, direction, bucket_start and sketch
+        """
+        closed = [
+            {
+                'interface': interface,
+                'direction': direction,
+                'bucket_start': self.bucket_start,
+                'sketch': sketch
+            }
+            for (interface, direction), sketch in self.sketches.items()
+            if sketch.count
+        ]
+        self.sketches = {}
+        return closed
+
+    def current_quantile(self, fraction: float, interface: str = 'all',
+                         direction: str = 'download') -> Optional[float]:
+        """Quantile of the in-memory (not yet persisted) bucket."""
+        sketch = self.sketches.get((interface, direction))
+        return sketch.quantile(fraction) if sketch else None
@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+"""
+Segment Supervisor - One collector process per network segment.
+
+A single monitoring process runs every stage under one GIL, which caps how
+many segments one gateway can watch. In supervisor mode every segment
+(VLAN) gets its own collector process, and the supervisor merges their
+results into site-wide snapshots:
+
+1. Each worker runs the regular ContinuousNetworkMonitorService for its
+   segment, on the shared wall-clock tick grid
+2. A ring sink packs every worker snapshot into fixed-size slots of a
+   multiprocessing.shared_memory ring (numbers only; nothing is pickled
+   after start-up)
+3. Slots are guarded by a sequence lock: the writer makes the slot's
+   sequence odd while writing and even when done, so readers detect
+   torn or overwritten slots instead of locking the writer out
+4. The supervisor reads the latest record of every ring on each tick and
+   merges them into a SiteSnapshot (totals, device-weighted latency and
+   loss, worst quality), restarting workers that die
+
+Collection work grows with the number of segments and is spread over as
+many processes; the aggregator only reads a few dozen bytes per segment
+per tick.
+
+Usage:
+    python segment_supervisor.py lan=192.168.1.0/24@eth0 iot=192.168.20.0/24@eth0.20
+    python segment_supervisor.py a=10.1.0.0/20 b=10.2.0.0/20 --simulate=2000   # Simulated segments
+
+    supervisor = SegmentSupervisor([SegmentSpec("lan", "192.168.1.0/24", ("eth0",))])
+    supervisor.start()
+    supervisor.latest_site_snapshot
+"""
+
+import multiprocessing
+import os
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# Local imports
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent))
+
+from monitoring_snapshot import QUALITY_LEVELS, QUALITY_CODES
+from persistence_pipeline import OutputSink
+from tick_scheduler import DeadlineScheduler
+from terminal_renderer import RenderConfig
+
+
+class SupervisorConfig:
+    """Configuration constants for multi-process collection."""
+
+    # Ring slots per segment (a minute of one-second ticks)
+    RING_SLOTS = 64
+
+    # Segment results older than this many intervals are not merged
+    STALE_INTERVALS = 3
+
+    # The aggregator runs this share of an interval after each tick, giving
+    # workers time to publish
+    AGGREGATION_DELAY = 0.3
+
+    # Site snapshots kept in memory
+    SITE_HISTORY = 3600
+
+    # Wait between restarts of a failed worker
+    RESTART_BACKOFF = 5.0
+
+    # How long a worker gets to stop cleanly before it is terminated
+    WORKER_STOP_TIMEOUT = 10.0
+
+
+# Ring layout: a 64-byte header, then fixed-size slots. Each slot is a
+# sequence word followed by one snapshot's numbers. The header also holds
+# the write count and a control word the supervisor sets to stop the
+# worker (plain memory, so a killed process can never leave it locked).
+# Sequence, count and control are aligned 64-bit words, written whole
+# through a 'Q' view (struct.pack_into would store them byte by byte).
+RING_MAGIC = b'NTRG'
+RING_LAYOUT_VERSION = 1
+RING_HEADER = struct.Struct('<4sHHIq')            # magic, layout, slot size, slots, started_ms
+RING_HEADER_SIZE = 64
+WORD_SIZE = 8
+WRITE_COUNT_WORD = 3
+CONTROL_WORD = 4
+CONTROL_STOP = 1
+SLOT_RECORD = struct.Struct('<qIdddddBB2x')       # timestamp, devices, rates, usage, latency, loss, quality, tested
+SLOT_SIZE = WORD_SIZE + SLOT_RECORD.size
+
+
+class SegmentRecord(NamedTuple):
+    """One worker snapshot as stored in the ring."""
+    timestamp_ms: int
+    device_count: int
+    total_upload_mbps: float
+    total_download_mbps: float
+    total_usage_mb: float
+    avg_latency_ms: float
+    avg_packet_loss: float
+    quality_code: int
+    tested: bool
+
+
+class SnapshotRing:
+    """
+    Single-writer ring of snapshot records in shared memory.
+
+    The writer never waits for readers; a reader that falls more than a
+    ring behind loses the overwritten records and is told how many.
+    """
+
+    def __init__(self, memory: shared_memory.SharedMemory, owner: bool):
+        self.memory = memory
+        self.owner = owner
+        self._buffer = memory.buf
+        self._words = memory.buf.cast('Q')
+        magic, layout, slot_size, slot_count, self.started_ms = RING_HEADER.unpack_from(self._buffer, 0)
+        if magic != RING_MAGIC or layout != RING_LAYOUT_VERSION or slot_size != SLOT_SIZE:
+            raise ValueError(f"{memory.name} is not a snapshot ring of this version")
+        self.slot_count = slot_count
+
+    @classmethod
+    def create(cls, slot_count: int = SupervisorConfig.RING_SLOTS, name: Optional[str] = None) -> 'SnapshotRing':
+        """Allocate a new ring (the creator unlinks it on close)."""
+        memory = shared_memory.SharedMemory(name=name, create=True, size=RING_HEADER_SIZE + slot_count * SLOT_SIZE)
+        memory.buf[:RING_HEADER_SIZE + slot_count * SLOT_SIZE] = bytes(RING_HEADER_SIZE + slot_count * SLOT_SIZE)
+        RING_HEADER.pack_into(memory.buf, 0, RING_MAGIC, RING_LAYOUT_VERSION, SLOT_SIZE, slot_count,
+                              int(time.time() * 1000))
+        return cls(memory, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> 'SnapshotRing':
+        """Open a ring created by another process."""
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    @property
+    def write_count(self) -> int:
+        """Records written since the ring was created."""
+        return self._words[WRITE_COUNT_WORD]
+
+    @property
+    def stop_requested(self) -> bool:
+        return self._words[CONTROL_WORD] == CONTROL_STOP
+
+    def request_stop(self):
+        """Ask the ring's writer to stop."""
+        self._words[CONTROL_WORD] = CONTROL_STOP
+
+    def _slot_offset(self, sequence: int) -> int:
+        return RING_HEADER_SIZE + (sequence % self.slot_count) * SLOT_SIZE
+
+    def write(self, record: SegmentRecord):
+        """Append a record (one writer per ring)."""
+        words = self._words
+        sequence = words[WRITE_COUNT_WORD]
+        offset = self._slot_offset(sequence)
+        word = offset // WORD_SIZE
+        words[word] = 2 * sequence + 1                  # Odd: being written
+        SLOT_RECORD.pack_into(self._buffer, offset + WORD_SIZE, *record)
+        words[word] = 2 * sequence + 2                  # Even: complete
+        words[WRITE_COUNT_WORD] = sequence + 1
+
+    def read(self, sequence: int) -> Optional[SegmentRecord]:
+        """
+        Read one record.
+
+        Returns:
+            The record, or None if it was overwritten or is being written
+        """
+        offset = self._slot_offset(sequence)
+        word = offset // WORD_SIZE
+        expected = 2 * sequence + 2
+        if self._words[word] != expected:
+            return None
+        fields = SLOT_RECORD.unpack_from(self._buffer, offset + WORD_SIZE)
+        if self._words[word] != expected:
+            return None  # Overwritten while we were reading
+        return SegmentRecord(*fields[:-1], bool(fields[-1]))
+
+    def read_latest(self) -> Optional[SegmentRecord]:
+        """The most recent complete record, if any."""
+        count = self.write_count
+        for sequence in range(count - 1, max(-1, count - 1 - self.slot_count), -1):
+            record = self.read(sequence)
+            if record is not None:
+                return record
+        return None
+
+    def read_since(self, next_sequence: int) -> Tuple[List[SegmentRecord], int, int]:
+        """
+        Records written since next_sequence.
+
+        Returns:
+            (records, records lost because they were overwritten, the
+            sequence to read from next time)
+        """
+        count = self.write_count
+        first = max(next_sequence, count - self.slot_count)
+        lost = first - next_sequence
+        records = []
+        for sequence in range(first, count):
+            record = self.read(sequence)
+            if record is None:
+                lost += 1
+            else:
+                records.append(record)
+        return records, lost, count
+
+    def close(self):
+        self._words.release()
+        self._buffer = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+class RingSink(OutputSink):
+    """Output sink packing every snapshot into a SnapshotRing."""
+
+    def __init__(self, ring: SnapshotRing, **queue_options):
+        # Records are tiny and the aggregator wants them at once
+        queue_options.setdefault('batch_size', 1)
+        super().__init__("ring", **queue_options)
+        self.ring = ring
+
+    def write_records(self, batch: List[Any]):
+        for snapshot in batch:
+            self.ring.write(SegmentRecord(
+                snapshot.timestamp_ms, snapshot.device_count,
+                snapshot.total_upload_mbps, snapshot.total_download_mbps, snapshot.total_usage_mb,
+                snapshot.avg_latency_ms, snapshot.avg_packet_loss, snapshot.quality_code,
+                snapshot.tested_device_ip is not None
+            ))
+
+
+@dataclass
+class SegmentSpec:
+    """A network segment and how to monitor it."""
+    name: str
+    network_range: str
+    interfaces: Optional[Tuple[str, ...]] = None   # Interfaces carrying the segment (None: all)
+    simulated_devices: int = 0                     # Simulate this many devices instead of measuring
+    seed: int = 1
+
+
+def _segment_backend(spec: SegmentSpec):
+    from network_backends import LiveBackend, SimulatedBackend, SimulationProfile
+
+    if spec.simulated_devices:
+        profile = SimulationProfile(device_count=spec.simulated_devices, network_range=spec.network_range,
+                                    seed=spec.seed, interfaces=spec.interfaces or (f"{spec.name}0",))
+        return SimulatedBackend(profile, speed=1.0)
+    return LiveBackend(interfaces=spec.interfaces)
+
+
+def run_segment_worker(spec: SegmentSpec, ring_name: str, monitoring_interval: float):
+    """
+    Collector process: monitor one segment and publish into its ring.
+
+    Runs until the supervisor requests a stop through the ring or goes
+    away. Exits with status 1 when the segment cannot be monitored (for
+    example when discovery finds no devices).
+    """
+    from continuous_monitor_service import ContinuousNetworkMonitorService
+
+    # Workers run headless; only the supervisor talks to the terminal
+    sys.stdout = open(os.devnull, 'w')
+
+    supervisor_pid = os.getppid()
+    ring = SnapshotRing.attach(ring_name)
+    service = ContinuousNetworkMonitorService(
+        monitoring_interval=monitoring_interval,
+        enable_traffic_accounting=False,  # One conntrack reader per site, not per segment
+        render_mode=RenderConfig.HEADLESS,
+        output_sinks=[RingSink(ring)],
+        network_backend=_segment_backend(spec),
+        network_range=spec.network_range
+    )
+
+    started = service.start()
+    try:
+        while (started and service.is_running and not ring.stop_requested
+               and os.getppid() == supervisor_pid):
+            time.sleep(0.2)
+    finally:
+        if started:
+            service.stop()
+        ring.close()
+    sys.exit(0 if started else 1)
+
+
+class SiteSnapshot:
+    """One aggregator tick: every segment's latest record and the site totals."""
+
+    __slots__ = (
+        'timestamp_ms', 'segments', 'device_count', 'total_upload_mbps', 'total_download_mbps',
+        'total_usage_mb', 'avg_latency_ms', 'avg_packet_loss', 'quality_code'
+    )
+
+    def __init__(self, timestamp_ms: int, segments: Dict[str, Optional[SegmentRecord]]):
+        """
+        Merge segment records.
+
+        Args:
+            timestamp_ms: Aggregation time
+            segments: Latest record per segment (None when stale or missing)
+        """
+        self.timestamp_ms = timestamp_ms
+        self.segments = segments
+        reporting = [record for record in segments.values() if record is not None]
+        devices = sum(record.device_count for record in reporting)
+        self.device_count = devices
+        self.total_upload_mbps = sum(record.total_upload_mbps for record in reporting)
+        self.total_download_mbps = sum(record.total_download_mbps for record in reporting)
+        self.total_usage_mb = sum(record.total_usage_mb for record in reporting)
+
+        # Latency and loss weighted by the devices behind them
+        weight = devices or len(reporting) or 1
+        share = (lambda record: record.device_count) if devices else (lambda record: 1)
+        self.avg_latency_ms = sum(record.avg_latency_ms * share(record) for record in reporting) / weight
+        self.avg_packet_loss = sum(record.avg_packet_loss * share(record) for record in reporting) / weight
+
+        # The site is only as good as its worst segment
+        self.quality_code = max((record.quality_code for record in reporting), default=QUALITY_CODES["Excellent"])
+
+    @property
+    def timestamp(self) -> str:
+        return datetime.fromtimestamp(self.timestamp_ms / 1000).isoformat()
+
+    @property
+    def overall_quality(self) -> str:
+        return QUALITY_LEVELS[self.quality_code]
+
+    @property
+    def segments_reporting(self) -> int:
+        return sum(1 for record in self.segments.values() if record is not None)
+
+    def __repr__(self) -> str:
+        return (f"SiteSnapshot(timestamp_ms={self.timestamp_ms}, segments={self.segments_reporting}/"
+                f"{len(self.segments)}, devices={self.device_count}, download={self.total_download_mbps:.2f}, "
+                f"quality={self.overall_quality!r})")
+
+
+class _Segment:
+    """Supervisor-side state of one segment."""
+
+    def __init__(self, spec: SegmentSpec, ring: SnapshotRing):
+        self.spec = spec
+        self.ring = ring
+        self.process: Optional[multiprocessing.Process] = None
+        self.next_sequence = 0
+        self.records_read = 0
+        self.records_lost = 0
+        self.restarts = 0
+        self.last_start = 0.0
+        self.latest: Optional[SegmentRecord] = None
+
+
+class SegmentSupervisor:
+    """
+    Runs one collector process per segment and aggregates their rings.
+
+    Workers are started with the 'spawn' method, so they do not inherit
+    the supervisor's threads or locks.
+    """
+
+    def __init__(self, segments: List[SegmentSpec], monitoring_interval: float = 1.0,
+                 ring_slots: int = SupervisorConfig.RING_SLOTS,
+                 history_size: int = SupervisorConfig.SITE_HISTORY):
+        """
+        Initialize the supervisor.
+
+        Args:
+            segments: Segments to monitor (names must be unique)
+            monitoring_interval: Tick interval of workers and aggregator
+            ring_slots: Records kept per segment ring
+            history_size: Site snapshots kept in memory
+        """
+        names = [spec.name for spec in segments]
+        if len(set(names)) != len(names):
+            raise ValueError("Segment names must be unique")
+        self.monitoring_interval = monitoring_interval
+        self.ring_slots = ring_slots
+        self.specs = list(segments)
+        self.segments: Dict[str, _Segment] = {}
+        self.site_snapshots: deque = deque(maxlen=history_size)
+        self.latest_site_snapshot: Optional[SiteSnapshot] = None
+        self.is_running = False
+
+        self.scheduler = DeadlineScheduler(monitoring_interval)
+        self._context = multiprocessing.get_context('spawn')
+        self._stopping = False
+        self._aggregator: Optional[threading.Thread] = None
+
+    def start(self):
+        """Create the rings, start the workers and the aggregator."""
+        if self.is_running:
+            return
+        self._stopping = False
+        for spec in self.specs:
+            segment = _Segment(spec, SnapshotRing.create(self.ring_slots))
+            self.segments[spec.name] = segment
+            self._start_worker(segment)
+        self.is_running = True
+        self._aggregator = threading.Thread(target=self._aggregate_loop, name="aggregator", daemon=True)
+        self._aggregator.start()
+
+    def _start_worker(self, segment: _Segment):
+        segment.last_start = time.monotonic()
+        segment.process = self._context.Process(
+            target=run_segment_worker,
+            args=(segment.spec, segment.ring.name, self.monitoring_interval),
+            name=f"segment-{segment.spec.name}",
+            daemon=True
+        )
+        segment.process.start()
+
+    def stop(self):
+        """Stop the workers (they flush their own outputs) and free the rings."""
+        if not self.is_running:
+            return
+        self.is_running = False
+        self._stopping = True
+        self.scheduler.stop()
+        if self._aggregator:
+            self._aggregator.join()
+        for segment in self.segments.values():
+            segment.ring.request_stop()
+
+        deadline = time.monotonic() + SupervisorConfig.WORKER_STOP_TIMEOUT
+        for segment in self.segments.values():
+            process = segment.process
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        for segment in self.segments.values():
+            segment.ring.close()
+
+    def _aggregate_loop(self):
+        """Merge the latest segment records once per tick."""
+        delay = self.monitoring_interval * SupervisorConfig.AGGREGATION_DELAY
+        for tick in self.scheduler.ticks(initial_delay=delay):
+            self.aggregate(int((tick.scheduled_time - delay) * 1000))
+            self._restart_failed_workers()
+
+    def aggregate(self, timestamp_ms: Optional[int] = None) -> SiteSnapshot:
+        """
+        Read every ring and build a site snapshot.
+
+        Args:
+            timestamp_ms: Time the snapshot stands for (defaults to now)
+        """
+        if timestamp_ms is None:
+            timestamp_ms = int(time.time() * 1000)
+        stale_before = timestamp_ms - SupervisorConfig.STALE_INTERVALS * self.monitoring_interval * 1000
+
+        latest: Dict[str, Optional[SegmentRecord]] = {}
+        for name, segment in self.segments.items():
+            records, lost, segment.next_sequence = segment.ring.read_since(segment.next_sequence)
+            segment.records_read += len(records)
+            segment.records_lost += lost
+            if records:
+                segment.latest = records[-1]
+            fresh = segment.latest is not None and segment.latest.timestamp_ms >= stale_before
+            latest[name] = segment.latest if fresh else None
+
+        snapshot = SiteSnapshot(timestamp_ms, latest)
+        self.site_snapshots.append(snapshot)
+        self.latest_site_snapshot = snapshot
+        return snapshot
+
+    def _restart_failed_workers(self):
+        if self._stopping:
+            return
+        for segment in self.segments.values():
+            process = segment.process
+            if process.is_alive() or time.monotonic() - segment.last_start < SupervisorConfig.RESTART_BACKOFF:
+                continue
+            process.join()
+            segment.restarts += 1
+            print(f"⚠️ Segment {segment.spec.name} worker exited ({process.exitcode}); restarting")
+            self._start_worker(segment)
+
+    def get_recent_site_snapshots(self, count: int = 10) -> List[SiteSnapshot]:
+        return list(self.site_snapshots)[-count:]
+
+    def get_status(self) -> Dict[str, Any]:
+        """Per-segment worker and ring state."""
+        return {
+            'is_running': self.is_running,
+            'monitoring_interval': self.monitoring_interval,
+            'site_snapshots': len(self.site_snapshots),
+            'segments': {
+                name: {
+                    'network_range': segment.spec.network_range,
+                    'pid': segment.process.pid if segment.process else None,
+                    'alive': bool(segment.process and segment.process.is_alive()),
+                    'restarts': segment.restarts,
+                    'records_written': segment.ring.write_count if self.is_running else None,
+                    'records_read': segment.records_read,
+                    'records_lost': segment.records_lost
+                }
+                for name, segment in self.segments.items()
+            }
+        }
+
+
+def segment_specs_from_args(args: List[str]) -> List[SegmentSpec]:
+    """Parse NAME=RANGE[@IFACE[,IFACE...]] arguments (plus --simulate=N)."""
+    simulated = 0
+    for arg in args:
+        if arg.startswith('--simulate='):
+            simulated = int(arg.split('=', 1)[1])
+
+    specs = []
+    for arg in args:
+        if arg.startswith('--') or '=' not in arg:
+            continue
+        name, target = arg.split('=', 1)
+        network_range, _, interfaces = target.partition('@')
+        specs.append(SegmentSpec(name, network_range, tuple(interfaces.split(',')) if interfaces else None,
+                                 simulated_devices=simulated, seed=len(specs) + 1))
+    return specs
+
+
+def main():
+    """Run the supervisor until interrupted, printing the site totals."""
+    print("🌐 Network Monitoring Supervisor")
+    print("================================")
+
+    specs = segment_specs_from_args(sys.argv[1:])
+    if not specs:
+        print("Usage: segment_supervisor.py NAME=RANGE[@IFACE,...] ... [--simulate=N]")
+        return 1
+
+    supervisor = SegmentSupervisor(specs)
+    supervisor.start()
+    print(f"🚀 {len(specs)} segment workers on {os.cpu_count()} cores: {', '.join(spec.name for spec in specs)}")
+    try:
+        shown = None
+        while True:
+            time.sleep(0.2)
+            snapshot = supervisor.latest_site_snapshot
+            if snapshot is not None and snapshot is not shown:
+                shown = snapshot
+                print(f"\r🏢 {snapshot.segments_reporting}/{len(specs)} segments | "
+                      f"📱 {snapshot.device_count} devices | "
+                      f"⬆️ {snapshot.total_upload_mbps:.2f} ⬇️ {snapshot.total_download_mbps:.2f} Mbps | "
+                      f"🎯 {snapshot.overall_quality}   ", end="", flush=True)
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping segment workers...")
+    finally:
+        supervisor.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Service Checkpoint - Warm restarts for the continuous monitoring service.
+
+A cold start has to sweep the whole subnet before the first snapshot, and
+a restart loses the probe rotation, the rate counters and the session
+aggregates. This module saves that state to a small local file so a
+restarted service can tick immediately:
+
+1. Atomic writes: temporary file, fsync, os.replace (a crash never leaves
+   a half-written checkpoint behind)
+2. Validation on load: format version, network range and maximum age,
+   with any unreadable file treated as "no checkpoint"
+3. Rate counter hand-over: interface counters from a clean shutdown are
+   reused when the host has not rebooted and the gap is short, so the
+   first rate after a restart covers the downtime instead of dropping it
+
+Usage:
+    save_checkpoint("monitor_checkpoint.json", state)
+    state = load_checkpoint("monitor_checkpoint.json", network_range="192.168.1.0/24")
+"""
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import psutil
+
+
+class CheckpointConfig:
+    """Configuration constants for service checkpoints."""
+
+    DEFAULT_PATH = "monitor_checkpoint.json"
+
+    # Seconds between periodic checkpoints
+    SAVE_INTERVAL = 30.0
+
+    # Checkpoints older than this are ignored (the device list is too stale)
+    MAX_AGE = 6 * 3600
+
+    # Longest gap across which interface counters are reused for rates
+    MAX_RATE_GAP = 300
+
+    FORMAT_VERSION = 1
+
+
+def save_checkpoint(path: str, state: Dict[str, Any]):
+    """
+    Atomically write a checkpoint file.
+
+    Args:
+        path: Checkpoint file path
+        state: JSON-serializable service state
+    """
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    payload = dict(state)
+    payload['version'] = CheckpointConfig.FORMAT_VERSION
+    payload['saved_at'] = time.time()
+    payload['boot_time'] = psutil.boot_time()
+    data = json.dumps(payload, separators=(',', ':'), default=str).encode('utf-8')
+
+    fd, temp_path = tempfile.mkstemp(prefix=f".{target.name}.", dir=str(target.parent))
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            temp_file.write(data)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_path, target)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+    # Make the rename itself durable
+    try:
+        dir_fd = os.open(str(target.parent), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass  # Not supported on every platform/filesystem
+
+
+def load_checkpoint(path: str, network_range: Optional[str] = None,
+                    max_age: float = CheckpointConfig.MAX_AGE) -> Optional[Dict[str, Any]]:
+    """
+    Load a checkpoint if it is usable.
+
+    Args:
+        path: Checkpoint file path
+        network_range: Expected network range (a checkpoint for another
+                       network is ignored)
+        max_age: Maximum checkpoint age in seconds
+
+    Returns:
+        Checkpoint state (with an 'age_seconds' entry), or None if the file
+        is missing, unreadable, from another version or network, or too old
+    """
+    try:
+        with open(path, 'rb') as checkpoint_file:
+            state = json.loads(checkpoint_file.read().decode('utf-8'))
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(state, dict) or state.get('version') != CheckpointConfig.FORMAT_VERSION:
+        return None
+    if network_range and state.get('network_range') != network_range:
+        return None
+
+    age = time.time() - state.get('saved_at', 0)
+    if age < 0 or age > max_age:
+        return None
+
+    state['age_seconds'] = age
+    return state
+
+
+def restore_interface_counters(state: Dict[str, Any],
+                               max_gap: float = CheckpointConfig.MAX_RATE_GAP) -> Dict[str, Dict]:
+    """
+    Interface counters from a checkpoint, rebased onto this process's clock.
+
+    Counters are only valid across a restart of the service, not a reboot
+    of the host, and only across a short gap. Periodic checkpoints are
+    not used: ticks after the checkpoint already counted those bytes, so
+    only the final checkpoint of a clean shutdown hands counters over.
+
+    Returns:
+        Interface stats usable as the previous sample, or {} to re-baseline
+    """
+    counters = state.get('interface_counters') or {}
+    age = state.get('age_seconds', max_gap + 1)
+    if not counters or age > max_gap or not state.get('clean_shutdown'):
+        return {}
+    if abs(state.get('boot_time', 0) - psutil.boot_time()) > 1:
+        return {}  # Host rebooted: counters started again from zero
+
+    # Re-express each sample time on this process's monotonic clock
+    wall_now, mono_now = time.time(), time.monotonic()
+    restored = {}
+    for interface, stats in counters.items():
+        stats = dict(stats)
+        stats['sampled_at'] = mono_now - (wall_now - stats.get('timestamp', wall_now - age))
+        restored[interface] = stats
+    return restored
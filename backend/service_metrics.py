@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Service Metrics - Prometheus-format instrumentation for the collector.
+
+To see where the collector's time goes without slowing it down, this
+module keeps recording off any shared lock:
+
+1. Histograms recorded from hot paths are sharded per thread: each thread
+   writes only to its own shard, so observe() takes no lock
+2. Histograms that a single thread already maintains (scheduler, stage,
+   writer and render timings) are attached as-is - no extra recording cost
+3. Counts, queue depths and memory are read through callbacks only when
+   the endpoint is scraped
+4. A small HTTP server on localhost serves everything in the Prometheus
+   text exposition format at /metrics
+
+Usage:
+    metrics = MetricsRegistry()
+    metrics.observe('bandwidth', 0.0004)                 # Hot path, lock-free
+    metrics.attach_histogram('tick', scheduler.durations)
+    metrics.register_gauge('persistence_queue_depth', "Queued records", lambda: queue.queue_depth)
+    server = MetricsServer(metrics, port=9108)
+    server.start()                                       # curl localhost:9108/metrics
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+import psutil
+
+from tick_scheduler import TimingHistogram, SchedulerConfig
+
+
+class MetricsConfig:
+    """Configuration constants for the metrics endpoint."""
+
+    # Localhost only: the endpoint is for a local scraper or an operator
+    DEFAULT_HOST = '127.0.0.1'
+    DEFAULT_PORT = 9108
+
+    # Prefix for every exported metric name
+    NAMESPACE = 'network_monitor'
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_value(value: float) -> str:
+    """Prometheus sample value formatting."""
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """
+    Collects stage timings, counters and gauges for exposition.
+
+    Stage duration histograms are exported as one metric family,
+    <namespace>_stage_duration_seconds, labelled by stage.
+    """
+
+    def __init__(self, namespace: str = MetricsConfig.NAMESPACE,
+                 bounds: Tuple[float, ...] = SchedulerConfig.HISTOGRAM_BOUNDS):
+        self.namespace = namespace
+        self.bounds = bounds
+
+        # Per-thread shards: stage -> histograms (one per recording thread)
+        self._local = threading.local()
+        self._histogram_shards: Dict[str, List[TimingHistogram]] = {}
+        self._counter_shards: List[Dict[str, float]] = []
+        self._registration_lock = threading.Lock()   # Only taken when a thread records for the first time
+
+        self._attached: Dict[Tuple[str, str], TimingHistogram] = {}      # (family, stage) -> histogram
+        self._gauges: Dict[str, Tuple[str, str, Callable[[], float]]] = {}  # name -> (type, help, fn)
+        self._counter_help: Dict[str, str] = {}
+
+    # Recording path (hot, lock-free after the first call per thread)
+
+    def observe(self, stage: str, seconds: float):
+        """Record one duration for a stage."""
+        shards = getattr(self._local, 'histograms', None)
+        if shards is None:
+            shards = self._local.histograms = {}
+        histogram = shards.get(stage)
+        if histogram is None:
+            histogram = shards[stage] = TimingHistogram(self.bounds)
+            with self._registration_lock:
+                self._histogram_shards.setdefault(stage, []).append(histogram)
+        histogram.observe(seconds)
+
+    def inc(self, name: str, amount: float = 1):
+        """Increment a counter."""
+        counters = getattr(self._local, 'counters', None)
+        if counters is None:
+            counters = self._local.counters = {}
+            with self._registration_lock:
+                self._counter_shards.append(counters)
+        counters[name] = counters.get(name, 0) + amount
+
+    # Registration
+
+    def describe_counter(self, name: str, help_text: str):
+        """Set the HELP text of a counter recorded with inc()."""
+        self._counter_help[name] = help_text
+
+    def attach_histogram(self, stage: str, histogram: TimingHistogram, family: str = 'stage_duration_seconds'):
+        """Export a histogram maintained elsewhere (written by a single thread)."""
+        self._attached[(family, stage)] = histogram
+
+    def register_gauge(self, name: str, help_text: str, fn: Callable[[], float]):
+        """Export a value read at scrape time."""
+        self._gauges[name] = ('gauge', help_text, fn)
+
+    def register_counter(self, name: str, help_text: str, fn: Callable[[], float]):
+        """Export a monotonically increasing value read at scrape time."""
+        self._gauges[name] = ('counter', help_text, fn)
+
+    # Exposition
+
+    def _merged_histograms(self) -> Dict[str, Dict[str, TimingHistogram]]:
+        """family -> stage -> merged histogram."""
+        families: Dict[str, Dict[str, TimingHistogram]] = {}
+
+        with self._registration_lock:
+            sharded = {stage: list(shards) for stage, shards in self._histogram_shards.items()}
+        for stage, shards in sharded.items():
+            merged = TimingHistogram(self.bounds)
+            for shard in shards:
+                merged.counts = [a + b for a, b in zip(merged.counts, shard.counts)]
+                merged.count += shard.count
+                merged.total += shard.total
+            families.setdefault('stage_duration_seconds', {})[stage] = merged
+
+        for (family, stage), histogram in list(self._attached.items()):
+            families.setdefault(family, {})[stage] = histogram
+
+        return families
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        prefix = self.namespace
+
+        for family, stages in sorted(self._merged_histograms().items()):
+            name = f"{prefix}_{family}"
+            lines.append(f"# HELP {name} Timing histogram by pipeline stage.")
+            lines.append(f"# TYPE {name} histogram")
+            for stage, histogram in sorted(stages.items()):
+                counts = list(histogram.counts)  # Copy: the owning thread keeps writing
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.bounds, counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                cumulative += counts[-1]
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {cumulative}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {_format_value(histogram.total)}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {cumulative}')
+
+        with self._registration_lock:
+            shards = list(self._counter_shards)
+        counters: Dict[str, float] = {}
+        for shard in shards:
+            for counter, value in list(shard.items()):
+                counters[counter] = counters.get(counter, 0) + value
+        for counter in set(self._counter_help) - set(counters):
+            counters[counter] = 0
+        for counter, value in sorted(counters.items()):
+            name = f"{prefix}_{counter}"
+            lines.append(f"# HELP {name} {self._counter_help.get(counter, counter)}")
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {_format_value(value)}")
+
+        for metric, (metric_type, help_text, fn) in sorted(self._gauges.items()):
+            try:
+                value = fn()
+            except Exception:
+                continue  # A failing callback must not break the scrape
+            if value is None:
+                continue
+            name = f"{prefix}_{metric}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.append(f"{name} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def register_process_metrics(self):
+        """Export resident memory and CPU time of this process."""
+        process = psutil.Process()
+        self.register_gauge('process_resident_memory_bytes', "Resident set size in bytes.",
+                            lambda: process.memory_info().rss)
+        self.register_counter('process_cpu_seconds_total', "User and system CPU time in seconds.",
+                              lambda: sum(process.cpu_times()[:2]))
+        self.register_gauge('process_threads', "Number of OS threads.", process.num_threads)
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Serves GET /metrics from the server's registry."""
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404, "Only /metrics is served")
+            return
+
+        body = self.server.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', MetricsConfig.CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood the terminal
+
+
+class MetricsServer:
+    """Background HTTP server exposing a MetricsRegistry."""
+
+    def __init__(self, registry: MetricsRegistry, host: str = MetricsConfig.DEFAULT_HOST,
+                 port: int = MetricsConfig.DEFAULT_PORT):
+        """
+        Initialize the server.
+
+        Args:
+            registry: Metrics to serve
+            host: Address to bind (localhost by default)
+            port: Port to bind (0 picks a free port)
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> int:
+        """
+        Bind and serve in a daemon thread.
+
+        Returns:
+            The bound port
+
+        Raises:
+            OSError: If the address cannot be bound
+        """
+        self._server = ThreadingHTTPServer((self.host, self.port), _MetricsRequestHandler)
+        self._server.daemon_threads = True
+        self._server.registry = self.registry
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+        return self.port
+
+    def stop(self):
+        """Stop serving and release the port."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/metrics"
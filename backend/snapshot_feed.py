@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Snapshot Feed - Live snapshots and device events for local subscribers.
+
+Dashboards used to poll get_recent_snapshots(), which queries and sorts
+network_snapshots on every call. The feed pushes instead: it is an output
+sink that publishes every snapshot, and every device joining or leaving,
+to any number of local subscribers without touching the database.
+
+1. Subscribers connect to a UNIX stream socket and receive length-prefixed
+   frames: a 5-byte header (payload length, frame type) and a compact JSON
+   payload. Browsers can use Server-Sent Events on localhost instead
+2. A new subscriber first gets a hello frame with the current devices and
+   the latest snapshot, then every update
+3. Each frame is encoded once and appended to every subscriber's bounded
+   output buffer; one selector thread writes the buffers out without
+   ever blocking on a subscriber
+4. A subscriber whose buffer would overflow is too slow to keep up and is
+   disconnected (evicted) instead of holding memory or the other
+   subscribers back
+
+Frame types: hello, snapshot, device_joined, device_left.
+
+Usage:
+    feed = SnapshotFeed("/run/netmon-feed.sock", http_port=9109)
+    service = ContinuousNetworkMonitorService(output_sinks=[feed])
+
+    for kind, payload in read_frames(connect_feed("/run/netmon-feed.sock")):
+        ...                                             # Subscriber side
+    curl -N http://127.0.0.1:9109/events                # Server-Sent Events
+"""
+
+import json
+import os
+import selectors
+import socket
+import struct
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from persistence_pipeline import OutputSink
+from output_sinks import snapshot_to_dict, _sink_queue_options
+
+
+class FeedConfig:
+    """Configuration constants for the snapshot feed."""
+
+    DEFAULT_SOCKET_PATH = "/tmp/network-monitor-feed.sock"
+    DEFAULT_HTTP_PORT = 9109
+
+    # Unsent data allowed per subscriber before it is evicted (about a
+    # minute of snapshots at one per second)
+    SUBSCRIBER_BUFFER_BYTES = 256 * 1024
+
+    # Connections beyond this are refused
+    MAX_SUBSCRIBERS = 64
+
+    # Largest HTTP request accepted from an event-stream client
+    MAX_REQUEST_BYTES = 8192
+
+    # Bytes handed to the kernel per send call
+    SEND_CHUNK_BYTES = 64 * 1024
+
+
+FRAME_HEADER = struct.Struct('!IB')   # Payload length, frame type
+FRAME_TYPES = {'hello': 1, 'snapshot': 2, 'device_joined': 3, 'device_left': 4}
+FRAME_NAMES = {code: name for name, code in FRAME_TYPES.items()}
+
+
+def device_to_dict(device: Dict[str, Any]) -> Dict[str, Any]:
+    """Identity fields of a device, as published in device events."""
+    return {
+        'ip': device.get('ip'),
+        'mac_address': device.get('mac_address'),
+        'hostname': device.get('hostname')
+    }
+
+
+def _payload_json(payload: Dict[str, Any]) -> bytes:
+    return json.dumps(payload, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def encode_frame(kind: str, payload: Dict[str, Any]) -> bytes:
+    """Length-prefixed frame for stream socket subscribers."""
+    data = _payload_json(payload)
+    return FRAME_HEADER.pack(len(data), FRAME_TYPES[kind]) + data
+
+
+def encode_event(kind: str, payload: Dict[str, Any]) -> bytes:
+    """Server-Sent Events message for HTTP subscribers."""
+    return b'event: ' + kind.encode('ascii') + b'\ndata: ' + _payload_json(payload) + b'\n\n'
+
+
+def connect_feed(socket_path: str = FeedConfig.DEFAULT_SOCKET_PATH, timeout: Optional[float] = None) -> socket.socket:
+    """Connect a subscriber to the feed's UNIX socket."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    sock.connect(socket_path)
+    return sock
+
+
+def read_frames(sock: socket.socket) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (frame type, payload) until the feed closes the connection."""
+    buffer = bytearray()
+    while True:
+        while len(buffer) >= FRAME_HEADER.size:
+            length, code = FRAME_HEADER.unpack_from(buffer)
+            end = FRAME_HEADER.size + length
+            if len(buffer) < end:
+                break
+            payload = json.loads(bytes(buffer[FRAME_HEADER.size:end]))
+            del buffer[:end]
+            yield FRAME_NAMES.get(code, str(code)), payload
+        data = sock.recv(65536)
+        if not data:
+            return
+        buffer += data
+
+
+class _Subscriber:
+    """One connection and its pending output."""
+
+    __slots__ = ('sock', 'http', 'ready', 'request', 'outbox', 'frames_sent', 'bytes_sent', 'connected_at')
+
+    def __init__(self, sock: socket.socket, http: bool):
+        self.sock = sock
+        self.http = http
+        self.ready = not http           # HTTP clients subscribe once their request is read
+        self.request = bytearray()
+        self.outbox = bytearray()
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.connected_at = time.monotonic()
+
+
+class SnapshotFeed(OutputSink):
+    """
+    Publishes snapshots and device events to local subscribers.
+
+    The sink's writer thread encodes frames and queues them per
+    subscriber; a selector thread accepts connections and writes the
+    queued data out.
+    """
+
+    def __init__(self, socket_path: Optional[str] = FeedConfig.DEFAULT_SOCKET_PATH,
+                 http_port: Optional[int] = None,
+                 buffer_bytes: int = FeedConfig.SUBSCRIBER_BUFFER_BYTES,
+                 max_subscribers: int = FeedConfig.MAX_SUBSCRIBERS,
+                 name: str = "feed", **queue_options):
+        """
+        Initialize the feed.
+
+        Args:
+            socket_path: UNIX socket for framed subscribers (None disables)
+            http_port: Serve Server-Sent Events on localhost at this port
+                       (None disables; 0 picks a free port)
+            buffer_bytes: Unsent bytes allowed per subscriber before eviction
+            max_subscribers: Connections accepted at most
+            name: Sink name
+            **queue_options: Overrides for the sink's queue sizing
+        """
+        # Publish every snapshot as soon as it arrives
+        queue_options.setdefault('batch_size', 1)
+        super().__init__(name, **_sink_queue_options(queue_options))
+        self.socket_path = socket_path
+        self.http_port = http_port
+        self.buffer_bytes = buffer_bytes
+        self.max_subscribers = max_subscribers
+
+        # Statistics
+        self.frames_published = 0
+        self.subscribers_total = 0
+        self.evictions = 0
+        self.refused = 0
+
+        self._subscribers: Dict[socket.socket, _Subscriber] = {}
+        self._lock = threading.Lock()
+        self._selector: Optional[selectors.DefaultSelector] = None
+        self._listeners: List[socket.socket] = []
+        self._wake_reader: Optional[socket.socket] = None
+        self._wake_writer: Optional[socket.socket] = None
+        self._server_thread: Optional[threading.Thread] = None
+        self._serving = False
+
+        # State sent to new subscribers
+        self._device_set = None
+        self._latest_snapshot: Optional[Dict[str, Any]] = None
+
+    def start(self):
+        """Open the listening sockets, then start the writer."""
+        if not self._serving:
+            self._open_server()
+        super().start()
+
+    def _open_server(self):
+        self._selector = selectors.DefaultSelector()
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)  # Left over from an earlier run
+            listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            listener.bind(self.socket_path)
+            self._add_listener(listener, http=False)
+        if self.http_port is not None:
+            listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            listener.bind(('127.0.0.1', self.http_port))
+            self.http_port = listener.getsockname()[1]
+            self._add_listener(listener, http=True)
+
+        self._wake_reader, self._wake_writer = socket.socketpair()
+        self._wake_reader.setblocking(False)
+        self._wake_writer.setblocking(False)
+        self._selector.register(self._wake_reader, selectors.EVENT_READ, 'wake')
+
+        self._serving = True
+        self._server_thread = threading.Thread(target=self._serve, name=f"{self.name}-server", daemon=True)
+        self._server_thread.start()
+
+    def _add_listener(self, listener: socket.socket, http: bool):
+        listener.listen(self.max_subscribers)
+        listener.setblocking(False)
+        self._listeners.append(listener)
+        self._selector.register(listener, selectors.EVENT_READ, ('listener', http))
+
+    def close(self):
+        """Disconnect every subscriber and remove the socket."""
+        if not self._serving:
+            return
+        self._serving = False
+        self._wake()
+        self._server_thread.join()
+        for subscriber in list(self._subscribers.values()):
+            subscriber.sock.close()
+        self._subscribers.clear()
+        for listener in self._listeners:
+            listener.close()
+        self._listeners.clear()
+        self._wake_reader.close()
+        self._wake_writer.close()
+        self._selector.close()
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    # Publishing (writer thread)
+
+    def write_records(self, batch: List[Any]):
+        for snapshot in batch:
+            messages = self._device_events(snapshot.device_set)
+            snapshot_data = snapshot_to_dict(snapshot)
+            messages.append(('snapshot', snapshot_data))
+            with self._lock:
+                self._latest_snapshot = snapshot_data
+            self.publish(messages)
+
+    def _device_events(self, device_set) -> List[Tuple[str, Dict[str, Any]]]:
+        """device_joined/device_left messages for a change of device set."""
+        previous = self._device_set
+        if device_set is previous:
+            return []
+        with self._lock:
+            self._device_set = device_set
+        if previous is None:
+            return []  # First snapshot: subscribers get the devices in their hello
+
+        events = []
+        for device in device_set.devices:
+            if device['ip'] not in previous.ips:
+                events.append(('device_joined', device_to_dict(device)))
+        for device in previous.devices:
+            if device['ip'] not in device_set.ips:
+                events.append(('device_left', device_to_dict(device)))
+        return events
+
+    def publish(self, messages: List[Tuple[str, Dict[str, Any]]]):
+        """Queue messages for every subscriber (each encoded once per format)."""
+        if not messages:
+            return
+        framed = b''.join(encode_frame(kind, payload) for kind, payload in messages)
+        events = None
+        with self._lock:
+            for subscriber in list(self._subscribers.values()):
+                if not subscriber.ready:
+                    continue
+                if subscriber.http:
+                    if events is None:
+                        events = b''.join(encode_event(kind, payload) for kind, payload in messages)
+                    data = events
+                else:
+                    data = framed
+                if len(subscriber.outbox) + len(data) > self.buffer_bytes:
+                    self._evict(subscriber)
+                    continue
+                subscriber.outbox += data
+                subscriber.frames_sent += len(messages)
+            self.frames_published += len(messages)
+        self._wake()
+
+    def _hello(self) -> Dict[str, Any]:
+        device_set = self._device_set
+        return {
+            'devices': [device_to_dict(device) for device in device_set.devices] if device_set else [],
+            'device_set_version': device_set.version if device_set else 0,
+            'snapshot': self._latest_snapshot
+        }
+
+    def _wake(self):
+        try:
+            self._wake_writer.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass  # Already pending, or closed during shutdown
+
+    # Serving (selector thread)
+
+    def _serve(self):
+        while self._serving:
+            for key, events in self._selector.select(timeout=1.0):
+                tag = key.data
+                if tag == 'wake':
+                    try:
+                        while self._wake_reader.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                elif isinstance(tag, tuple):
+                    self._accept(key.fileobj, http=tag[1])
+                else:
+                    subscriber = tag
+                    if events & selectors.EVENT_READ:
+                        self._on_readable(subscriber)
+                    if events & selectors.EVENT_WRITE:
+                        self._send(subscriber)
+            self._update_interest()
+
+    def _accept(self, listener: socket.socket, http: bool):
+        try:
+            sock, _address = listener.accept()
+        except (BlockingIOError, OSError):
+            return
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                self.refused += 1
+                sock.close()
+                return
+            sock.setblocking(False)
+            subscriber = _Subscriber(sock, http)
+            self._subscribers[sock] = subscriber
+            self.subscribers_total += 1
+            if not http:
+                subscriber.outbox += encode_frame('hello', self._hello())
+        self._selector.register(sock, selectors.EVENT_READ, subscriber)
+
+    def _on_readable(self, subscriber: _Subscriber):
+        """Read an HTTP request, or notice a subscriber hanging up."""
+        try:
+            data = subscriber.sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+        if not data:
+            with self._lock:
+                self._disconnect(subscriber)
+            return
+        if not subscriber.http or subscriber.ready:
+            return  # Subscribers have nothing to say after connecting
+
+        subscriber.request += data
+        if b'\r\n\r\n' not in subscriber.request:
+            if len(subscriber.request) > FeedConfig.MAX_REQUEST_BYTES:
+                with self._lock:
+                    self._disconnect(subscriber)
+            return
+
+        request_line = bytes(subscriber.request).split(b'\r\n', 1)[0].split()
+        if len(request_line) < 2 or request_line[0] != b'GET' or request_line[1].split(b'?')[0] != b'/events':
+            subscriber.outbox += b'HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n'
+            self._send(subscriber)
+            with self._lock:
+                self._disconnect(subscriber)
+            return
+        with self._lock:
+            subscriber.outbox += (b'HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n'
+                                  b'Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n')
+            subscriber.outbox += encode_event('hello', self._hello())
+            subscriber.ready = True
+
+    def _send(self, subscriber: _Subscriber):
+        """Write as much of the subscriber's buffer as the socket takes."""
+        with self._lock:
+            while subscriber.outbox:
+                try:
+                    sent = subscriber.sock.send(subscriber.outbox[:FeedConfig.SEND_CHUNK_BYTES])
+                except BlockingIOError:
+                    return
+                except OSError:
+                    self._disconnect(subscriber)
+                    return
+                del subscriber.outbox[:sent]
+                subscriber.bytes_sent += sent
+
+    def _update_interest(self):
+        """Watch for writability only where data is waiting."""
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        for subscriber in subscribers:
+            events = selectors.EVENT_READ | (selectors.EVENT_WRITE if subscriber.outbox else 0)
+            try:
+                if self._selector.get_key(subscriber.sock).events != events:
+                    self._selector.modify(subscriber.sock, events, subscriber)
+            except (KeyError, ValueError):
+                pass  # Disconnected meanwhile
+
+    def _evict(self, subscriber: _Subscriber):
+        """Drop a subscriber that cannot keep up (lock held)."""
+        self.evictions += 1
+        self._disconnect(subscriber)
+
+    def _disconnect(self, subscriber: _Subscriber):
+        """Forget a subscriber and close its socket (lock held)."""
+        if self._subscribers.pop(subscriber.sock, None) is None:
+            return
+        try:
+            self._selector.unregister(subscriber.sock)
+        except (KeyError, ValueError):
+            pass
+        subscriber.sock.close()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        with self._lock:
+            buffered = sum(len(subscriber.outbox) for subscriber in self._subscribers.values())
+        stats.update({
+            'socket_path': self.socket_path,
+            'http_port': self.http_port,
+            'subscribers': self.subscriber_count,
+            'subscribers_total': self.subscribers_total,
+            'frames_published': self.frames_published,
+            'evictions': self.evictions,
+            'refused': self.refused,
+            'bytes_buffered': buffered
+        })
+        return stats
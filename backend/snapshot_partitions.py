@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Time-Partitioned Storage for the Raw Monitoring Tables
+
+cleanup_old_data() used to delete old rows from one ever-growing file: a
+long write transaction that held up every writer, and the freed pages
+stayed in the file. With partitioning, the raw tables (network_snapshots
+and device_quality_tests) live in one SQLite file per day or week next to
+the main database:
+
+1. Rows are written to the partition of their timestamp
+2. Queries attach and scan only the partitions overlapping their time
+   range (the query router)
+3. Retention detaches and unlinks whole partitions: constant time, and
+   the disk space is returned at once
+
+Sessions, devices, sketches and rollups stay in the main file, so the
+rollups outlive the raw partitions they were computed from.
+
+Partition files are plain SQLite databases created with the main file's
+own table definitions. A transaction spanning the main file and its
+partitions is atomic per file in WAL mode: a power loss in the middle of a
+commit can leave a partition's rows without the rollup and ID sequence
+updates made in the main file.
+
+Usage:
+    db = NetworkDatabaseManager("network_monitoring.db", partition_by='day')
+    db.get_snapshots(start, end)          # Scans only the overlapping days
+    db.cleanup_old_data(days_to_keep=30)  # Unlinks the older day files
+"""
+
+import re
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+
+class PartitionConfig:
+    """Configuration constants for time-partitioned raw tables."""
+
+    # Partition sizes (epoch milliseconds); weeks start on Monday, UTC
+    PERIODS = {'day': 86400 * 1000, 'week': 7 * 86400 * 1000}
+    ORIGIN_MS = 4 * 86400 * 1000    # 1970-01-05, a Monday
+
+    # Tables stored in the partitions
+    TABLES = ('network_snapshots', 'device_quality_tests')
+
+    # Partitions attached to one connection at once (SQLite allows 10
+    # attached databases by default); the router works in groups this size
+    MAX_ATTACHED = 8
+
+    # Partition files: raw-<first UTC day>.db
+    FILE_PATTERN = re.compile(r'^raw-(\d{8})\.db$')
+
+
+class SnapshotPartitions:
+    """
+    Maps time to partition files and attaches them to connections.
+
+    A partition is named by its key, the epoch milliseconds at which its
+    period starts. Connections are attached on demand, outside of any
+    transaction, and detach partitions they do not need (or that
+    retention removed) to stay under the attach limit.
+    """
+
+    def __init__(self, directory: Path, period: str, schema_sql: Sequence[str]):
+        """
+        Args:
+            directory: Directory holding the partition files
+            period: 'day' or 'week'
+            schema_sql: CREATE statements of the partitioned tables and
+                        their indexes, as stored in the main database
+        """
+        if period not in PartitionConfig.PERIODS:
+            raise ValueError(f"partition period must be one of {sorted(PartitionConfig.PERIODS)}, not {period!r}")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.period = period
+        self.period_ms = PartitionConfig.PERIODS[period]
+        # Stored statements lose IF NOT EXISTS; processes may race to create a file
+        self.schema_sql = [re.sub(r'^CREATE (TABLE|INDEX) ', r'CREATE \1 IF NOT EXISTS ', sql) for sql in schema_sql]
+
+    def key_for(self, timestamp_ms: int) -> int:
+        """Start of the period holding a timestamp."""
+        return timestamp_ms - (timestamp_ms - PartitionConfig.ORIGIN_MS) % self.period_ms
+
+    def name_for(self, key: int) -> str:
+        """Schema name a partition is attached under."""
+        return 'p' + datetime.fromtimestamp(key / 1000, tz=timezone.utc).strftime('%Y%m%d')
+
+    def path_for(self, key: int) -> Path:
+        return self.directory / f"raw-{self.name_for(key)[1:]}.db"
+
+    def keys(self) -> List[int]:
+        """Keys of the partitions on disk, oldest first."""
+        keys = []
+        for path in self.directory.iterdir():
+            match = PartitionConfig.FILE_PATTERN.match(path.name)
+            if match:
+                day = datetime.strptime(match.group(1), '%Y%m%d').replace(tzinfo=timezone.utc)
+                keys.append(int(day.timestamp() * 1000))
+        return sorted(keys)
+
+    def overlapping(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> List[int]:
+        """Keys of the partitions overlapping [start_ms, end_ms), oldest first (None is unbounded)."""
+        return [key for key in self.keys()
+                if (start_ms is None or key + self.period_ms > start_ms) and (end_ms is None or key < end_ms)]
+
+    def attach(self, conn: sqlite3.Connection, keys: Sequence[int], create: bool = False) -> List[str]:
+        """
+        Attach partitions to a connection that is not in a transaction.
+
+        Args:
+            conn: Connection to attach to
+            keys: Partitions needed (at most MAX_ATTACHED)
+            create: Create missing partition files (writes); otherwise
+                    missing partitions are skipped
+
+        Returns:
+            Schema names of the attached partitions, in the order of keys
+        """
+        if len(keys) > PartitionConfig.MAX_ATTACHED:
+            raise ValueError(f"at most {PartitionConfig.MAX_ATTACHED} partitions can be attached at once")
+        wanted = {self.name_for(key): key for key in keys}
+        attached = {name: file for _seq, name, file in conn.execute("PRAGMA database_list")
+                    if name not in ('main', 'temp')}
+
+        # Let go of partitions removed by retention, and make room
+        missing = len([name for name in wanted if name not in attached])
+        for name, file in list(attached.items()):
+            crowded = name not in wanted and len(attached) + missing > PartitionConfig.MAX_ATTACHED
+            if crowded or not Path(file).exists():
+                conn.execute(f"DETACH DATABASE {name}")
+                del attached[name]
+                missing += name in wanted
+
+        names = []
+        for name, key in wanted.items():
+            if name not in attached:
+                path = self.path_for(key)
+                if not path.exists():
+                    if not create:
+                        continue
+                    self._create(path)
+                conn.execute("ATTACH DATABASE ? AS " + name, (str(path),))
+                conn.execute(f"PRAGMA {name}.synchronous = NORMAL")
+            names.append(name)
+        return names
+
+    def _create(self, path: Path):
+        """Create a partition file holding the partitioned tables."""
+        conn = sqlite3.connect(path)
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            for sql in self.schema_sql:
+                conn.execute(sql)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def drop_before(self, cutoff_ms: int) -> List[int]:
+        """
+        Unlink every partition that ends at or before cutoff_ms.
+
+        Connections that still have a dropped partition attached detach it
+        the next time they attach partitions; until then the file's space
+        is held by the open handle.
+
+        Returns:
+            Keys of the dropped partitions
+        """
+        dropped = [key for key in self.keys() if key + self.period_ms <= cutoff_ms]
+        for key in dropped:
+            path = self.path_for(key)
+            for suffix in ('-wal', '-shm'):
+                Path(str(path) + suffix).unlink(missing_ok=True)
+            path.unlink(missing_ok=True)
+        return dropped
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Stage Workers - Independent schedulers for the monitoring pipeline stages.
+
+Device discovery can take tens of seconds and a quality probe several
+seconds, while bandwidth has to be sampled every tick. Running them in one
+loop means the slowest stage sets the pace. This module gives each stage
+its own thread and cadence:
+
+1. PeriodicStage runs one stage function on a fixed schedule
+2. The latest result is published as an immutable StageResult
+3. Readers (the snapshot assembler) pick up the latest result without
+   locking or waiting - a single attribute read
+
+Usage:
+    probe_stage = PeriodicStage("probe", run_probe, interval=1.0)
+    probe_stage.start()
+    result = probe_stage.latest   # None until the first run completes
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from tick_scheduler import DeadlineScheduler
+
+
+@dataclass(frozen=True)
+class StageResult:
+    """Latest output of a stage, published atomically."""
+    value: Any
+    sequence: int           # Increments on every successful run
+    completed_at: float     # time.monotonic() when the run finished
+    duration: float         # Seconds the run took
+
+
+class PeriodicStage:
+    """
+    Runs a stage function on its own daemon thread at a fixed cadence.
+
+    Runs are scheduled on absolute monotonic deadlines, so a fast stage
+    keeps its rhythm without drift; a run that takes longer than the
+    interval is followed immediately by one coalesced run instead of
+    piling up. Exceptions are recorded and never stop the worker.
+    """
+
+    def __init__(self, name: str, func: Callable[[], Any], interval: float,
+                 initial_delay: float = 0.0):
+        """
+        Initialize the stage.
+
+        Args:
+            name: Stage name (used for the thread name and reporting)
+            func: Callable producing the stage's result; returning None
+                  keeps the previously published result
+            interval: Seconds between run starts
+            initial_delay: Seconds to wait before the first run
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.initial_delay = initial_delay
+
+        self.latest: Optional[StageResult] = None
+        self.run_count = 0
+        self.error_count = 0
+        self.last_error: Optional[str] = None
+
+        self.scheduler = DeadlineScheduler(interval, align=False)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the stage worker thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self.scheduler.reset()
+        self._thread = threading.Thread(target=self._run_loop, name=f"stage-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the worker; an in-progress run is allowed to finish."""
+        self.scheduler.stop()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+
+    def trigger(self):
+        """Run the stage as soon as possible instead of waiting for its slot."""
+        self.scheduler.trigger()
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def _run_loop(self):
+        for _tick in self.scheduler.ticks(initial_delay=self.initial_delay):
+            run_start = time.monotonic()
+
+            try:
+                value = self.func()
+                if value is not None:
+                    finished = time.monotonic()
+                    sequence = self.latest.sequence + 1 if self.latest else 1
+                    self.latest = StageResult(value, sequence, finished, finished - run_start)
+            except Exception as e:
+                self.error_count += 1
+                self.last_error = str(e)
+            self.run_count += 1
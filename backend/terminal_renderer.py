@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Terminal Renderer - Status display decoupled from the monitoring loop.
+
+Printing on every tick puts terminal I/O (slow SSH sessions, a blocked
+journald pipe) directly into tick latency. The renderer takes that work
+off the monitoring thread:
+
+1. The monitoring thread only publishes the latest snapshot (one
+   attribute assignment) and queues messages unformatted
+2. A render thread formats and writes, at a capped refresh rate
+3. Intermediate snapshots are simply never drawn - the display always
+   shows the latest state, never a backlog
+
+Render modes:
+    live      - redraw the status line at up to max_refresh_hz
+    changes   - redraw only when the displayed values change
+    headless  - no render thread, no formatting, no output (daemons)
+
+When output is not a terminal, status lines are written as plain lines
+instead of being redrawn in place.
+
+Usage:
+    renderer = TerminalRenderer(format_status, mode='live')
+    renderer.start()
+    renderer.publish(snapshot)                  # From the monitoring thread
+    renderer.message("Testing {} ...", ip)      # Formatted on the render thread
+    renderer.stop()
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, Optional, TextIO
+
+from tick_scheduler import TimingHistogram
+
+
+class RenderConfig:
+    """Configuration constants for terminal rendering."""
+
+    LIVE = 'live'
+    CHANGES = 'changes'
+    HEADLESS = 'headless'
+    MODES = (LIVE, CHANGES, HEADLESS)
+
+    # Redraws per second at most
+    MAX_REFRESH_HZ = 4.0
+
+    # Messages waiting to be printed before the oldest are discarded
+    MAX_PENDING_MESSAGES = 100
+
+    # Terminal width when it cannot be detected
+    DEFAULT_WIDTH = 80
+
+
+class TerminalRenderer:
+    """
+    Draws the latest published snapshot on its own thread.
+
+    The status line is produced by a formatter supplied by the service, so
+    the renderer knows nothing about snapshot contents; in 'changes' mode an
+    optional change_key function decides whether a new snapshot looks
+    different from the one on screen.
+    """
+
+    def __init__(self, formatter: Callable[[Any], str], mode: str = RenderConfig.LIVE,
+                 max_refresh_hz: float = RenderConfig.MAX_REFRESH_HZ,
+                 change_key: Optional[Callable[[Any], Hashable]] = None,
+                 stream: Optional[TextIO] = None):
+        """
+        Initialize the renderer.
+
+        Args:
+            formatter: Builds the status line for a snapshot
+            mode: 'live', 'changes' or 'headless'
+            max_refresh_hz: Maximum redraws per second
+            change_key: Values that must differ for a redraw in 'changes' mode
+                        (defaults to the formatted line itself)
+            stream: Output stream (stdout by default)
+        """
+        if mode not in RenderConfig.MODES:
+            raise ValueError(f"Unknown render mode: {mode}")
+
+        self.formatter = formatter
+        self.mode = mode
+        self.min_redraw_interval = 1.0 / max_refresh_hz if max_refresh_hz > 0 else 0.0
+        self.change_key = change_key
+        self.stream = stream or sys.stdout
+        self.interactive = self._is_terminal(self.stream)
+
+        # Statistics
+        self.published = 0
+        self.redraws = 0
+        self.messages_printed = 0
+        self.messages_dropped = 0
+        self.render_durations = TimingHistogram()
+
+        self._latest: Optional[tuple] = None     # (sequence, snapshot), swapped atomically
+        self._drawn_sequence = 0
+        self._drawn_key: Any = None
+        self._status_line = ""
+        self._messages: deque = deque()
+        self._pending = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_headless(self) -> bool:
+        return self.mode == RenderConfig.HEADLESS
+
+    @property
+    def pending_messages(self) -> int:
+        return len(self._messages)
+
+    @staticmethod
+    def _is_terminal(stream: TextIO) -> bool:
+        try:
+            return stream.isatty()
+        except (AttributeError, ValueError):
+            return False
+
+    def start(self):
+        """Start the render thread (no-op when headless)."""
+        if self.is_headless or (self._thread and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._render_loop, name="renderer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """Draw what is pending, then stop the render thread."""
+        if not self._thread:
+            return
+        self._stop_event.set()
+        self._pending.set()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def publish(self, snapshot: Any):
+        """Make snapshot the one to draw next. Never blocks or formats."""
+        if self.is_headless:
+            return
+        self.published += 1
+        self._latest = (self.published, snapshot)
+        self._pending.set()
+
+    def message(self, template: str, *args: Any):
+        """
+        Queue a one-off message printed above the status line.
+
+        Formatting (template.format(*args)) happens on the render thread,
+        and not at all in headless mode.
+        """
+        if self.is_headless:
+            return
+        if len(self._messages) >= RenderConfig.MAX_PENDING_MESSAGES:
+            self._messages.popleft()
+            self.messages_dropped += 1
+        self._messages.append((template, args))
+        self._pending.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Render counters and timing."""
+        return {
+            'mode': self.mode,
+            'interactive': self.interactive,
+            'published': self.published,
+            'redraws': self.redraws,
+            'skipped': self.published - self.redraws if self.published > self.redraws else 0,
+            'messages_printed': self.messages_printed,
+            'messages_dropped': self.messages_dropped,
+            'render_duration': self.render_durations.to_dict()
+        }
+
+    def _render_loop(self):
+        next_redraw = 0.0
+
+        while True:
+            self._pending.wait()
+            stopping = self._stop_event.is_set()
+
+            # Throttle: wait out the rest of the refresh interval
+            delay = next_redraw - time.monotonic()
+            if delay > 0 and not stopping:
+                self._stop_event.wait(delay)
+                stopping = self._stop_event.is_set()
+            self._pending.clear()
+
+            render_start = time.monotonic()
+            try:
+                drawn = self._render()
+            except Exception:
+                drawn = False  # A broken stream must never take the service down
+            if drawn:
+                self.render_durations.observe(time.monotonic() - render_start)
+                next_redraw = render_start + self.min_redraw_interval
+
+            if stopping:
+                if self.interactive and self._status_line:
+                    self._write("\n")
+                break
+
+    def _render(self) -> bool:
+        """Print queued messages and redraw the status line if needed."""
+        output = []
+
+        messages = []
+        while self._messages:
+            messages.append(self._messages.popleft())
+        if messages:
+            if self.interactive:
+                output.append(self._clear_sequence())
+            for template, args in messages:
+                output.append(("\n" if self.interactive else "") + self._format_message(template, args) + "\n")
+            self.messages_printed += len(messages)
+
+        latest = self._latest
+        redraw = False
+        if latest is not None and latest[0] != self._drawn_sequence:
+            sequence, snapshot = latest
+            line = self.formatter(snapshot)
+            key = self.change_key(snapshot) if self.change_key else line
+            if self.mode == RenderConfig.LIVE or key != self._drawn_key:
+                self._status_line = line
+                self._drawn_key = key
+                redraw = True
+            self._drawn_sequence = sequence
+
+        if redraw:
+            if self.interactive:
+                output.append(self._clear_sequence() + self._status_line)
+            else:
+                output.append(self._status_line + "\n")
+            self.redraws += 1
+        elif messages and self.interactive and self._status_line:
+            output.append(self._status_line)  # Messages scrolled it away
+
+        if output:
+            self._write("".join(output))
+        return redraw or bool(messages)
+
+    @staticmethod
+    def _format_message(template: str, args) -> str:
+        try:
+            return template.format(*args) if args else template
+        except (IndexError, KeyError, ValueError):
+            return f"{template} {args}"
+
+    def _clear_sequence(self) -> str:
+        """Carriage return, blank the line, carriage return."""
+        try:
+            width = os.get_terminal_size(self.stream.fileno()).columns
+        except (AttributeError, ValueError, OSError):
+            width = RenderConfig.DEFAULT_WIDTH
+        return '\r' + ' ' * width + '\r'
+
+    def _write(self, text: str):
+        self.stream.write(text)
+        self.stream.flush()
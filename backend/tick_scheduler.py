@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Deadline Scheduler - Drift-free periodic ticks on a monotonic clock.
+
+Sleeping "interval minus the time the work took" accumulates drift, and a
+wall-clock timer breaks whenever NTP steps the clock. This module schedules
+ticks the way real-time loops do:
+
+1. Absolute deadlines on time.monotonic(): tick n is due at origin + n * interval,
+   so per-tick jitter never accumulates
+2. A regular timestamp grid: each tick carries its nominal wall-clock time,
+   aligned to a multiple of the interval, for rollups and forecasts
+3. An explicit policy for ticks that were missed because a run overran
+4. Lateness and duration histograms, plus overrun and missed-tick counters
+
+Missed tick policies:
+    skip      - drop overdue slots and wait for the next future deadline
+    catch_up  - run every missed slot back to back (bounded by max_catch_up)
+    coalesce  - run once immediately for all missed slots, then resume the grid
+
+Usage:
+    scheduler = DeadlineScheduler(interval=1.0, policy='coalesce')
+    for tick in scheduler.ticks():
+        collect(tick.scheduled_time)    # Duration is measured automatically
+    ...
+    scheduler.stop()                    # From any thread
+
+    async for tick in scheduler.aticks():   # Same grid inside an event loop
+        await collect(tick.scheduled_time)
+"""
+
+import asyncio
+import bisect
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence, Tuple
+
+
+class SchedulerConfig:
+    """Configuration constants for deadline scheduling."""
+
+    SKIP = 'skip'
+    CATCH_UP = 'catch_up'
+    COALESCE = 'coalesce'
+    POLICIES = (SKIP, CATCH_UP, COALESCE)
+
+    # Missed slots replayed at most before falling back to skipping
+    MAX_CATCH_UP = 10
+
+    # Histogram bucket upper bounds (seconds)
+    HISTOGRAM_BOUNDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class TimingHistogram:
+    """
+    Fixed-bucket histogram of durations in seconds.
+
+    Buckets are cumulative-friendly (upper bounds, plus an overflow bucket),
+    which is what Prometheus-style exporters expect.
+    """
+
+    def __init__(self, bounds: Sequence[float] = SchedulerConfig.HISTOGRAM_BOUNDS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max_value = 0.0
+
+    def observe(self, value: float):
+        """Record one observation."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max_value:
+            self.max_value = value
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given fraction, capped at the max (None if empty)."""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target and bucket_count:
+                return min(self.bounds[index], self.max_value) if index < len(self.bounds) else self.max_value
+        return self.max_value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary suitable for status reporting."""
+        return {
+            'count': self.count,
+            'mean_ms': round(self.mean * 1000, 3),
+            'p50_ms': _to_ms(self.percentile(0.50)),
+            'p99_ms': _to_ms(self.percentile(0.99)),
+            'max_ms': round(self.max_value * 1000, 3),
+            'buckets': {str(bound): count for bound, count in zip(self.bounds + ('+Inf',), self.counts)}
+        }
+
+
+def _to_ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+@dataclass(frozen=True)
+class ScheduledTick:
+    """One tick handed to the scheduled work."""
+    index: int                  # Slot number on the grid (pending slot if triggered)
+    scheduled_time: float       # Nominal wall-clock time of the slot (epoch seconds)
+    deadline: float             # Slot deadline on the monotonic clock
+    lateness: float             # Seconds between the deadline and the actual start
+    missed: int = 0             # Slots missed since the previous tick (skipped or coalesced)
+    triggered: bool = False     # Run early on request, off the regular grid
+
+
+class DeadlineScheduler:
+    """
+    Yields ticks at absolute monotonic deadlines on a fixed grid.
+
+    The time between a yielded tick and the next request for a tick is
+    recorded as the tick's duration; a duration longer than the interval
+    is counted as an overrun and the policy decides what happens to the
+    slots that were missed.
+    """
+
+    def __init__(self, interval: float, policy: str = SchedulerConfig.COALESCE,
+                 align: bool = True, max_catch_up: int = SchedulerConfig.MAX_CATCH_UP):
+        """
+        Initialize the scheduler.
+
+        Args:
+            interval: Seconds between ticks
+            policy: What to do with missed ticks ('skip', 'catch_up' or 'coalesce')
+            align: Start the grid on a wall-clock multiple of the interval
+            max_catch_up: Most missed slots replayed by 'catch_up' before skipping
+        """
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        if policy not in SchedulerConfig.POLICIES:
+            raise ValueError(f"Unknown missed tick policy: {policy}")
+
+        self.interval = interval
+        self.policy = policy
+        self.align = align
+        self.max_catch_up = max_catch_up
+
+        # Statistics
+        self.lateness = TimingHistogram()
+        self.durations = TimingHistogram()
+        self.ticks_run = 0
+        self.overruns = 0
+        self.missed_ticks = 0
+        self.triggered_ticks = 0
+
+        self._wall_origin = 0.0
+        self._origin_slot: Optional[int] = None     # Grid slot number of tick 0 when aligned
+        self._mono_origin = 0.0
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+
+        # Event loop and wake-up event of a running aticks() loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_wake: Optional[asyncio.Event] = None
+
+    def reset(self):
+        """Re-arm a stopped scheduler so ticks() can run again."""
+        self._stop_event.clear()
+        self._wake_event.clear()
+
+    def stop(self):
+        """Stop the tick loop; a wait in progress returns immediately."""
+        self._stop_event.set()
+        self._wake_event.set()
+        self._wake_async_waiter()
+
+    def trigger(self):
+        """Run an extra tick as soon as possible, off the regular grid."""
+        self._wake_event.set()
+        self._wake_async_waiter()
+
+    def _wake_async_waiter(self):
+        loop, wake = self._loop, self._async_wake
+        if loop is not None and wake is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wake.set)
+
+    @property
+    def is_stopped(self) -> bool:
+        return self._stop_event.is_set()
+
+    def scheduled_time(self, index: int) -> float:
+        """Nominal wall-clock time of grid slot index."""
+        if self._origin_slot is not None:
+            # Exact multiples of the interval, free of accumulated rounding
+            return (self._origin_slot + index) * self.interval
+        return self._wall_origin + index * self.interval
+
+    def deadline(self, index: int) -> float:
+        """Monotonic deadline of grid slot index."""
+        return self._mono_origin + index * self.interval
+
+    def _anchor(self, initial_delay: float):
+        """Fix the grid origin on both clocks."""
+        wall_now = time.time()
+        mono_now = time.monotonic()
+        first_wall = wall_now + initial_delay
+        self._origin_slot = None
+        if self.align:
+            self._origin_slot = math.ceil(first_wall / self.interval)
+            first_wall = self._origin_slot * self.interval
+        self._wall_origin = first_wall
+        self._mono_origin = mono_now + (first_wall - wall_now)
+
+    def _wait_until(self, deadline: float) -> bool:
+        """Sleep until deadline; returns True if woken early by trigger()."""
+        remaining = deadline - time.monotonic()
+        if remaining > 0:
+            self._wake_event.wait(remaining)
+        woken = self._wake_event.is_set()
+        self._wake_event.clear()
+        return woken and not self._stop_event.is_set()
+
+    def _next_index(self, index: int, now: float) -> Tuple[int, int]:
+        """
+        Choose the next slot to run after slot index finished at time now.
+
+        Returns:
+            Tuple of (next slot index, slots dropped or coalesced)
+        """
+        following = index + 1
+        # Last slot whose deadline has already passed
+        overdue = int((now - self._mono_origin) // self.interval)
+        if overdue < following:
+            return following, 0  # On time
+
+        missed = overdue - following
+        if self.policy == SchedulerConfig.SKIP:
+            # Even a single late slot is dropped: wait for the next future deadline
+            return overdue + 1, missed + 1
+        if self.policy == SchedulerConfig.CATCH_UP and missed < self.max_catch_up:
+            return following, 0
+        # Coalesce (and catch-up beyond its backlog): run the latest overdue slot now
+        return overdue, missed
+
+    def ticks(self, initial_delay: float = 0.0) -> Iterator[ScheduledTick]:
+        """
+        Generate ticks until stop() is called.
+
+        A new grid is anchored on every call; call reset() first to reuse a
+        stopped scheduler.
+
+        Args:
+            initial_delay: Minimum seconds before the first tick
+        """
+        self._anchor(initial_delay)
+        index = 0
+        missed = 0
+
+        while not self._stop_event.is_set():
+            deadline = self.deadline(index)
+            if self._wait_until(deadline):
+                # Triggered early: run now, then continue with the same slot
+                tick = self._triggered_tick(index)
+                yield tick
+                self.durations.observe(time.monotonic() - tick.deadline)
+                continue
+            if self._stop_event.is_set():
+                break
+
+            tick = self._start_tick(index, deadline, missed)
+            yield tick
+            index, missed = self._finish_tick(tick)
+
+    async def aticks(self, initial_delay: float = 0.0) -> AsyncIterator[ScheduledTick]:
+        """
+        Generate ticks inside a running event loop until stop() is called.
+
+        Same grid, policies and statistics as ticks(); waiting between
+        ticks yields to the loop instead of blocking a thread, and
+        cancelling the consuming task ends the loop cleanly.
+
+        Args:
+            initial_delay: Minimum seconds before the first tick
+        """
+        self._loop = asyncio.get_running_loop()
+        self._async_wake = asyncio.Event()
+        if self._wake_event.is_set():
+            self._async_wake.set()  # Triggered before the loop started
+        self._anchor(initial_delay)
+        index = 0
+        missed = 0
+
+        try:
+            while not self._stop_event.is_set():
+                deadline = self.deadline(index)
+                if await self._wait_until_async(deadline):
+                    tick = self._triggered_tick(index)
+                    yield tick
+                    self.durations.observe(time.monotonic() - tick.deadline)
+                    continue
+                if self._stop_event.is_set():
+                    break
+
+                tick = self._start_tick(index, deadline, missed)
+                yield tick
+                index, missed = self._finish_tick(tick)
+        finally:
+            self._loop = None
+            self._async_wake = None
+
+    async def _wait_until_async(self, deadline: float) -> bool:
+        """Async counterpart of _wait_until()."""
+        remaining = deadline - time.monotonic()
+        wake = self._async_wake
+        if remaining > 0 and not wake.is_set():
+            try:
+                await asyncio.wait_for(wake.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+        woken = wake.is_set() or self._wake_event.is_set()
+        wake.clear()
+        self._wake_event.clear()
+        return woken and not self._stop_event.is_set()
+
+    def _triggered_tick(self, index: int) -> ScheduledTick:
+        self.triggered_ticks += 1
+        return ScheduledTick(index, time.time(), time.monotonic(), 0.0, triggered=True)
+
+    def _start_tick(self, index: int, deadline: float, missed: int) -> ScheduledTick:
+        lateness = max(0.0, time.monotonic() - deadline)
+        self.lateness.observe(lateness)
+        return ScheduledTick(index, self.scheduled_time(index), deadline, lateness, missed)
+
+    def _finish_tick(self, tick: ScheduledTick) -> Tuple[int, int]:
+        """Record a finished tick's duration and choose the next slot."""
+        finished = time.monotonic()
+        duration = finished - (tick.deadline + tick.lateness)
+        self.durations.observe(duration)
+        self.ticks_run += 1
+        if duration > self.interval:
+            self.overruns += 1
+
+        index, missed = self._next_index(tick.index, finished)
+        self.missed_ticks += missed
+        return index, missed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Scheduler counters and histogram summaries."""
+        return {
+            'interval': self.interval,
+            'policy': self.policy,
+            'ticks_run': self.ticks_run,
+            'overruns': self.overruns,
+            'missed_ticks': self.missed_ticks,
+            'triggered_ticks': self.triggered_ticks,
+            'lateness': self.lateness.to_dict(),
+            'duration': self.durations.to_dict()
+        }
@@ -245,6 +245,9 @@ class RealisticNetworkDataGenerator:
         cumulative_upload_mb = 0
         cumulative_download_mb = 0
         
+        # Snapshots not yet written
+        pending_records = []
+        
         while current_time <= end_time:
             hour = current_time.hour
             
@@ -276,7 +279,7 @@ class RealisticNetworkDataGenerator:
             
             # Create monitoring snapshot data (FIXED: include timestamp)
             snapshot_data = {
-                "timestamp": current_time.isoformat(),        # FIXED: Include historical timestamp
+                "timestamp": int(current_time.timestamp() * 1000),  # Historical time, epoch ms
                 "device_count": len(active_devices),
                 "total_upload_mbps": round(upload_mbps, 2),
                 "total_download_mbps": round(download_mbps, 2),
@@ -288,27 +291,30 @@ class RealisticNetworkDataGenerator:
                 "tested_device_ip": tested_device["ip"] if tested_device else None
             }
             
-            # Store in database
-            snapshot_id = self.db_manager.save_network_snapshot(session_id, snapshot_data)
-            
-            # Store device information
-            for device in active_devices:
-                device_data = {
+            # Queue the snapshot with its device information
+            pending_records.append({
+                "snapshot": snapshot_data,
+                "devices": [{
                     "ip": device["ip"],
                     "mac_address": device["mac"],
                     "hostname": device["hostname"],
                     "device_type": device.get("device_type", "unknown")
-                }
-                self.db_manager.save_device(device_data)
+                } for device in active_devices]
+            })
             
             data_points_generated += 1
             current_time += timedelta(seconds=interval_seconds)
             
-            # Progress indicator
+            # Store in database (one transaction per batch) and show progress
             if data_points_generated % 500 == 0:
+                self.db_manager.save_monitoring_batch(session_id, pending_records)
+                pending_records = []
                 progress = (data_points_generated / total_points) * 100
                 print(f"📈 Progress: {progress:.1f}% ({data_points_generated:,} / {total_points:,} points)")
         
+        if pending_records:
+            self.db_manager.save_monitoring_batch(session_id, pending_records)
+        
         # End the monitoring session
         self.db_manager.end_monitoring_session(session_id)
         
@@ -26,7 +26,7 @@ import sys
 backend_path = Path(__file__).parent.parent / 'backend'
 sys.path.insert(0, str(backend_path))
 
-from database_manager import NetworkDatabaseManager
+from database_manager import NetworkDatabaseManager, DatabaseConfig, to_epoch_ms
 
 @dataclass
 class UsageInsight:
@@ -108,70 +108,64 @@ class NetworkUsagePredictor:
         Fetch and aggregate monitoring data by hour.
         
         This transforms our second-by-second data into hourly summaries,
-        making it easier to spot patterns and trends.
+        making it easier to spot patterns and trends. The summaries come
+        from the hourly rollups kept as snapshots are written, so a week
+        is 168 rows however many snapshots it holds.
         """
         
         # Calculate the time range to analyze
         end_time = datetime.now()
         start_time = end_time - timedelta(days=days_back)
         
-        # SQL query to get hourly aggregated data
+        # Buckets are UTC hours; shifting by the local UTC offset makes
+        # them line up with local hours
+        utc_offset_ms = int(end_time.astimezone().utcoffset().total_seconds() * 1000)
+        start_ms = to_epoch_ms(start_time)
+        
+        # SQL query over the hourly rollups
         query = """
         SELECT 
-            -- Time grouping: Convert timestamp to hour of day (0-23)
-            CAST(strftime('%H', timestamp) AS INTEGER) as hour_of_day,
-            DATE(timestamp) as date,
+            -- Time grouping: local hours since the epoch (integer math, no parsing)
+            (bucket_start + :utc_offset_ms) / 3600000 as hour_bucket,
             
-            -- Usage metrics (averaged per hour)
-            AVG(device_count) as avg_devices,
-            AVG(total_upload_mbps + total_download_mbps) as avg_total_mbps,
-            AVG(total_usage_mb) as avg_usage_mb,
+            -- Usage metrics (averaged per tick; a deadband row's usage is
+            -- already summed over the ticks it stands for)
+            device_count_sum * 1.0 / sample_count as avg_devices,
+            (total_upload_mbps_sum + total_download_mbps_sum) / sample_count as avg_total_mbps,
+            total_usage_mb_sum / sample_count as avg_usage_mb,
             
             -- Quality metrics
-            AVG(avg_latency_ms) as avg_latency,
-            AVG(avg_packet_loss) as avg_packet_loss,
+            avg_latency_ms_sum / sample_count as avg_latency,
+            avg_packet_loss_sum / sample_count as avg_packet_loss,
             
             -- Count how many data points we have per hour
-            COUNT(*) as sample_count,
+            sample_count,
             
             -- Time range for this hour
-            MIN(timestamp) as hour_start,
-            MAX(timestamp) as hour_end
+            first_timestamp as hour_start,
+            last_timestamp as hour_end
             
-        FROM network_snapshots 
-        WHERE timestamp >= ? AND timestamp <= ?
-        GROUP BY DATE(timestamp), CAST(strftime('%H', timestamp) AS INTEGER)
-        ORDER BY date, hour_of_day
+        FROM snapshot_rollups 
+        WHERE bucket_ms = :bucket_ms AND bucket_start >= :start_ms AND bucket_start <= :end_ms
+        ORDER BY bucket_start
         """
         
-        # Execute query and convert to pandas DataFrame
-        with self.db_manager._get_connection() as conn:
-            df = pd.read_sql_query(query, conn, params=[
-                start_time.isoformat(),
-                end_time.isoformat()
-            ])
-        
-        # FIXED: Handle mixed timestamp formats gracefully
-        try:
-            # Try to parse timestamps with flexible format handling
-            df['hour_start'] = pd.to_datetime(df['hour_start'], format='mixed', errors='coerce')
-            df['hour_end'] = pd.to_datetime(df['hour_end'], format='mixed', errors='coerce')
-            df['date'] = pd.to_datetime(df['date'], format='mixed', errors='coerce')
-            
-            # Remove any rows where timestamp parsing failed
-            df = df.dropna(subset=['hour_start', 'hour_end', 'date'])
-            
-        except Exception as e:
-            print(f"⚠️  Timestamp parsing warning: {e}")
-            # Fallback: try with ISO format
-            try:
-                df['hour_start'] = pd.to_datetime(df['hour_start'], format='ISO8601', errors='coerce')
-                df['hour_end'] = pd.to_datetime(df['hour_end'], format='ISO8601', errors='coerce')
-                df['date'] = pd.to_datetime(df['date'], format='ISO8601', errors='coerce')
-                df = df.dropna(subset=['hour_start', 'hour_end', 'date'])
-            except Exception as e2:
-                print(f"❌ Timestamp parsing failed: {e2}")
-                return pd.DataFrame()  # Return empty DataFrame
+        # Execute query and convert to pandas DataFrame (on a read-only
+        # analytics connection: the report never holds up the collector)
+        with self.db_manager.analytics_connection() as conn:
+            df = pd.read_sql_query(query, conn, params={
+                'utc_offset_ms': utc_offset_ms,
+                'bucket_ms': DatabaseConfig.ROLLUP_BUCKETS['hour'],
+                'start_ms': start_ms - start_ms % DatabaseConfig.ROLLUP_BUCKETS['hour'],
+                'end_ms': to_epoch_ms(end_time)
+            })
+        
+        # Local hour of day and date come straight from the bucket number
+        df['hour_of_day'] = df['hour_bucket'] % 24
+        df['date'] = pd.to_datetime((df['hour_bucket'] - df['hour_of_day']) * 3600, unit='s')
+        df['hour_start'] = pd.to_datetime(df['hour_start'] + utc_offset_ms, unit='ms')
+        df['hour_end'] = pd.to_datetime(df['hour_end'] + utc_offset_ms, unit='ms')
+        df = df.drop(columns=['hour_bucket'])
         
         print(f"📊 Fetched {len(df)} hourly data points for analysis")
         return df
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Analytics Connections Testing Script
+
+This script tests the read-only analytics connection pool against
+temporary databases:
+
+1. Analytics connections cannot write, neither the main file nor
+   attached partitions
+2. Connections are reused, and at most ANALYTICS_POOL_SIZE are open
+3. Snapshot blocks see one consistent state while writers commit
+4. Writer latency while long reports run on analytics connections
+
+Usage: python test_analytics_connections.py
+"""
+
+import sys
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from database_manager import NetworkDatabaseManager, DatabaseConfig, now_ms
+
+DAY_MS = 86400 * 1000
+
+
+def make_snapshot(timestamp: int, index: int) -> dict:
+    return {
+        'timestamp': timestamp,
+        'device_count': 10 + index % 20,
+        'total_upload_mbps': 1.0 + index % 7,
+        'total_download_mbps': 10.0 + index % 13,
+        'total_usage_mb': 0.5,
+        'avg_latency_ms': 12.0,
+        'avg_packet_loss': 0.0,
+        'overall_quality': 'Good',
+        'active_interfaces': ['eth0'],
+        'tested_device_ip': f"10.0.0.{index % 8 + 1}"
+    }
+
+
+def fill(db: NetworkDatabaseManager, session_id: int, days: int, per_day: int):
+    """Monitoring ticks ending now."""
+    start_ms = now_ms() - days * DAY_MS
+    step = DAY_MS // per_day
+    records = [{'snapshot': make_snapshot(start_ms + i * step, i)} for i in range(days * per_day)]
+    for offset in range(0, len(records), 5000):
+        db.save_monitoring_batch(session_id, records[offset:offset + 5000])
+
+
+# A deliberately slow report: every snapshot against its hour's average
+REPORT_QUERY = """
+    SELECT s.tested_device_ip, COUNT(*), AVG(s.total_download_mbps - h.avg_download)
+    FROM network_snapshots s
+    JOIN (SELECT timestamp / 3600000 AS hour, AVG(total_download_mbps) AS avg_download
+          FROM network_snapshots GROUP BY hour) h ON h.hour = s.timestamp / 3600000
+    GROUP BY s.tested_device_ip
+"""
+
+
+def rejects_writes(conn: sqlite3.Connection, sql: str) -> bool:
+    try:
+        conn.execute(sql)
+    except sqlite3.OperationalError:
+        return True
+    return False
+
+
+class AnalyticsConnectionsTester:
+    """Tests for the read-only analytics connections."""
+
+    def __init__(self):
+        self.test_results = {}
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    def test_read_only(self, temp_dir: str) -> bool:
+        """Test that analytics connections cannot write."""
+        self.print_header("Read-Only Connections")
+
+        db = NetworkDatabaseManager(os.path.join(temp_dir, "readonly.db"), partition_by='day')
+        session_id = db.start_monitoring_session("readonly")
+        fill(db, session_id, days=2, per_day=100)
+        keys = db.partitions.overlapping()
+
+        with db.analytics_connection(partitions=keys) as conn:
+            names = [name for _seq, name, _file in conn.execute("PRAGMA database_list")
+                     if name not in ('main', 'temp')]
+            readable = sum(conn.execute(f"SELECT COUNT(*) FROM {name}.network_snapshots").fetchone()[0]
+                           for name in names)
+            rejected = [rejects_writes(conn, "UPDATE devices SET hostname = 'x'"),
+                        rejects_writes(conn, "DELETE FROM monitoring_sessions")]
+            rejected += [rejects_writes(conn, f"DELETE FROM {name}.network_snapshots") for name in names]
+
+        read_only_ok = len(names) == len(keys) >= 2 and all(rejected) and readable == 200
+        self.print_result("Writes Rejected", read_only_ok,
+                          f"{len(rejected)} writes rejected across the main file and {len(names)} "
+                          f"attached partitions; {readable} snapshots readable")
+        db.close()
+        return read_only_ok
+
+    def test_pool(self, temp_dir: str) -> bool:
+        """Test connection reuse and the pool bound."""
+        self.print_header("Connection Pool")
+
+        db = NetworkDatabaseManager(os.path.join(temp_dir, "pool.db"))
+        with db.analytics_connection() as first:
+            pass
+        with db.analytics_connection() as second:
+            pass
+        with db._get_connection() as writer:
+            reused_ok = first is second and second is not writer
+        self.print_result("Connections Reused", reused_ok,
+                          "a returned connection is lent out again, separate from the writer's")
+
+        size = DatabaseConfig.ANALYTICS_POOL_SIZE
+        lent = set()
+        peak = [0]
+        active = [0]
+        lock = threading.Lock()
+        start = threading.Barrier(size * 2)
+
+        def report():
+            start.wait()
+            with db.analytics_connection() as conn:
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                    lent.add(id(conn))
+                conn.execute("SELECT COUNT(*) FROM network_snapshots").fetchone()
+                time.sleep(0.05)
+                with lock:
+                    active[0] -= 1
+
+        threads = [threading.Thread(target=report) for _ in range(size * 2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        bounded_ok = peak[0] == size and len(lent) == size and len(db._analytics_connections) == size
+        self.print_result("Pool Bounded", bounded_ok,
+                          f"{size * 2} concurrent reports shared {len(lent)} connections "
+                          f"(at most {peak[0]} lent at once)")
+
+        db.close()
+        with db.analytics_connection() as conn:
+            reopened = conn.execute("SELECT COUNT(*) FROM devices").fetchone()[0] == 0
+        reopened_ok = reopened and len(db._analytics_connections) == 1
+        self.print_result("Pool Closed With the Manager", reopened_ok,
+                          "close() closes pooled connections; the next report opens a new one")
+        db.close()
+        return reused_ok and bounded_ok and reopened_ok
+
+    def test_snapshot(self, temp_dir: str) -> bool:
+        """Test that a snapshot block does not see concurrent commits."""
+        self.print_header("Snapshot-Consistent Reads")
+
+        db = NetworkDatabaseManager(os.path.join(temp_dir, "snapshot.db"))
+        session_id = db.start_monitoring_session("snapshot")
+        fill(db, session_id, days=1, per_day=500)
+        query = "SELECT COUNT(*) FROM network_snapshots"
+
+        def write_elsewhere(count: int):
+            # Another thread, so another connection, as the collector would
+            thread = threading.Thread(target=lambda: [db.save_network_snapshot(session_id, make_snapshot(now_ms(), i))
+                                                      for i in range(count)])
+            thread.start()
+            thread.join()
+
+        with db.analytics_connection(snapshot=True) as conn:
+            before = conn.execute(query).fetchone()[0]
+            write_elsewhere(10)
+            during = conn.execute(query).fetchone()[0]
+            maximum = conn.execute("SELECT MAX(id) FROM network_snapshots").fetchone()[0]
+        with db.analytics_connection() as conn:
+            live_before = conn.execute(query).fetchone()[0]
+            write_elsewhere(10)
+            live_after = conn.execute(query).fetchone()[0]
+            in_transaction = conn.in_transaction
+
+        snapshot_ok = (before == during == maximum == 500 and live_before == 510 and live_after == 520
+                       and not in_transaction)
+        self.print_result("Snapshot Ignores Concurrent Commits", snapshot_ok,
+                          f"snapshot saw {before} -> {during} snapshots across 10 commits; "
+                          f"without one, {live_before} -> {live_after}")
+        db.close()
+        return snapshot_ok
+
+    def _writer_latencies(self, db: NetworkDatabaseManager, session_id: int, reports: int) -> tuple:
+        """Single-snapshot write latencies while reports run on other threads."""
+        done = threading.Event()
+        report_seconds = []
+
+        def run_report():
+            start = time.perf_counter()
+            with db.analytics_connection(snapshot=True) as conn:
+                conn.execute(REPORT_QUERY).fetchall()
+                conn.execute(REPORT_QUERY).fetchall()
+            report_seconds.append(time.perf_counter() - start)
+
+        def run_reports():
+            threads = [threading.Thread(target=run_report) for _ in range(reports)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            done.set()
+
+        latencies = []
+        index = 0
+        runner = threading.Thread(target=run_reports)
+        start = time.perf_counter()
+        if reports:
+            runner.start()
+        while not done.is_set() if reports else time.perf_counter() - start < 1.0:
+            write_start = time.perf_counter()
+            db.save_network_snapshot(session_id, make_snapshot(now_ms(), index))
+            latencies.append((time.perf_counter() - write_start) * 1000)
+            index += 1
+            time.sleep(0.002)  # Paced like the service's writer
+        if reports:
+            runner.join()
+        return latencies, max(report_seconds, default=0.0)
+
+    def test_parallel(self, temp_dir: str) -> bool:
+        """Benchmark writer latency while long reports run."""
+        self.print_header("Ingestion During Reports")
+
+        db = NetworkDatabaseManager(os.path.join(temp_dir, "parallel.db"))
+        session_id = db.start_monitoring_session("parallel")
+        fill(db, session_id, days=5, per_day=10000)
+
+        results = {}
+        for label, reports in (("idle", 0), ("2 reports", 2)):
+            latencies, report_seconds = self._writer_latencies(db, session_id, reports)
+            results[label] = {
+                'p99': sorted(latencies)[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+                'median': statistics.median(latencies),
+                'max': max(latencies),
+                'writes': len(latencies),
+                'report_seconds': report_seconds
+            }
+        db.close()
+
+        for label, result in results.items():
+            print(f"   {label:>9}: {result['writes']} writes, median {result['median']:.2f}ms, "
+                  f"p99 {result['p99']:.2f}ms, max {result['max']:.1f}ms")
+
+        busy = results['2 reports']
+        parallel_ok = busy['report_seconds'] > 0.5 and busy['writes'] > 50 and busy['p99'] < 20
+        self.print_result("Writers Keep Going During Reports", parallel_ok,
+                          f"{busy['writes']} writes committed during {busy['report_seconds']:.1f}s reports "
+                          f"over 50,000 snapshots, p99 {busy['p99']:.2f}ms")
+        return parallel_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all analytics connection tests."""
+        print("🚀 Analytics Connections Test Suite")
+        start_time = time.time()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            results = [
+                self.test_read_only(temp_dir),
+                self.test_pool(temp_dir),
+                self.test_snapshot(temp_dir),
+                self.test_parallel(temp_dir)
+            ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = AnalyticsConnectionsTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Async Monitoring Service Testing Script
+
+This script tests and benchmarks the asyncio edition of the continuous
+monitoring service. Loopback addresses (127.0.0.0/8) all answer ICMP, so
+real echo requests are used without touching the LAN:
+
+1. The event loop pinger matches replies to thousands of concurrent pings
+   and keeps the in-flight count bounded
+2. Sweep benchmark on one core: the threaded sweep of a /24 against the
+   event loop sweep of a /20 (16x the hosts), with tick lateness measured
+   while the sweep runs
+3. The service at 10x the devices: snapshots on time, every device probed
+   within the coverage window, same snapshot contract and sinks
+4. stop() cancels in-flight probes instead of waiting for them
+5. Background retention runs as an event loop task when a database and
+   retention_days are given
+
+Usage: python test_async_monitor_service.py
+"""
+
+import sys
+import os
+import asyncio
+import contextlib
+import io
+import json
+import tempfile
+import threading
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from async_monitor_service import AsyncContinuousMonitorService, AsyncPinger
+from database_manager import NetworkDatabaseManager, now_ms
+from network_monitor import NetworkMonitor
+from tick_scheduler import DeadlineScheduler
+from monitoring_snapshot import MonitoringSnapshot
+from output_sinks import JsonlFileSink
+from persistence_pipeline import snapshot_to_record
+
+
+def make_service(network_range: str, **options) -> AsyncContinuousMonitorService:
+    options.setdefault('render_mode', 'headless')
+    return AsyncContinuousMonitorService(enable_traffic_accounting=False, resolve_hostnames=False,
+                                         network_range=network_range, **options)
+
+
+class AsyncMonitorServiceTester:
+    """Tests for the asyncio monitoring service."""
+
+    def __init__(self):
+        self.test_results = {}
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    def test_pinger(self) -> bool:
+        """Test reply matching and bounded concurrency."""
+        self.print_header("Event Loop Pinger")
+
+        async def exercise():
+            pinger = AsyncPinger(max_in_flight=100)
+            mode = pinger.open()
+            single = await pinger.ping('127.0.0.1')
+
+            peak = 0
+
+            async def watch():
+                nonlocal peak
+                while True:
+                    peak = max(peak, pinger.in_flight)
+                    await asyncio.sleep(0)
+
+            watcher = asyncio.create_task(watch())
+            hosts = [f'127.0.{i // 250}.{i % 250 + 1}' for i in range(1000)]
+            delays = await asyncio.gather(*(pinger.ping(ip) for ip in hosts))
+            watcher.cancel()
+            pinger.close()
+            return mode, single, delays, peak, pinger
+
+        mode, single, delays, peak, pinger = asyncio.run(exercise())
+
+        reply_ok = single is not None and 0 <= single < 1.0
+        self.print_result("Loopback Echo Answered", reply_ok,
+                          f"{mode} socket, {single * 1000 if single is not None else float('nan'):.2f}ms")
+
+        answered = sum(1 for delay in delays if delay is not None)
+        bounded_ok = answered == 1000 and 0 < peak <= 100 and pinger.in_flight == 0
+        self.print_result("1000 Concurrent Pings, Bounded In Flight", bounded_ok,
+                          f"{answered}/1000 replies, at most {peak} in flight")
+
+        return reply_ok and bounded_ok
+
+    def test_sweep_benchmark(self) -> bool:
+        """Benchmark the threaded sweep against the event loop sweep on one core."""
+        self.print_header("Sweep Benchmark (one core)")
+
+        if hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, {min(os.sched_getaffinity(0))})
+
+        monitor = NetworkMonitor('127.0.0.0/24')
+        monitor._get_hostname = lambda ip: None         # Compare the pings only
+        monitor._get_mac_address = lambda ip: None
+        with contextlib.redirect_stdout(io.StringIO()):
+            cpu_start, wall_start = time.process_time(), time.perf_counter()
+            threaded_devices = monitor._perform_ping_sweep()
+            threaded_cpu = time.process_time() - cpu_start
+            threaded_wall = time.perf_counter() - wall_start
+
+        async def sweep():
+            service = make_service('127.0.0.0/20')
+            service.pinger.open()
+            ticks = DeadlineScheduler(0.02, align=False)
+            threads_during = []
+
+            async def tick_during_sweep():
+                async for _tick in ticks.aticks():
+                    threads_during.append(threading.active_count())
+
+            ticker = asyncio.create_task(tick_during_sweep())
+            await asyncio.sleep(0.05)
+            cpu_start, wall_start = time.process_time(), time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                devices = await service.discover_devices()
+            cpu = time.process_time() - cpu_start
+            wall = time.perf_counter() - wall_start
+            ticks.stop()
+            await ticker
+            service.pinger.close()
+            return devices, cpu, wall, ticks, max(threads_during)
+
+        async_devices, async_cpu, async_wall, ticks, peak_threads = asyncio.run(sweep())
+
+        scale = len(async_devices) / max(1, len(threaded_devices))
+        threaded_rate = len(threaded_devices) / max(threaded_cpu, 1e-3)
+        async_rate = len(async_devices) / max(async_cpu, 1e-3)
+        print(f"   Threaded sweep: {len(threaded_devices):5d} hosts in {threaded_wall:.2f}s "
+              f"({threaded_cpu:.2f}s CPU, one thread per host)")
+        print(f"   Async sweep:    {len(async_devices):5d} hosts in {async_wall:.2f}s "
+              f"({async_cpu:.2f}s CPU, {peak_threads} threads in the process)")
+
+        scale_ok = len(threaded_devices) == 254 and len(async_devices) == 4094 and scale >= 10
+        self.print_result("10x the Hosts per Sweep", scale_ok, f"{scale:.0f}x the hosts of the threaded sweep")
+
+        efficiency_ok = async_rate >= threaded_rate
+        self.print_result("Less CPU per Host", efficiency_ok,
+                          f"{async_rate:.0f} vs {threaded_rate:.0f} hosts per CPU-second")
+
+        lateness_p99 = ticks.lateness.percentile(0.99) or 0.0
+        responsive_ok = ticks.ticks_run > 0 and lateness_p99 <= 0.05
+        self.print_result("Loop Stays Responsive During the Sweep", responsive_ok,
+                          f"20ms ticks during the sweep: p99 lateness ≤{lateness_p99 * 1000:.0f}ms")
+
+        return scale_ok and efficiency_ok and responsive_ok
+
+    def test_service_at_scale(self) -> bool:
+        """Test the service with 10x the devices of a /24."""
+        self.print_header("Service with 4094 Devices")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "async.jsonl")
+
+            async def monitor():
+                service = make_service('127.0.0.0/20', monitoring_interval=0.1, probe_coverage=1.0,
+                                       output_sinks=[JsonlFileSink(path)])
+                with contextlib.redirect_stdout(io.StringIO()):
+                    started = await service.start()
+                    await asyncio.sleep(2.5)
+                    status = service.get_service_status()
+                    await service.stop()
+                return started, service, status
+
+            started, service, status = asyncio.run(monitor())
+            with open(path, encoding='utf-8') as output:
+                lines = [json.loads(line) for line in output]
+
+        snapshots = service.get_recent_snapshots(count=1000)
+        scheduler = service.tick_scheduler
+        lateness_p99 = scheduler.lateness.percentile(0.99) or 0.0
+        ticks_ok = started and len(snapshots) >= 20 and lateness_p99 < service.monitoring_interval
+        self.print_result("Snapshots on Time", ticks_ok,
+                          f"{len(snapshots)} snapshots, p99 tick lateness ≤{lateness_p99 * 1000:.0f}ms, "
+                          f"{scheduler.overruns} overruns")
+
+        coverage_ok = (len(service.tested_devices) == 4094 and status['event_loop']['probe_batch_size'] == 410
+                       and service.probe_stage.error_count == 0)
+        self.print_result("Every Device Probed Within the Coverage Window", coverage_ok,
+                          f"{len(service.tested_devices)} devices probed in {service.probe_stage.run_count} rounds "
+                          f"of {status['event_loop']['probe_batch_size']} (threaded: 1 per tick)")
+
+        device_sets = {id(snapshot.device_set) for snapshot in snapshots}
+        tested = [snapshot for snapshot in snapshots if snapshot.tested_device_ip]
+        record = snapshot_to_record(tested[-1]) if tested else None
+        contract_ok = (all(isinstance(snapshot, MonitoringSnapshot) for snapshot in snapshots)
+                       and len(device_sets) == 1 and snapshots[-1].device_count == 4094
+                       and tested and record['quality_test'] is not None
+                       and record['snapshot']['tested_device_ip'] == tested[-1].tested_device_ip
+                       and tested[-1].avg_packet_loss == 0.0)
+        self.print_result("Same Snapshot Contract", contract_ok,
+                          f"{len(tested)} snapshots report a probe, quality {snapshots[-1].overall_quality}")
+
+        sink_ok = len(lines) == service.measurement_count and lines[-1]['device_count'] == 4094
+        self.print_result("Sinks Fed on Every Tick", sink_ok,
+                          f"{len(lines)} lines for {service.measurement_count} snapshots")
+
+        return ticks_ok and coverage_ok and contract_ok and sink_ok
+
+    def test_cancellation(self) -> bool:
+        """Test that stop() cancels in-flight probes instead of waiting."""
+        self.print_header("Cancellation on Stop")
+
+        async def monitor():
+            # Four samples per device: each probe round takes about 1.5s
+            service = make_service('127.0.0.0/24', monitoring_interval=0.1, quality_test_samples=4)
+            with contextlib.redirect_stdout(io.StringIO()):
+                await service.start()
+                await asyncio.sleep(0.6)
+                in_flight = service.probe_stage.run_count == 0
+                stop_start = time.perf_counter()
+                await service.stop()
+                stop_seconds = time.perf_counter() - stop_start
+            leftover = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            return service, in_flight, stop_seconds, leftover
+
+        service, in_flight, stop_seconds, leftover = asyncio.run(monitor())
+
+        cancel_ok = in_flight and stop_seconds < 1.0 and not leftover and service.pinger.in_flight == 0
+        self.print_result("In-Flight Probes Cancelled", cancel_ok,
+                          f"stopped in {stop_seconds * 1000:.0f}ms with a probe round in progress, "
+                          f"{len(leftover)} tasks left")
+
+        flushed_ok = not service.is_running and service.measurement_count > 0 and not service._tasks
+        self.print_result("Service Stopped Cleanly", flushed_ok, f"{service.measurement_count} snapshots")
+
+        return cancel_ok and flushed_ok
+
+    def test_retention(self) -> bool:
+        """Test that background retention runs as an event loop task."""
+        self.print_header("Background Retention")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db = NetworkDatabaseManager(os.path.join(temp_dir, "async.db"))
+            session_id = db.start_monitoring_session("old data")
+            old_ms = now_ms() - 3 * 86400 * 1000
+            db.save_monitoring_batch(session_id, [{'snapshot': {
+                'timestamp': old_ms + i * 1000, 'device_count': 1, 'total_upload_mbps': 0.0,
+                'total_download_mbps': 0.0, 'total_usage_mb': 0.0, 'avg_latency_ms': 1.0,
+                'avg_packet_loss': 0.0, 'overall_quality': 'Good', 'active_interfaces': []
+            }} for i in range(500)])
+
+            async def monitor():
+                service = make_service('127.0.0.0/28', monitoring_interval=0.1, db_manager=db, retention_days=1)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    await service.start()
+                    task_names = {task.get_name() for task in service._tasks}
+                    service.retention_stage.trigger()  # Instead of waiting for the first slot
+                    deadline = time.monotonic() + 5.0
+                    while service.retention_stage.run_count == 0 and time.monotonic() < deadline:
+                        await asyncio.sleep(0.05)
+                    await service.stop()
+                return service, task_names
+
+            service, task_names = asyncio.run(monitor())
+            with db._get_connection() as conn:
+                old_left = conn.execute("SELECT COUNT(*) FROM network_snapshots WHERE timestamp < ?",
+                                        (now_ms() - 86400 * 1000,)).fetchone()[0]
+            db.close()
+
+        retention_ok = ('retention' in task_names and service.retention_stage.run_count >= 1
+                        and service.retention_stage.error_count == 0 and old_left == 0
+                        and service.retention_rows_removed >= 500)
+        self.print_result("Retention Runs on the Event Loop", retention_ok,
+                          f"{service.retention_rows_removed} rows older than 1 day removed, "
+                          f"{old_left} left")
+        return retention_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all async service tests."""
+        print("🚀 Async Monitoring Service Test Suite")
+        start_time = time.time()
+
+        results = [
+            self.test_pinger(),
+            self.test_sweep_benchmark(),
+            self.test_service_at_scale(),
+            self.test_cancellation(),
+            self.test_retention()
+        ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = AsyncMonitorServiceTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Background Retention Testing Script
+
+This script tests and benchmarks batched retention against temporary
+databases:
+
+1. cleanup_old_data removes exactly the snapshots (and their quality
+   tests) older than the cutoff, reporting progress after every batch
+2. A run stopped between batches resumes on the next run
+3. New databases use incremental auto-vacuum and shrink after retention
+4. Writer latency while retention runs, against deleting everything in
+   one transaction (the previous behaviour)
+
+Usage: python test_background_retention.py
+"""
+
+import sys
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from database_manager import NetworkDatabaseManager, DatabaseConfig, now_ms
+
+DAY_MS = 86400 * 1000
+
+
+def make_snapshot(timestamp: int, index: int) -> dict:
+    return {
+        'timestamp': timestamp,
+        'device_count': 10 + index % 20,
+        'total_upload_mbps': 1.0 + index % 7,
+        'total_download_mbps': 10.0 + index % 13,
+        'total_usage_mb': 0.5,
+        'avg_latency_ms': 12.0,
+        'avg_packet_loss': 0.0,
+        'overall_quality': 'Good',
+        'active_interfaces': ['eth0'],
+        'tested_device_ip': f"10.0.0.{index % 8 + 1}"
+    }
+
+
+def fill(db: NetworkDatabaseManager, session_id: int, days: int, per_day: int):
+    """Monitoring ticks with a quality test each, ending now."""
+    start_ms = now_ms() - days * DAY_MS
+    step = DAY_MS // per_day
+    records = [{'snapshot': make_snapshot(start_ms + i * step, i),
+                'quality_test': {'latency_ms': 5.0, 'packet_loss_percent': 0.0}}
+               for i in range(days * per_day)]
+    for offset in range(0, len(records), 5000):
+        db.save_monitoring_batch(session_id, records[offset:offset + 5000])
+
+
+def counts(db: NetworkDatabaseManager, cutoff_ms: int) -> dict:
+    with db._get_connection() as conn:
+        return {
+            'old': conn.execute("SELECT COUNT(*) FROM network_snapshots WHERE timestamp < ?",
+                                (cutoff_ms,)).fetchone()[0],
+            'snapshots': conn.execute("SELECT COUNT(*) FROM network_snapshots").fetchone()[0],
+            'tests': conn.execute("SELECT COUNT(*) FROM device_quality_tests").fetchone()[0],
+            'orphans': conn.execute("""
+                SELECT COUNT(*) FROM device_quality_tests
+                WHERE snapshot_id NOT IN (SELECT id FROM network_snapshots)
+            """).fetchone()[0]
+        }
+
+
+def single_transaction_cleanup(db: NetworkDatabaseManager, days_to_keep: int):
+    """The previous cleanup_old_data: every old row deleted in one transaction."""
+    cutoff_ms = now_ms() - days_to_keep * DAY_MS
+    with db._get_connection(write=True) as conn:
+        conn.execute("""
+            DELETE FROM device_quality_tests
+            WHERE snapshot_id IN (SELECT id FROM network_snapshots WHERE timestamp < ?)
+        """, (cutoff_ms,))
+        conn.execute("DELETE FROM network_snapshots WHERE timestamp < ?", (cutoff_ms,))
+        conn.execute("UPDATE devices SET is_active = 0 WHERE last_seen < ?", (cutoff_ms,))
+
+
+class BackgroundRetentionTester:
+    """Tests for batched background retention."""
+
+    def __init__(self):
+        self.test_results = {}
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    def test_batches(self, temp_dir: str) -> bool:
+        """Test what is removed, progress reports and resuming."""
+        self.print_header("Batched Deletes")
+
+        db = NetworkDatabaseManager(os.path.join(temp_dir, "batches.db"))
+        session_id = db.start_monitoring_session("batches")
+        fill(db, session_id, days=10, per_day=1000)
+        cutoff_ms = now_ms() - 4 * DAY_MS
+        before = counts(db, cutoff_ms)
+
+        reports = []
+        # Stop after a few batches, then let a second run finish
+        first = db.cleanup_old_data(days_to_keep=4, on_progress=lambda p: reports.append(p.snapshots_removed),
+                                    should_stop=lambda: len(reports) >= 3)
+        middle = counts(db, cutoff_ms)
+        second = db.cleanup_old_data(days_to_keep=4)
+        after = counts(db, cutoff_ms)
+
+        exact_ok = (after['old'] == 0 and after['snapshots'] == before['snapshots'] - before['old']
+                    and after['tests'] == after['snapshots'] and after['orphans'] == 0)
+        self.print_result("Old Rows Removed Exactly", exact_ok,
+                          f"{before['old']:,} of {before['snapshots']:,} snapshots were older than the cutoff; "
+                          f"{after['snapshots']:,} kept with their tests")
+
+        progress_ok = (reports == sorted(reports) and reports[0] <= DatabaseConfig.RETENTION_BATCH_ROWS
+                       and first.snapshots_pending == before['old']
+                       and first.rows_removed == 2 * first.snapshots_removed)
+        self.print_result("Progress Reported per Batch", progress_ok,
+                          f"removed after each batch: {reports[:3]}, "
+                          f"{first.fraction_done:.0%} done when stopped")
+
+        resumed_ok = (not first.finished and second.finished and 0 < middle['old'] < before['old']
+                      and first.snapshots_removed + second.snapshots_removed == before['old'])
+        self.print_result("Stopped Run Resumes", resumed_ok,
+                          f"first run stopped after {first.batches} batches "
+                          f"({first.snapshots_removed:,} rows), second removed {second.snapshots_removed:,} "
+                          f"in {second.batches}")
+        db.close()
+        return exact_ok and progress_ok and resumed_ok
+
+    def test_vacuum(self, temp_dir: str) -> bool:
+        """Test that retention gives space back to the file system."""
+        self.print_header("Incremental Vacuum")
+
+        path = os.path.join(temp_dir, "vacuum.db")
+        db = NetworkDatabaseManager(path)
+        session_id = db.start_monitoring_session("vacuum")
+        fill(db, session_id, days=10, per_day=3000)
+        with db._get_connection() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        size_before = os.path.getsize(path)
+
+        progress = db.cleanup_old_data(days_to_keep=3)
+        with db._get_connection() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        size_after = os.path.getsize(path)
+        db.close()
+
+        shrunk_ok = (auto_vacuum == 2 and progress.pages_freed > 0 and free_pages == 0
+                     and size_after < size_before * 0.5)
+        self.print_result("File Shrinks After Retention", shrunk_ok,
+                          f"{size_before / 1e6:.1f} MB -> {size_after / 1e6:.1f} MB, "
+                          f"{progress.pages_freed:,} pages freed in steps of {DatabaseConfig.VACUUM_STEP_PAGES}")
+        return shrunk_ok
+
+    def _writer_latencies(self, db: NetworkDatabaseManager, session_id: int, cleanup) -> tuple:
+        """Single-snapshot write latencies while cleanup runs on another thread."""
+        done = threading.Event()
+        latencies = []
+        elapsed = []
+
+        def run_cleanup():
+            start = time.perf_counter()
+            cleanup()
+            elapsed.append(time.perf_counter() - start)
+            done.set()
+
+        thread = threading.Thread(target=run_cleanup)
+        thread.start()
+        index = 0
+        while not done.is_set():
+            start = time.perf_counter()
+            db.save_network_snapshot(session_id, make_snapshot(now_ms(), index))
+            latencies.append((time.perf_counter() - start) * 1000)
+            index += 1
+            time.sleep(0.002)  # Paced like the service's writer
+        thread.join()
+        return latencies, elapsed[0]
+
+    def test_ingest_pauses(self, temp_dir: str) -> bool:
+        """Benchmark writer latency during retention."""
+        self.print_header("Ingestion During Retention")
+
+        results = {}
+        for label in ("one transaction", "batched"):
+            db = NetworkDatabaseManager(os.path.join(temp_dir, f"ingest-{label.replace(' ', '-')}.db"))
+            session_id = db.start_monitoring_session(label)
+            fill(db, session_id, days=20, per_day=10000)
+            if label == "batched":
+                cleanup = lambda: db.cleanup_old_data(days_to_keep=5)
+            else:
+                cleanup = lambda: single_transaction_cleanup(db, days_to_keep=5)
+            latencies, seconds = self._writer_latencies(db, session_id, cleanup)
+            results[label] = {
+                'max': max(latencies),
+                'p99': sorted(latencies)[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+                'median': statistics.median(latencies),
+                'writes': len(latencies),
+                'seconds': seconds
+            }
+            db.close()
+
+        for label, result in results.items():
+            print(f"   {label:>15}: cleanup {result['seconds']:.2f}s, {result['writes']} writes meanwhile, "
+                  f"median {result['median']:.2f}ms, p99 {result['p99']:.2f}ms, max {result['max']:.1f}ms")
+
+        old, new = results['one transaction'], results['batched']
+        paused_ok = new['p99'] < 10 and new['max'] * 5 < old['max']
+        self.print_result("Writers Wait Milliseconds", paused_ok,
+                          f"longest write {old['max']:.0f}ms -> {new['max']:.1f}ms while 150,000 "
+                          f"snapshots were removed")
+        return paused_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all background retention tests."""
+        print("🚀 Background Retention Test Suite")
+        start_time = time.time()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            results = [
+                self.test_batches(temp_dir),
+                self.test_vacuum(temp_dir),
+                self.test_ingest_pauses(temp_dir)
+            ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = BackgroundRetentionTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
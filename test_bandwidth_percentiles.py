@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Bandwidth Percentile Sketch Testing Script
+
+This script tests the streaming quantile sketches behind 95th-percentile
+(billing-style) bandwidth reporting:
+
+1. KLL sketch accuracy against exact percentiles
+2. Merging and serialization round trips
+3. Hour/day bucket persistence and range queries in SQLite
+4. Query speed for a month of data
+
+Usage: python test_bandwidth_percentiles.py
+"""
+
+import sys
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timezone, timedelta
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from quantile_sketch import KLLSketch, BandwidthQuantileTracker
+from database_manager import NetworkDatabaseManager
+
+
+def exact_percentile(values, fraction):
+    """Nearest-rank percentile used as ground truth."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def rank_of(values, value):
+    """Fraction of values strictly below value."""
+    return sum(1 for v in values if v < value) / len(values)
+
+
+class BandwidthPercentileTester:
+    """Tests for quantile sketches and their database persistence."""
+
+    def __init__(self):
+        self.test_results = {}
+        self.rng = random.Random(42)
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    def test_sketch_accuracy(self) -> bool:
+        """Test p95/p99 rank error of a single and a merged sketch."""
+        self.print_header("Sketch Accuracy")
+
+        # Bursty traffic: mostly idle with heavy-tailed peaks
+        values = [self.rng.lognormvariate(2.5, 1.2) for _ in range(50000)]
+
+        single = KLLSketch(seed=1)
+        for value in values:
+            single.update(value)
+
+        parts = [KLLSketch(seed=i) for i in range(24)]
+        for i, value in enumerate(values):
+            parts[i % 24].update(value)
+        merged = KLLSketch()
+        for part in parts:
+            merged.merge(KLLSketch.from_json(part.to_json()))
+
+        all_ok = True
+        for label, sketch in (("Single", single), ("Merged", merged)):
+            for fraction in (0.95, 0.99):
+                estimate = sketch.quantile(fraction)
+                error = abs(rank_of(values, estimate) - fraction)
+                ok = error < 0.01
+                all_ok = all_ok and ok
+                self.print_result(f"{label} p{fraction*100:g} Rank Error", ok,
+                                  f"estimate {estimate:.2f} vs exact {exact_percentile(values, fraction):.2f} "
+                                  f"(rank error {error:.4f})")
+
+        count_ok = merged.count == len(values) and merged.max_value == max(values)
+        self.print_result("Merged Count and Extremes", count_ok, f"{merged.count:,} samples")
+
+        size = len(single.to_json())
+        compact_ok = size < 20000
+        self.print_result("Compact Serialization", compact_ok, f"{size:,} bytes for 50,000 samples")
+
+        return all_ok and count_ok and compact_ok
+
+    def test_tracker_buckets(self) -> bool:
+        """Test that the collector tracker closes buckets on hour boundaries."""
+        self.print_header("Collector Bucket Tracking")
+
+        tracker = BandwidthQuantileTracker()
+        hour_start = 1_700_000_000 - 1_700_000_000 % 3600
+
+        closed = []
+        for second in range(0, 7200, 10):
+            closed.extend(tracker.record(hour_start + second, {'eth0': (1.0, 10.0), 'all': (1.0, 10.0)}))
+
+        keys_ok = sorted((b['interface'], b['direction']) for b in closed) == [
+            ('all', 'download'), ('all', 'upload'), ('eth0', 'download'), ('eth0', 'upload')
+        ]
+        start_ok = all(b['bucket_start'] == hour_start for b in closed)
+        count_ok = all(b['sketch'].count == 360 for b in closed)
+        self.print_result("Hour Bucket Closed", keys_ok and start_ok and count_ok,
+                          f"{len(closed)} sketches closed for hour {hour_start}")
+
+        remaining = tracker.drain()
+        drain_ok = len(remaining) == 4 and tracker.sketches == {}
+        self.print_result("Drain Current Bucket", drain_ok, f"{len(remaining)} sketches drained")
+
+        return keys_ok and start_ok and count_ok and drain_ok
+
+    def test_database_percentiles(self) -> bool:
+        """Test persistence and range queries across hour and day buckets."""
+        self.print_header("Database Percentile Queries")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db = NetworkDatabaseManager(os.path.join(temp_dir, "sketches.db"))
+
+            # 30 days of hourly buckets, 3600 samples each
+            day_zero = datetime(2026, 9, 1, tzinfo=timezone.utc)
+            all_values = []
+            write_start = time.time()
+            for hour in range(30 * 24):
+                bucket_start = int((day_zero + timedelta(hours=hour)).timestamp())
+                sketch = KLLSketch(seed=hour)
+                peak = 3.0 if 18 <= hour % 24 <= 22 else 1.0
+                for _ in range(3600):
+                    value = self.rng.expovariate(1.0 / (20.0 * peak))
+                    sketch.update(value)
+                    all_values.append(value)
+                db.save_bandwidth_sketch('all', 'download', bucket_start, sketch)
+            print(f"   Persisted 720 hourly buckets in {time.time() - write_start:.1f}s")
+
+            query_start = time.perf_counter()
+            month = db.get_bandwidth_percentiles(day_zero, day_zero + timedelta(days=30))
+            query_ms = (time.perf_counter() - query_start) * 1000
+
+            count_ok = month['sample_count'] == len(all_values)
+            self.print_result("Month Sample Count", count_ok, f"{month['sample_count']:,} samples")
+
+            day_buckets_ok = month['buckets_merged'] == 30
+            self.print_result("Daily Sketches Used", day_buckets_ok,
+                              f"{month['buckets_merged']} buckets merged")
+
+            error = abs(rank_of(all_values, month['p95']) - 0.95)
+            accuracy_ok = error < 0.01
+            self.print_result("Month p95 Accuracy", accuracy_ok,
+                              f"p95={month['p95']} Mbps (exact {exact_percentile(all_values, 0.95):.2f}, "
+                              f"rank error {error:.4f})")
+
+            speed_ok = query_ms < 1000
+            self.print_result("Month Query Speed", speed_ok, f"{query_ms:.0f}ms")
+
+            # Range with partial days at both edges: hourly buckets fill in
+            edge_start = day_zero + timedelta(days=2, hours=20)
+            edge_end = day_zero + timedelta(days=5, hours=3)
+            edges = db.get_bandwidth_percentiles(edge_start, edge_end, percentiles=(95,))
+            expected_hours = int((edge_end - edge_start).total_seconds() // 3600)
+            edges_ok = edges['sample_count'] == expected_hours * 3600 and edges['buckets_merged'] == 4 + 3 + 2
+            self.print_result("Partial Day Edges", edges_ok,
+                              f"{edges['buckets_merged']} buckets, {edges['sample_count']:,} samples")
+
+            # Restart within an hour: a second partial bucket merges, not overwrites
+            extra = KLLSketch()
+            for _ in range(100):
+                extra.update(50.0)
+            db.save_bandwidth_sketch('all', 'download', int(day_zero.timestamp()), extra)
+            first_hour = db.get_bandwidth_percentiles(day_zero, day_zero + timedelta(hours=1))
+            merge_ok = first_hour['sample_count'] == 3700
+            self.print_result("Partial Buckets Merge", merge_ok,
+                              f"{first_hour['sample_count']} samples in first hour")
+
+            empty = db.get_bandwidth_percentiles(day_zero, day_zero + timedelta(days=1),
+                                                 interface='eth9')
+            empty_ok = empty['p95'] is None and empty['sample_count'] == 0
+            self.print_result("Unknown Interface", empty_ok, "No data returns None")
+
+        return all([count_ok, day_buckets_ok, accuracy_ok, speed_ok, edges_ok, merge_ok, empty_ok])
+
+    def run_all_tests(self) -> bool:
+        """Run all percentile tests."""
+        print("🚀 Bandwidth Percentile Sketch Test Suite")
+        start_time = time.time()
+
+        results = [
+            self.test_sketch_accuracy(),
+            self.test_tracker_buckets(),
+            self.test_database_percentiles()
+        ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = BandwidthPercentileTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Bulk Insert Testing Script
+
+This script tests the database manager's batch write APIs against a
+temporary database:
+
+1. save_network_snapshots and save_device_quality_tests return IDs in
+   record order, across statement chunks
+2. save_devices upserts a batch in one statement and returns IDs per IP
+3. A batch is all or nothing
+4. Sustained ingest rate of whole monitoring ticks, row by row versus
+   batched
+
+Usage: python test_bulk_inserts.py
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from database_manager import NetworkDatabaseManager, DatabaseConfig
+
+
+def make_snapshot(index: int) -> dict:
+    return {
+        'timestamp': 1735689600000 + index,
+        'device_count': index % 50,
+        'total_upload_mbps': 1.0 + index % 7,
+        'total_download_mbps': 10.0 + index % 13,
+        'total_usage_mb': 0.5,
+        'avg_latency_ms': 12.0,
+        'avg_packet_loss': 0.0,
+        'overall_quality': 'Good',
+        'active_interfaces': ['eth0'],
+        'tested_device_ip': f"10.0.{index % 4}.1"
+    }
+
+
+def make_devices(count: int, tick: int = 0) -> list:
+    return [{'ip': f"10.0.{i // 250}.{i % 250 + 1}", 'mac_address': f"aa:bb:cc:00:{i // 256:02x}:{i % 256:02x}",
+             'hostname': f"host-{i}" if tick == 0 else None} for i in range(count)]
+
+
+class BulkInsertTester:
+    """Tests for batch write APIs."""
+
+    def __init__(self):
+        self.test_results = {}
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    def test_returned_ids(self, temp_dir: str) -> bool:
+        """Test that IDs come back in record order."""
+        self.print_header("Returned IDs")
+
+        db = NetworkDatabaseManager(os.path.join(temp_dir, "ids.db"))
+        session_id = db.start_monitoring_session("bulk ids")
+        count = 6000
+        per_chunk = DatabaseConfig.MAX_SQL_VARIABLES // 13
+        snapshot_ids = db.save_network_snapshots(session_id, [make_snapshot(i) for i in range(count)])
+        with db._get_connection() as conn:
+            stored = {row['id']: row['timestamp'] for row in conn.execute("SELECT id, timestamp FROM network_snapshots")}
+        ordered_ok = (len(snapshot_ids) == count == len(stored)
+                      and all(stored[snapshot_id] == make_snapshot(i)['timestamp']
+                              for i, snapshot_id in enumerate(snapshot_ids)))
+        self.print_result("Snapshot IDs in Record Order", ordered_ok,
+                          f"{count} snapshots in {-(-count // per_chunk)} statements of up to {per_chunk} rows")
+
+        tests = [{'snapshot_id': snapshot_ids[i], 'device_ip': f"10.0.0.{i % 250 + 1}", 'latency_ms': float(i)}
+                 for i in range(3000)]
+        test_ids = db.save_device_quality_tests(tests)
+        with db._get_connection() as conn:
+            latencies = {row[0]: row[1] for row in conn.execute("SELECT id, latency_ms FROM device_quality_tests")}
+        tests_ok = len(test_ids) == 3000 and all(latencies[test_id] == float(i) for i, test_id in enumerate(test_ids))
+        self.print_result("Quality Test IDs in Record Order", tests_ok, f"{len(test_ids)} tests")
+
+        # Older SQLite builds allow 999 variables per statement
+        default_limit = DatabaseConfig.MAX_SQL_VARIABLES
+        DatabaseConfig.MAX_SQL_VARIABLES = 999
+        try:
+            small_ids = db.save_network_snapshots(session_id, [make_snapshot(i) for i in range(500)])
+        finally:
+            DatabaseConfig.MAX_SQL_VARIABLES = default_limit
+        small_ok = small_ids == list(range(snapshot_ids[-1] + 1, snapshot_ids[-1] + 501))
+        self.print_result("Chunks Fit a 999-Variable Limit", small_ok, "500 snapshots in 7 statements")
+        db.close()
+        return ordered_ok and tests_ok and small_ok
+
+    def test_device_upserts(self, temp_dir: str) -> bool:
+        """Test batch device upserts."""
+        self.print_header("Device Upserts")
+
+        db = NetworkDatabaseManager(os.path.join(temp_dir, "devices.db"))
+        first = db.save_devices(make_devices(1000))
+        # Seen again without hostnames, plus new devices and a duplicate IP
+        again = db.save_devices(make_devices(1200, tick=1) + [{'ip': '10.0.0.1', 'hostname': 'renamed'}])
+        with db._get_connection() as conn:
+            rows = {row['ip_address']: dict(row) for row in conn.execute("SELECT * FROM devices")}
+
+        stable_ok = (len(first) == 1000 and len(again) == 1200 and len(rows) == 1200
+                     and all(again[ip] == device_id for ip, device_id in first.items())
+                     and all(rows[ip]['id'] == device_id for ip, device_id in again.items()))
+        self.print_result("IDs Returned per IP and Kept on Update", stable_ok,
+                          f"{len(first)} inserted, {len(again)} upserted ({len(again) - len(first)} new)")
+
+        merged_ok = (rows['10.0.0.1']['hostname'] == 'renamed' and rows['10.0.0.2']['hostname'] == 'host-1'
+                     and rows['10.0.4.200']['hostname'] is None and rows['10.0.0.2']['mac_address'] is not None)
+        self.print_result("Missing Fields Keep Stored Values", merged_ok,
+                          "NULL hostname keeps the stored one; the last entry for an IP wins")
+
+        single_ok = db.save_device({'ip': '10.0.0.2'}) == first['10.0.0.2']
+        self.print_result("save_device Uses the Batch Path", single_ok, f"device ID {first['10.0.0.2']}")
+        db.close()
+        return stable_ok and merged_ok and single_ok
+
+    def test_atomicity(self, temp_dir: str) -> bool:
+        """Test that a failing batch writes nothing."""
+        self.print_header("All or Nothing")
+
+        db = NetworkDatabaseManager(os.path.join(temp_dir, "atomic.db"))
+        session_id = db.start_monitoring_session("atomic")
+        records = [{'snapshot': make_snapshot(i), 'devices': make_devices(20)} for i in range(4000)]
+        records[3500]['snapshot'] = dict(records[3500]['snapshot'], overall_quality=None)  # NOT NULL column
+        try:
+            db.save_monitoring_batch(session_id, records)
+            raised = False
+        except Exception:
+            raised = True
+        with db._get_connection() as conn:
+            counts = [conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                      for table in ('network_snapshots', 'devices', 'device_quality_tests')]
+        atomic_ok = raised and counts == [0, 0, 0]
+        self.print_result("Failed Batch Rolled Back", atomic_ok,
+                          f"bad row in the second statement chunk; rows left: {counts}")
+        db.close()
+        return atomic_ok
+
+    def test_ingest_rate(self, temp_dir: str) -> bool:
+        """Compare row-by-row and batched writes of monitoring ticks."""
+        self.print_header("Sustained Ingest")
+
+        devices = make_devices(100)
+        ticks = [{'snapshot': make_snapshot(i), 'devices': devices,
+                  'quality_test': {'latency_ms': 5.0, 'packet_loss_percent': 0.0}} for i in range(300)]
+        rows_per_tick = 1 + len(devices) + 1
+
+        # Every device sighting written (no registry coalescing): this compares write paths
+        db = NetworkDatabaseManager(os.path.join(temp_dir, "row_by_row.db"), last_seen_granularity_ms=0)
+        session_id = db.start_monitoring_session("row by row")
+        tick_count = 30
+        start = time.perf_counter()
+        for tick in ticks[:tick_count]:
+            snapshot_id = db.save_network_snapshot(session_id, tick['snapshot'])
+            for device in tick['devices']:
+                db.save_device(device)
+            db.save_device_quality_test(snapshot_id, tick['snapshot']['tested_device_ip'], tick['quality_test'])
+        row_rate = tick_count * rows_per_tick / (time.perf_counter() - start)
+        db.close()
+
+        db = NetworkDatabaseManager(os.path.join(temp_dir, "batched.db"), last_seen_granularity_ms=0)
+        session_id = db.start_monitoring_session("batched")
+        start = time.perf_counter()
+        # Ticks arrive in batches of 10, as from the write-behind pipeline;
+        # a batch writes each device once, so count the rows actually written
+        for offset in range(0, len(ticks), 10):
+            db.save_monitoring_batch(session_id, ticks[offset:offset + 10])
+        batches = len(ticks) // 10
+        batch_rate = batches * (10 + len(devices) + 10) / (time.perf_counter() - start)
+        with db._get_connection() as conn:
+            tests = conn.execute("SELECT COUNT(*) FROM device_quality_tests").fetchone()[0]
+        db.close()
+
+        print(f"   row by row: {row_rate:8.0f} rows/s ({rows_per_tick} statements and commits per tick)")
+        print(f"   batched:    {batch_rate:8.0f} rows/s (3 statements and 1 commit per 10 ticks)")
+        rate_ok = batch_rate >= 10000 and batch_rate > 5 * row_rate and tests == len(ticks)
+        self.print_result("Tens of Thousands of Rows per Second", rate_ok,
+                          f"{batch_rate / row_rate:.0f}x the row-by-row rate, "
+                          f"{batch_rate:.0f} rows written/s with 100-device ticks")
+        return rate_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all bulk insert tests."""
+        print("🚀 Bulk Insert Test Suite")
+        start_time = time.time()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            results = [
+                self.test_returned_ids(temp_dir),
+                self.test_device_upserts(temp_dir),
+                self.test_atomicity(temp_dir),
+                self.test_ingest_rate(temp_dir)
+            ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = BulkInsertTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
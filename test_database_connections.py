@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Database Connection Testing Script
+
+This script tests and benchmarks the database manager's connections
+against a temporary database:
+
+1. Each thread keeps one tuned connection (WAL, synchronous=NORMAL, mmap,
+   page cache) and connections of finished threads are closed
+2. Write blocks are transactions: committed on success, rolled back on
+   error
+3. Readers see committed data while a write transaction is open, and do
+   not hold the writer up
+4. save_network_snapshot throughput against a connection per call in
+   rollback-journal mode behind one lock (the previous behaviour)
+
+Usage: python test_database_connections.py
+"""
+
+import sys
+import os
+import contextlib
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from database_manager import NetworkDatabaseManager, DatabaseConfig
+
+
+SNAPSHOT = {
+    'device_count': 12,
+    'total_upload_mbps': 4.2,
+    'total_download_mbps': 38.5,
+    'total_usage_mb': 5.3,
+    'avg_latency_ms': 14.0,
+    'avg_packet_loss': 0.2,
+    'overall_quality': 'Excellent',
+    'active_interfaces': ['eth0'],
+    'tested_device_ip': '192.168.1.20'
+}
+
+
+class PerCallConnectionManager(NetworkDatabaseManager):
+    """The previous connection handling: a new connection per call, one global lock."""
+
+    def __init__(self, db_path: str):
+        self.connection_lock = threading.Lock()
+        super().__init__(db_path)
+
+    @contextlib.contextmanager
+    def _get_connection(self, write: bool = False, partitions=()):
+        with self.connection_lock:
+            conn = sqlite3.connect(self.db_path, timeout=30.0)
+            conn.row_factory = sqlite3.Row
+            try:
+                yield conn
+                if write:
+                    conn.commit()  # The write methods used to commit themselves
+            finally:
+                conn.close()
+
+
+class DatabaseConnectionTester:
+    """Tests for per-thread database connections."""
+
+    def __init__(self):
+        self.test_results = {}
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    def test_connections(self, temp_dir: str) -> bool:
+        """Test connection reuse, tuning and cleanup."""
+        self.print_header("Per-Thread Connections")
+
+        db = NetworkDatabaseManager(os.path.join(temp_dir, "connections.db"))
+        with db._get_connection() as first, db._get_connection() as second:
+            pragmas = {name: first.execute(f"PRAGMA {name}").fetchone()[0]
+                       for name in ('journal_mode', 'synchronous', 'cache_size', 'mmap_size')}
+        reused = first is second
+
+        other = []
+        worker = threading.Thread(target=lambda: other.append(db.save_network_snapshot(1, SNAPSHOT)))
+        worker.start()
+        worker.join()
+        separate = len(db._connections) == 2 and other[0] > 0
+
+        tuned_ok = (pragmas['journal_mode'] == 'wal' and pragmas['synchronous'] == 1
+                    and pragmas['cache_size'] == -DatabaseConfig.CACHE_SIZE_KB
+                    and pragmas['mmap_size'] == DatabaseConfig.MMAP_SIZE)
+        self.print_result("Connections Tuned on Open", tuned_ok,
+                          ", ".join(f"{name}={value}" for name, value in pragmas.items()))
+
+        # Finished threads' connections are closed when the next one opens
+        for _ in range(20):
+            worker = threading.Thread(target=db.get_recent_snapshots)
+            worker.start()
+            worker.join()
+        reuse_ok = reused and separate and len(db._connections) == 2
+        self.print_result("One Connection per Thread", reuse_ok,
+                          f"reused within a thread, {len(db._connections)} open after 22 threads")
+
+        db.close()
+        reopened = db.get_recent_snapshots(limit=1)
+        closed_ok = len(reopened) == 1 and len(db._connections) == 1
+        self.print_result("Close and Reopen", closed_ok, "closed connections are reopened on next use")
+        db.close()
+        return tuned_ok and reuse_ok and closed_ok
+
+    def test_transactions(self, temp_dir: str) -> bool:
+        """Test commit and rollback of write blocks, and reads during a write."""
+        self.print_header("Transactions")
+
+        db = NetworkDatabaseManager(os.path.join(temp_dir, "transactions.db"))
+        session_id = db.start_monitoring_session("transactions")
+        try:
+            with db._get_connection(write=True) as conn:
+                conn.execute("INSERT INTO monitoring_sessions (notes) VALUES ('never committed')")
+                raise ValueError("failure inside the transaction")
+        except ValueError:
+            pass
+        with db._get_connection() as conn:
+            notes = [row[0] for row in conn.execute("SELECT notes FROM monitoring_sessions")]
+        rollback_ok = notes == ["transactions"] and not db.write_lock.locked()
+        self.print_result("Failed Write Rolled Back", rollback_ok, f"sessions: {notes}")
+
+        # Hold a write transaction open on another thread and read meanwhile
+        inserted, release = threading.Event(), threading.Event()
+
+        def slow_writer():
+            with db._get_connection(write=True) as conn:
+                conn.execute("INSERT INTO monitoring_sessions (notes) VALUES ('in progress')")
+                inserted.set()
+                release.wait()
+
+        writer = threading.Thread(target=slow_writer)
+        writer.start()
+        inserted.wait()
+        start = time.perf_counter()
+        during = db.get_session_summary(session_id)
+        with db._get_connection() as conn:
+            visible = conn.execute("SELECT COUNT(*) FROM monitoring_sessions").fetchone()[0]
+        read_ms = (time.perf_counter() - start) * 1000
+        release.set()
+        writer.join()
+        with db._get_connection() as conn:
+            after = conn.execute("SELECT COUNT(*) FROM monitoring_sessions").fetchone()[0]
+
+        isolated_ok = during is not None and visible == 1 and after == 2 and read_ms < 100
+        self.print_result("Reads Proceed During a Write", isolated_ok,
+                          f"read in {read_ms:.1f}ms with a write open, saw {visible} committed row(s), "
+                          f"{after} after commit")
+        db.close()
+        return rollback_ok and isolated_ok
+
+    def _write_latencies(self, db: NetworkDatabaseManager, count: int, pause: float = 0.0) -> list:
+        latencies = []
+        for _ in range(count):
+            start = time.perf_counter()
+            db.save_network_snapshot(1, SNAPSHOT)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if pause:
+                time.sleep(pause)
+        return latencies
+
+    def _with_readers(self, db: NetworkDatabaseManager, count: int, readers: int = 3):
+        """Writer latencies while reader threads keep aggregating the table."""
+        stop = threading.Event()
+        reads = []
+
+        def reader():
+            while not stop.is_set():
+                with db._get_connection() as conn:
+                    conn.execute("SELECT COUNT(*), AVG(total_download_mbps), MAX(avg_latency_ms) "
+                                 "FROM network_snapshots").fetchone()
+                reads.append(1)
+                time.sleep(0.001)
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        # Paced like the service's writer, so the readers run throughout
+        latencies = self._write_latencies(db, count, pause=0.002)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return latencies, len(reads)
+
+    def test_benchmark(self, temp_dir: str) -> bool:
+        """Benchmark single-row snapshot writes, alone and with readers."""
+        self.print_header("save_network_snapshot Benchmark")
+
+        results = {}
+        for label, manager in (("per-call", PerCallConnectionManager), ("per-thread", NetworkDatabaseManager)):
+            db = manager(os.path.join(temp_dir, f"{label}.db"))
+            # Give the readers something to scan
+            with db._get_connection(write=True) as conn:
+                conn.executemany("""
+                    INSERT INTO network_snapshots (
+                        session_id, device_count, total_upload_mbps, total_download_mbps, total_usage_mb,
+                        avg_latency_ms, avg_packet_loss, overall_quality, active_interfaces
+                    ) VALUES (1, 10, 1.0, ?, 1.0, 12.0, 0.0, 'Good', '[]')
+                """, [(float(i % 100),) for i in range(100000)])
+                conn.commit()
+            db.refresh_rollups()  # Outside the timed writes
+
+            count = 300
+            start = time.perf_counter()
+            alone = self._write_latencies(db, count)
+            rate = count / (time.perf_counter() - start)
+            contended, reads = self._with_readers(db, count)
+            results[label] = {
+                'rate': rate,
+                'median': statistics.median(alone),
+                'p99_contended': sorted(contended)[int(count * 0.99) - 1],
+                'reads': reads
+            }
+            if hasattr(db, '_connections'):
+                db.close()
+
+        old, new = results['per-call'], results['per-thread']
+        for label, result in results.items():
+            print(f"   {label:>10}: {result['rate']:7.0f} snapshots/s, median {result['median']:.2f}ms, "
+                  f"p99 with 3 readers {result['p99_contended']:.2f}ms ({result['reads']} reads)")
+
+        speedup = new['rate'] / old['rate']
+        faster_ok = speedup >= 3.0
+        self.print_result("Snapshot Writes Faster", faster_ok,
+                          f"{speedup:.1f}x the previous throughput "
+                          f"({old['rate']:.0f} -> {new['rate']:.0f} snapshots/s)")
+
+        unblocked_ok = new['p99_contended'] < old['p99_contended']
+        self.print_result("Readers Do Not Hold the Writer Up", unblocked_ok,
+                          f"writer p99 with readers {old['p99_contended']:.2f}ms -> {new['p99_contended']:.2f}ms")
+        return faster_ok and unblocked_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all database connection tests."""
+        print("🚀 Database Connection Test Suite")
+        start_time = time.time()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            results = [
+                self.test_connections(temp_dir),
+                self.test_transactions(temp_dir),
+                self.test_benchmark(temp_dir)
+            ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = DatabaseConnectionTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
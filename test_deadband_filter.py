@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Deadband Compression Testing Script
+
+This script tests change-driven snapshot persistence without touching
+the network:
+
+1. An idle hour is stored in far fewer rows (heartbeat rows only)
+2. The full series can be reconstructed, within tolerance, from the rows
+3. Metric steps and device changes start a new row immediately
+4. Every probe is still stored as a quality test
+5. Older databases gain the validity columns on open
+
+Usage: python test_deadband_filter.py
+"""
+
+import sys
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from typing import List
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from deadband_filter import DeadbandFilter, DeadbandConfig, expand_snapshot_rows
+from monitoring_snapshot import MonitoringSnapshot, DeviceSet, QUALITY_CODES
+from persistence_pipeline import SnapshotPersistencePipeline
+from database_manager import NetworkDatabaseManager
+
+
+DEVICES = DeviceSet([{'ip': f'192.168.1.{10 + i}', 'hostname': f'device-{i}'} for i in range(8)], version=1)
+START_MS = 1700000000000
+
+
+def make_series(ticks: int, download=lambda i: 10.0, device_set=lambda i: DEVICES,
+                probe_every: int = 0, seed: int = 7) -> List[MonitoringSnapshot]:
+    """One snapshot per second with small noise around the given levels."""
+    rng = random.Random(seed)
+    return [
+        MonitoringSnapshot(
+            timestamp_ms=START_MS + i * 1000,
+            device_set=device_set(i),
+            total_upload_mbps=round(1.0 + rng.uniform(-0.2, 0.2), 2),
+            total_download_mbps=round(download(i) + rng.uniform(-0.3, 0.3), 2),
+            total_usage_mb=0.25,
+            avg_latency_ms=round(12.0 + rng.uniform(-1.0, 1.0), 2),
+            avg_packet_loss=0.0,
+            quality_code=QUALITY_CODES["Excellent"],
+            interfaces=('eth0',),
+            tested_device_ip=DEVICES.devices[i % len(DEVICES)]['ip'] if probe_every and i % probe_every == 0 else None
+        )
+        for i in range(ticks)
+    ]
+
+
+class DeadbandFilterTester:
+    """Tests for deadband snapshot compression."""
+
+    def __init__(self):
+        self.test_results = {}
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    @staticmethod
+    def _persist(db_path: str, snapshots: List[MonitoringSnapshot], heartbeat: float = DeadbandConfig.HEARTBEAT):
+        db = NetworkDatabaseManager(db_path)
+        session_id = db.start_monitoring_session("deadband test")
+        pipeline = SnapshotPersistencePipeline(db, session_id, deadband=DeadbandFilter(heartbeat))
+        pipeline.start()
+        for snapshot in snapshots:
+            pipeline.submit_snapshot(snapshot)
+        pipeline.stop()
+        db.end_monitoring_session(session_id)
+        return db, session_id, pipeline
+
+    def test_idle_compression(self) -> bool:
+        """Test row reduction and reconstruction for an idle hour."""
+        self.print_header("Idle Hour")
+
+        snapshots = make_series(3600)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db, session_id, pipeline = self._persist(os.path.join(temp_dir, "idle.db"), snapshots)
+            with db._get_connection() as conn:
+                rows = [dict(row) for row in conn.execute(
+                    "SELECT * FROM network_snapshots WHERE session_id = ? ORDER BY id", (session_id,))]
+                session = dict(conn.execute("SELECT * FROM monitoring_sessions WHERE id = ?",
+                                            (session_id,)).fetchone())
+
+        ratio = len(snapshots) / len(rows)
+        rows_ok = len(rows) <= 3600 / DeadbandConfig.HEARTBEAT + 1 and pipeline.deadband.rows == len(rows)
+        self.print_result("Far Fewer Rows", rows_ok, f"{len(snapshots)} snapshots -> {len(rows)} rows ({ratio:.0f}x)")
+
+        series = list(expand_snapshot_rows(rows))
+        worst = max(
+            abs(tick['total_download_mbps'] - snapshot.total_download_mbps)
+            / max(DeadbandConfig.TOLERANCES['total_download_mbps'],
+                  DeadbandConfig.RELATIVE_TOLERANCE * tick['total_download_mbps'])
+            for tick, snapshot in zip(series, snapshots)
+        )
+        usage_ok = abs(sum(tick['total_usage_mb'] for tick in series) - 0.25 * len(snapshots)) < 0.01
+        times_ok = series[-1]['timestamp'] == snapshots[-1].timestamp_ms
+        fidelity_ok = len(series) == len(snapshots) and worst <= 1.0 and usage_ok and times_ok
+        self.print_result("Series Reconstructed Within Tolerance", fidelity_ok,
+                          f"{len(series)} ticks, worst download error {worst:.0%} of the deadband")
+
+        session_ok = session['total_snapshots'] == len(snapshots) and abs(session['avg_device_count'] - 8) < 1e-9
+        self.print_result("Session Summary Weighted by Ticks", session_ok,
+                          f"total_snapshots={session['total_snapshots']}")
+
+        return rows_ok and fidelity_ok and session_ok
+
+    def test_changes(self) -> bool:
+        """Test that real changes start new rows at the right tick."""
+        self.print_header("Change Detection")
+
+        grown = DeviceSet(list(DEVICES.devices) + [{'ip': '192.168.1.99'}], version=2)
+        snapshots = make_series(
+            300,
+            download=lambda i: 10.0 if i < 100 else 40.0,
+            device_set=lambda i: DEVICES if i < 200 else grown
+        )
+        deadband = DeadbandFilter()
+        starts = []
+        for snapshot in snapshots:
+            closed = deadband.offer(snapshot)
+            if closed:
+                starts.append(closed.valid_until_ms)
+        last = deadband.flush()
+
+        step_ok = START_MS + 99 * 1000 in starts and START_MS + 199 * 1000 in starts
+        count_ok = last.valid_until_ms == snapshots[-1].timestamp_ms and last.anchor.device_set is grown
+        self.print_result("Step and Device Change Close Rows", step_ok and count_ok,
+                          f"{deadband.rows} rows for {deadband.ticks} ticks")
+
+        return step_ok and count_ok
+
+    def test_quality_tests_kept(self) -> bool:
+        """Test that probes absorbed into a row are still stored."""
+        self.print_header("Probe Results")
+
+        snapshots = make_series(600, probe_every=5)
+        probes = sum(1 for snapshot in snapshots if snapshot.tested_device_ip)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db, session_id, _ = self._persist(os.path.join(temp_dir, "probes.db"), snapshots)
+            with db._get_connection() as conn:
+                stored = conn.execute("SELECT COUNT(*) FROM device_quality_tests").fetchone()[0]
+                rows = conn.execute("SELECT COUNT(*) FROM network_snapshots").fetchone()[0]
+
+        kept_ok = stored == probes
+        self.print_result("Every Probe Stored", kept_ok, f"{stored}/{probes} quality tests across {rows} rows")
+        return kept_ok
+
+    def test_migration(self) -> bool:
+        """Test that an existing database gains the new columns."""
+        self.print_header("Schema Migration")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "old.db")
+            conn = sqlite3.connect(db_path)
+            conn.execute("""
+                CREATE TABLE network_snapshots (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, session_id INTEGER NOT NULL,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP, device_count INTEGER NOT NULL,
+                    total_upload_mbps REAL NOT NULL, total_download_mbps REAL NOT NULL,
+                    total_usage_mb REAL NOT NULL, avg_latency_ms REAL NOT NULL,
+                    avg_packet_loss REAL NOT NULL, overall_quality TEXT NOT NULL,
+                    active_interfaces TEXT, tested_device_ip TEXT
+                )
+            """)
+            conn.execute("""
+                INSERT INTO network_snapshots (session_id, device_count, total_upload_mbps, total_download_mbps,
+                    total_usage_mb, avg_latency_ms, avg_packet_loss, overall_quality)
+                VALUES (1, 3, 1.0, 2.0, 0.1, 10.0, 0.0, 'Good')
+            """)
+            conn.commit()
+            conn.close()
+
+            db = NetworkDatabaseManager(db_path)
+            NetworkDatabaseManager(db_path)  # Reopening must not fail
+            with db._get_connection() as conn:
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(network_snapshots)")}
+                old_row = dict(conn.execute("SELECT * FROM network_snapshots").fetchone())
+
+        migrated_ok = {'valid_until', 'sample_count'} <= columns and old_row['sample_count'] == 1
+        self.print_result("Columns Added to Existing Table", migrated_ok)
+        return migrated_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all deadband tests."""
+        print("🚀 Deadband Compression Test Suite")
+        start_time = time.time()
+
+        results = [
+            self.test_idle_compression(),
+            self.test_changes(),
+            self.test_quality_tests_kept(),
+            self.test_migration()
+        ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = DeadbandFilterTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Device Registry Testing Script
+
+This script tests the in-process device registry against temporary
+databases:
+
+1. Steady-state ticks rewrite almost no device rows: unchanged devices
+   only move last_seen on once per granularity
+2. Real changes (new devices, MAC addresses, hostnames) are written at once
+3. IDs are known by IP and MAC address, also for skipped devices
+4. Writes that roll back are not remembered
+
+Device rows are counted by temporary triggers on the test's connection,
+independently of the registry's own counters.
+
+Usage: python test_device_registry.py
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from database_manager import NetworkDatabaseManager, now_ms
+
+
+def make_devices(count: int) -> list:
+    return [{'ip': f"10.0.{i // 250}.{i % 250 + 1}", 'mac_address': f"aa:bb:cc:00:{i // 256:02x}:{i % 256:02x}",
+             'hostname': f"host-{i}"} for i in range(count)]
+
+
+def make_tick(index: int, devices: list) -> dict:
+    return {
+        'snapshot': {
+            'device_count': len(devices),
+            'total_upload_mbps': 1.0,
+            'total_download_mbps': 10.0 + index % 13,
+            'total_usage_mb': 0.5,
+            'avg_latency_ms': 12.0,
+            'avg_packet_loss': 0.0,
+            'overall_quality': 'Good',
+            'active_interfaces': ['eth0'],
+            'tested_device_ip': devices[index % len(devices)]['ip']
+        },
+        'devices': devices
+    }
+
+
+def count_device_writes(db: NetworkDatabaseManager):
+    """Count inserted and updated device rows made through this thread's connection."""
+    with db._get_connection() as conn:
+        conn.executescript("""
+            CREATE TEMP TABLE device_writes (ip_address TEXT);
+            CREATE TEMP TRIGGER count_device_inserts AFTER INSERT ON main.devices
+            BEGIN INSERT INTO device_writes VALUES (NEW.ip_address); END;
+            CREATE TEMP TRIGGER count_device_updates AFTER UPDATE ON main.devices
+            BEGIN INSERT INTO device_writes VALUES (NEW.ip_address); END;
+        """)
+
+
+def device_writes(db: NetworkDatabaseManager) -> int:
+    with db._get_connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM temp.device_writes").fetchone()[0]
+
+
+class DeviceRegistryTester:
+    """Tests for the device registry."""
+
+    def __init__(self):
+        self.test_results = {}
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    def test_steady_state(self, temp_dir: str) -> bool:
+        """Compare device rows written per tick with and without the registry."""
+        self.print_header("Steady-State Device Writes")
+
+        devices = make_devices(100)
+        tick_count = 1000
+        granularity_ms = 250
+        results = {}
+        for label, granularity in (("every sighting", 0), ("registry", granularity_ms)):
+            db = NetworkDatabaseManager(os.path.join(temp_dir, f"steady-{granularity}.db"),
+                                        last_seen_granularity_ms=granularity)
+            session_id = db.start_monitoring_session(label)
+            db.save_monitoring_batch(session_id, [make_tick(0, devices)])  # Devices discovered
+            count_device_writes(db)
+
+            start = time.perf_counter()
+            for index in range(1, tick_count + 1):
+                db.save_monitoring_batch(session_id, [make_tick(index, devices)])
+                time.sleep(0.001)  # Long enough for last_seen to come due a few times
+            elapsed = time.perf_counter() - start
+            with db._get_connection() as conn:
+                oldest_seen = conn.execute("SELECT MIN(last_seen) FROM devices").fetchone()[0]
+            results[label] = {'writes': device_writes(db), 'seconds': elapsed,
+                              'staleness_ms': now_ms() - oldest_seen}
+            db.close()
+
+        baseline, registry = results['every sighting'], results['registry']
+        for label, result in results.items():
+            print(f"   {label:>14}: {result['writes']:6,} device rows written in {tick_count} ticks "
+                  f"({result['seconds'] * 1000 / tick_count:.2f}ms per tick)")
+
+        # Each device is rewritten once per granularity; at a 1 s tick the
+        # default 60 s granularity skips 59 writes in 60
+        reduction = 1 - registry['writes'] / baseline['writes']
+        due = int(registry['seconds'] * 1000 / granularity_ms)
+        reduced_ok = (baseline['writes'] == tick_count * len(devices) and reduction >= 0.98
+                      and (due - 1) * len(devices) <= registry['writes'] <= (due + 1) * len(devices))
+        self.print_result("Unchanged Devices Not Rewritten", reduced_ok,
+                          f"{reduction:.1%} fewer device writes ({baseline['writes']:,} -> "
+                          f"{registry['writes']:,}: last_seen due {due} times) with {granularity_ms}ms granularity")
+
+        fresh_ok = registry['staleness_ms'] <= granularity_ms + 100
+        self.print_result("last_seen Within the Granularity", fresh_ok,
+                          f"oldest last_seen {registry['staleness_ms']}ms behind after the last tick")
+        return reduced_ok and fresh_ok
+
+    def test_changes(self, temp_dir: str) -> bool:
+        """Test that real changes are written immediately, and IDs are known."""
+        self.print_header("Changes and IDs")
+
+        db = NetworkDatabaseManager(os.path.join(temp_dir, "changes.db"), last_seen_granularity_ms=3600 * 1000)
+        first = db.save_devices(make_devices(50))
+        count_device_writes(db)
+
+        renamed = dict(make_devices(50)[3], hostname='renamed')
+        new_mac = dict(make_devices(50)[7], mac_address='aa:bb:cc:ff:ff:ff')
+        without_fields = {'ip': make_devices(50)[9]['ip']}  # None keeps the stored values
+        again = db.save_devices(make_devices(50)[:3] + [renamed, new_mac, without_fields]
+                                + [{'ip': '10.9.9.9', 'hostname': 'newcomer'}])
+        with db._get_connection() as conn:
+            written = sorted(row[0] for row in conn.execute("SELECT ip_address FROM temp.device_writes"))
+            stored = {row['ip_address']: dict(row) for row in conn.execute("SELECT * FROM devices")}
+
+        changes_ok = (written == sorted([renamed['ip'], new_mac['ip'], '10.9.9.9'])
+                      and stored[renamed['ip']]['hostname'] == 'renamed'
+                      and stored[new_mac['ip']]['mac_address'] == 'aa:bb:cc:ff:ff:ff'
+                      and stored[without_fields['ip']]['hostname'] == 'host-9')
+        self.print_result("Real Changes Written at Once", changes_ok,
+                          f"wrote {len(written)} of {len(again)} devices: a new hostname, a new MAC "
+                          f"and a new device")
+
+        registry = db.device_registry
+        ids_ok = (all(again[ip] == first[ip] for ip in again if ip in first)
+                  and again['10.9.9.9'] == stored['10.9.9.9']['id']
+                  and all(registry.device_id(ip) == row['id'] for ip, row in stored.items())
+                  and registry.device_id(mac_address='AA:BB:CC:FF:FF:FF') == stored[new_mac['ip']]['id']
+                  and db.save_device({'ip': make_devices(50)[20]['ip']}) == first[make_devices(50)[20]['ip']])
+        self.print_result("IDs by IP and MAC Address", ids_ok,
+                          f"{len(registry)} devices registered; skipped devices still return their IDs")
+        db.close()
+        return changes_ok and ids_ok
+
+    def test_rollback(self, temp_dir: str) -> bool:
+        """Test that a rolled-back write is written again."""
+        self.print_header("Rolled-Back Writes")
+
+        db = NetworkDatabaseManager(os.path.join(temp_dir, "rollback.db"))
+        session_id = db.start_monitoring_session("rollback")
+        devices = make_devices(30)
+        bad = make_tick(0, devices)
+        bad['snapshot'] = dict(bad['snapshot'], overall_quality=None)  # NOT NULL column
+        try:
+            db.save_monitoring_batch(session_id, [make_tick(1, devices), bad])
+            raised = False
+        except Exception:
+            raised = True
+        forgotten = len(db.device_registry) == 0
+
+        db.save_monitoring_batch(session_id, [make_tick(2, devices)])
+        with db._get_connection() as conn:
+            stored = conn.execute("SELECT COUNT(*) FROM devices").fetchone()[0]
+        rollback_ok = raised and forgotten and stored == 30 and len(db.device_registry) == 30
+        self.print_result("Rolled-Back Writes Not Remembered", rollback_ok,
+                          f"registry empty after the failed batch; {stored} devices stored on the retry")
+        db.close()
+        return rollback_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all device registry tests."""
+        print("🚀 Device Registry Test Suite")
+        start_time = time.time()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            results = [
+                self.test_steady_state(temp_dir),
+                self.test_changes(temp_dir),
+                self.test_rollback(temp_dir)
+            ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = DeviceRegistryTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
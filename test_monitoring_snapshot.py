@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Compact Monitoring Snapshot Testing Script
+
+This script tests the slotted snapshot type and the shared device set
+without touching the network:
+
+1. Memory and allocations of an hour of snapshots, compared with the
+   previous dataclass layout (fresh device list and strings per tick)
+2. Device sets are immutable and only re-versioned on membership changes
+3. The old attribute names still work for display and persistence
+4. The service shares one device set and interface tuple across ticks
+
+Usage: python test_monitoring_snapshot.py
+"""
+
+import sys
+import os
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from monitoring_snapshot import MonitoringSnapshot, DeviceSet, QUALITY_CODES, QUALITY_LEVELS
+from continuous_monitor_service import ContinuousNetworkMonitorService
+from persistence_pipeline import snapshot_to_record
+
+
+@dataclass
+class LegacySnapshot:
+    """The snapshot layout used before the compact type (for comparison)."""
+    timestamp: str
+    device_count: int
+    devices: List[Dict[str, Any]]
+    total_upload_mbps: float
+    total_download_mbps: float
+    total_usage_mb: float
+    avg_latency_ms: float
+    avg_packet_loss: float
+    overall_quality: str
+    active_interfaces: List[str]
+    tested_device_ip: Optional[str] = None
+    top_talkers: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def make_devices(count: int) -> List[Dict[str, Any]]:
+    return [
+        {'ip': f'192.168.1.{10 + i}', 'hostname': f'device-{i}', 'mac_address': f'aa:bb:cc:dd:ee:{i:02x}',
+         'last_seen': datetime.now().isoformat()}
+        for i in range(count)
+    ]
+
+
+class MonitoringSnapshotTester:
+    """Tests for the compact snapshot type."""
+
+    HOUR = 3600
+    DEVICES = 50
+
+    def __init__(self):
+        self.test_results = {}
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    @staticmethod
+    def _measure(build) -> Dict[str, float]:
+        """Bytes and allocated blocks retained by the objects build() returns."""
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        retained = build()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        stats = after.compare_to(before, 'filename')
+        size = sum(stat.size_diff for stat in stats)
+        blocks = sum(stat.count_diff for stat in stats)
+        del retained
+        return {'bytes': size, 'blocks': blocks}
+
+    def test_memory(self) -> bool:
+        """Compare an hour of compact snapshots with the previous layout."""
+        self.print_header("Snapshot Memory (1 hour, 50 devices)")
+
+        device_cache = {device['ip']: device for device in make_devices(self.DEVICES)}
+        interface_stats = {'lo': {}, 'eth0': {}, 'wlan0': {}}
+        start = time.time()
+
+        def build_legacy():
+            return [
+                LegacySnapshot(
+                    timestamp=datetime.fromtimestamp(start + i).isoformat(),
+                    device_count=len(device_cache),
+                    devices=list(device_cache.values()),
+                    total_upload_mbps=round(1.5 + i % 7 * 0.11, 2),
+                    total_download_mbps=round(12.0 + i % 13 * 0.37, 2),
+                    total_usage_mb=round(0.3 + i % 5 * 0.01, 2),
+                    avg_latency_ms=round(10.0 + i % 9 * 0.13, 2),
+                    avg_packet_loss=0.0,
+                    overall_quality="Good",
+                    active_interfaces=list(interface_stats.keys())
+                )
+                for i in range(self.HOUR)
+            ]
+
+        device_set = DeviceSet(device_cache.values(), version=1)
+        interfaces = tuple(interface_stats)
+
+        def build_compact():
+            return [
+                MonitoringSnapshot(
+                    timestamp_ms=int(round((start + i) * 1000)),
+                    device_set=device_set,
+                    total_upload_mbps=round(1.5 + i % 7 * 0.11, 2),
+                    total_download_mbps=round(12.0 + i % 13 * 0.37, 2),
+                    total_usage_mb=round(0.3 + i % 5 * 0.01, 2),
+                    avg_latency_ms=round(10.0 + i % 9 * 0.13, 2),
+                    avg_packet_loss=0.0,
+                    quality_code=QUALITY_CODES["Good"],
+                    interfaces=interfaces
+                )
+                for i in range(self.HOUR)
+            ]
+
+        legacy = self._measure(build_legacy)
+        compact = self._measure(build_compact)
+
+        memory_ratio = legacy['bytes'] / max(1, compact['bytes'])
+        memory_ok = memory_ratio >= 3
+        self.print_result("Retained Memory Reduced", memory_ok,
+                          f"{legacy['bytes'] / self.HOUR:.0f} -> {compact['bytes'] / self.HOUR:.0f} bytes "
+                          f"per snapshot ({memory_ratio:.1f}x smaller)")
+
+        block_ratio = legacy['blocks'] / max(1, compact['blocks'])
+        blocks_ok = block_ratio >= 2
+        self.print_result("Allocations per Snapshot Reduced", blocks_ok,
+                          f"{legacy['blocks'] / self.HOUR:.1f} -> {compact['blocks'] / self.HOUR:.1f} "
+                          f"live blocks per snapshot ({block_ratio:.1f}x fewer)")
+
+        no_dict_ok = not hasattr(build_compact()[0], '__dict__')
+        self.print_result("Snapshots Are Slotted", no_dict_ok)
+
+        return memory_ok and blocks_ok and no_dict_ok
+
+    def test_device_set_versions(self) -> bool:
+        """Test immutability and re-versioning of device sets."""
+        self.print_header("Device Set Versions")
+
+        devices = make_devices(5)
+        first = DeviceSet.from_devices(devices)
+
+        # A later sweep of the same devices (fresh dicts, new last_seen)
+        time.sleep(0.01)
+        same = DeviceSet.from_devices(make_devices(5), previous=first)
+        grown = DeviceSet.from_devices(make_devices(6), previous=same)
+        renamed_devices = make_devices(6)
+        renamed_devices[0]['hostname'] = 'printer'
+        renamed = DeviceSet.from_devices(renamed_devices, previous=grown)
+
+        reuse_ok = (same is first and first.version == 1 and grown.version == 2
+                    and renamed.version == 3 and len(grown) == 6 and '192.168.1.15' in grown)
+        self.print_result("Reused Until Membership Changes", reuse_ok,
+                          f"versions {first.version}, {same.version}, {grown.version}, {renamed.version}")
+
+        try:
+            first.devices = ()
+            immutable_ok = False
+        except AttributeError:
+            immutable_ok = isinstance(first.devices, tuple)
+        self.print_result("Device Sets Are Immutable", immutable_ok)
+
+        return reuse_ok and immutable_ok
+
+    def test_compatibility(self) -> bool:
+        """Test the derived attributes used by display and persistence."""
+        self.print_header("Compatibility Views")
+
+        device_set = DeviceSet(make_devices(3), version=1)
+        sample_time = 1700000000.5
+        snapshot = MonitoringSnapshot(
+            timestamp_ms=int(round(sample_time * 1000)),
+            device_set=device_set,
+            total_upload_mbps=1.0, total_download_mbps=2.0, total_usage_mb=0.1,
+            avg_latency_ms=0.0, avg_packet_loss=100.0,
+            quality_code=QUALITY_CODES["Poor"],
+            interfaces=('eth0',),
+            tested_device_ip='192.168.1.10'
+        )
+
+        views_ok = (snapshot.timestamp == datetime.fromtimestamp(sample_time).isoformat()
+                    and snapshot.device_count == 3
+                    and snapshot.devices is device_set.devices
+                    and snapshot.overall_quality == "Poor"
+                    and list(snapshot.active_interfaces) == ['eth0']
+                    and all(QUALITY_LEVELS[QUALITY_CODES[name]] == name for name in QUALITY_LEVELS))
+        self.print_result("Old Attribute Names Available", views_ok, snapshot.timestamp)
+
+        record = snapshot_to_record(snapshot)
+        record_ok = (record['snapshot']['overall_quality'] == "Poor"
+                     and record['snapshot']['device_count'] == 3
+                     and len(record['devices']) == 3
+                     and record['quality_test']['test_status'] == 'timeout')
+        self.print_result("Persistence Record Unchanged", record_ok)
+
+        return views_ok and record_ok
+
+    def test_service_sharing(self) -> bool:
+        """Test that the service shares device sets and interfaces across ticks."""
+        self.print_header("Service Snapshots")
+
+        service = ContinuousNetworkMonitorService(monitoring_interval=0.05, enable_traffic_accounting=False,
+                                                  render_mode='headless')
+        sweeps = {'count': 3}
+        service.network_monitor.discover_devices = lambda: make_devices(sweeps['count'])
+        service.network_monitor.monitor_device_connectivity = \
+            lambda ip, samples=1: {'avg_latency_ms': 3.0, 'packet_loss_percent': 0.0}
+        service.start()
+
+        time.sleep(0.5)
+        service._run_discovery_stage()       # Same devices: same set
+        time.sleep(0.3)
+        sweeps['count'] = 4
+        service._run_discovery_stage()       # New device: new version
+        time.sleep(0.3)
+        service.stop()
+
+        snapshots = service.get_recent_snapshots(count=1000)
+        device_sets = {id(snapshot.device_set): snapshot.device_set for snapshot in snapshots}
+        versions = sorted(device_set.version for device_set in device_sets.values())
+        sharing_ok = len(snapshots) > 10 and versions == [1, 2]
+        self.print_result("One Device Set per Membership", sharing_ok,
+                          f"{len(snapshots)} snapshots reference {len(device_sets)} device sets "
+                          f"(versions {versions})")
+
+        interface_ids = {id(snapshot.interfaces) for snapshot in snapshots}
+        grid_ok = (len(interface_ids) == 1 and snapshots[-1].device_count == 4
+                   and all(isinstance(snapshot.timestamp_ms, int) for snapshot in snapshots))
+        self.print_result("Interfaces Shared, Integer Timestamps", grid_ok,
+                          f"{len(interface_ids)} interface tuple(s), last at {snapshots[-1].timestamp}")
+
+        return sharing_ok and grid_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all snapshot tests."""
+        print("🚀 Compact Monitoring Snapshot Test Suite")
+        start_time = time.time()
+
+        results = [
+            self.test_memory(),
+            self.test_device_set_versions(),
+            self.test_compatibility(),
+            self.test_service_sharing()
+        ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = MonitoringSnapshotTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Network Backends Testing Script
+
+This script tests the simulated and replayed network backends and uses
+them to load-test the monitoring service without any network:
+
+1. The simulation is deterministic and follows its profile: round-trip
+   times, packet loss, churn and the traffic curve
+2. A recorded trace replays faster than real time with the same devices
+   and the same rates
+3. Load test: the threaded and asyncio services monitoring 10,000
+   simulated devices (discovery time, tick latency, throughput, memory)
+
+Usage: python test_network_backends.py
+"""
+
+import sys
+import os
+import asyncio
+import contextlib
+import io
+import statistics
+import tempfile
+import time
+
+import psutil
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from network_backends import SimulatedBackend, SimulationProfile, TraceRecorder, TraceReplayBackend
+from network_monitor import NetworkMonitor
+from continuous_monitor_service import ContinuousNetworkMonitorService
+from async_monitor_service import AsyncContinuousMonitorService
+
+
+START_TIME = 1700000000.0
+
+
+def quiet_discovery(monitor: NetworkMonitor):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return monitor.discover_devices()
+
+
+class NetworkBackendsTester:
+    """Tests for simulated and replayed network backends."""
+
+    def __init__(self):
+        self.test_results = {}
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    def test_simulation(self) -> bool:
+        """Test determinism and the modelled statistics."""
+        self.print_header("Simulated Network")
+
+        def sweep(seed: int):
+            backend = SimulatedBackend(SimulationProfile(device_count=500, seed=seed, start_time=START_TIME))
+            devices = quiet_discovery(NetworkMonitor(backend=backend))
+            return [(device['ip'], device['latency_ms'], device['mac_address'], device['hostname'])
+                    for device in devices]
+
+        first, again, other = sweep(7), sweep(7), sweep(8)
+        deterministic_ok = first == again and first != other and len(first) > 400
+        self.print_result("Same Seed, Same Network", deterministic_ok,
+                          f"{len(first)} devices found, identical on rerun, different with another seed")
+
+        profile = SimulationProfile(device_count=200, churn_fraction=0.0, slow_device_fraction=0.0,
+                                    loss_rate=0.05, start_time=START_TIME)
+        backend = SimulatedBackend(profile)
+        results = [backend.ping(ip, 1.0) for ip in backend.devices for _ in range(50)]
+        replies = [delay * 1000 for delay in results if delay is not None]
+        loss = 1 - len(replies) / len(results)
+        median = statistics.median(replies)
+        model_ok = abs(loss - 0.05) < 0.01 and abs(median - profile.rtt_median_ms) < 0.2
+        self.print_result("Round-Trip Times and Loss Follow the Profile", model_ok,
+                          f"median {median:.2f}ms (profile {profile.rtt_median_ms}ms), "
+                          f"loss {loss * 100:.1f}% (profile 5.0%)")
+
+        profile = SimulationProfile(device_count=2000, churn_fraction=0.5, session_seconds=600.0,
+                                    start_time=START_TIME)
+        backend = SimulatedBackend(profile)
+        online_before = {device.ip for device in backend.online_devices()}
+        backend.advance(900)
+        online_after = {device.ip for device in backend.online_devices()}
+        arp_ips = {entry['ip'] for entry in backend.arp_table()}
+        churn_ok = (0.65 < len(online_before) / 2000 < 0.85 and online_before != online_after
+                    and len(online_before - online_after) > 100 and arp_ips == online_after)
+        self.print_result("Devices Come and Go", churn_ok,
+                          f"{len(online_before)} online, 15 minutes later {len(online_before - online_after)} "
+                          f"left and {len(online_after - online_before)} joined")
+
+        monitor = NetworkMonitor(backend=SimulatedBackend(SimulationProfile(device_count=10, start_time=START_TIME)))
+        samples = []
+        rates_ok = True
+        for _ in range(48):
+            before = monitor.get_bandwidth_stats()
+            monitor.backend.advance(1800)
+            after = monitor.get_bandwidth_stats()
+            samples.append(after)
+            expected_up, expected_down = monitor.backend.traffic_mbps(monitor.backend.monotonic() - 900)
+            rate = monitor.calculate_bandwidth_usage(before, after)
+            rates_ok &= (abs(rate['download_rate_mbps'] - expected_down) < 0.02 * expected_down + 0.05
+                         and abs(rate['upload_rate_mbps'] - expected_up) < 0.02 * expected_up + 0.05)
+        monotonic_ok = all(later['bytes_recv'] >= earlier['bytes_recv'] and later['bytes_sent'] >= earlier['bytes_sent']
+                           for earlier, later in zip(samples, samples[1:]))
+        day = [monitor.backend.traffic_mbps(hour * 3600.0)[1] for hour in range(24)]
+        traffic_ok = rates_ok and monotonic_ok and max(day) > 1.9 * min(day)
+        self.print_result("Counters Follow the Traffic Curve", traffic_ok,
+                          f"download {min(day):.0f}-{max(day):.0f} Mbps over a simulated day, "
+                          f"counters monotonic, measured rates match the model")
+
+        return deterministic_ok and model_ok and churn_ok and traffic_ok
+
+    def test_trace_replay(self) -> bool:
+        """Test recording a trace and replaying it faster than real time."""
+        self.print_header("Trace Record and Replay")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "lan.trace.jsonl")
+
+            # Record ten simulated minutes: a sweep, then a counter sample
+            # and a probe every second
+            simulated = SimulatedBackend(SimulationProfile(device_count=300, start_time=START_TIME))
+            recorder = TraceRecorder(simulated, path)
+            monitor = NetworkMonitor(backend=recorder)
+            recorded_devices = quiet_discovery(monitor)
+            for second in range(600):
+                monitor.get_bandwidth_stats()
+                recorder.ping(recorded_devices[second % len(recorded_devices)]['ip'], 1.0)
+                simulated.advance(1.0)
+            monitor.get_bandwidth_stats()
+            recorder.close()
+            trace_bytes = os.path.getsize(path)
+
+            # Replay at 300x: ten minutes in two seconds
+            replay = TraceReplayBackend(path, speed=300.0)
+            replayed = NetworkMonitor(backend=replay)
+            replayed_devices = quiet_discovery(replayed)
+            same_devices_ok = (replayed.network_range == simulated.network_range
+                               and [device['ip'] for device in replayed_devices]
+                               == [device['ip'] for device in recorded_devices]
+                               and replayed_devices[5]['mac_address'] == recorded_devices[5]['mac_address'])
+            self.print_result("Replay Finds the Recorded Devices", same_devices_ok,
+                              f"{len(replayed_devices)} devices from {replay.events} events "
+                              f"({trace_bytes / 1024:.0f} KiB trace)")
+
+            before = replayed.get_bandwidth_stats()
+            time.sleep(0.5)
+            after = replayed.get_bandwidth_stats()
+            rate = replayed.calculate_bandwidth_usage(before, after)
+            start, end = before['sampled_at'], after['sampled_at']
+            expected = ((simulated._transferred_mbit(simulated.profile.download_mbps, end)
+                         - simulated._transferred_mbit(simulated.profile.download_mbps, start)) / (end - start))
+            rate_ok = (100 < rate['time_period_seconds'] < 200
+                       and abs(rate['download_rate_mbps'] - expected) < 0.01 * expected + 0.05)
+            self.print_result("Rates Replay at 300x Speed", rate_ok,
+                              f"{rate['time_period_seconds']:.0f} trace seconds in 0.5s, "
+                              f"{rate['download_rate_mbps']:.2f} Mbps (recorded {expected:.2f})")
+
+            time.sleep(max(0.0, replay.duration / 300.0 - 0.5) + 0.1)
+            looped = TraceReplayBackend(path, speed=None, loop=True)
+            counters = []
+            for _ in range(30):
+                counters.append(looped.interface_counters()['sim0'].bytes_recv)
+                looped.advance(60)
+            end_ok = (replay.exhausted and not looped.exhausted
+                      and all(later > earlier for earlier, later in zip(counters, counters[1:])))
+            self.print_result("End of Trace: Stops, or Loops with Growing Counters", end_ok,
+                              f"{replay.duration:.0f}s trace over in {replay.duration / 300.0:.1f}s; "
+                              f"looped for {30 * 60 / replay.duration:.0f} laps")
+
+        return same_devices_ok and rate_ok and end_ok
+
+    def test_threaded_service_load(self) -> bool:
+        """Load-test the threaded service with 10,000 simulated devices."""
+        self.print_header("Load Test: Threaded Service, 10,000 Devices")
+
+        process = psutil.Process()
+        rss_before = process.memory_info().rss
+        backend = SimulatedBackend(SimulationProfile(device_count=10000), speed=1.0)
+        service = ContinuousNetworkMonitorService(
+            monitoring_interval=0.05, render_mode='headless', network_backend=backend
+        )
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            discovery_start = time.perf_counter()
+            started = service.start()
+            discovery_seconds = time.perf_counter() - discovery_start
+            time.sleep(3.0)
+            rss_after = process.memory_info().rss
+            service.stop()
+
+        online = len(backend.online_devices())
+        discovery_ok = started and service.traffic_accountant is None and len(service.device_cache) > 0.95 * online
+        self.print_result("Discovery of 10,000 Hosts Without a Network", discovery_ok,
+                          f"{len(service.device_cache)} of {online} online devices in {discovery_seconds:.1f}s "
+                          f"({backend.network_range})")
+
+        scheduler = service.tick_scheduler
+        lateness_p99 = scheduler.lateness.percentile(0.99) or 0.0
+        throughput = 1.0 / scheduler.durations.mean if scheduler.durations.count else 0.0
+        latency_ok = scheduler.ticks_run >= 40 and lateness_p99 < service.monitoring_interval
+        self.print_result("Ticks on Time at 20 Hz", latency_ok,
+                          f"{scheduler.ticks_run} ticks, p99 lateness ≤{lateness_p99 * 1000:.0f}ms, "
+                          f"{throughput:.0f} snapshots/s of tick capacity")
+
+        snapshot = service.get_recent_snapshots(count=1)[-1]
+        expected_down = backend.traffic_mbps()[1]
+        rates_ok = (snapshot.device_count == len(service.device_cache)
+                    and abs(snapshot.total_download_mbps - expected_down) < 0.05 * expected_down)
+        self.print_result("Snapshots Carry the Simulated Traffic", rates_ok,
+                          f"{snapshot.total_download_mbps:.1f} Mbps down (model {expected_down:.1f}), "
+                          f"{snapshot.device_count} devices")
+
+        grown_mb = (rss_after - rss_before) / (1024 * 1024)
+        memory_ok = grown_mb < 150
+        self.print_result("Memory at 10,000 Devices", memory_ok,
+                          f"{grown_mb:.0f} MB resident for the backend and service "
+                          f"({grown_mb * 1024 * 1024 / 10000:.0f} bytes per device)")
+
+        return discovery_ok and latency_ok and rates_ok and memory_ok
+
+    def test_async_service_load(self) -> bool:
+        """Load-test the asyncio service with 10,000 simulated devices."""
+        self.print_header("Load Test: Async Service, 10,000 Devices")
+
+        # Unanswered pings wait out their timeout as on a real network, so
+        # the sweep of a /18 needs thousands of them in flight
+        backend = SimulatedBackend(SimulationProfile(device_count=10000), speed=1.0)
+
+        async def monitor():
+            service = AsyncContinuousMonitorService(
+                monitoring_interval=0.1, probe_coverage=1.0, max_pings_in_flight=8192,
+                render_mode='headless', network_backend=backend
+            )
+            with contextlib.redirect_stdout(io.StringIO()):
+                started = await service.start()
+                await asyncio.sleep(2.5)
+                mode = service.pinger.mode
+                await service.stop()
+            return started, service, mode
+
+        started, service, mode = asyncio.run(monitor())
+
+        scheduler = service.tick_scheduler
+        lateness_p99 = scheduler.lateness.percentile(0.99) or 0.0
+        # A round lasts until its slowest probe; with 1% loss most rounds
+        # wait out one timeout, still probing hundreds of devices per second
+        probes_per_second = service.pinger.sent / 2.5
+        probing_ok = (started and mode == 'backend' and service.probe_stage.error_count == 0
+                      and len(service.tested_devices) >= 1000 and lateness_p99 < service.monitoring_interval)
+        self.print_result("Hundreds of Simulated Devices Probed per Second", probing_ok,
+                          f"{len(service.tested_devices)} devices probed in {service.probe_stage.run_count} rounds, "
+                          f"{probes_per_second:.0f} pings/s, sweep {service.last_sweep.get('seconds', 0):.2f}s, "
+                          f"p99 tick lateness ≤{lateness_p99 * 1000:.0f}ms")
+
+        return probing_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all network backend tests."""
+        print("🚀 Network Backends Test Suite")
+        start_time = time.time()
+
+        results = [
+            self.test_simulation(),
+            self.test_trace_replay(),
+            self.test_threaded_service_load(),
+            self.test_async_service_load()
+        ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = NetworkBackendsTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Output Sinks Testing Script
+
+This script tests the snapshot fan-out of the continuous monitoring
+service without touching the network:
+
+1. JSONL files receive every snapshot and rotate by size, counted in
+   bytes whatever the characters
+2. UNIX datagrams reach a listener, and are dropped (not raised) without one
+3. A failing sink and a stalled sink affect neither collection nor the
+   other sinks
+4. The service feeds configured sinks on every tick
+5. With --stdout, every line the services write to stdout is JSON
+
+Usage: python test_output_sinks.py
+"""
+
+import sys
+import os
+import io
+import json
+import signal
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from output_sinks import JsonlFileSink, UnixDatagramSink, StdoutSink, SinkFanOut
+from persistence_pipeline import OutputSink
+from monitoring_snapshot import MonitoringSnapshot, DeviceSet, QUALITY_CODES
+from continuous_monitor_service import ContinuousNetworkMonitorService
+
+
+DEVICES = DeviceSet([{'ip': f'192.168.1.{10 + i}'} for i in range(4)], version=1)
+
+
+def make_snapshot(index: int) -> MonitoringSnapshot:
+    return MonitoringSnapshot(
+        timestamp_ms=1700000000000 + index * 1000,
+        device_set=DEVICES,
+        total_upload_mbps=1.5,
+        total_download_mbps=10.0 + index % 10,
+        total_usage_mb=0.3,
+        avg_latency_ms=12.5,
+        avg_packet_loss=0.0,
+        quality_code=QUALITY_CODES["Good"],
+        interfaces=('eth0',)
+    )
+
+
+class FailingSink(OutputSink):
+    """A sink whose destination is broken."""
+
+    def write_records(self, batch):
+        raise OSError("destination unavailable")
+
+
+class StalledSink(OutputSink):
+    """A sink whose destination blocks until released."""
+
+    def __init__(self, release: threading.Event, **queue_options):
+        super().__init__("stalled", **queue_options)
+        self.release = release
+
+    def write_records(self, batch):
+        self.release.wait()
+
+
+class OutputSinksTester:
+    """Tests for pluggable output sinks."""
+
+    def __init__(self):
+        self.test_results = {}
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    def test_jsonl_rotation(self) -> bool:
+        """Test JSON lines output and size-based rotation."""
+        self.print_header("Rotating JSONL Sink")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "snapshots.jsonl")
+            sink = JsonlFileSink(path, max_bytes=20000, backup_count=2, batch_size=50)
+            sink.start()
+            for index in range(1000):
+                sink.submit_snapshot(make_snapshot(index))
+            sink.stop()
+
+            files = sorted(os.listdir(temp_dir))
+            with open(path, encoding='utf-8') as current:
+                lines = [json.loads(line) for line in current]
+            sizes_ok = all(os.path.getsize(os.path.join(temp_dir, name)) <= 20000 for name in files)
+
+        rotation_ok = (files == ["snapshots.jsonl", "snapshots.jsonl.1", "snapshots.jsonl.2"]
+                       and sink.rotations > 2 and sizes_ok)
+        self.print_result("Rotates by Size, Keeps Backups", rotation_ok,
+                          f"{sink.rotations} rotations, files: {', '.join(files)}")
+
+        content_ok = (sink.stats.written == 1000 and lines
+                      and lines[-1]['timestamp_ms'] == make_snapshot(999).timestamp_ms
+                      and lines[-1]['overall_quality'] == "Good" and lines[-1]['device_count'] == 4)
+        self.print_result("Every Snapshot Written as JSON", content_ok,
+                          f"{sink.stats.written} written, {len(lines)} in the current file")
+
+        # Hostnames and vendors need not be ASCII; the size limit is in bytes
+        talkers = ({'ip': '10.0.0.9', 'hostname': 'büro-drucker', 'vendor': 'Köln Geräte ✓'},)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "unicode.jsonl")
+            sink = JsonlFileSink(path, max_bytes=5000, backup_count=1, batch_size=7)
+            sink.start()
+            for index in range(200):
+                snapshot = make_snapshot(index)
+                snapshot.top_talkers = talkers
+                sink.submit_snapshot(snapshot)
+            sink.stop()
+
+            sizes = [os.path.getsize(os.path.join(temp_dir, name)) for name in sorted(os.listdir(temp_dir))]
+            with open(path, encoding='utf-8') as current:
+                hostnames = {line['top_talkers'][0]['hostname'] for line in map(json.loads, current)}
+        bytes_ok = sink.rotations > 2 and max(sizes) <= 5000 and hostnames == {'büro-drucker'}
+        self.print_result("Size Limit Counted in Bytes", bytes_ok,
+                          f"non-ASCII talkers: {sink.rotations} rotations, largest file {max(sizes)} of 5000 bytes")
+
+        return rotation_ok and content_ok and bytes_ok
+
+    def test_datagrams(self) -> bool:
+        """Test datagram delivery and drops without a listener."""
+        self.print_header("UNIX Datagram Sink")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            socket_path = os.path.join(temp_dir, "monitor.sock")
+            listener = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            listener.bind(socket_path)
+            listener.settimeout(2.0)
+
+            sink = UnixDatagramSink(socket_path)
+            sink.start()
+            for index in range(5):
+                sink.submit_snapshot(make_snapshot(index))
+            received = [json.loads(listener.recv(65536)) for _ in range(5)]
+
+            # A burst into a listener that is not reading: the kernel queue
+            # fills up and the rest is dropped instead of blocking the writer
+            for index in range(5, 205):
+                sink.submit_snapshot(make_snapshot(index))
+            sink.stop()
+            listener.close()
+
+            delivery_ok = ([message['timestamp_ms'] for message in received]
+                           == [make_snapshot(index).timestamp_ms for index in range(5)])
+            self.print_result("Datagrams Delivered in Order", delivery_ok, f"{len(received)} received")
+
+            burst_ok = (sink.datagrams_dropped > 0 and sink.stats.failed == 0
+                        and sink.datagrams_sent + sink.datagrams_dropped == 205)
+            self.print_result("Full Listener Queue: Dropped, Not Blocked", burst_ok,
+                              f"{sink.datagrams_sent} sent, {sink.datagrams_dropped} dropped")
+
+            orphan = UnixDatagramSink(os.path.join(temp_dir, "nobody.sock"))
+            orphan.start()
+            for index in range(20):
+                orphan.submit_snapshot(make_snapshot(index))
+            orphan.stop()
+
+        orphan_ok = orphan.datagrams_dropped == 20 and orphan.stats.failed == 0
+        self.print_result("No Listener: Dropped, Not Failed", orphan_ok,
+                          f"{orphan.datagrams_dropped} dropped, {orphan.stats.failed} failed")
+
+        return delivery_ok and burst_ok and orphan_ok
+
+    def test_failure_isolation(self) -> bool:
+        """Test that broken and stalled sinks are isolated."""
+        self.print_header("Failure Isolation")
+
+        release = threading.Event()
+        stream = io.StringIO()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            healthy = JsonlFileSink(os.path.join(temp_dir, "out.jsonl"))
+            failing = FailingSink("failing")
+            stalled = StalledSink(release, max_queue_size=100)
+            stdout = StdoutSink(stream=stream)
+            outputs = SinkFanOut([healthy, failing, stalled, stdout])
+            outputs.start()
+
+            worst_submit = 0.0
+            for index in range(2000):
+                start = time.perf_counter()
+                outputs.submit_snapshot(make_snapshot(index))
+                worst_submit = max(worst_submit, time.perf_counter() - start)
+
+            release.set()
+            outputs.stop()
+
+        nonblocking_ok = worst_submit < 0.1
+        self.print_result("Submitting Never Blocks", nonblocking_ok,
+                          f"worst fan-out submit {worst_submit * 1000:.2f}ms with a stalled sink")
+
+        stats = outputs.get_stats()
+        isolated_ok = (stats['jsonl']['written'] == 2000
+                       and stats['stdout']['written'] == 2000
+                       and len(stream.getvalue().splitlines()) == 2000
+                       and stats['failing']['failed'] == 2000
+                       and stats['stalled']['dropped'] > 0
+                       and stats['stalled']['written'] + stats['stalled']['dropped'] == 2000)
+        self.print_result("Other Sinks Unaffected", isolated_ok,
+                          f"jsonl {stats['jsonl']['written']}, stdout {stats['stdout']['written']}, "
+                          f"failing {stats['failing']['failed']} failed, "
+                          f"stalled {stats['stalled']['dropped']} dropped")
+
+        return nonblocking_ok and isolated_ok
+
+    def test_service_fan_out(self) -> bool:
+        """Test that the service feeds its sinks on every tick."""
+        self.print_header("Service Fan-Out")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "service.jsonl")
+            service = ContinuousNetworkMonitorService(
+                monitoring_interval=0.05, enable_traffic_accounting=False, render_mode='headless',
+                output_sinks=[JsonlFileSink(path)]
+            )
+            service.network_monitor.discover_devices = lambda: [{'ip': '10.0.0.1'}, {'ip': '10.0.0.2'}]
+            service.network_monitor.monitor_device_connectivity = \
+                lambda ip, samples=1: {'avg_latency_ms': 3.0, 'packet_loss_percent': 0.0}
+            service.start()
+            time.sleep(1.0)
+            service.stop()
+
+            with open(path, encoding='utf-8') as output:
+                lines = [json.loads(line) for line in output]
+
+        fan_out_ok = len(lines) == service.measurement_count > 10 and lines[-1]['device_count'] == 2
+        self.print_result("Every Tick Reaches the Sink", fan_out_ok,
+                          f"{len(lines)} lines for {service.measurement_count} snapshots")
+        return fan_out_ok
+
+    def test_stdout_cli(self) -> bool:
+        """Test that --stdout output parses as JSON lines, line by line."""
+        self.print_header("JSON Lines on stdout")
+
+        results = {}
+        for script in ("continuous_monitor_service.py", "async_monitor_service.py"):
+            process = subprocess.Popen(
+                [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend', script),
+                 '--simulate=20', '--stdout'],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            )
+            time.sleep(4.0)
+            process.send_signal(signal.SIGINT)
+            stdout, stderr = process.communicate(timeout=30)
+
+            lines = stdout.splitlines()
+            not_json = []
+            for line in lines:
+                try:
+                    json.loads(line)
+                except ValueError:
+                    not_json.append(line)
+            results[script] = (lines, not_json, stderr)
+
+        cli_ok = all(len(lines) >= 2 and not not_json and "Network Monitoring Service" in stderr
+                     for lines, not_json, stderr in results.values())
+        self.print_result("Every stdout Line Is JSON", cli_ok,
+                          "; ".join(f"{script}: {len(lines)} lines, {len(not_json)} not JSON"
+                                    + (f" (first: {not_json[0][:40]!r})" if not_json else "")
+                                    for script, (lines, not_json, _stderr) in results.items())
+                          + "; diagnostics on stderr")
+        return cli_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all output sink tests."""
+        print("🚀 Output Sinks Test Suite")
+        start_time = time.time()
+
+        results = [
+            self.test_jsonl_rotation(),
+            self.test_datagrams(),
+            self.test_failure_isolation(),
+            self.test_service_fan_out(),
+            self.test_stdout_cli()
+        ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = OutputSinksTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Write-Behind Persistence Pipeline Testing Script
+
+This script tests the persistence stage of the continuous monitoring
+service without touching the network:
+
+1. Throughput of batched snapshot writes into SQLite
+2. Flushing by batch age and on shutdown
+3. Drop accounting when the writer falls behind (submit never blocks)
+4. Quality test rows and device upserts written by a batch
+5. Bandwidth sketches share their batch's transaction, so a failed batch
+   merges no sketch twice when it is written again
+6. The threaded and asyncio service CLIs both persist with --db=PATH
+
+Usage: python test_persistence_pipeline.py
+"""
+
+import sys
+import os
+import signal
+import sqlite3
+import subprocess
+import tempfile
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from persistence_pipeline import WriteBehindQueue, SnapshotPersistencePipeline
+from monitoring_snapshot import MonitoringSnapshot, DeviceSet, QUALITY_CODES
+from database_manager import NetworkDatabaseManager
+from quantile_sketch import KLLSketch
+from continuous_monitor_service import database_from_args
+
+
+# Device sets shared between synthetic snapshots, as in the service
+DEVICE_SETS = {}
+
+
+def make_snapshot(index: int, device_count: int = 8, tested: bool = False) -> MonitoringSnapshot:
+    """Build a synthetic snapshot with a stable set of devices."""
+    device_set = DEVICE_SETS.get(device_count)
+    if device_set is None:
+        device_set = DEVICE_SETS[device_count] = DeviceSet([
+            {'ip': f'192.168.1.{10 + i}', 'hostname': f'device-{i}', 'mac_address': f'aa:bb:cc:dd:ee:{i:02x}',
+             'response_time_ms': 5.0 + i, 'discovery_method': 'ping'}
+            for i in range(device_count)
+        ], version=1)
+    return MonitoringSnapshot(
+        timestamp_ms=int(time.time() * 1000),
+        device_set=device_set,
+        total_upload_mbps=1.5,
+        total_download_mbps=12.0 + index % 10,
+        total_usage_mb=0.3,
+        avg_latency_ms=0.0 if tested and index % 2 else 12.5,
+        avg_packet_loss=100.0 if tested and index % 2 else 0.0,
+        quality_code=QUALITY_CODES["Good"],
+        interfaces=('eth0',),
+        tested_device_ip=device_set.devices[index % device_count]['ip'] if tested else None
+    )
+
+
+class PersistencePipelineTester:
+    """Tests for the write-behind persistence pipeline."""
+
+    def __init__(self):
+        self.test_results = {}
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    def test_throughput(self) -> bool:
+        """Test sustained snapshot persistence rate into SQLite."""
+        self.print_header("Snapshot Throughput")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db = NetworkDatabaseManager(os.path.join(temp_dir, "pipeline.db"))
+            session_id = db.start_monitoring_session("throughput test")
+            pipeline = SnapshotPersistencePipeline(db, session_id)
+            pipeline.start()
+
+            total = 5000
+            snapshots = [make_snapshot(i) for i in range(total)]
+
+            submit_start = time.perf_counter()
+            max_submit = 0.0
+            for snapshot in snapshots:
+                call_start = time.perf_counter()
+                pipeline.submit_snapshot(snapshot)
+                max_submit = max(max_submit, time.perf_counter() - call_start)
+            submit_seconds = time.perf_counter() - submit_start
+
+            pipeline.stop()
+            total_seconds = time.perf_counter() - submit_start
+            rate = total / total_seconds
+
+            with sqlite3.connect(db.db_path) as conn:
+                stored = conn.execute("SELECT COUNT(*) FROM network_snapshots WHERE session_id = ?",
+                                      (session_id,)).fetchone()[0]
+                device_rows = conn.execute("SELECT COUNT(*) FROM devices").fetchone()[0]
+
+            stored_ok = stored == total and pipeline.stats.dropped == 0
+            self.print_result("All Snapshots Stored", stored_ok,
+                              f"{stored:,} rows in {pipeline.stats.batches} batches")
+
+            rate_ok = rate > 1000
+            self.print_result("Sustained Rate > 1000/s", rate_ok, f"{rate:,.0f} snapshots/s end to end")
+
+            submit_ok = max_submit < 0.1
+            self.print_result("Submit Never Blocks", submit_ok,
+                              f"{submit_seconds * 1e6 / total:.1f}µs average, {max_submit * 1000:.2f}ms worst")
+
+            devices_ok = device_rows == 8
+            self.print_result("Devices Upserted Once", devices_ok, f"{device_rows} device rows")
+
+        return stored_ok and rate_ok and submit_ok and devices_ok
+
+    def test_flush_behaviour(self) -> bool:
+        """Test flushing by batch age and on shutdown."""
+        self.print_header("Batch Flushing")
+
+        written = []
+        pipeline = WriteBehindQueue("age", written.append, batch_size=100, max_batch_age=0.2)
+        pipeline.start()
+        for i in range(5):
+            pipeline.submit(i)
+        time.sleep(0.6)
+        age_ok = written == [[0, 1, 2, 3, 4]]
+        self.print_result("Partial Batch Flushed by Age", age_ok, f"{len(written)} batch(es) after 0.6s")
+
+        written.clear()
+        pipeline = WriteBehindQueue("stop", written.append, batch_size=100, max_batch_age=60.0)
+        pipeline.start()
+        for i in range(250):
+            pipeline.submit(i)
+        pipeline.stop()
+        flushed = [item for batch in written for item in batch]
+        stop_ok = flushed == list(range(250)) and all(len(batch) <= 100 for batch in written)
+        self.print_result("Queue Drained on Stop", stop_ok,
+                          f"{len(flushed)} records in {len(written)} batches, none lost")
+
+        return age_ok and stop_ok
+
+    def test_drops_and_failures(self) -> bool:
+        """Test that a slow or failing writer drops records instead of blocking."""
+        self.print_header("Backpressure and Drops")
+
+        def slow_writer(batch):
+            time.sleep(0.5)
+
+        pipeline = WriteBehindQueue("slow", slow_writer, max_queue_size=100, batch_size=10)
+        pipeline.start()
+        submit_start = time.perf_counter()
+        accepted = sum(1 for i in range(1000) if pipeline.submit(i))
+        submit_seconds = time.perf_counter() - submit_start
+        stats = pipeline.get_stats()
+
+        drop_ok = stats['dropped'] == 1000 - accepted and stats['dropped'] > 0
+        self.print_result("Drops Counted", drop_ok,
+                          f"{accepted} accepted, {stats['dropped']} dropped, peak depth {stats['max_queue_depth']}")
+
+        fast_ok = submit_seconds < 0.5
+        self.print_result("Collection Not Blocked", fast_ok, f"1000 submits in {submit_seconds * 1000:.1f}ms")
+
+        pressure_ok = stats['under_backpressure']
+        self.print_result("Backpressure Reported", pressure_ok,
+                          f"queue {stats['queue_depth']}/{stats['queue_capacity']}")
+
+        # The slow writer is abandoned here; it is a daemon thread
+
+        def failing_writer(batch):
+            raise sqlite3.OperationalError("database is locked")
+
+        pipeline = WriteBehindQueue("failing", failing_writer, batch_size=5)
+        pipeline.start()
+        for i in range(20):
+            pipeline.submit(i)
+        pipeline.stop()
+        failure_ok = (pipeline.stats.failed == 20 and pipeline.stats.failed_batches >= 4
+                      and "locked" in pipeline.stats.last_error)
+        self.print_result("Write Failures Survived", failure_ok,
+                          f"{pipeline.stats.failed} records in {pipeline.stats.failed_batches} failed batches")
+
+        return drop_ok and fast_ok and pressure_ok and failure_ok
+
+    def test_quality_tests(self) -> bool:
+        """Test quality test rows written for probed snapshots."""
+        self.print_header("Quality Test Records")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db = NetworkDatabaseManager(os.path.join(temp_dir, "quality.db"))
+            session_id = db.start_monitoring_session("quality test")
+            pipeline = SnapshotPersistencePipeline(db, session_id)
+            pipeline.start()
+            for i in range(10):
+                pipeline.submit_snapshot(make_snapshot(i, tested=True))
+            pipeline.submit_snapshot(make_snapshot(10))
+            pipeline.stop()
+
+            with sqlite3.connect(db.db_path) as conn:
+                statuses = dict(conn.execute(
+                    "SELECT test_status, COUNT(*) FROM device_quality_tests GROUP BY test_status"
+                ).fetchall())
+                orphans = conn.execute("""
+                    SELECT COUNT(*) FROM device_quality_tests q
+                    LEFT JOIN network_snapshots s ON q.snapshot_id = s.id
+                    WHERE s.id IS NULL
+                """).fetchone()[0]
+
+            status_ok = statuses == {'success': 5, 'timeout': 5}
+            self.print_result("One Row per Probe", status_ok, f"statuses {statuses}")
+
+            link_ok = orphans == 0
+            self.print_result("Linked to Snapshots", link_ok, f"{orphans} orphaned rows")
+
+        return status_ok and link_ok
+
+    def test_sketch_atomicity(self) -> bool:
+        """Test that sketches are only merged when their batch commits."""
+        self.print_header("Sketches in the Batch Transaction")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db = NetworkDatabaseManager(os.path.join(temp_dir, "sketches.db"))
+            session_id = db.start_monitoring_session("sketch test")
+            sketch = KLLSketch()
+            for value in range(100):
+                sketch.update(float(value))
+            bucket = {'interface': 'all', 'direction': 'download',
+                      'bucket_start': int(time.time()) // 3600 * 3600, 'sketch': sketch}
+            batch = [('sketches', [bucket]), ('snapshot', make_snapshot(0))]
+
+            # Snapshot inserts fail (e.g. a full disk) while the batch is written
+            with db._get_connection(write=True) as conn:
+                conn.execute("""
+                    CREATE TEMP TRIGGER fail_snapshots BEFORE INSERT ON main.network_snapshots
+                    BEGIN SELECT RAISE(ABORT, 'disk full'); END
+                """)
+            pipeline = SnapshotPersistencePipeline(db, session_id)
+            try:
+                pipeline.write_records(batch)
+                raised = False
+            except sqlite3.DatabaseError:
+                raised = True
+            with db._get_connection() as conn:
+                after_failure = conn.execute("SELECT COUNT(*) FROM bandwidth_sketches").fetchone()[0]
+                conn.execute("DROP TRIGGER temp.fail_snapshots")
+
+            pipeline.write_records(batch)  # The retry
+            with db._get_connection() as conn:
+                counts = [row[0] for row in conn.execute("SELECT sample_count FROM bandwidth_sketches")]
+                snapshots = conn.execute("SELECT COUNT(*) FROM network_snapshots").fetchone()[0]
+            db.close()
+
+            atomic_ok = raised and after_failure == 0 and counts == [100, 100] and snapshots == 1
+            self.print_result("Failed Batch Leaves No Sketch", atomic_ok,
+                              f"{after_failure} sketch rows after the failure; the retry merged "
+                              f"{counts} samples (hourly, daily) once")
+
+            cli_db = database_from_args(['--simulate=5', f'--db={os.path.join(temp_dir, "cli.db")}'])
+            cli_ok = (cli_db is not None and cli_db.db_path.name == "cli.db"
+                      and database_from_args(['--headless']) is None)
+            if cli_db:
+                cli_db.close()
+            self.print_result("--db Enables Persistence", cli_ok, "main() opens the database given by --db=PATH")
+
+        return atomic_ok and cli_ok
+
+    def test_cli_persistence(self) -> bool:
+        """Test that both service CLIs persist snapshots given --db=PATH."""
+        self.print_header("Persistence from the Command Line")
+
+        counts = {}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for script in ("continuous_monitor_service.py", "async_monitor_service.py"):
+                path = os.path.join(temp_dir, f"{script}.db")
+                process = subprocess.Popen(
+                    [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend', script),
+                     '--simulate=20', '--headless', f'--db={path}'],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                )
+                time.sleep(4.0)
+                process.send_signal(signal.SIGINT)
+                process.wait(timeout=30)
+                with sqlite3.connect(path) as conn:
+                    counts[script] = conn.execute(
+                        "SELECT COALESCE(SUM(sample_count), 0) FROM network_snapshots").fetchone()[0]
+                conn.close()
+
+        cli_ok = all(count >= 2 for count in counts.values())
+        self.print_result("Both Services Persist with --db", cli_ok,
+                          "; ".join(f"{script}: {count} ticks stored" for script, count in counts.items()))
+        return cli_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all persistence pipeline tests."""
+        print("🚀 Write-Behind Persistence Pipeline Test Suite")
+        start_time = time.time()
+
+        results = [
+            self.test_throughput(),
+            self.test_flush_behaviour(),
+            self.test_drops_and_failures(),
+            self.test_quality_tests(),
+            self.test_sketch_atomicity(),
+            self.test_cli_persistence()
+        ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = PersistencePipelineTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Segment Supervisor Testing Script
+
+This script tests multi-process collection with simulated segments (no
+network needed):
+
+1. The shared-memory ring: records round-trip, overwritten and torn slots
+   are detected, never returned
+2. A writer process and a reader sharing a ring at full speed: every
+   record read is intact
+3. The supervisor with three segment workers: site snapshots are the sum
+   of the segments, and a killed worker is restarted
+4. Collection throughput with one saturated worker per core against a
+   single worker (skipped with fewer than 2 cores)
+5. Aggregation cost for many segments, and where the CPU time goes
+
+Usage: python test_segment_supervisor.py
+"""
+
+import sys
+import os
+import multiprocessing
+import signal
+import struct
+import time
+
+import psutil
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from segment_supervisor import (
+    SegmentSupervisor, SegmentSpec, SnapshotRing, SegmentRecord, SupervisorConfig,
+    RING_HEADER_SIZE, SLOT_SIZE, _Segment
+)
+
+
+def make_record(index: int) -> SegmentRecord:
+    # Every field derives from the index, so a torn record is detectable
+    return SegmentRecord(index, index % 1000, index * 0.5, index * 2.0, index * 0.25,
+                         index % 97 + 0.5, index % 13 * 1.0, index % 4, index % 2 == 0)
+
+
+def write_records(ring_name: str, count: int):
+    """Writer process: fill the ring as fast as possible."""
+    ring = SnapshotRing.attach(ring_name)
+    for index in range(count):
+        ring.write(make_record(index))
+    ring.close()
+
+
+class SegmentSupervisorTester:
+    """Tests for multi-process segment collection."""
+
+    def __init__(self):
+        self.test_results = {}
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    def test_ring(self) -> bool:
+        """Test ring reads, overwrites and torn slots."""
+        self.print_header("Shared-Memory Ring")
+
+        ring = SnapshotRing.create(slot_count=64)
+        reader = SnapshotRing.attach(ring.name)
+        for index in range(10):
+            ring.write(make_record(index))
+        records, lost, next_sequence = reader.read_since(0)
+        roundtrip_ok = (records == [make_record(index) for index in range(10)] and lost == 0
+                        and next_sequence == 10 and reader.read_latest() == make_record(9))
+        self.print_result("Records Round-Trip Between Handles", roundtrip_ok,
+                          f"{len(records)} records read back, latest {reader.read_latest().timestamp_ms}")
+
+        for index in range(10, 200):
+            ring.write(make_record(index))
+        records, lost, next_sequence = reader.read_since(next_sequence)
+        lapped_ok = (lost == 190 - 64 and len(records) == 64 and records[0] == make_record(136)
+                     and next_sequence == 200)
+        self.print_result("Lapped Reader Told What It Lost", lapped_ok,
+                          f"{len(records)} records kept, {lost} overwritten")
+
+        # A writer caught mid-record leaves the slot's sequence odd
+        offset = RING_HEADER_SIZE + (199 % 64) * SLOT_SIZE
+        struct.pack_into('<Q', ring.memory.buf, offset, 2 * 199 + 1)
+        torn_ok = reader.read(199) is None and reader.read_latest() == make_record(198)
+        self.print_result("Slot Being Written Is Skipped", torn_ok,
+                          "odd sequence: read() returns None, latest falls back to the previous record")
+
+        reader.close()
+        ring.close()
+        return roundtrip_ok and lapped_ok and torn_ok
+
+    def test_concurrent_processes(self) -> bool:
+        """Test a writer process and a reader at full speed."""
+        self.print_header("Writer and Reader Processes")
+
+        ring = SnapshotRing.create(slot_count=64)
+        count = 200000
+        writer = multiprocessing.get_context('spawn').Process(target=write_records, args=(ring.name, count))
+        writer.start()
+
+        next_sequence, read, lost, corrupt = 0, 0, 0, 0
+        start = time.perf_counter()
+        while True:
+            done = not writer.is_alive()
+            records, missed, next_sequence = ring.read_since(next_sequence)
+            read += len(records)
+            lost += missed
+            corrupt += sum(1 for record in records if record != make_record(record.timestamp_ms))
+            if done and next_sequence == count:
+                break
+        elapsed = time.perf_counter() - start
+        writer.join()
+        ring.close()
+
+        intact_ok = writer.exitcode == 0 and corrupt == 0 and read + lost == count and read > 0
+        self.print_result("Every Record Read Is Intact", intact_ok,
+                          f"{read} read, {lost} overwritten before the reader got to them, {corrupt} torn "
+                          f"({count / elapsed:.0f} records/s written, no pickling)")
+        return intact_ok
+
+    def test_supervisor(self) -> bool:
+        """Test site aggregation and worker restarts."""
+        self.print_header("Supervisor with Three Segments")
+
+        SupervisorConfig.RESTART_BACKOFF = 1.0
+        specs = [
+            SegmentSpec("office", "10.1.0.0/22", simulated_devices=300, seed=1),
+            SegmentSpec("iot", "10.2.0.0/22", simulated_devices=500, seed=2),
+            SegmentSpec("guest", "10.3.0.0/22", simulated_devices=800, seed=3)
+        ]
+        supervisor = SegmentSupervisor(specs, monitoring_interval=0.2)
+        supervisor.start()
+
+        # Workers import, discover and establish a baseline first
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            snapshot = supervisor.latest_site_snapshot
+            if snapshot and snapshot.segments_reporting == 3:
+                break
+            time.sleep(0.1)
+        time.sleep(2.0)
+
+        snapshot = supervisor.latest_site_snapshot
+        records = list(snapshot.segments.values())
+        status = supervisor.get_status()
+        merged_ok = (snapshot.segments_reporting == 3
+                     and snapshot.device_count == sum(record.device_count for record in records)
+                     and all(0.85 * spec.simulated_devices <= snapshot.segments[spec.name].device_count
+                             <= spec.simulated_devices for spec in specs)
+                     and abs(snapshot.total_download_mbps - sum(r.total_download_mbps for r in records)) < 1e-9
+                     and snapshot.total_download_mbps > 0)
+        self.print_result("Site Snapshot Merges Every Segment", merged_ok,
+                          f"{snapshot.device_count} devices "
+                          f"({', '.join(f'{name} {r.device_count}' for name, r in snapshot.segments.items())}), "
+                          f"{snapshot.total_download_mbps:.1f} Mbps down, {snapshot.overall_quality}")
+
+        segments = status['segments']
+        lossless_ok = all(segment['records_lost'] == 0 and segment['records_read'] >= 8 and segment['alive']
+                          for segment in segments.values())
+        self.print_result("Every Worker Record Reaches the Aggregator", lossless_ok,
+                          ", ".join(f"{name}: {segment['records_read']} read, {segment['records_lost']} lost"
+                                    for name, segment in segments.items()))
+
+        cpu = {name: psutil.Process(segment['pid']).cpu_times() for name, segment in segments.items()}
+        own = psutil.Process().cpu_times()
+
+        # Pause one worker: its segment goes stale and is left out, then
+        # comes back when the worker resumes
+        iot_pid = segments['iot']['pid']
+        os.kill(iot_pid, signal.SIGSTOP)
+        time.sleep(1.0)
+        paused = supervisor.latest_site_snapshot
+        os.kill(iot_pid, signal.SIGCONT)
+        time.sleep(1.0)
+        resumed = supervisor.latest_site_snapshot
+        stale_ok = (paused.segments['iot'] is None and paused.segments_reporting == 2
+                    and paused.device_count == snapshot.device_count - snapshot.segments['iot'].device_count
+                    and resumed.segments_reporting == 3)
+        self.print_result("Stalled Segment Left Out Until It Reports Again", stale_ok,
+                          f"paused: {paused.segments_reporting}/3 segments, {paused.device_count} devices; "
+                          f"resumed: {resumed.segments_reporting}/3")
+
+        # Kill it: the supervisor starts a new worker on the same ring
+        written_before = supervisor.segments['iot'].ring.write_count
+        os.kill(iot_pid, signal.SIGKILL)
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            time.sleep(0.1)
+            status = supervisor.get_status()
+            iot = status['segments']['iot']
+            if iot['restarts'] and iot['alive'] and iot['records_written'] > written_before + 5:
+                break
+        recovered = supervisor.latest_site_snapshot
+        supervisor.stop()
+
+        iot = status['segments']['iot']
+        restart_ok = (iot['restarts'] == 1 and iot['pid'] != iot_pid and recovered.segments_reporting == 3
+                      and iot['records_written'] > written_before)
+        self.print_result("Killed Worker Restarted on the Same Ring", restart_ok,
+                          f"iot restarted {iot['restarts']} time(s), pid {iot_pid} -> {iot['pid']}, "
+                          f"ring continued at record {written_before}")
+
+        worker_cpu = sum(times.user + times.system for times in cpu.values())
+        supervisor_cpu = own.user + own.system
+        print(f"   CPU so far: workers {worker_cpu:.2f}s in {len(cpu)} processes, supervisor {supervisor_cpu:.2f}s "
+              f"({os.cpu_count()} cores available)")
+
+        stopped_ok = not any(segment['alive'] for segment in supervisor.get_status()['segments'].values())
+        self.print_result("Workers Stopped with the Supervisor", stopped_ok, "rings unlinked, processes joined")
+
+        return merged_ok and lossless_ok and stale_ok and restart_ok and stopped_ok
+
+    def _collection_rate(self, segment_count: int, seconds: float = 3.0) -> float:
+        """Records per second written by segment_count saturated workers together."""
+        # Ticks far shorter than a collection, so every worker runs flat out
+        specs = [SegmentSpec(f"seg{index}", f"10.{index}.0.0/20", simulated_devices=2000, seed=index)
+                 for index in range(segment_count)]
+        supervisor = SegmentSupervisor(specs, monitoring_interval=0.0001)
+        supervisor.start()
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            snapshot = supervisor.latest_site_snapshot
+            if snapshot and snapshot.segments_reporting == segment_count:
+                break
+            time.sleep(0.1)
+
+        rings = [segment.ring for segment in supervisor.segments.values()]
+        written = sum(ring.write_count for ring in rings)
+        start = time.perf_counter()
+        time.sleep(seconds)
+        rate = (sum(ring.write_count for ring in rings) - written) / (time.perf_counter() - start)
+        supervisor.stop()
+        return rate
+
+    def test_scaling(self) -> bool:
+        """Benchmark collection throughput against the number of workers."""
+        self.print_header("Scaling with Cores")
+
+        cores = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+        if cores < 2:
+            print(f"   ⏭️  Skipped: {cores} core available, scaling needs at least 2")
+            return True
+
+        workers = min(cores, 4)
+        single = self._collection_rate(1)
+        parallel = self._collection_rate(workers)
+        speedup = parallel / single if single else 0.0
+        for label, rate in (("1 worker", single), (f"{workers} workers", parallel)):
+            print(f"   {label:>9}: {rate:,.0f} records/s")
+
+        scaling_ok = speedup >= 0.7 * workers
+        self.print_result("Throughput Scales with Workers", scaling_ok,
+                          f"{speedup:.1f}x the records of one worker with {workers} workers on {cores} cores")
+        return scaling_ok
+
+    def test_aggregation_cost(self) -> bool:
+        """Test that aggregation stays cheap with many segments."""
+        self.print_header("Aggregation Cost")
+
+        supervisor = SegmentSupervisor([SegmentSpec(f"vlan{index}", f"10.{index}.0.0/24") for index in range(64)],
+                                       monitoring_interval=1.0)
+        writers = []
+        for spec in supervisor.specs:
+            # Rings written from this process instead of worker processes
+            ring = SnapshotRing.create()
+            supervisor.segments[spec.name] = _Segment(spec, ring)
+            writers.append(ring)
+
+        now_ms = int(time.time() * 1000)
+        rounds = 200
+        start = time.perf_counter()
+        for tick in range(rounds):
+            for ring in writers:
+                ring.write(make_record(now_ms + tick))
+            snapshot = supervisor.aggregate(now_ms + tick)
+        per_tick = (time.perf_counter() - start) / rounds
+        for ring in writers:
+            ring.close()
+
+        cost_ok = snapshot.segments_reporting == 64 and per_tick < 0.01
+        self.print_result("64 Segments Merged in Well Under a Tick", cost_ok,
+                          f"{per_tick * 1000:.2f}ms per site snapshot, including 64 ring writes")
+        return cost_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all segment supervisor tests."""
+        print("🚀 Segment Supervisor Test Suite")
+        start_time = time.time()
+
+        results = [
+            self.test_ring(),
+            self.test_concurrent_processes(),
+            self.test_supervisor(),
+            self.test_scaling(),
+            self.test_aggregation_cost()
+        ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = SegmentSupervisorTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
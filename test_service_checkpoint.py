@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Service Checkpoint Testing Script
+
+This script tests warm restarts of the continuous monitoring service
+without touching the network (discovery and probing are replaced on the
+service instance by local functions):
+
+1. Atomic checkpoint writes and validation on load
+2. Interface counter hand-over after a clean shutdown only
+3. Restart to first snapshot without an initial sweep
+4. Background reconciliation and restored probe rotation/aggregates
+
+Usage: python test_service_checkpoint.py
+"""
+
+import sys
+import os
+import json
+import tempfile
+import time
+
+import psutil
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from service_checkpoint import save_checkpoint, load_checkpoint, restore_interface_counters
+from continuous_monitor_service import ContinuousNetworkMonitorService, checkpoint_path_from_args
+
+SWEEP_SECONDS = 3.0
+
+
+def make_service(checkpoint_path: str, discovery_calls: list) -> ContinuousNetworkMonitorService:
+    """Service whose discovery sweep takes SWEEP_SECONDS, like a /24 scan."""
+    service = ContinuousNetworkMonitorService(
+        monitoring_interval=0.2, enable_traffic_accounting=False,
+        render_mode='headless', checkpoint_path=checkpoint_path
+    )
+
+    def slow_discovery():
+        discovery_calls.append(time.monotonic())
+        time.sleep(SWEEP_SECONDS)
+        return [{'ip': f'10.0.0.{i}', 'status': 'online'} for i in range(1, 6)]
+
+    service.network_monitor.discover_devices = slow_discovery
+    service.network_monitor.monitor_device_connectivity = \
+        lambda ip, samples=1: {'avg_latency_ms': 4.0, 'packet_loss_percent': 0.0}
+    return service
+
+
+def time_to_first_snapshot(service: ContinuousNetworkMonitorService) -> float:
+    start = time.monotonic()
+    if not service.start():
+        return float('inf')
+    while not service.snapshots and time.monotonic() - start < 30:
+        time.sleep(0.01)
+    return time.monotonic() - start
+
+
+class ServiceCheckpointTester:
+    """Tests for warm-restart checkpoints."""
+
+    def __init__(self):
+        self.test_results = {}
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    def test_checkpoint_files(self) -> bool:
+        """Test atomic writes and load validation."""
+        self.print_header("Checkpoint Files")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "checkpoint.json")
+            state = {'network_range': '10.0.0.0/24', 'devices': [{'ip': '10.0.0.1'}]}
+            save_checkpoint(path, state)
+            save_checkpoint(path, state)
+
+            loaded = load_checkpoint(path, network_range='10.0.0.0/24')
+            roundtrip_ok = loaded is not None and loaded['devices'] == state['devices']
+            leftovers = [name for name in os.listdir(temp_dir) if name != "checkpoint.json"]
+            self.print_result("Round Trip, No Temp Files Left", roundtrip_ok and not leftovers,
+                              f"{os.path.getsize(path)} bytes")
+
+            rejected = {
+                'other network': load_checkpoint(path, network_range='192.168.1.0/24'),
+                'too old': load_checkpoint(path, max_age=-1),
+                'missing': load_checkpoint(os.path.join(temp_dir, "absent.json"))
+            }
+            with open(path, 'w') as checkpoint_file:
+                checkpoint_file.write('{"version": 1, "devices": [')  # Torn write from another tool
+            rejected['corrupt'] = load_checkpoint(path)
+            with open(path, 'w') as checkpoint_file:
+                json.dump({'version': 99, 'saved_at': time.time()}, checkpoint_file)
+            rejected['other version'] = load_checkpoint(path)
+
+            rejected_ok = all(value is None for value in rejected.values())
+            self.print_result("Unusable Checkpoints Ignored", rejected_ok, ", ".join(rejected))
+
+        opt_in_ok = (checkpoint_path_from_args(['--headless']) is None
+                     and checkpoint_path_from_args(['--checkpoint=/tmp/state.json']) == '/tmp/state.json'
+                     and checkpoint_path_from_args(['--checkpoint']) == 'monitor_checkpoint.json')
+        self.print_result("Checkpoints Opt-In From the Command Line", opt_in_ok,
+                          "no checkpoint file unless --checkpoint[=PATH] is given")
+
+        return roundtrip_ok and not leftovers and rejected_ok and opt_in_ok
+
+    def test_counter_handover(self) -> bool:
+        """Test that only clean-shutdown counters are reused for rates."""
+        self.print_header("Rate Counter Hand-over")
+
+        now = time.time()
+        counters = {'eth0': {'bytes_sent': 1000, 'bytes_recv': 5000, 'timestamp': now - 2.0}}
+        clean = {'interface_counters': counters, 'age_seconds': 2.0, 'clean_shutdown': True,
+                 'boot_time': psutil.boot_time()}
+
+        restored = restore_interface_counters(clean)
+        gap = time.monotonic() - restored.get('eth0', {}).get('sampled_at', 0)
+        clean_ok = restored.get('eth0', {}).get('bytes_recv') == 5000 and 1.9 < gap < 2.5
+        self.print_result("Clean Shutdown Counters Reused", clean_ok, f"gap rebased to {gap:.2f}s")
+
+        periodic = dict(clean, clean_shutdown=False)
+        rebooted = dict(clean, boot_time=0)
+        stale = dict(clean, age_seconds=3600)
+        skipped_ok = not any(restore_interface_counters(s) for s in (periodic, rebooted, stale))
+        self.print_result("Periodic, Rebooted and Stale Counters Re-baselined", skipped_ok)
+
+        return clean_ok and skipped_ok
+
+    def test_warm_restart(self) -> bool:
+        """Test restart to first snapshot with a checkpoint."""
+        self.print_header("Warm Restart")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "checkpoint.json")
+
+            cold_calls = []
+            cold = make_service(path, cold_calls)
+            cold_seconds = time_to_first_snapshot(cold)
+            time.sleep(1.0)
+            cold.stop()
+            saved_index = cold.device_test_index
+            saved_measurements = cold.measurement_count
+
+            warm_calls = []
+            warm = make_service(path, warm_calls)
+            warm_seconds = time_to_first_snapshot(warm)
+
+            speed_ok = warm.restored_from_checkpoint and warm_seconds < 1.0 <= cold_seconds
+            self.print_result("First Snapshot Under One Second", speed_ok,
+                              f"cold {cold_seconds:.2f}s vs warm {warm_seconds:.2f}s")
+
+            state_ok = (len(warm.device_cache) == 5 and warm.device_test_index >= saved_index
+                        and warm.measurement_count > saved_measurements)
+            self.print_result("Rotation and Aggregates Restored", state_ok,
+                              f"index {saved_index} → {warm.device_test_index}, "
+                              f"measurements {saved_measurements} → {warm.measurement_count}")
+
+            time.sleep(0.5)
+            reconcile_ok = len(warm_calls) == 1
+            self.print_result("Background Reconciliation Started", reconcile_ok,
+                              f"{len(warm_calls)} sweep(s) running while ticking")
+            warm.stop()
+
+        return speed_ok and state_ok and reconcile_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all checkpoint tests."""
+        print("🚀 Service Checkpoint Test Suite")
+        start_time = time.time()
+
+        results = [
+            self.test_checkpoint_files(),
+            self.test_counter_handover(),
+            self.test_warm_restart()
+        ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = ServiceCheckpointTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
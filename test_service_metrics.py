@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Service Metrics Testing Script
+
+This script tests the Prometheus metrics endpoint of the continuous
+monitoring service:
+
+1. Exposition format (cumulative histogram buckets, counters, gauges)
+2. Lock-free per-thread recording under concurrent writers
+3. Recording overhead per observation
+4. The localhost HTTP endpoint
+
+Usage: python test_service_metrics.py
+"""
+
+import sys
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from service_metrics import MetricsRegistry, MetricsServer
+from tick_scheduler import TimingHistogram
+
+
+def parse_samples(text: str) -> dict:
+    """Map 'name{labels}' to its value for every sample line."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+class ServiceMetricsTester:
+    """Tests for the metrics registry and endpoint."""
+
+    def __init__(self):
+        self.test_results = {}
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    def test_exposition_format(self) -> bool:
+        """Test histogram, counter and gauge rendering."""
+        self.print_header("Exposition Format")
+
+        registry = MetricsRegistry()
+        for value in (0.0005, 0.003, 0.003, 0.2, 30.0):
+            registry.observe('bandwidth', value)
+        attached = TimingHistogram()
+        attached.observe(1.5)
+        registry.attach_histogram('discovery', attached)
+        registry.describe_counter('probe_timeouts_total', "Probes that received no reply.")
+        registry.inc('probes_total', 3)
+        registry.register_gauge('persistence_queue_depth', "Queued records.", lambda: 42)
+        registry.register_gauge('broken', "Failing callback.", lambda: 1 / 0)
+
+        text = registry.render()
+        samples = parse_samples(text)
+        family = 'network_monitor_stage_duration_seconds'
+
+        buckets_ok = (samples[f'{family}_bucket{{stage="bandwidth",le="0.001"}}'] == 1
+                      and samples[f'{family}_bucket{{stage="bandwidth",le="0.005"}}'] == 3
+                      and samples[f'{family}_bucket{{stage="bandwidth",le="10.0"}}'] == 4
+                      and samples[f'{family}_bucket{{stage="bandwidth",le="+Inf"}}'] == 5
+                      and samples[f'{family}_count{{stage="bandwidth"}}'] == 5)
+        self.print_result("Cumulative Buckets", buckets_ok, "le buckets count everything at or below the bound")
+
+        attached_ok = samples[f'{family}_count{{stage="discovery"}}'] == 1
+        self.print_result("Attached Histogram Exported", attached_ok, "discovery stage present")
+
+        values_ok = (samples['network_monitor_probes_total'] == 3
+                     and samples['network_monitor_probe_timeouts_total'] == 0
+                     and samples['network_monitor_persistence_queue_depth'] == 42
+                     and 'network_monitor_broken' not in samples)
+        self.print_result("Counters and Gauges", values_ok, "declared counters start at 0, failing callbacks skipped")
+
+        types_ok = (f"# TYPE {family} histogram" in text
+                    and "# TYPE network_monitor_probes_total counter" in text
+                    and "# TYPE network_monitor_persistence_queue_depth gauge" in text)
+        self.print_result("TYPE Lines", types_ok)
+
+        return buckets_ok and attached_ok and values_ok and types_ok
+
+    def test_concurrent_recording(self) -> bool:
+        """Test that per-thread shards lose nothing under concurrent writers."""
+        self.print_header("Concurrent Recording")
+
+        registry = MetricsRegistry()
+        per_thread = 20000
+
+        def writer():
+            for _ in range(per_thread):
+                registry.observe('probing', 0.002)
+                registry.inc('probes_total')
+
+        threads = [threading.Thread(target=writer) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        # Scrape while writers are running
+        while any(thread.is_alive() for thread in threads):
+            registry.render()
+            time.sleep(0.01)
+
+        samples = parse_samples(registry.render())
+        total = 8 * per_thread
+        count_ok = (samples['network_monitor_stage_duration_seconds_count{stage="probing"}'] == total
+                    and samples['network_monitor_probes_total'] == total)
+        self.print_result("No Lost Observations", count_ok, f"{total:,} observations from 8 threads")
+
+        return count_ok
+
+    def test_recording_overhead(self) -> bool:
+        """Test the cost of one observe() call on the hot path."""
+        self.print_header("Recording Overhead")
+
+        registry = MetricsRegistry()
+        iterations = 100000
+        start = time.perf_counter()
+        for _ in range(iterations):
+            registry.observe('bandwidth', 0.0004)
+        per_call = (time.perf_counter() - start) / iterations
+
+        overhead_ok = per_call < 20e-6
+        self.print_result("Observe Cost", overhead_ok, f"{per_call * 1e6:.2f}µs per observation")
+
+        return overhead_ok
+
+    def test_http_endpoint(self) -> bool:
+        """Test serving /metrics on localhost."""
+        self.print_header("HTTP Endpoint")
+
+        registry = MetricsRegistry()
+        registry.register_process_metrics()
+        server = MetricsServer(registry, port=0)
+        server.start()
+        try:
+            with urllib.request.urlopen(server.url, timeout=5) as response:
+                content_type = response.headers['Content-Type']
+                samples = parse_samples(response.read().decode())
+            served_ok = content_type.startswith('text/plain; version=0.0.4')
+            self.print_result("Metrics Served", served_ok, f"{server.url} ({content_type})")
+
+            rss_ok = samples.get('network_monitor_process_resident_memory_bytes', 0) > 0
+            self.print_result("Process RSS Exported",
+                              rss_ok, f"{samples.get('network_monitor_process_resident_memory_bytes', 0) / 1e6:.1f} MB")
+
+            try:
+                urllib.request.urlopen(server.url.replace('/metrics', '/other'), timeout=5)
+                not_found_ok = False
+            except urllib.error.HTTPError as e:
+                not_found_ok = e.code == 404
+            self.print_result("Other Paths Rejected", not_found_ok, "404 outside /metrics")
+        finally:
+            server.stop()
+
+        return served_ok and rss_ok and not_found_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all metrics tests."""
+        print("🚀 Service Metrics Test Suite")
+        start_time = time.time()
+
+        results = [
+            self.test_exposition_format(),
+            self.test_concurrent_recording(),
+            self.test_recording_overhead(),
+            self.test_http_endpoint()
+        ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = ServiceMetricsTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Session Statistics Testing Script
+
+This script tests the bounded snapshot history and the O(1) running
+session aggregates of the continuous monitoring service, without
+touching the network:
+
+1. The running aggregates (averages, peaks, totals) match values
+   recomputed from the full snapshot sequence
+2. The in-memory history never grows past its maxlen and keeps the
+   newest snapshots in order
+3. The aggregates still cover every snapshot after older ones have been
+   evicted from the history
+
+Usage: python test_session_statistics.py
+"""
+
+import sys
+import os
+import math
+import random
+import time
+from typing import Any, Dict, List
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from monitoring_snapshot import MonitoringSnapshot, DeviceSet
+from continuous_monitor_service import ContinuousNetworkMonitorService, SessionStatistics
+
+
+def make_snapshots(count: int, seed: int = 7) -> List[MonitoringSnapshot]:
+    """Snapshots with varying device counts, rates and probe results."""
+    rng = random.Random(seed)
+    device_sets = [DeviceSet([{'ip': f'10.0.0.{i + 1}'} for i in range(size)], version=size)
+                   for size in range(0, 30)]
+    start_ms = int(time.time() * 1000)
+    return [
+        MonitoringSnapshot(start_ms + index * 1000, rng.choice(device_sets),
+                           rng.uniform(0, 50), rng.uniform(0, 500), rng.uniform(0, 5),
+                           rng.uniform(1, 200), rng.uniform(0, 20), rng.randrange(4))
+        for index in range(count)
+    ]
+
+
+def recompute(snapshots: List[MonitoringSnapshot]) -> Dict[str, Any]:
+    """The session aggregates from a full pass over every snapshot."""
+    count = len(snapshots)
+    return {
+        'snapshot_count': count,
+        'avg_device_count': sum(s.device_count for s in snapshots) / count,
+        'max_device_count': max(s.device_count for s in snapshots),
+        'upload_mbps_sum': math.fsum(s.total_upload_mbps for s in snapshots),
+        'download_mbps_sum': math.fsum(s.total_download_mbps for s in snapshots),
+        'peak_download_mbps': max(s.total_download_mbps for s in snapshots),
+        'avg_latency_ms': math.fsum(s.avg_latency_ms for s in snapshots) / count,
+        'avg_packet_loss': math.fsum(s.avg_packet_loss for s in snapshots) / count
+    }
+
+
+def mismatches(stats: SessionStatistics, expected: Dict[str, Any]) -> List[str]:
+    """Aggregates that differ from the recomputed values (beyond float rounding)."""
+    return [name for name, value in expected.items()
+            if not math.isclose(getattr(stats, name), value, rel_tol=1e-9, abs_tol=1e-9)]
+
+
+class SessionStatisticsTester:
+    """Tests for bounded history and running session aggregates."""
+
+    def __init__(self):
+        self.test_results = {}
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    def test_aggregates(self) -> bool:
+        """Test the running aggregates against a full recomputation."""
+        self.print_header("Running Aggregates")
+
+        snapshots = make_snapshots(5000)
+        stats = SessionStatistics()
+        for snapshot in snapshots:
+            stats.update(snapshot)
+        expected = recompute(snapshots)
+
+        wrong = mismatches(stats, expected)
+        aggregates_ok = not wrong
+        self.print_result("Aggregates Match a Full Pass", aggregates_ok,
+                          f"{len(expected)} aggregates over {len(snapshots):,} snapshots"
+                          + (f"; differing: {wrong}" if wrong else ""))
+
+        empty = SessionStatistics()
+        empty_ok = empty.avg_device_count == empty.avg_latency_ms == empty.avg_packet_loss == 0.0
+        self.print_result("Empty Session Averages", empty_ok, "averages are 0 before the first snapshot")
+        return aggregates_ok and empty_ok
+
+    def test_bounded_history(self) -> bool:
+        """Test the ring buffer bound and the aggregates after evictions."""
+        self.print_header("Bounded History")
+
+        history_size = 100
+        service = ContinuousNetworkMonitorService(monitoring_interval=0.05, enable_traffic_accounting=False,
+                                                  render_mode='headless', snapshot_history_size=history_size)
+        snapshots = make_snapshots(2500, seed=11)
+        lengths = []
+        for snapshot in snapshots:
+            service._process_monitoring_data(snapshot)
+            lengths.append(len(service.snapshots))
+
+        recent = service.get_recent_snapshots(count=10 * history_size)
+        bounded_ok = (max(lengths) == history_size and service.snapshots.maxlen == history_size
+                      and recent == snapshots[-history_size:])
+        self.print_result("History Stays at maxlen", bounded_ok,
+                          f"{len(snapshots):,} snapshots processed, at most {max(lengths)} kept; "
+                          f"the newest {len(recent)} in order")
+
+        expected = recompute(snapshots)
+        wrong = mismatches(service.session_stats, expected)
+        in_memory = recompute(list(service.snapshots))
+        evicted_ok = not wrong and service.session_stats.snapshot_count != in_memory['snapshot_count']
+        self.print_result("Aggregates Cover Evicted Snapshots", evicted_ok,
+                          f"peak {service.session_stats.peak_download_mbps:.1f} Mbps and averages over all "
+                          f"{service.session_stats.snapshot_count:,} snapshots, not the "
+                          f"{in_memory['snapshot_count']} in memory"
+                          + (f"; differing: {wrong}" if wrong else ""))
+
+        status = service.get_service_status()
+        status_ok = (status['snapshots_in_memory'] == history_size
+                     and status['snapshot_history_size'] == history_size
+                     and status['avg_latency_ms'] == round(expected['avg_latency_ms'], 2)
+                     and status['avg_device_count'] == round(expected['avg_device_count'], 2)
+                     and status['peak_download_mbps'] == expected['peak_download_mbps'])
+        self.print_result("Service Status Reports Session Aggregates", status_ok,
+                          f"avg latency {status['avg_latency_ms']}ms, "
+                          f"avg devices {status['avg_device_count']}")
+        return bounded_ok and evicted_ok and status_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all session statistics tests."""
+        print("🚀 Session Statistics Test Suite")
+        start_time = time.time()
+
+        results = [
+            self.test_aggregates(),
+            self.test_bounded_history()
+        ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = SessionStatisticsTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Snapshot Feed Testing Script
+
+This script tests the live subscriber feed without touching the network
+or a database:
+
+1. Frames round-trip through the encoder and the subscriber reader
+2. Dozens of subscribers receive every snapshot well within a second
+3. A subscriber that stops reading is evicted without holding the others
+   back
+4. Device join/leave events and Server-Sent Events over HTTP
+5. The service publishes through the feed on every tick
+
+Usage: python test_snapshot_feed.py
+"""
+
+import sys
+import os
+import shutil
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from snapshot_feed import SnapshotFeed, encode_frame, read_frames, connect_feed, FRAME_HEADER
+from monitoring_snapshot import MonitoringSnapshot, DeviceSet, QUALITY_CODES
+from continuous_monitor_service import ContinuousNetworkMonitorService
+
+
+def make_devices(count: int, version: int, first: int = 10) -> DeviceSet:
+    return DeviceSet([{'ip': f'192.168.1.{first + i}', 'hostname': f'host{first + i}'} for i in range(count)],
+                     version=version)
+
+
+def make_snapshot(device_set: DeviceSet, timestamp_ms: int = None) -> MonitoringSnapshot:
+    return MonitoringSnapshot(
+        timestamp_ms=timestamp_ms if timestamp_ms is not None else int(time.time() * 1000),
+        device_set=device_set,
+        total_upload_mbps=1.5,
+        total_download_mbps=10.0,
+        total_usage_mb=0.3,
+        avg_latency_ms=12.5,
+        avg_packet_loss=0.0,
+        quality_code=QUALITY_CODES["Good"],
+        interfaces=('eth0',)
+    )
+
+
+class Subscriber(threading.Thread):
+    """Reads frames on a background thread, noting when snapshots arrive."""
+
+    def __init__(self, socket_path: str):
+        super().__init__(daemon=True)
+        self.sock = connect_feed(socket_path)
+        self.frames = []
+        self.delays_ms = []
+
+    def run(self):
+        try:
+            for kind, payload in read_frames(self.sock):
+                self.frames.append((kind, payload))
+                if kind == 'snapshot':
+                    self.delays_ms.append(time.time() * 1000 - payload['timestamp_ms'])
+        except OSError:
+            pass
+
+    def kinds(self, kind: str):
+        return [payload for frame_kind, payload in self.frames if frame_kind == kind]
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+class SnapshotFeedTester:
+    """Tests for the live snapshot feed."""
+
+    def __init__(self):
+        self.test_results = {}
+        self.temp_dir = tempfile.mkdtemp()
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    def socket_path(self, name: str) -> str:
+        return os.path.join(self.temp_dir, f"{name}.sock")
+
+    def test_framing(self) -> bool:
+        """Test frame encoding against the subscriber reader."""
+        self.print_header("Framing")
+
+        messages = [('hello', {'devices': []}), ('snapshot', {'device_count': 3, 'note': 'é'}),
+                    ('device_left', {'ip': '10.0.0.1'})]
+        left, right = socket.socketpair()
+        data = b''.join(encode_frame(kind, payload) for kind, payload in messages)
+        # Deliver in awkward pieces: frames must be reassembled across reads
+        for offset in range(0, len(data), 7):
+            left.sendall(data[offset:offset + 7])
+        left.close()
+        received = list(read_frames(right))
+        right.close()
+
+        snapshot_frame = encode_frame('snapshot', {'device_count': 3})
+        roundtrip_ok = received == messages
+        self.print_result("Frames Reassembled Across Reads", roundtrip_ok,
+                          f"{len(received)} frames in 7-byte pieces, "
+                          f"{FRAME_HEADER.size}-byte header, snapshot frame {len(snapshot_frame)} bytes")
+        return roundtrip_ok
+
+    def test_many_subscribers(self) -> bool:
+        """Test that dozens of subscribers get every snapshot quickly."""
+        self.print_header("Forty Subscribers")
+
+        path = self.socket_path("many")
+        feed = SnapshotFeed(path)
+        feed.start()
+        devices = make_devices(50, version=1)
+        feed.submit_snapshot(make_snapshot(devices))
+
+        subscribers = [Subscriber(path) for _ in range(40)]
+        for subscriber in subscribers:
+            subscriber.start()
+        wait_for(lambda: all(subscriber.frames for subscriber in subscribers))
+
+        count = 100
+        for _ in range(count):
+            feed.submit_snapshot(make_snapshot(devices))
+            time.sleep(0.02)
+        wait_for(lambda: all(len(subscriber.kinds('snapshot')) == count for subscriber in subscribers))
+        stats = feed.get_stats()
+        feed.stop()
+        for subscriber in subscribers:
+            subscriber.join(timeout=5)
+
+        hellos = [subscriber.kinds('hello') for subscriber in subscribers]
+        hello_ok = all(len(hello) == 1 and len(hello[0]['devices']) == 50 and hello[0]['snapshot']
+                       for hello in hellos)
+        self.print_result("New Subscribers Start from the Current State", hello_ok,
+                          "hello frame carries 50 devices and the latest snapshot")
+
+        delays = sorted(delay for subscriber in subscribers for delay in subscriber.delays_ms)
+        p99 = delays[int(len(delays) * 0.99) - 1]
+        delivered_ok = (all(len(subscriber.kinds('snapshot')) == count for subscriber in subscribers)
+                        and p99 < 250 and stats['evictions'] == 0)
+        self.print_result("Every Snapshot Reaches Every Subscriber", delivered_ok,
+                          f"{len(delays)} deliveries, median {statistics.median(delays):.1f}ms, "
+                          f"p99 {p99:.1f}ms, {stats['evictions']} evicted")
+
+        closed_ok = not os.path.exists(path) and all(not subscriber.is_alive() for subscriber in subscribers)
+        self.print_result("Stopping Closes Subscribers and the Socket", closed_ok,
+                          "subscribers saw end of stream, socket unlinked")
+        return hello_ok and delivered_ok and closed_ok
+
+    def test_slow_subscriber(self) -> bool:
+        """Test that a subscriber that stops reading is evicted."""
+        self.print_header("Slow Subscriber")
+
+        path = self.socket_path("slow")
+        feed = SnapshotFeed(path, buffer_bytes=32 * 1024)
+        feed.start()
+
+        stalled = connect_feed(path)
+        stalled.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        healthy = Subscriber(path)
+        healthy.start()
+        wait_for(lambda: feed.subscriber_count == 2)
+
+        count = 400
+        for index in range(count):
+            # A changing device set makes join/leave frames, bulking up the stream
+            devices = make_devices(200, version=index + 2, first=10 + index % 2)
+            feed.submit_snapshot(make_snapshot(devices))
+        wait_for(lambda: len(healthy.kinds('snapshot')) == count)
+        stats = feed.get_stats()
+
+        evicted_ok = stats['evictions'] == 1 and stats['subscribers'] == 1
+        self.print_result("Stalled Subscriber Evicted", evicted_ok,
+                          f"{stats['evictions']} evicted at {feed.buffer_bytes // 1024} KB unsent, "
+                          f"{stats['subscribers']} still connected")
+
+        healthy_ok = len(healthy.kinds('snapshot')) == count and stats['dropped'] == 0
+        self.print_result("Others Unaffected", healthy_ok,
+                          f"healthy subscriber got {len(healthy.kinds('snapshot'))}/{count} snapshots")
+
+        # The evicted connection ends, after whatever was already delivered
+        stalled.settimeout(5)
+        try:
+            received = sum(1 for _ in read_frames(stalled))
+            ended = True
+        except OSError:
+            received, ended = 0, False
+        stalled.close()
+        feed.stop()
+        ended_ok = ended and received < count
+        self.print_result("Evicted Connection Closed", ended_ok,
+                          f"stream ended after {received} frames")
+        return evicted_ok and healthy_ok and ended_ok
+
+    def test_device_events_and_sse(self) -> bool:
+        """Test join/leave events, over both the socket and HTTP."""
+        self.print_header("Device Events and Server-Sent Events")
+
+        path = self.socket_path("events")
+        feed = SnapshotFeed(path, http_port=0)
+        feed.start()
+        feed.submit_snapshot(make_snapshot(make_devices(3, version=1)))     # .10 .11 .12
+
+        subscriber = Subscriber(path)
+        subscriber.start()
+        http = socket.create_connection(('127.0.0.1', feed.http_port), timeout=5)
+        http.sendall(b"GET /events HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n")
+        wait_for(lambda: subscriber.frames and feed.get_stats()['bytes_buffered'] == 0)
+        time.sleep(0.1)
+
+        feed.submit_snapshot(make_snapshot(make_devices(3, version=2, first=11)))  # .11 .12 .13
+        feed.submit_snapshot(make_snapshot(make_devices(3, version=2, first=11)))  # No change
+        wait_for(lambda: len(subscriber.kinds('snapshot')) == 2)
+
+        joined = [payload['ip'] for payload in subscriber.kinds('device_joined')]
+        left = [payload['ip'] for payload in subscriber.kinds('device_left')]
+        events_ok = joined == ['192.168.1.13'] and left == ['192.168.1.10']
+        self.print_result("Joins and Leaves Published Once", events_ok,
+                          f"joined {joined}, left {left}")
+
+        response = b''
+        deadline = time.time() + 5
+        while response.count(b'event: snapshot') < 2 and time.time() < deadline:
+            response += http.recv(65536)
+        http.close()
+        head, _, body = response.partition(b'\r\n\r\n')
+        event_names = [line[len(b'event: '):].decode() for line in body.split(b'\n') if line.startswith(b'event: ')]
+        sse_ok = (head.startswith(b'HTTP/1.1 200') and b'text/event-stream' in head
+                  and event_names == ['hello', 'device_joined', 'device_left', 'snapshot', 'snapshot'])
+        self.print_result("Server-Sent Events over HTTP", sse_ok, f"events: {', '.join(event_names)}")
+
+        other = socket.create_connection(('127.0.0.1', feed.http_port), timeout=5)
+        other.sendall(b"GET / HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        not_found = other.recv(1024)
+        other.close()
+        feed.stop()
+        not_found_ok = not_found.startswith(b'HTTP/1.1 404')
+        self.print_result("Other Paths Not Found", not_found_ok, not_found.split(b'\r\n')[0].decode())
+        return events_ok and sse_ok and not_found_ok
+
+    def test_service_feed(self) -> bool:
+        """Test that the service publishes through the feed."""
+        self.print_header("Service Feed")
+
+        path = self.socket_path("service")
+        feed = SnapshotFeed(path)
+        service = ContinuousNetworkMonitorService(
+            monitoring_interval=0.05, enable_traffic_accounting=False, render_mode='headless',
+            output_sinks=[feed]
+        )
+        service.network_monitor.discover_devices = lambda: [{'ip': '10.0.0.1'}, {'ip': '10.0.0.2'}]
+        service.network_monitor.monitor_device_connectivity = \
+            lambda ip, samples=1: {'avg_latency_ms': 3.0, 'packet_loss_percent': 0.0}
+        service.start()
+        wait_for(lambda: os.path.exists(path))
+        subscriber = Subscriber(path)
+        subscriber.start()
+        time.sleep(1.0)
+        service.stop()
+        subscriber.join(timeout=5)
+
+        snapshots = subscriber.kinds('snapshot')
+        service_ok = (len(snapshots) > 10 and snapshots[-1]['device_count'] == 2
+                      and service.db_manager is None)
+        self.print_result("Every Tick Published without a Database", service_ok,
+                          f"{len(snapshots)} snapshots received of {service.measurement_count}")
+        return service_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all snapshot feed tests."""
+        print("🚀 Snapshot Feed Test Suite")
+        start_time = time.time()
+
+        results = [
+            self.test_framing(),
+            self.test_many_subscribers(),
+            self.test_slow_subscriber(),
+            self.test_device_events_and_sse(),
+            self.test_service_feed()
+        ]
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = SnapshotFeedTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Snapshot Partition Testing Script
+
+This script tests the time-partitioned raw tables against temporary
+databases:
+
+1. Rows are written to the file of their day, with IDs in record order
+   across partitions, and range queries open only the overlapping days
+2. Readers, session statistics and rollups match an unpartitioned database
+3. Rollups include snapshots other writers put in partitions, whether
+   caught up by refresh_rollups or by the next save
+4. Enabling partitioning on an existing database moves its rows, and the
+   setting sticks
+5. Retention unlinks whole partitions: time against deleting the same rows
+   from one file, and the disk space returned
+
+Usage: python test_snapshot_partitions.py
+"""
+
+import sys
+import os
+import math
+import sqlite3
+import tempfile
+import threading
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from database_manager import NetworkDatabaseManager, now_ms
+from snapshot_partitions import PartitionConfig
+
+DAY_MS = 86400 * 1000
+
+
+def make_snapshot(timestamp: int, index: int) -> dict:
+    return {
+        'timestamp': timestamp,
+        'device_count': index % 40,
+        'total_upload_mbps': 1.0 + index % 7,
+        'total_download_mbps': 10.0 + index % 13,
+        'total_usage_mb': 0.5,
+        'avg_latency_ms': 12.0 + index % 5,
+        'avg_packet_loss': 0.0,
+        'overall_quality': ('Excellent', 'Good', 'Fair')[index % 3],
+        'active_interfaces': ['eth0'],
+        'tested_device_ip': f"10.0.0.{index % 4 + 1}",
+        'sample_count': 1 + index % 3
+    }
+
+
+def make_records(start_ms: int, days: int, per_day: int) -> list:
+    """Monitoring ticks spread evenly over some days."""
+    step = DAY_MS // per_day
+    return [{'snapshot': make_snapshot(start_ms + i * step, i),
+             'devices': [{'ip': f"10.0.0.{i % 4 + 1}"}],
+             'quality_test': {'latency_ms': float(i % 50), 'packet_loss_percent': 0.0}}
+            for i in range(days * per_day)]
+
+
+def partition_files(db: NetworkDatabaseManager) -> list:
+    return sorted(path.name for path in db.partitions.directory.glob('raw-*.db'))
+
+
+class SnapshotPartitionTester:
+    """Tests for time-partitioned raw tables."""
+
+    def __init__(self):
+        self.test_results = {}
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    def test_routing(self, temp_dir: str) -> bool:
+        """Test where rows are written and which partitions queries open."""
+        self.print_header("Writes and Query Routing")
+
+        db = NetworkDatabaseManager(os.path.join(temp_dir, "routing.db"), partition_by='day')
+        session_id = db.start_monitoring_session("routing")
+        start_ms = 1735689600000  # 2025-01-01 00:00 UTC
+        # 20 days in one call: more than one transaction may attach
+        records = make_records(start_ms, days=20, per_day=48)
+        snapshot_ids = db.save_monitoring_batch(session_id, records)
+
+        files = partition_files(db)
+        with db._get_connection() as conn:
+            main_rows = conn.execute("SELECT COUNT(*) FROM main.network_snapshots").fetchone()[0]
+        per_file = []
+        for name in files:
+            conn = sqlite3.connect(db.partitions.directory / name)
+            per_file.append(conn.execute("SELECT COUNT(*), MIN(timestamp), MAX(timestamp) "
+                                         "FROM network_snapshots").fetchone())
+            conn.close()
+        placed_ok = (len(files) == 20 and files[0] == 'raw-20250101.db' and main_rows == 0
+                     and all(count == 48 and (last - first) < DAY_MS and first % DAY_MS == 0
+                             for count, first, last in per_file))
+        self.print_result("Rows Written to the File of Their Day", placed_ok,
+                          f"{len(records)} ticks over {len(files)} partition files "
+                          f"(up to {PartitionConfig.MAX_ATTACHED} attached per transaction), "
+                          f"{main_rows} left in the main file")
+
+        stored = {row['id']: row['timestamp'] for row in db.get_snapshots(start_ms, start_ms + 20 * DAY_MS)}
+        tests = db.get_device_history('10.0.0.1', hours=24 * 365 * 100)
+        ids_ok = (snapshot_ids == list(range(1, len(records) + 1))
+                  and all(stored[snapshot_id] == record['snapshot']['timestamp']
+                          for snapshot_id, record in zip(snapshot_ids, records))
+                  and len({test['id'] for test in tests}) == len(tests) == len(records) // 4
+                  and all(stored[test['snapshot_id']] == test['test_timestamp'] for test in tests))
+        self.print_result("IDs Global and in Record Order", ids_ok,
+                          f"snapshot IDs {snapshot_ids[0]}..{snapshot_ids[-1]}, tests linked to their snapshots")
+
+        # A fresh thread's connection shows what a query attached
+        attached = []
+
+        def query_one_day():
+            day = db.get_snapshots(start_ms + 5 * DAY_MS + 1000, start_ms + 6 * DAY_MS)
+            with db._get_connection() as conn:
+                names = [row[1] for row in conn.execute("PRAGMA database_list") if row[1] not in ('main', 'temp')]
+            attached.append((len(day), names))
+
+        worker = threading.Thread(target=query_one_day)
+        worker.start()
+        worker.join()
+        day_rows, names = attached[0]
+        routed_ok = day_rows == 47 and names == ['p20250106']
+        self.print_result("Range Queries Open Only Overlapping Days", routed_ok,
+                          f"one-day query read {day_rows} rows from {names} of {len(files)} partitions")
+        db.close()
+        return placed_ok and ids_ok and routed_ok
+
+    def test_equivalence(self, temp_dir: str) -> bool:
+        """Test that readers return what an unpartitioned database returns."""
+        self.print_header("Same Results as One File")
+
+        recent_start = now_ms() - 3 * DAY_MS
+        results = {}
+        for label, partition_by in (("single", None), ("daily", 'day'), ("weekly", 'week')):
+            db = NetworkDatabaseManager(os.path.join(temp_dir, f"{label}.db"), partition_by=partition_by)
+            session_id = db.start_monitoring_session(label)
+            db.save_monitoring_batch(session_id, make_records(recent_start, days=3, per_day=200))
+            db.end_monitoring_session(session_id)
+            results[label] = {
+                'recent': db.get_recent_snapshots(150),
+                'range': db.get_snapshots(recent_start + DAY_MS // 2, recent_start + 2 * DAY_MS),
+                'history': db.get_device_history('10.0.0.2', hours=36),
+                'summary': db.get_session_summary(session_id),
+                'rollups': db.get_rollups('hour', recent_start, recent_start + 3 * DAY_MS)
+            }
+            db.close()
+
+        def comparable(result: dict) -> dict:
+            summary = {key: value for key, value in result['summary'].items()
+                       if key not in ('start_time', 'end_time', 'notes')}
+            return dict(result, summary=summary)
+
+        single = comparable(results['single'])
+        matching = [label for label in ('daily', 'weekly') if comparable(results[label]) == single]
+        readers_ok = matching == ['daily', 'weekly'] and len(single['recent']) == 150 and single['history']
+        self.print_result("Readers Match", readers_ok,
+                          f"recent, range, device history and session summary identical for {matching}")
+
+        rollups_ok = (len(single['rollups']) > 0
+                      and all(results[label]['rollups'] == single['rollups'] for label in ('daily', 'weekly')))
+        self.print_result("Rollups Match", rollups_ok,
+                          f"{len(single['rollups'])} hourly buckets; session averaged "
+                          f"{single['summary']['avg_device_count']:.2f} devices over "
+                          f"{single['summary']['total_snapshots']} ticks")
+        return readers_ok and rollups_ok
+
+    def test_other_writers(self, temp_dir: str) -> bool:
+        """Test that rollups include snapshots other writers put in partitions."""
+        self.print_header("Other Writers' Partitions Rolled Up")
+
+        start_ms = 1735689600000
+        path = os.path.join(temp_dir, "shared.db")
+        db = NetworkDatabaseManager(path, partition_by='day')
+        session_id = db.start_monitoring_session("ours")
+        # A writer that leaves the rollups to others, as other versions would
+        other = NetworkDatabaseManager(path)
+        other._roll_up = lambda cursor, up_to=None, sources=(): 0
+
+        writes = [
+            (db, make_records(start_ms, days=1, per_day=100)),
+            # More partitions than one transaction can attach
+            (other, make_records(start_ms + DAY_MS, days=PartitionConfig.MAX_ATTACHED + 2, per_day=50))
+        ]
+        for manager, records in writes:
+            manager.save_monitoring_batch(session_id, records)
+        refreshed = db.refresh_rollups()
+
+        def matches_reference(label: str) -> bool:
+            reference = NetworkDatabaseManager(os.path.join(temp_dir, f"reference-{label}.db"))
+            reference_session = reference.start_monitoring_session("reference")
+            for _manager, records in writes:
+                reference.save_monitoring_batch(reference_session, records)
+            expected = reference.get_rollups('day', start_ms, start_ms + 30 * DAY_MS)
+            reference.close()
+            actual = db.get_rollups('day', start_ms, start_ms + 30 * DAY_MS)
+            return len(actual) == len(expected) and all(
+                a.keys() == e.keys() and all(math.isclose(a[key], e[key], rel_tol=1e-9, abs_tol=1e-9)
+                                             for key in a)
+                for a, e in zip(actual, expected))
+
+        written_elsewhere = sum(len(records) for _manager, records in writes[1:])
+        refresh_ok = refreshed == written_elsewhere and matches_reference("refresh")
+        self.print_result("Refresh Reads the Partitions", refresh_ok,
+                          f"{refreshed} snapshot IDs from {PartitionConfig.MAX_ATTACHED + 2} partitions "
+                          f"written elsewhere rolled up")
+
+        # Rows elsewhere, then a save of ours to a different partition
+        writes.append((other, make_records(start_ms + 20 * DAY_MS, days=1, per_day=50)))
+        writes.append((db, make_records(start_ms, days=1, per_day=10)))
+        for manager, records in writes[-2:]:
+            manager.save_monitoring_batch(session_id, records)
+        with db._get_connection() as conn:
+            caught_up = (conn.execute("SELECT last_id FROM rollup_watermark").fetchone()[0]
+                         == conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'network_snapshots'").fetchone()[0])
+        save_ok = caught_up and matches_reference("save")
+        self.print_result("Saves Never Skip Them", save_ok,
+                          "a save to another partition caught the rollups up with the rows written elsewhere")
+        other.close()
+        db.close()
+        return refresh_ok and save_ok
+
+    def test_enabling(self, temp_dir: str) -> bool:
+        """Test turning partitioning on for an existing database."""
+        self.print_header("Enabling on an Existing Database")
+
+        path = os.path.join(temp_dir, "existing.db")
+        db = NetworkDatabaseManager(path)
+        session_id = db.start_monitoring_session("existing")
+        start_ms = 1735689600000
+        snapshot_ids = db.save_monitoring_batch(session_id, make_records(start_ms, days=4, per_day=100))
+        before = db.get_snapshots(start_ms, start_ms + 4 * DAY_MS)
+        rollups_before = db.get_rollups('day', start_ms, start_ms + 4 * DAY_MS)
+        db.close()
+
+        db = NetworkDatabaseManager(path, partition_by='day')
+        with db._get_connection() as conn:
+            left = [conn.execute(f"SELECT COUNT(*) FROM main.{table}").fetchone()[0]
+                    for table in PartitionConfig.TABLES]
+        after = db.get_snapshots(start_ms, start_ms + 4 * DAY_MS)
+        next_id = db.save_network_snapshot(session_id, make_snapshot(start_ms + 5 * DAY_MS, 0))
+        moved_ok = (left == [0, 0] and after == before and len(partition_files(db)) == 5
+                    and next_id == snapshot_ids[-1] + 1
+                    and db.get_rollups('day', start_ms, start_ms + 4 * DAY_MS) == rollups_before)
+        self.print_result("Existing Rows Moved", moved_ok,
+                          f"{len(before)} snapshots moved into 4 day files, main tables left with {left}, "
+                          f"next ID {next_id}")
+        db.close()
+
+        reopened = NetworkDatabaseManager(path)
+        sticky_ok = reopened.partitions is not None and reopened.partitions.period == 'day'
+        reopened.close()
+        try:
+            NetworkDatabaseManager(path, partition_by='week')
+            mismatch_ok = False
+        except ValueError:
+            mismatch_ok = True
+        self.print_result("Setting Kept Across Opens", sticky_ok and mismatch_ok,
+                          "reopened without partition_by stays daily; asking for weekly raises ValueError")
+        return moved_ok and sticky_ok and mismatch_ok
+
+    def test_retention(self, temp_dir: str) -> bool:
+        """Compare dropping partitions with deleting rows."""
+        self.print_header("Retention")
+
+        days, per_day = 40, 2000
+        start_ms = now_ms() - days * DAY_MS
+        records = make_records(start_ms, days=days, per_day=per_day)
+
+        timings = {}
+        for label, partition_by in (("delete", None), ("drop", 'day')):
+            db = NetworkDatabaseManager(os.path.join(temp_dir, f"retention-{label}.db"), partition_by=partition_by)
+            session_id = db.start_monitoring_session(label)
+            for offset in range(0, len(records), 5000):
+                db.save_monitoring_batch(session_id, records[offset:offset + 5000])
+
+            def disk_bytes():
+                files = [db.db_path] + (list(db.partitions.directory.iterdir()) if db.partitions else [])
+                return sum(os.path.getsize(path) for path in files if os.path.exists(path))
+
+            size_before = disk_bytes()
+            start = time.perf_counter()
+            db.cleanup_old_data(days_to_keep=10)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            kept = len(db.get_snapshots(start_ms, now_ms() + DAY_MS))
+            timings[label] = {'ms': elapsed_ms, 'freed': size_before - disk_bytes(), 'kept': kept,
+                              'before': size_before}
+            db.close()
+
+        delete, drop = timings['delete'], timings['drop']
+        for label, result in timings.items():
+            print(f"   {label:>6}: {result['ms']:8.1f}ms, {result['freed'] / 1e6:6.1f} MB of "
+                  f"{result['before'] / 1e6:.1f} MB returned to the disk, {result['kept']:,} snapshots kept")
+
+        # The day holding the cutoff is kept whole
+        kept_ok = delete['kept'] <= drop['kept'] <= delete['kept'] + per_day
+        fast_ok = drop['ms'] * 5 <= delete['ms']
+        self.print_result("Old Partitions Dropped Quickly", kept_ok and fast_ok,
+                          f"{delete['ms'] / drop['ms']:.0f}x faster than deleting the rows "
+                          f"({delete['ms']:.0f}ms -> {drop['ms']:.1f}ms)")
+
+        freed_ok = drop['freed'] > drop['before'] * 0.5
+        self.print_result("Disk Space Returned", freed_ok,
+                          f"{drop['freed'] / 1e6:.1f} MB freed by dropping, "
+                          f"{max(delete['freed'], 0) / 1e6:.1f} MB by deleting (and vacuuming)")
+        return kept_ok and fast_ok and freed_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all snapshot partition tests."""
+        print("🚀 Snapshot Partition Test Suite")
+        start_time = time.time()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            results = [
+                self.test_routing(temp_dir),
+                self.test_equivalence(temp_dir),
+                self.test_other_writers(temp_dir),
+                self.test_enabling(temp_dir),
+                self.test_retention(temp_dir)
+            ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = SnapshotPartitionTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Snapshot Rollup Testing Script
+
+This script tests the minute/hour/day snapshot rollups against a
+temporary database:
+
+1. Rollups written with the snapshots match an aggregation of the raw
+   rows at every granularity (count, sum, min, max, sum of squares),
+   deadband rows counted as the ticks they stand for
+2. A deadband row crossing a minute boundary has its ticks and usage
+   split between the minutes as expand_snapshot_rows spreads them
+3. Snapshots from other writers and databases older than the rollups are
+   caught up from the watermark, without counting anything twice
+4. Rollups outlive raw-data cleanup
+5. A month of hourly statistics from rollups against GROUP BY over the
+   raw table, and the write overhead of keeping them
+
+Usage: python test_snapshot_rollups.py
+"""
+
+import sys
+import os
+import math
+import sqlite3
+import tempfile
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from database_manager import NetworkDatabaseManager, DatabaseConfig, ROLLUP_METRICS
+from deadband_filter import expand_snapshot_rows
+
+
+START_MS = 1740787200000    # 2025-03-01 00:00 UTC
+STEP_MS = 5000
+
+# The raw-table aggregation the rollups replace
+RAW_HOURLY_QUERY = """
+    SELECT timestamp / 3600000 AS hour_bucket,
+           SUM(device_count * sample_count) * 1.0 / SUM(sample_count),
+           SUM((total_upload_mbps + total_download_mbps) * sample_count) / SUM(sample_count),
+           SUM(avg_latency_ms * sample_count) / SUM(sample_count), SUM(sample_count)
+    FROM network_snapshots WHERE timestamp >= ? AND timestamp < ?
+    GROUP BY hour_bucket ORDER BY hour_bucket
+"""
+ROLLUP_HOURLY_QUERY = """
+    SELECT bucket_start / 3600000 AS hour_bucket,
+           device_count_sum * 1.0 / sample_count,
+           (total_upload_mbps_sum + total_download_mbps_sum) / sample_count,
+           avg_latency_ms_sum / sample_count, sample_count
+    FROM snapshot_rollups WHERE bucket_ms = 3600000 AND bucket_start >= ? AND bucket_start < ?
+    ORDER BY bucket_start
+"""
+
+
+def make_snapshot(index: int, sample_count: int = 1) -> dict:
+    snapshot = {
+        'timestamp': START_MS + index * STEP_MS,
+        'device_count': 5 + index % 11,
+        'total_upload_mbps': round(1.0 + (index * 7) % 13 / 3, 3),
+        'total_download_mbps': round(20.0 + (index * 11) % 29 / 2, 3),
+        'total_usage_mb': 0.25 * sample_count,
+        'avg_latency_ms': 8.0 + index % 17,
+        'avg_packet_loss': (index % 5) / 10,
+        'overall_quality': 'Good',
+        'active_interfaces': ['eth0'],
+        'sample_count': sample_count
+    }
+    if sample_count > 1:
+        snapshot['valid_until'] = snapshot['timestamp'] + (sample_count - 1) * STEP_MS
+    return snapshot
+
+
+def raw_rollups(conn: sqlite3.Connection, bucket_ms: int) -> dict:
+    """Rollup values computed from scratch over the per-tick series."""
+    cursor = conn.execute("SELECT * FROM network_snapshots")
+    names = [description[0] for description in cursor.description]
+    rows = [dict(zip(names, row)) for row in cursor]
+
+    # Pieces of rows per finest bucket: ticks and usage summed, metrics per tick
+    finest_ms = min(DatabaseConfig.ROLLUP_BUCKETS.values())
+    pieces = {}
+    for tick in expand_snapshot_rows(rows):
+        minute = tick['timestamp'] - tick['timestamp'] % finest_ms
+        piece = pieces.setdefault((minute, tick['id']), {'ticks': [], 'sample_count': 0, 'total_usage_mb': 0.0})
+        piece['ticks'].append(tick)
+        piece['sample_count'] += tick['sample_count']
+        piece['total_usage_mb'] += tick['total_usage_mb']
+
+    buckets = {}
+    for (minute, _id), piece in pieces.items():
+        buckets.setdefault(minute - minute % bucket_ms, []).append(piece)
+    rollups = {}
+    for bucket, bucket_pieces in buckets.items():
+        values = [sum(piece['sample_count'] for piece in bucket_pieces), len(bucket_pieces)]
+        for metric, weight in ROLLUP_METRICS:
+            if weight == '1':
+                samples = [(piece[metric], 1) for piece in bucket_pieces]
+            else:
+                samples = [(tick[metric], tick['sample_count']) for piece in bucket_pieces for tick in piece['ticks']]
+            values += [math.fsum(value * count for value, count in samples), min(value for value, _ in samples),
+                       max(value for value, _ in samples), math.fsum(value * value * count for value, count in samples)]
+        rollups[bucket] = tuple(values)
+    return rollups
+
+
+def stored_rollups(conn: sqlite3.Connection, bucket_ms: int) -> dict:
+    columns = [f"{metric}_{stat}" for metric, _weight in ROLLUP_METRICS for stat in ('sum', 'min', 'max', 'sumsq')]
+    rows = conn.execute(f"""
+        SELECT bucket_start, sample_count, row_count, {', '.join(columns)}
+        FROM snapshot_rollups WHERE bucket_ms = ?
+    """, (bucket_ms,)).fetchall()
+    return {row[0]: tuple(row[1:]) for row in rows}
+
+
+def same_rollups(expected: dict, actual: dict) -> bool:
+    return expected.keys() == actual.keys() and all(
+        all(math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9) for a, b in zip(expected[key], actual[key]))
+        for key in expected
+    )
+
+
+class SnapshotRollupTester:
+    """Tests for incrementally maintained snapshot rollups."""
+
+    def __init__(self):
+        self.test_results = {}
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    def test_maintained_on_write(self, temp_dir: str) -> bool:
+        """Test rollups kept by every write path against the raw rows."""
+        self.print_header("Rollups Maintained on Write")
+
+        db = NetworkDatabaseManager(os.path.join(temp_dir, "written.db"))
+        session_id = db.start_monitoring_session("rollups")
+        db.save_network_snapshots(session_id, [make_snapshot(i) for i in range(3000)])
+        for i in range(3000, 3020):
+            db.save_network_snapshot(session_id, make_snapshot(i))
+        # Deadband rows standing for several ticks, out of time order
+        db.save_monitoring_batch(session_id, [{'snapshot': make_snapshot(i, sample_count=1 + i % 4)}
+                                              for i in range(20000, 19000, -7)])
+
+        with db._get_connection() as conn:
+            matches = {name: same_rollups(raw_rollups(conn, bucket_ms), stored_rollups(conn, bucket_ms))
+                       for name, bucket_ms in DatabaseConfig.ROLLUP_BUCKETS.items()}
+            bucket_counts = {name: len(stored_rollups(conn, bucket_ms))
+                             for name, bucket_ms in DatabaseConfig.ROLLUP_BUCKETS.items()}
+        exact_ok = all(matches.values())
+        self.print_result("Rollups Match the Raw Rows", exact_ok,
+                          ", ".join(f"{name}: {bucket_counts[name]} buckets "
+                                    f"{'exact' if matches[name] else 'DIFFERENT'}" for name in matches))
+
+        # Per-tick mean and spread of one hour, from first principles
+        hour = db.get_rollups('hour', START_MS, START_MS + 3600000)[0]
+        ticks = [make_snapshot(i)['avg_latency_ms'] for i in range(720)]
+        mean = sum(ticks) / len(ticks)
+        stddev = math.sqrt(sum((value - mean) ** 2 for value in ticks) / len(ticks))
+        stats_ok = (hour['sample_count'] == 720 and math.isclose(hour['avg_latency_ms_avg'], mean)
+                    and math.isclose(hour['avg_latency_ms_stddev'], stddev)
+                    and hour['avg_latency_ms_min'] == min(ticks) and hour['avg_latency_ms_max'] == max(ticks))
+        self.print_result("Mean and Standard Deviation per Tick", stats_ok,
+                          f"first hour: latency {hour['avg_latency_ms_avg']:.2f} ± {hour['avg_latency_ms_stddev']:.2f}ms "
+                          f"over {hour['sample_count']} ticks")
+        db.close()
+        return exact_ok and stats_ok
+
+    def test_boundary_rows(self, temp_dir: str) -> bool:
+        """Test a deadband row spread over the minutes it covers."""
+        self.print_header("Deadband Rows Across Buckets")
+
+        db = NetworkDatabaseManager(os.path.join(temp_dir, "boundary.db"))
+        session_id = db.start_monitoring_session("boundary")
+        # 21 one-second ticks from hh:00:50 to hh:01:10, with 0.1 MB each
+        row = dict(make_snapshot(0), timestamp=START_MS + 50000, valid_until=START_MS + 70000,
+                   sample_count=21, total_usage_mb=2.1)
+        db.save_monitoring_batch(session_id, [{'snapshot': row}])
+
+        minutes = db.get_rollups('minute', START_MS, START_MS + 120000)
+        ticks = list(expand_snapshot_rows([row]))
+        expected = [[tick for tick in ticks if tick['timestamp'] // 60000 == bucket['bucket_start'] // 60000]
+                    for bucket in minutes]
+        usage = [bucket['total_usage_mb_avg'] * bucket['sample_count'] for bucket in minutes]
+        spread_ok = len(minutes) == 2 and all(
+            bucket['sample_count'] == len(in_minute) and bucket['row_count'] == 1
+            and math.isclose(used, sum(tick['total_usage_mb'] for tick in in_minute))
+            and bucket['first_timestamp'] == in_minute[0]['timestamp']
+            and bucket['last_timestamp'] == in_minute[-1]['timestamp']
+            for bucket, in_minute, used in zip(minutes, expected, usage))
+        self.print_result("Ticks and Usage Split at the Minute", spread_ok,
+                          ", ".join(f"{bucket['sample_count']} ticks / {used:.1f} MB"
+                                    for bucket, used in zip(minutes, usage))
+                          + f" (expand_snapshot_rows: {' and '.join(str(len(t)) for t in expected)} ticks)")
+
+        hour = db.get_rollups('hour', START_MS, START_MS + 3600000)[0]
+        hour_usage = hour['total_usage_mb_avg'] * hour['sample_count']
+        whole_ok = (hour['sample_count'] == 21 and math.isclose(hour_usage, 2.1)
+                    and hour['first_timestamp'] == row['timestamp'] and hour['last_timestamp'] == row['valid_until'])
+        self.print_result("Coarser Buckets Keep the Whole Row", whole_ok,
+                          f"hour: {hour['sample_count']} ticks, {hour_usage:.1f} MB")
+        db.close()
+        return spread_ok and whole_ok
+
+    def test_catch_up(self, temp_dir: str) -> bool:
+        """Test the watermark catch-up for other writers and old databases."""
+        self.print_header("Watermark Catch-Up")
+
+        path = os.path.join(temp_dir, "catch_up.db")
+        db = NetworkDatabaseManager(path)
+        session_id = db.start_monitoring_session("catch up")
+        db.save_network_snapshots(session_id, [make_snapshot(i) for i in range(1000)])
+
+        # Another process writes raw rows; the manager's next write takes them in
+        other = sqlite3.connect(path)
+        columns = "session_id, timestamp, device_count, total_upload_mbps, total_download_mbps, " \
+                  "total_usage_mb, avg_latency_ms, avg_packet_loss, overall_quality, sample_count"
+        other.executemany(f"INSERT INTO network_snapshots ({columns}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'Good', 1)", [
+            (session_id, s['timestamp'], s['device_count'], s['total_upload_mbps'], s['total_download_mbps'],
+             s['total_usage_mb'], s['avg_latency_ms'], s['avg_packet_loss'])
+            for s in map(make_snapshot, range(1000, 1500))
+        ])
+        other.commit()
+        other.close()
+        db.save_network_snapshot(session_id, make_snapshot(1500))
+        refreshed_again = db.refresh_rollups()
+        with db._get_connection() as conn:
+            hour_ms = DatabaseConfig.ROLLUP_BUCKETS['hour']
+            writers_ok = (same_rollups(raw_rollups(conn, hour_ms), stored_rollups(conn, hour_ms))
+                          and refreshed_again == 0)
+        self.print_result("Other Writers' Rows Included Once", writers_ok,
+                          "500 rows from another connection rolled up with the next save; refresh found nothing left")
+        db.close()
+
+        # A database from before the rollups: raw rows, no rollup tables
+        legacy_path = os.path.join(temp_dir, "legacy.db")
+        db = NetworkDatabaseManager(legacy_path)
+        session_id = db.start_monitoring_session("legacy")
+        db.close()
+        conn = sqlite3.connect(legacy_path)
+        conn.execute("DROP TABLE snapshot_rollups")
+        conn.execute("DROP TABLE rollup_watermark")
+        conn.executemany(f"INSERT INTO network_snapshots ({columns}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'Good', ?)", [
+            (session_id, s['timestamp'], s['device_count'], s['total_upload_mbps'], s['total_download_mbps'],
+             s['total_usage_mb'], s['avg_latency_ms'], s['avg_packet_loss'], s['sample_count'])
+            for s in (make_snapshot(i, sample_count=1 + i % 3) for i in range(120000))
+        ])
+        conn.commit()
+        conn.close()
+
+        start = time.perf_counter()
+        db = NetworkDatabaseManager(legacy_path)
+        backfill_seconds = time.perf_counter() - start
+        with db._get_connection() as conn:
+            backfill_ok = all(same_rollups(raw_rollups(conn, bucket_ms), stored_rollups(conn, bucket_ms))
+                              for bucket_ms in DatabaseConfig.ROLLUP_BUCKETS.values())
+            watermark = conn.execute("SELECT last_id FROM rollup_watermark").fetchone()[0]
+        backfill_ok = backfill_ok and watermark == 120000
+        self.print_result("Existing Snapshots Backfilled on Open", backfill_ok,
+                          f"120,000 rows in {backfill_seconds:.1f}s "
+                          f"(chunks of {DatabaseConfig.ROLLUP_CHUNK_ROWS:,}), watermark at {watermark:,}")
+        db.close()
+        return writers_ok and backfill_ok
+
+    def test_outlive_cleanup(self, temp_dir: str) -> bool:
+        """Test that rollups stay when raw snapshots are deleted."""
+        self.print_header("Rollups Outlive Raw Data")
+
+        db = NetworkDatabaseManager(os.path.join(temp_dir, "cleanup.db"))
+        session_id = db.start_monitoring_session("cleanup")
+        db.save_network_snapshots(session_id, [make_snapshot(i) for i in range(2000)])
+        before = db.get_rollups('day', START_MS, START_MS + 86400000)
+        db.cleanup_old_data(days_to_keep=30)
+        db.save_network_snapshot(session_id, make_snapshot(2000))
+        after = db.get_rollups('day', START_MS, START_MS + 86400000)
+        with db._get_connection() as conn:
+            raw_left = conn.execute("SELECT COUNT(*) FROM network_snapshots").fetchone()[0]
+
+        kept_ok = raw_left == 1 and before[0]['sample_count'] == 2000 and after[0]['sample_count'] == 2001
+        self.print_result("Daily Statistics Kept After Cleanup", kept_ok,
+                          f"{raw_left} raw row left, day bucket still counts {after[0]['sample_count']} ticks")
+        db.close()
+        return kept_ok
+
+    def test_query_speed(self, temp_dir: str) -> bool:
+        """Compare a month of hourly statistics from rollups and raw rows."""
+        self.print_header("A Month of Hourly Statistics")
+
+        db = NetworkDatabaseManager(os.path.join(temp_dir, "month.db"))
+        session_id = db.start_monitoring_session("month")
+        days = 30
+        rows = days * 86400000 // STEP_MS
+        start = time.perf_counter()
+        for offset in range(0, rows, 5000):
+            db.save_network_snapshots(session_id, [make_snapshot(i) for i in range(offset, min(offset + 5000, rows))])
+        write_rate = rows / (time.perf_counter() - start)
+
+        # The same batches without maintaining rollups
+        plain = NetworkDatabaseManager(os.path.join(temp_dir, "plain.db"))
+        plain._roll_up = lambda cursor, up_to=None, sources=(): 0
+        session_id = plain.start_monitoring_session("plain")
+        start = time.perf_counter()
+        for offset in range(0, rows // 5, 5000):
+            plain.save_network_snapshots(session_id, [make_snapshot(i) for i in range(offset, offset + 5000)])
+        plain_rate = rows // 5 / (time.perf_counter() - start)
+        plain.close()
+
+        range_ms = (START_MS, START_MS + days * 86400000)
+        with db._get_connection() as conn:
+            timings = {}
+            results = {}
+            for label, query in (("raw", RAW_HOURLY_QUERY), ("rollup", ROLLUP_HOURLY_QUERY)):
+                best = float('inf')
+                for _ in range(3):
+                    start = time.perf_counter()
+                    results[label] = conn.execute(query, range_ms).fetchall()
+                    best = min(best, time.perf_counter() - start)
+                timings[label] = best
+        db.close()
+
+        same = (len(results['raw']) == len(results['rollup']) == days * 24
+                and all(a[0] == b[0] and a[4] == b[4] and all(math.isclose(x, y) for x, y in zip(a[1:4], b[1:4]))
+                        for a, b in zip(results['raw'], results['rollup'])))
+        speedup = timings['raw'] / timings['rollup']
+        print(f"   raw GROUP BY: {timings['raw'] * 1000:8.1f}ms over {rows:,} snapshots")
+        print(f"   rollups:      {timings['rollup'] * 1000:8.1f}ms over {days * 24} rows")
+        speed_ok = same and speedup >= 20
+        self.print_result("Hourly Statistics from Rollups", speed_ok,
+                          f"{speedup:.0f}x faster, identical results for {days * 24} hours")
+
+        overhead_ok = write_rate >= 0.5 * plain_rate
+        self.print_result("Write Overhead", overhead_ok,
+                          f"{write_rate:,.0f} snapshots/s with rollups vs {plain_rate:,.0f} without "
+                          f"(batches of 5,000)")
+        return speed_ok and overhead_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all snapshot rollup tests."""
+        print("🚀 Snapshot Rollup Test Suite")
+        start_time = time.time()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            results = [
+                self.test_maintained_on_write(temp_dir),
+                self.test_boundary_rows(temp_dir),
+                self.test_catch_up(temp_dir),
+                self.test_outlive_cleanup(temp_dir),
+                self.test_query_speed(temp_dir)
+            ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = SnapshotRollupTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Stage Workers Testing Script
+
+This script tests the independent stage workers of the continuous
+monitoring service:
+
+1. A slow stage (discovery) never delays a fast one (probing)
+2. Results are published as StageResults with increasing sequence
+   numbers; a run returning None keeps the previous result
+3. Exceptions are counted and recorded without stopping the worker
+4. trigger() runs a stage before its slot, and stop() ends the worker
+   promptly even during a long wait
+
+Usage: python test_stage_workers.py
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from stage_workers import PeriodicStage, StageResult
+
+
+class StageWorkersTester:
+    """Tests for independently scheduled pipeline stages."""
+
+    def __init__(self):
+        self.test_results = {}
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    def test_independence(self) -> bool:
+        """Test that a slow discovery stage does not hold up probes."""
+        self.print_header("Stage Independence")
+
+        probe_times = []
+        discovery_runs = []
+
+        def slow_discovery():
+            discovery_runs.append(time.monotonic())
+            time.sleep(0.4)  # A network scan taking several probe intervals
+            return ['10.0.0.1']
+
+        def probe():
+            probe_times.append(time.monotonic())
+            return {'latency_ms': 1.0}
+
+        discovery = PeriodicStage("discovery", slow_discovery, interval=0.2)
+        probe_stage = PeriodicStage("probe", probe, interval=0.05)
+        discovery.start()
+        probe_stage.start()
+        time.sleep(1.2)
+        discovery.stop()
+        probe_stage.stop()
+
+        gaps = [b - a for a, b in zip(probe_times, probe_times[1:])]
+        longest_gap = max(gaps) if gaps else float('inf')
+        independent_ok = len(discovery_runs) >= 2 and len(probe_times) >= 18 and longest_gap < 0.1
+        self.print_result("Slow Discovery Does Not Delay Probes", independent_ok,
+                          f"{len(probe_times)} probes while {len(discovery_runs)} 400ms discoveries ran, "
+                          f"longest gap between probes {longest_gap * 1000:.0f}ms")
+
+        threads_ok = discovery.latest is not None and probe_stage.latest is not None and not (
+            discovery.is_running or probe_stage.is_running)
+        self.print_result("Each Stage Publishes Its Own Result", threads_ok,
+                          f"discovery #{discovery.latest.sequence if discovery.latest else 0}, "
+                          f"probe #{probe_stage.latest.sequence if probe_stage.latest else 0}")
+        return independent_ok and threads_ok
+
+    def test_publishing(self) -> bool:
+        """Test StageResult publishing and None results."""
+        self.print_header("Result Publishing")
+
+        runs = [0]
+
+        def every_other():
+            runs[0] += 1
+            return runs[0] if runs[0] % 2 else None  # Even runs have nothing new
+
+        stage = PeriodicStage("publish", every_other, interval=0.02)
+        seen = []
+        stage.start()
+        deadline = time.monotonic() + 2.0
+        while stage.run_count < 10 and time.monotonic() < deadline:
+            latest = stage.latest
+            if latest is not None and (not seen or seen[-1] is not latest):
+                seen.append(latest)
+            time.sleep(0.002)
+        stage.stop()
+
+        final = stage.latest
+        sequences = [result.sequence for result in seen]
+        published_ok = (isinstance(final, StageResult) and final.value % 2 == 1
+                        and final.sequence == (final.value + 1) // 2
+                        and sequences == sorted(sequences) and final.duration >= 0)
+        self.print_result("Sequence Counts Published Results", published_ok,
+                          f"{stage.run_count} runs published {final.sequence if final else 0} results "
+                          f"(latest value {final.value if final else None})")
+        return published_ok
+
+    def test_errors(self) -> bool:
+        """Test that failing runs are counted and the worker keeps going."""
+        self.print_header("Error Handling")
+
+        runs = [0]
+
+        def flaky():
+            runs[0] += 1
+            if runs[0] % 3 == 0:
+                raise RuntimeError(f"probe {runs[0]} failed")
+            return runs[0]
+
+        stage = PeriodicStage("flaky", flaky, interval=0.02)
+        stage.start()
+        deadline = time.monotonic() + 2.0
+        while stage.run_count < 9 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        alive = stage.is_running
+        stage.stop()
+
+        errors_ok = (alive and stage.error_count == stage.run_count // 3 and stage.error_count >= 3
+                     and stage.last_error.endswith("failed") and stage.latest.value % 3 != 0)
+        self.print_result("Errors Counted, Worker Keeps Running", errors_ok,
+                          f"{stage.error_count} of {stage.run_count} runs failed; "
+                          f"last error '{stage.last_error}'")
+        return errors_ok
+
+    def test_trigger_and_stop(self) -> bool:
+        """Test early runs on request, prompt shutdown and restarting."""
+        self.print_header("Trigger and Stop")
+
+        ran = threading.Event()
+        stage = PeriodicStage("manual", lambda: ran.set() or 'done', interval=30.0, initial_delay=30.0)
+        stage.start()
+        time.sleep(0.05)
+        idle = not ran.is_set()
+        stage.trigger()
+        triggered = ran.wait(1.0)
+        trigger_ok = idle and triggered and stage.latest.value == 'done'
+        self.print_result("Trigger Runs Before the Slot", trigger_ok,
+                          "a stage waiting 30s ran within a second of trigger()")
+
+        stop_start = time.monotonic()
+        stage.stop()
+        stop_seconds = time.monotonic() - stop_start
+        stopped = not stage.is_running and stop_seconds < 0.5
+
+        ran.clear()
+        stage.start()
+        stage.trigger()
+        restarted = ran.wait(1.0) and stage.is_running
+        stage.stop()
+        stop_ok = stopped and restarted and not stage.is_running
+        self.print_result("Stop Joins Promptly, Start Resumes", stop_ok,
+                          f"stopped in {stop_seconds * 1000:.1f}ms during a 30s wait, then restarted")
+        return trigger_ok and stop_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all stage worker tests."""
+        print("🚀 Stage Workers Test Suite")
+        start_time = time.time()
+
+        results = [
+            self.test_independence(),
+            self.test_publishing(),
+            self.test_errors(),
+            self.test_trigger_and_stop()
+        ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = StageWorkersTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
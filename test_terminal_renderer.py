@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Terminal Renderer Testing Script
+
+This script tests the status display used by the continuous monitoring
+service, writing to in-memory and deliberately slow streams:
+
+1. Redraws are capped at the configured refresh rate
+2. 'changes' mode redraws only when displayed values change
+3. Headless mode never formats or writes anything
+4. A slow terminal never blocks the publishing (monitoring) thread
+5. A headless service prints nothing per sweep or probe, and its banner
+   says so
+
+Usage: python test_terminal_renderer.py
+"""
+
+import sys
+import os
+import io
+import contextlib
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from terminal_renderer import TerminalRenderer
+from continuous_monitor_service import ContinuousNetworkMonitorService
+from network_backends import SimulatedBackend, SimulationProfile
+
+
+class SlowStream(io.StringIO):
+    """Stream whose writes take as long as a congested SSH session."""
+
+    def write(self, text):
+        time.sleep(0.2)
+        return super().write(text)
+
+
+class TerminalRendererTester:
+    """Tests for throttled, decoupled rendering."""
+
+    def __init__(self):
+        self.test_results = {}
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    def test_throttled_redraws(self) -> bool:
+        """Test that 100 snapshots/s are drawn at no more than the capped rate."""
+        self.print_header("Throttled Redraws")
+
+        stream = io.StringIO()
+        renderer = TerminalRenderer(lambda value: f"value={value}", max_refresh_hz=5.0, stream=stream)
+        renderer.start()
+        for value in range(100):
+            renderer.publish(value)
+            time.sleep(0.01)
+        renderer.stop()
+
+        lines = stream.getvalue().splitlines()
+        rate_ok = 3 <= renderer.redraws <= 8
+        self.print_result("Redraw Rate Capped", rate_ok,
+                          f"{renderer.redraws} redraws for {renderer.published} snapshots over ~1s")
+
+        latest_ok = lines and lines[-1] == "value=99"
+        self.print_result("Latest Snapshot Drawn", latest_ok, f"last line {lines[-1] if lines else None!r}")
+
+        return rate_ok and latest_ok
+
+    def test_changes_mode(self) -> bool:
+        """Test that 'changes' mode skips redraws of unchanged values."""
+        self.print_header("Redraw on Change")
+
+        stream = io.StringIO()
+        renderer = TerminalRenderer(lambda value: f"devices={value // 10}", mode='changes',
+                                    max_refresh_hz=0, change_key=lambda value: value // 10, stream=stream)
+        renderer.start()
+        for value in range(30):
+            renderer.publish(value)
+            time.sleep(0.005)
+        renderer.stop()
+
+        lines = stream.getvalue().splitlines()
+        changes_ok = lines == ["devices=0", "devices=1", "devices=2"]
+        self.print_result("Only Changes Drawn", changes_ok, f"{len(lines)} lines for 30 snapshots")
+
+        return changes_ok
+
+    def test_headless(self) -> bool:
+        """Test that headless mode does no formatting and no output."""
+        self.print_header("Headless Mode")
+
+        calls = []
+        stream = io.StringIO()
+        renderer = TerminalRenderer(lambda value: calls.append(value) or "", mode='headless', stream=stream)
+        renderer.start()
+        for value in range(1000):
+            renderer.publish(value)
+            renderer.message("probe {}", value)
+        renderer.stop()
+
+        silent_ok = not calls and stream.getvalue() == "" and renderer._thread is None
+        self.print_result("No Formatting, Output or Thread", silent_ok,
+                          f"{len(calls)} formatter calls, {len(stream.getvalue())} bytes written")
+
+        return silent_ok
+
+    def test_slow_terminal(self) -> bool:
+        """Test that publishing never waits on a slow stream."""
+        self.print_header("Slow Terminal")
+
+        renderer = TerminalRenderer(lambda value: f"value={value}", max_refresh_hz=100.0, stream=SlowStream())
+        renderer.start()
+        worst = 0.0
+        for value in range(50):
+            start = time.perf_counter()
+            renderer.publish(value)
+            renderer.message("Testing connection quality to {}", value)
+            worst = max(worst, time.perf_counter() - start)
+            time.sleep(0.01)
+        renderer.stop(timeout=5)
+
+        publish_ok = worst < 0.05
+        self.print_result("Publishing Never Blocks", publish_ok,
+                          f"worst publish+message {worst * 1000:.2f}ms with 200ms writes")
+
+        messages_ok = renderer.messages_printed + renderer.messages_dropped == 50
+        self.print_result("Messages Batched", messages_ok,
+                          f"{renderer.messages_printed} printed in {renderer.render_durations.count} writes")
+
+        return publish_ok and messages_ok
+
+    def test_headless_service(self) -> bool:
+        """Test that a headless service keeps discovery and probe chatter off the console."""
+        self.print_header("Headless Service")
+
+        backend = SimulatedBackend(SimulationProfile(device_count=20))
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            service = ContinuousNetworkMonitorService(monitoring_interval=0.05, enable_traffic_accounting=False,
+                                                      render_mode='headless', network_backend=backend)
+            started = service.start()
+            time.sleep(0.5)
+            service.stop()
+        text = output.getvalue()
+
+        chatter = [line for line in text.splitlines()
+                   if line.lstrip().startswith(("Ping ", "✅ Found device", "🔍 Scanning", "🔍 Testing"))]
+        quiet_ok = started and service.probe_stage.run_count > 0 and not chatter
+        self.print_result("No Per-Probe or Per-Host Output", quiet_ok,
+                          f"{service.probe_stage.run_count} probes and a sweep of 20 hosts, "
+                          f"{len(chatter)} progress lines printed")
+
+        banner_ok = "Terminal display: off (headless)" in text and "real-time terminal output" not in text
+        self.print_result("Banner Matches the Render Mode", banner_ok,
+                          next((line for line in text.splitlines() if "Terminal display" in line), "no display line"))
+
+        return quiet_ok and banner_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all renderer tests."""
+        print("🚀 Terminal Renderer Test Suite")
+        start_time = time.time()
+
+        results = [
+            self.test_throttled_redraws(),
+            self.test_changes_mode(),
+            self.test_headless(),
+            self.test_slow_terminal(),
+            self.test_headless_service()
+        ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = TerminalRendererTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Deadline Scheduler Testing Script
+
+This script tests the monotonic tick scheduler used by the continuous
+monitoring service:
+
+1. Ticks land on a regular, interval-aligned timestamp grid without drift
+2. Missed tick policies (skip, catch-up, coalesce) after long and short
+   overruns
+3. Overrun counting and lateness/duration histograms
+4. Triggered runs and prompt shutdown
+
+Usage: python test_tick_scheduler.py
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from tick_scheduler import DeadlineScheduler, TimingHistogram
+
+
+def run_ticks(scheduler: DeadlineScheduler, count: int, slow_index: int = -1, slow_seconds: float = 0.0):
+    """Collect ticks until count have run, stalling once at slow_index."""
+    ticks = []
+    for tick in scheduler.ticks():
+        ticks.append(tick)
+        if tick.index == slow_index and not tick.triggered:
+            time.sleep(slow_seconds)
+        if len(ticks) >= count:
+            scheduler.stop()
+    return ticks
+
+
+class TickSchedulerTester:
+    """Tests for drift-free deadline scheduling."""
+
+    def __init__(self):
+        self.test_results = {}
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    def test_grid_without_drift(self) -> bool:
+        """Test that ticks stay on the grid even when each tick does work."""
+        self.print_header("Regular Grid")
+
+        interval = 0.05
+        scheduler = DeadlineScheduler(interval)
+        start = time.monotonic()
+        ticks = []
+        for tick in scheduler.ticks():
+            ticks.append(tick)
+            time.sleep(0.02)  # Work that a sleep(interval - duration) loop would drift on
+            if len(ticks) == 40:
+                scheduler.stop()
+        elapsed = time.monotonic() - start
+
+        aligned = all(round(t.scheduled_time * 1000) % 50 == 0 for t in ticks)
+        spacing_ok = all(round((b.scheduled_time - a.scheduled_time) * 1000) == 50
+                         for a, b in zip(ticks, ticks[1:]))
+        self.print_result("Aligned, Evenly Spaced Timestamps", aligned and spacing_ok,
+                          f"{len(ticks)} ticks every {interval * 1000:.0f}ms")
+
+        drift = elapsed - 40 * interval
+        drift_ok = abs(drift) < 2 * interval
+        self.print_result("No Accumulated Drift", drift_ok, f"{drift * 1000:+.1f}ms after 40 ticks")
+
+        lateness_ok = scheduler.lateness.percentile(0.5) <= 0.01 and scheduler.overruns == 0
+        self.print_result("Ticks Start on Time", lateness_ok,
+                          f"median lateness ≤{scheduler.lateness.percentile(0.5) * 1000:.1f}ms, "
+                          f"{scheduler.overruns} overruns")
+
+        return aligned and spacing_ok and drift_ok and lateness_ok
+
+    def test_missed_tick_policies(self) -> bool:
+        """Test each policy after a tick overruns by several intervals."""
+        self.print_header("Missed Tick Policies")
+
+        results = {}
+        for policy in ('skip', 'catch_up', 'coalesce'):
+            scheduler = DeadlineScheduler(0.05, policy=policy)
+            ticks = run_ticks(scheduler, 12, slow_index=2, slow_seconds=0.23)
+            results[policy] = (scheduler, [t.index for t in ticks])
+
+        skip, skip_indexes = results['skip']
+        skip_ok = skip_indexes[:4] == [0, 1, 2, 7] and skip.missed_ticks == 4 and skip.overruns == 1
+        self.print_result("Skip Drops Overdue Slots", skip_ok, f"slots {skip_indexes[:5]}")
+
+        catch_up, catch_up_indexes = results['catch_up']
+        catch_up_ok = catch_up_indexes == list(range(12)) and catch_up.missed_ticks == 0
+        self.print_result("Catch-Up Replays Every Slot", catch_up_ok, f"slots {catch_up_indexes[:8]}")
+
+        coalesce, coalesce_indexes = results['coalesce']
+        coalesce_ok = coalesce_indexes[:4] == [0, 1, 2, 6] and coalesce.missed_ticks == 3
+        self.print_result("Coalesce Runs Once for Missed Slots", coalesce_ok, f"slots {coalesce_indexes[:5]}")
+
+        return skip_ok and catch_up_ok and coalesce_ok
+
+    def test_short_overrun(self) -> bool:
+        """Test the policies after a tick overruns by 1.5 intervals (only the next slot is late)."""
+        self.print_header("Short Overrun")
+
+        results = {}
+        for policy in ('skip', 'coalesce'):
+            scheduler = DeadlineScheduler(0.05, policy=policy)
+            ticks = run_ticks(scheduler, 6, slow_index=2, slow_seconds=0.075)
+            results[policy] = (scheduler, [t.index for t in ticks])
+
+        skip, skip_indexes = results['skip']
+        skip_ok = skip_indexes[:4] == [0, 1, 2, 4] and skip.missed_ticks == 1
+        self.print_result("Skip Drops the Late Slot", skip_ok, f"slots {skip_indexes[:5]}")
+
+        coalesce, coalesce_indexes = results['coalesce']
+        coalesce_ok = coalesce_indexes[:4] == [0, 1, 2, 3] and coalesce.missed_ticks == 0
+        self.print_result("Coalesce Runs the Late Slot at Once", coalesce_ok, f"slots {coalesce_indexes[:5]}")
+
+        return skip_ok and coalesce_ok
+
+    def test_histograms(self) -> bool:
+        """Test histogram bucketing and summaries."""
+        self.print_header("Timing Histograms")
+
+        histogram = TimingHistogram()
+        for value in [0.0005] * 90 + [0.03] * 9 + [20.0]:
+            histogram.observe(value)
+        summary = histogram.to_dict()
+
+        percentile_ok = histogram.percentile(0.5) == 0.001 and histogram.percentile(0.99) == 0.05
+        self.print_result("Bucket Percentiles", percentile_ok,
+                          f"p50 ≤{summary['p50_ms']}ms, p99 ≤{summary['p99_ms']}ms")
+
+        overflow_ok = summary['buckets']['+Inf'] == 1 and summary['max_ms'] == 20000.0
+        self.print_result("Overflow Bucket", overflow_ok, f"max {summary['max_ms']}ms")
+
+        return percentile_ok and overflow_ok
+
+    def test_trigger_and_stop(self) -> bool:
+        """Test early triggered runs and prompt shutdown of a long wait."""
+        self.print_header("Trigger and Stop")
+
+        scheduler = DeadlineScheduler(30.0, align=False)
+        ticks = []
+
+        def consume():
+            for tick in scheduler.ticks(initial_delay=30.0):
+                ticks.append(tick)
+
+        worker = threading.Thread(target=consume, daemon=True)
+        worker.start()
+        time.sleep(0.1)
+        scheduler.trigger()
+        time.sleep(0.1)
+        trigger_ok = len(ticks) == 1 and ticks[0].triggered
+        self.print_result("Triggered Run Before Deadline", trigger_ok, f"{len(ticks)} tick(s) after trigger")
+
+        stop_start = time.monotonic()
+        scheduler.stop()
+        worker.join(timeout=2)
+        stop_seconds = time.monotonic() - stop_start
+        stop_ok = not worker.is_alive() and stop_seconds < 0.5
+        self.print_result("Stop Interrupts Wait", stop_ok, f"stopped in {stop_seconds * 1000:.1f}ms")
+
+        return trigger_ok and stop_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all scheduler tests."""
+        print("🚀 Deadline Scheduler Test Suite")
+        start_time = time.time()
+
+        results = [
+            self.test_grid_without_drift(),
+            self.test_missed_tick_policies(),
+            self.test_short_overrun(),
+            self.test_histograms(),
+            self.test_trigger_and_stop()
+        ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = TickSchedulerTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Timestamp Migration Testing Script
+
+This script tests the move from text timestamps to integer epoch
+milliseconds against a temporary database written the old way:
+
+1. Both old text formats (SQLite's UTC CURRENT_TIMESTAMP and local
+   isoformat() strings) convert to the right instant
+2. The migration runs in chunks: another connection keeps writing while
+   it converts, and an interrupted migration resumes
+3. Range filters that were wrong across the two text formats are right
+4. Hour bucketing over integers against strftime() over text
+
+Usage: python test_timestamp_migration.py
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from database_manager import NetworkDatabaseManager, DatabaseConfig, SCHEMA_VERSION, to_epoch_ms
+
+
+# Tables as schema version 1 created them (time columns only matter here)
+LEGACY_SCHEMA = """
+CREATE TABLE devices (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, ip_address TEXT UNIQUE NOT NULL, mac_address TEXT, hostname TEXT,
+    device_type TEXT DEFAULT 'unknown', manufacturer TEXT,
+    first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP, last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    is_active BOOLEAN DEFAULT 1
+);
+CREATE TABLE monitoring_sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    end_time TIMESTAMP NULL, total_snapshots INTEGER DEFAULT 0, avg_device_count REAL DEFAULT 0.0,
+    avg_quality_score REAL DEFAULT 0.0, notes TEXT
+);
+CREATE TABLE network_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, session_id INTEGER NOT NULL,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP, device_count INTEGER NOT NULL,
+    total_upload_mbps REAL NOT NULL, total_download_mbps REAL NOT NULL, total_usage_mb REAL NOT NULL,
+    avg_latency_ms REAL NOT NULL, avg_packet_loss REAL NOT NULL, overall_quality TEXT NOT NULL,
+    active_interfaces TEXT, tested_device_ip TEXT, valid_until TIMESTAMP NULL,
+    sample_count INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE device_quality_tests (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, snapshot_id INTEGER NOT NULL, device_ip TEXT NOT NULL,
+    test_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP, latency_ms REAL, packet_loss_percent REAL DEFAULT 0.0,
+    response_time_ms REAL, test_status TEXT DEFAULT 'success'
+);
+CREATE TABLE schema_version (version INTEGER PRIMARY KEY, applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+CREATE INDEX idx_snapshots_timestamp ON network_snapshots(timestamp);
+INSERT INTO schema_version (version) VALUES (1);
+INSERT INTO monitoring_sessions (notes) VALUES ('legacy');
+"""
+
+# The predictor's hourly query before the migration
+LEGACY_HOURLY_QUERY = """
+    SELECT CAST(strftime('%H', timestamp) AS INTEGER) AS hour_of_day, DATE(timestamp) AS date,
+           SUM(total_download_mbps * sample_count) / SUM(sample_count), SUM(sample_count)
+    FROM network_snapshots WHERE timestamp >= ? AND timestamp <= ?
+    GROUP BY DATE(timestamp), CAST(strftime('%H', timestamp) AS INTEGER)
+"""
+HOURLY_QUERY = """
+    SELECT timestamp / 3600000 AS hour_bucket,
+           SUM(total_download_mbps * sample_count) / SUM(sample_count), SUM(sample_count)
+    FROM network_snapshots WHERE timestamp >= ? AND timestamp <= ?
+    GROUP BY hour_bucket
+"""
+
+START = datetime(2025, 3, 1)            # Local time
+STEP = timedelta(seconds=5)
+
+
+def legacy_text(index: int) -> str:
+    """Odd rows as CURRENT_TIMESTAMP wrote them (UTC), even rows as isoformat() did (local)."""
+    moment = START + STEP * index + timedelta(microseconds=index % 1000)
+    if index % 2:
+        return moment.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    return moment.isoformat()
+
+
+def expected_ms(index: int) -> int:
+    moment = START + STEP * index + timedelta(microseconds=index % 1000)
+    if index % 2:
+        moment = moment.replace(microsecond=0)  # CURRENT_TIMESTAMP has whole seconds
+    return to_epoch_ms(moment)
+
+
+def build_legacy_database(path: str, rows: int):
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.executemany("""
+        INSERT INTO network_snapshots (session_id, timestamp, device_count, total_upload_mbps,
+            total_download_mbps, total_usage_mb, avg_latency_ms, avg_packet_loss, overall_quality,
+            active_interfaces, valid_until, sample_count)
+        VALUES (1, ?, 8, 1.0, ?, 0.5, 12.0, 0.0, 'Good', '["eth0"]', ?, ?)
+    """, [(legacy_text(i), float(i % 97), legacy_text(i + 1) if i % 10 == 0 else None, 2 if i % 10 == 0 else 1)
+          for i in range(rows)])
+    conn.executemany("INSERT INTO device_quality_tests (snapshot_id, device_ip, test_timestamp, latency_ms) "
+                     "VALUES (?, '10.0.0.1', ?, 5.0)", [(i + 1, legacy_text(i)) for i in range(0, rows, 50)])
+    conn.execute("INSERT INTO devices (ip_address) VALUES ('10.0.0.1')")   # CURRENT_TIMESTAMP defaults
+    conn.commit()
+    conn.close()
+
+
+class TimestampMigrationTester:
+    """Tests for epoch-millisecond timestamps."""
+
+    def __init__(self):
+        self.test_results = {}
+
+    def print_header(self, title: str):
+        """Print formatted test section header."""
+        print(f"\n{'='*70}")
+        print(f"🧪 {title}")
+        print('='*70)
+
+    def print_result(self, test_name: str, success: bool, details: str = ""):
+        """Print test result with status."""
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"    💡 {details}")
+        self.test_results[test_name] = success
+
+    def test_migration(self, temp_dir: str) -> bool:
+        """Test conversion, online chunking and range filters."""
+        self.print_header("Chunked Migration of a Version 1 Database")
+
+        path = os.path.join(temp_dir, "legacy.db")
+        rows = 200000
+        build_legacy_database(path, rows)
+
+        # The old range filter compares strings: 'YYYY-MM-DD HH...' sorts
+        # before 'YYYY-MM-DDTHH...', so half the rows of the edge days are lost
+        day_start, day_end = START + timedelta(days=3), START + timedelta(days=4)
+        in_range = {i + 1 for i in range(rows) if day_start <= START + STEP * i < day_end}
+        with sqlite3.connect(path) as conn:
+            legacy_ids = {row[0] for row in conn.execute("SELECT id FROM network_snapshots WHERE timestamp >= ? AND timestamp < ?",
+                                                         (day_start.isoformat(), day_end.isoformat()))}
+            start = time.perf_counter()
+            legacy_hours = conn.execute(LEGACY_HOURLY_QUERY, (START.isoformat(), (START + timedelta(days=30)).isoformat())).fetchall()
+            legacy_seconds = time.perf_counter() - start
+
+        # Another connection keeps writing while the manager converts
+        writer = sqlite3.connect(path, timeout=30.0)
+        opened = []
+        migration = threading.Thread(target=lambda: opened.append(NetworkDatabaseManager(path)))
+        write_latencies = []
+        start = time.perf_counter()
+        migration.start()
+        time.sleep(0.05)
+        while migration.is_alive():
+            write_start = time.perf_counter()
+            writer.execute("""
+                INSERT INTO network_snapshots (session_id, timestamp, device_count, total_upload_mbps,
+                    total_download_mbps, total_usage_mb, avg_latency_ms, avg_packet_loss, overall_quality)
+                VALUES (1, ?, 8, 1.0, 1.0, 0.5, 12.0, 0.0, 'Good')
+            """, (to_epoch_ms(datetime.now()),))
+            writer.commit()
+            write_latencies.append(time.perf_counter() - write_start)
+            time.sleep(0.01)
+        migration.join()
+        migration_seconds = time.perf_counter() - start
+        writer.close()
+        db = opened[0]
+
+        with db._get_connection() as conn:
+            stored = dict(conn.execute("SELECT id, timestamp FROM network_snapshots WHERE id <= ?", (rows,)).fetchall())
+            valid_until = dict(conn.execute("SELECT id, valid_until FROM network_snapshots "
+                                            "WHERE valid_until IS NOT NULL AND id <= ?", (rows,)).fetchall())
+            leftover_text = sum(conn.execute(f"SELECT COUNT(*) FROM {table} WHERE typeof({column}) = 'text'").fetchone()[0]
+                                for table, columns in db.TIME_COLUMNS for column in columns)
+            version = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0]
+            written_during = conn.execute("SELECT COUNT(*) FROM network_snapshots WHERE id > ?", (rows,)).fetchone()[0]
+            new_ids = {row[0] for row in conn.execute("SELECT id FROM network_snapshots WHERE timestamp >= ? AND timestamp < ?",
+                                                      (to_epoch_ms(day_start), to_epoch_ms(day_end)))}
+            start = time.perf_counter()
+            hours = conn.execute(HOURLY_QUERY, (to_epoch_ms(START), to_epoch_ms(START + timedelta(days=30)))).fetchall()
+            new_seconds = time.perf_counter() - start
+
+        converted_ok = (all(stored[i + 1] == expected_ms(i) for i in range(rows))
+                        and all(valid_until[i + 1] == expected_ms(i + 1) for i in range(0, rows, 10))
+                        and leftover_text == 0 and version == SCHEMA_VERSION)
+        self.print_result("Both Text Formats Converted Exactly", converted_ok,
+                          f"{rows:,} snapshots (UTC and local text) in {migration_seconds:.1f}s, "
+                          f"{leftover_text} text values left, schema version {version}")
+
+        worst_write = max(write_latencies) * 1000
+        online_ok = written_during == len(write_latencies) > 5 and worst_write < 500
+        self.print_result("Writers Keep Going During Migration", online_ok,
+                          f"{written_during} rows written meanwhile, slowest write {worst_write:.0f}ms "
+                          f"(chunks of {DatabaseConfig.MIGRATION_CHUNK_ROWS:,} rows)")
+
+        range_ok = new_ids == in_range and legacy_ids != in_range
+        self.print_result("Range Filters Exact", range_ok,
+                          f"one day: {len(new_ids):,} rows; text comparison matched {len(legacy_ids & in_range):,} "
+                          f"of them and {len(legacy_ids - in_range):,} from other days")
+
+        speedup = legacy_seconds / new_seconds
+        bucket_ok = len(hours) >= len(legacy_hours) - 1 and speedup >= 1.5
+        self.print_result("Hour Bucketing Faster", bucket_ok,
+                          f"{len(hours)} hours in {new_seconds * 1000:.0f}ms vs strftime() over text "
+                          f"{legacy_seconds * 1000:.0f}ms ({speedup:.1f}x)")
+
+        # Resumes: text left by an interrupted run is picked up on open
+        with db._get_connection(write=True) as conn:
+            conn.execute("UPDATE network_snapshots SET timestamp = ? WHERE id = 7", (legacy_text(6),))
+            conn.execute("DELETE FROM schema_version WHERE version = ?", (SCHEMA_VERSION,))
+        db.close()
+        start = time.perf_counter()
+        reopened = NetworkDatabaseManager(path)
+        resume_seconds = time.perf_counter() - start
+        with reopened._get_connection() as conn:
+            resumed = conn.execute("SELECT timestamp FROM network_snapshots WHERE id = 7").fetchone()[0]
+        resume_ok = resumed == expected_ms(6)
+        self.print_result("Interrupted Migration Resumes", resume_ok,
+                          f"1 leftover row converted on reopen in {resume_seconds * 1000:.0f}ms")
+        reopened.close()
+        return converted_ok and online_ok and range_ok and bucket_ok and resume_ok
+
+    def test_new_database(self, temp_dir: str) -> bool:
+        """Test that new databases store integers from the start."""
+        self.print_header("New Database")
+
+        db = NetworkDatabaseManager(os.path.join(temp_dir, "new.db"))
+        session_id = db.start_monitoring_session("new")
+        snapshot_id = db.save_network_snapshot(session_id, {
+            'device_count': 1, 'total_upload_mbps': 1.0, 'total_download_mbps': 2.0, 'total_usage_mb': 0.1,
+            'avg_latency_ms': 5.0, 'avg_packet_loss': 0.0, 'overall_quality': 'Excellent',
+            'active_interfaces': ['eth0'], 'tested_device_ip': '10.0.0.1'
+        })
+        db.save_device_quality_test(snapshot_id, '10.0.0.1', {'latency_ms': 5.0})
+        db.save_device({'ip': '10.0.0.1'})
+        db.end_monitoring_session(session_id)
+
+        with db._get_connection() as conn:
+            # A row inserted without times gets the integer column default
+            conn.execute("INSERT INTO monitoring_sessions (notes) VALUES ('defaults')")
+            conn.commit()
+            types = {f"{table}.{column}": conn.execute(f"SELECT typeof({column}) FROM {table} ORDER BY rowid LIMIT 1").fetchone()[0]
+                     for table, columns in db.TIME_COLUMNS for column in columns if column != 'valid_until'}
+            default = conn.execute("SELECT start_time FROM monitoring_sessions WHERE notes = 'defaults'").fetchone()[0]
+        now = to_epoch_ms(datetime.now())
+        integer_ok = set(types.values()) == {'integer'} and abs(default - now) < 5000
+        self.print_result("Every Time Column Holds Integers", integer_ok,
+                          f"{len(types)} columns, SQL default within {abs(default - now)}ms of now")
+
+        history_ok = len(db.get_device_history('10.0.0.1', hours=1)) == 1
+        self.print_result("Relative Ranges Use Epoch Milliseconds", history_ok, "device history for the last hour")
+        db.close()
+        return integer_ok and history_ok
+
+    def run_all_tests(self) -> bool:
+        """Run all timestamp migration tests."""
+        print("🚀 Timestamp Migration Test Suite")
+        start_time = time.time()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            results = [
+                self.test_migration(temp_dir),
+                self.test_new_database(temp_dir)
+            ]
+
+        passed = sum(1 for result in self.test_results.values() if result)
+        total = len(self.test_results)
+
+        print(f"\n{'='*70}")
+        print(f"📊 Results: {passed}/{total} checks passed in {time.time() - start_time:.1f}s")
+        print('='*70)
+
+        return all(results)
+
+
+def main():
+    tester = TimestampMigrationTester()
+    success = tester.run_all_tests()
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())